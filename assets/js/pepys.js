@@ -18,6 +18,8 @@ window.pepys.controller = {
     mapbox_map_id: "",
     mapbox_access_token: "",
     static_prefix: "",
+    // settings.PEPYS_VISIT_TIMES, "client" or "cookies".
+    visit_times: "client",
   },
 
   init: function (spec) {
@@ -333,7 +335,12 @@ window.pepys.tooltips = {
  *
  * The 'New' flags are actually, for any element with the class "newable"
  * and a data-time attribute: it adds a "NEW" marker to any that are new for
- * this user, based on the cookies set in VisitTimeMiddleware.
+ * this user, based on when their previous visit ended.
+ *
+ * By default we work that out here, keeping the times in localStorage, so
+ * that pages are the same for everyone and can be cached. If
+ * settings.PEPYS_VISIT_TIMES is "cookies" then VisitTimeMiddleware sets
+ * cookies instead.
  */
 window.pepys.comments = {
   /**
@@ -341,6 +348,22 @@ window.pepys.comments = {
    */
   prev_visit_end: null,
 
+  /**
+   * How long until a visit is over and the 'new' flags are reset. Seconds.
+   * The same as VisitTimeMiddleware.visit_length.
+   */
+  visit_length: 5400,
+
+  /**
+   * The localStorage key for the times of the user's visits.
+   */
+  storage_key: "pepys_visit_times",
+
+  /**
+   * The names of the cookies set by VisitTimeMiddleware.
+   */
+  cookie_names: ["last_view", "visit_start", "prev_visit_end"],
+
   init: function () {
     this.init_hash_link();
     this.init_newables();
@@ -357,7 +380,11 @@ window.pepys.comments = {
   },
 
   init_newables: function () {
-    this.get_cookies();
+    if (pepys.controller.config.visit_times === "cookies") {
+      this.get_cookies();
+    } else {
+      this.update_visit_times();
+    }
     this.set_markers();
   },
 
@@ -365,12 +392,70 @@ window.pepys.comments = {
    * We only need to know the end of their previous visit, if any.
    */
   get_cookies: function () {
-    cookie_value = readCookie("prev_visit_end");
-    if (isNumber(cookie_value)) {
-      this.prev_visit_end = parseInt(cookie_value, 10);
+    var value = parseInt(readCookie("prev_visit_end"), 10);
+    if (!Number.isNaN(value)) {
+      this.prev_visit_end = value;
+    }
+  },
+
+  /**
+   * Does what VisitTimeMiddleware does with cookies, using localStorage:
+   * updates the times of this page view, the start of this visit and the
+   * end of the previous one, and sets prev_visit_end.
+   */
+  update_visit_times: function () {
+    var now = Math.floor(Date.now() / 1000);
+    var times = this.read_visit_times();
+
+    if (times.last_view === null || times.visit_start === null) {
+      // User hasn't been here before.
+      times.visit_start = now;
+    } else if (now - times.visit_start > this.visit_length) {
+      // This is a new visit for the user.
+      times.prev_visit_end = times.last_view;
+      times.visit_start = now;
+    }
+    times.last_view = now;
+
+    this.prev_visit_end = times.prev_visit_end;
+
+    try {
+      window.localStorage.setItem(this.storage_key, JSON.stringify(times));
+    } catch (_e) {
+      // No localStorage, so every visit will be the first.
     }
   },
 
+  /**
+   * Returns an object of the stored times, each a UTC unixtime or null.
+   * The first time, it uses any cookies set by VisitTimeMiddleware before,
+   * and then deletes them, so they aren't sent with every request.
+   */
+  read_visit_times: function () {
+    var times = { last_view: null, visit_start: null, prev_visit_end: null };
+    var stored = null;
+
+    try {
+      stored = JSON.parse(window.localStorage.getItem(this.storage_key));
+    } catch (_e) {
+      // No localStorage, or invalid JSON.
+    }
+
+    this.cookie_names.forEach(function (name) {
+      var value = parseInt(
+        stored === null ? readCookie(name) : stored[name],
+        10,
+      );
+      if (!Number.isNaN(value)) {
+        times[name] = value;
+      }
+      document.cookie =
+        name + "=; expires=Thu, 01 Jan 1970 00:00:00 GMT; path=/";
+    });
+
+    return times;
+  },
+
   /**
    * Any element with a class of .newable should have a `data-time` element
    * containing a UTC unixtime of when that comment was posted.
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from pepysdiary.annotations.models import Annotation
+
+
+class Command(BaseCommand):
+    """
+    Recalculates the comment_count and last_comment_time for every object
+    that can be commented on (Entries, Letters, Topics, Articles, Posts).
+
+    These are changed incrementally as Annotations are saved and deleted,
+    so this is only needed if they've got out of step, e.g. after
+    Annotations have been changed directly in the database.
+
+    ./manage.py recount_comments
+    """
+
+    help = "Recalculates the comment counts and times on all commentable objects."
+
+    def handle(self, *args, **options):
+        results = Annotation.objects.recount_comment_data()
+
+        if options.get("verbosity", 1) > 0:
+            for model_class, num in results.items():
+                self.stdout.write(
+                    f"Recounted comments on {num} "
+                    f"{model_class._meta.verbose_name_plural}."
+                )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from pepysdiary.annotations.models import Annotation
+
+
+class Command(BaseCommand):
+    """
+    Sets the stored comment_html and reading for every Annotation.
+
+    These are set whenever an Annotation is saved, so this is only needed
+    for Annotations saved before they existed, after changing how comments
+    are rendered, or after adding to settings.PEPYS_READING_DATETIMES.
+
+    ./manage.py render_comments
+    ./manage.py render_comments --batch-size=1000
+    """
+
+    help = "Sets the stored comment HTML and reading for all Annotations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            action="store",
+            default=500,
+            type=int,
+            help="How many Annotations to read and update at once. Default 500.",
+        )
+
+    def handle(self, *args, **options):
+        num = Annotation.objects.render_comments(batch_size=options["batch_size"])
+
+        if options.get("verbosity", 1) > 0:
+            self.stdout.write(f"Rendered {num} annotation{'s' if num != 1 else ''}.")
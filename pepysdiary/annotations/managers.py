@@ -1,8 +1,57 @@
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.contenttypes.prefetch import GenericPrefetch
 from django.contrib.sites.models import Site
+from django.db.models import (
+    CharField,
+    Count,
+    Max,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce
 from django_comments.managers import CommentManager
 
+# The fields of commented-on objects that are needed to display their
+# titles and links alongside Annotations. Each model has some of them.
+CONTENT_OBJECT_FIELDS = ("title", "slug", "date_published", "diary_date", "letter_date")
 
-class AnnotationManager(CommentManager):
+
+def get_commentable_models():
+    "Returns the model classes of every kind of object that has Annotations."
+    return [
+        model_class
+        for model_class in apps.get_models()
+        if {"comment_count", "last_comment_time"}
+        <= {f.name for f in model_class._meta.get_fields()}
+    ]
+
+
+class AnnotationQuerySet(QuerySet):
+    def prefetch_content_objects(self):
+        """
+        Fetches the objects the Annotations are on (their content_object)
+        with one query per kind of object, rather than one per Annotation.
+        Only the fields needed for their titles and URLs are fetched.
+
+        e.g. Annotation.visible_objects.filter(user=person)
+            .prefetch_content_objects()
+        """
+        querysets = []
+        for model_class in get_commentable_models():
+            field_names = {f.name for f in model_class._meta.get_fields()}
+            querysets.append(
+                model_class._base_manager.only(
+                    *[name for name in CONTENT_OBJECT_FIELDS if name in field_names]
+                )
+            )
+        return self.prefetch_related(GenericPrefetch("content_object", querysets))
+
+
+class AnnotationManager(CommentManager.from_queryset(AnnotationQuerySet)):
     def get_queryset(self):
         """
         Trying this out, to fetch the related Persons for comments posted
@@ -12,6 +61,83 @@ class AnnotationManager(CommentManager):
         """
         return super().get_queryset().select_related("user")
 
+    def recount_comment_data(self):
+        """
+        Sets the comment_count and last_comment_time on every object, of
+        every model that has those fields, from their visible Annotations.
+
+        Saving and deleting Annotations changes those fields incrementally,
+        so this is for fixing any that have drifted. It does one UPDATE per
+        model.
+
+        Returns a dict of model class: number of objects updated.
+        """
+        results = {}
+        for model_class in get_commentable_models():
+            visible = (
+                self.model.objects.filter(
+                    content_type=ContentType.objects.get_for_model(model_class),
+                    object_pk=Cast(OuterRef("pk"), output_field=CharField()),
+                    site_id=settings.SITE_ID,
+                    is_public=True,
+                    is_removed=False,
+                )
+                .order_by()
+                .values("object_pk")
+            )
+
+            results[model_class] = model_class._base_manager.update(
+                comment_count=Coalesce(
+                    Subquery(visible.annotate(count=Count("pk")).values("count")),
+                    Value(0),
+                ),
+                last_comment_time=Subquery(
+                    visible.annotate(latest=Max("submit_date")).values("latest")
+                ),
+            )
+        return results
+
+    def render_comments(self, batch_size=500):
+        """
+        Sets the comment_html and reading of every Annotation, from its
+        comment and submit_date, as saving one does. For Annotations saved
+        before those fields existed, or if PEPYS_READING_DATETIMES changes.
+
+        Annotations are read, and the changed ones updated, in batches of
+        batch_size. Returns the number that were changed.
+        """
+        queryset = (
+            self.get_queryset()
+            .select_related(None)
+            .only("comment", "submit_date", "comment_html", "reading")
+            .order_by("pk")
+        )
+        num_changed = 0
+        last_pk = None
+        while True:
+            batch = queryset
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            batch = list(batch[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            changed = []
+            for annotation in batch:
+                comment_html = annotation.render_comment_html()
+                reading = annotation.get_reading()
+                if (comment_html, reading) != (
+                    annotation.comment_html,
+                    annotation.reading,
+                ):
+                    annotation.comment_html = comment_html
+                    annotation.reading = reading
+                    changed.append(annotation)
+            self.bulk_update(changed, ["comment_html", "reading"])
+            num_changed += len(changed)
+        return num_changed
+
 
 class VisibleAnnotationManager(AnnotationManager):
     """
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Made by pepysdiary.common.search.search_trigger_sql() from the model's
+# search_fields at the time, and copied here so that it doesn't change.
+SQL = """
+    CREATE FUNCTION annotations_annotation_search_document() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT'
+                OR OLD.comment IS DISTINCT FROM NEW.comment THEN
+            NEW.search_document :=
+                setweight(to_tsvector(COALESCE(NEW.comment, '')), 'A');
+        ELSIF NEW.search_document IS NULL THEN
+            NEW.search_document := OLD.search_document;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER annotations_annotation_search_document
+        BEFORE INSERT OR UPDATE OF comment, search_document
+        ON annotations_annotation
+        FOR EACH ROW EXECUTE FUNCTION annotations_annotation_search_document();
+"""
+
+REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS annotations_annotation_search_document ON annotations_annotation;
+    DROP FUNCTION IF EXISTS annotations_annotation_search_document();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("annotations", "0008_alter_annotation_content_type_alter_annotation_user"),
+    ]
+
+    operations = [
+        migrations.RunSQL(SQL, REVERSE_SQL),
+    ]
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+def set_readings(apps, schema_editor):
+    """
+    Set every existing Annotation's reading, with one UPDATE per reading.
+    Their comment_html is left for the render_comments command to set.
+    """
+    Annotation = apps.get_model("annotations", "Annotation")
+
+    for reading, start in enumerate(sorted(settings.PEPYS_READING_DATETIMES), 1):
+        Annotation.objects.filter(submit_date__gte=start).update(reading=reading)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("annotations", "0009_search_document_trigger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="annotation",
+            name="comment_html",
+            field=models.TextField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="The comment as HTML, with links and paragraphs.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="annotation",
+            name="reading",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                editable=False,
+                help_text="Which reading of the diary it was posted during, from 1.",
+            ),
+        ),
+        migrations.RunPython(set_readings, reverse_code=migrations.RunPython.noop),
+    ]
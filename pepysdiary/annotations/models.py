@@ -3,14 +3,21 @@ from django.contrib.contenttypes.models import ContentType
 from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Max
+from django.db import models
+from django.db.models import F, Max, Subquery, Value
+from django.db.models.functions import Greatest
+from django.template.defaultfilters import linebreaks_filter
 from django.utils.html import strip_tags
 from django_comments.abstracts import CommentAbstractModel
 
+from pepysdiary.common.models import SearchableMixin
+from pepysdiary.common.search import search_index
+from pepysdiary.common.templatetags.utility_filters import custom_urlizetrunc
+
 from .managers import AnnotationManager, VisibleAnnotationManager
 
 
-class Annotation(CommentAbstractModel):
+class Annotation(SearchableMixin, CommentAbstractModel):
     """
     Fields inherited from CommentAbstractModel:
 
@@ -29,8 +36,25 @@ class Annotation(CommentAbstractModel):
     is_removed - BooleanField (comment is inappropriate; displays "has been removed")
     """
 
-    # Also see index_components() method.
+    # Made from search_fields. See common.search.
     search_document = SearchVectorField(null=True)
+    search_fields = (("comment", "A"),)
+    search_summary_fields = ("comment",)
+
+    # Both set from the comment and submit_date when saving, so that
+    # displaying lots of Annotations doesn't have to work them out each time.
+    # The render_comments command sets them for all existing Annotations.
+    comment_html = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="The comment as HTML, with links and paragraphs.",
+    )
+    reading = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        help_text="Which reading of the diary it was posted during, from 1.",
+    )
 
     objects = AnnotationManager()
     visible_objects = VisibleAnnotationManager()
@@ -42,16 +66,66 @@ class Annotation(CommentAbstractModel):
         verbose_name_plural = "annotations"
         indexes = [GinIndex(fields=["search_document"])]
 
+    # The parent object and visibility of this Annotation as it was when
+    # last loaded from, or saved to, the database. So that on save we know
+    # how to change the parent's comment_count and last_comment_time.
+    # A tuple of (content_type_id, object_pk, is_visible, submit_date).
+    _saved_state = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields():
+            instance._remember_saved_state()
+        return instance
+
     def save(self, *args, **kwargs):
         # We don't allow HTML at all:
         self.comment = strip_tags(self.comment)
+        self.comment_html = self.render_comment_html()
+        self.reading = self.get_reading()
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"comment", "submit_date"} & set(
+            update_fields
+        ):
+            kwargs["update_fields"] = {*update_fields, "comment_html", "reading"}
+
+        if self._state.adding:
+            saved_state = (self.content_type_id, self.object_pk, False, None)
+        else:
+            saved_state = self._saved_state
 
         super().save(*args, **kwargs)
-        self.set_parent_comment_data()
+
+        if saved_state is None or saved_state[:2] != (
+            self.content_type_id,
+            self.object_pk,
+        ):
+            # We don't know enough about what's changed, so count everything:
+            self.set_parent_comment_data()
+        else:
+            self.update_parent_comment_data(
+                was_visible=saved_state[2],
+                is_visible=self.is_visible,
+                date_changed=saved_state[3] != self.submit_date,
+            )
+        self._remember_saved_state()
         self._set_user_first_comment_date()
 
     @property
-    def reading(self):
+    def is_visible(self):
+        "Is this Annotation public and not removed?"
+        return self.is_public is True and self.is_removed is False
+
+    def render_comment_html(self):
+        """
+        Returns the comment as HTML, as it's displayed: with URLs linked and
+        shortened, and line breaks turned into paragraphs and <br>s.
+        """
+        return linebreaks_filter(custom_urlizetrunc(self.comment, 34))
+
+    def get_reading(self):
         """
         Returns an integer indicating which reading this was posted during.
         From 1 to 3 (so far).
@@ -63,12 +137,6 @@ class Annotation(CommentAbstractModel):
             reading -= 1
         return reading
 
-    def index_components(self):
-        """Used by common.signals.on_save() to update the SearchVector on
-        self.search_document.
-        """
-        return ((self.comment, "A"),)
-
     def get_user_name(self):
         """
         Now:
@@ -168,7 +236,93 @@ class Annotation(CommentAbstractModel):
                     "submit_date__max"
                 ]
 
-        obj.save()
+        # Only update these fields, rather than calling obj.save(), which
+        # would re-do everything else that happens when the object's saved.
+        obj._meta.model._base_manager.filter(pk=obj.pk).update(
+            comment_count=obj.comment_count, last_comment_time=obj.last_comment_time
+        )
+
+    def update_parent_comment_data(
+        self, *, was_visible, is_visible, date_changed=False
+    ):
+        """
+        A quicker alternative to set_parent_comment_data() for when we know
+        whether this Annotation was, and is now, visible.
+
+        Changes the parent object's comment_count by +1 or -1, and its
+        last_comment_time, in a single UPDATE, without loading the object.
+
+        was_visible -- Whether this Annotation was public and not removed
+                       before this change. False if it's new.
+        is_visible -- Whether it is now. False if it's being deleted.
+        date_changed -- Whether its submit_date has changed.
+        """
+        model_class = self._get_parent_model_class()
+
+        updates = {}
+
+        count_change = int(is_visible) - int(was_visible)
+        if count_change != 0:
+            updates["comment_count"] = F("comment_count") + count_change
+
+        if is_visible and not was_visible:
+            # Postgres's GREATEST() ignores NULLs:
+            updates["last_comment_time"] = Greatest(
+                "last_comment_time", Value(self.submit_date)
+            )
+        elif was_visible and (not is_visible or date_changed):
+            # This might have been, or might now be, the latest comment:
+            updates["last_comment_time"] = self._latest_visible_submit_date()
+
+        if updates:
+            updated = model_class._base_manager.filter(pk=self.object_pk).update(
+                **updates
+            )
+            if updated == 0:
+                msg = (
+                    f"Content type {self.content_type_id} object "
+                    f"{self.object_pk} doesn't exist"
+                )
+                raise AttributeError(msg)
+
+    def _get_parent_model_class(self):
+        "Returns the model class of the object this Annotation is on."
+        try:
+            content_type = ContentType.objects.get_for_id(self.content_type_id)
+        except ObjectDoesNotExist as err:
+            msg = f"Content type {self.content_type_id} doesn't exist"
+            raise AttributeError(msg) from err
+
+        model_class = content_type.model_class()
+        if not model_class:
+            msg = f"Content type {self.content_type_id} object has no associated model"
+            raise AttributeError(msg)
+        return model_class
+
+    def _latest_visible_submit_date(self):
+        """
+        A subquery for the submit_date of the most recent visible Annotation
+        on this one's parent object (or NULL if there are none).
+        """
+        return Subquery(
+            Annotation.objects.filter(
+                content_type_id=self.content_type_id,
+                object_pk=self.object_pk,
+                site_id=self.site_id,
+                is_public=True,
+                is_removed=False,
+            )
+            .order_by("-submit_date")
+            .values("submit_date")[:1]
+        )
+
+    def _remember_saved_state(self):
+        self._saved_state = (
+            self.content_type_id,
+            self.object_pk,
+            self.is_visible,
+            self.submit_date,
+        )
 
     def _set_user_first_comment_date(self):
         """
@@ -192,3 +346,6 @@ class Annotation(CommentAbstractModel):
         ):
             self.user.first_comment_date = self.submit_date
             self.user.save()
+
+
+search_index.register(Annotation)
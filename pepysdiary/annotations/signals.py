@@ -1,19 +1,34 @@
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django_comments.signals import comment_was_posted
 
+from pepysdiary.common.caching import bump_cache_version
+from pepysdiary.common.templatetags.list_tags import COMMENTED_LISTS_CACHE_NAME
+
 from .models import Annotation
 from .spam_checker import test_comment_for_spam
 
 
-@receiver(post_save, sender=Annotation)
 @receiver(post_delete, sender=Annotation)
 def post_annotation_delete_actions(sender, instance, using, **kwargs):
     """
     If we're deleting a comment, we need to make sure the parent object's
     comment count and most-recent-comment date are still accurate.
+    (Annotation.save() does this when saving.)
     """
-    instance.set_parent_comment_data()
+    if instance._saved_state is not None:
+        was_visible = instance._saved_state[2]
+    else:
+        was_visible = instance.is_visible
+    instance.update_parent_comment_data(was_visible=was_visible, is_visible=False)
+
+
+@receiver(post_save, sender=Annotation)
+@receiver(post_delete, sender=Annotation)
+def post_annotation_save_delete_actions(sender, instance, using, **kwargs):
+    "Make sure the cached lists of recent comments are re-made."
+    transaction.on_commit(lambda: bump_cache_version(COMMENTED_LISTS_CACHE_NAME))
 
 
 comment_was_posted.connect(
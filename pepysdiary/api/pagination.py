@@ -1,9 +1,54 @@
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from pepysdiary.common.paginator import CursorPaginator, InvalidPage
 
 
 class CustomPagination(PageNumberPagination):
+    """
+    Pages of results, using ?page=2 etc.
+
+    If the view has a `cursor_ordering`, and there's a `cursor` query
+    parameter, we use a CursorPaginator instead, which is quicker for deep
+    pages. An empty cursor gets the first page. Then totalResults and
+    totalPages are null, and nextPageURL and previousPageURL have cursors.
+    """
+
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_page = None
+
+        ordering = getattr(view, "cursor_ordering", None)
+        if ordering is None or self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        self.request = request
+        paginator = CursorPaginator(queryset, self.get_page_size(request), ordering)
+        try:
+            self.cursor_page = paginator.page(
+                request.query_params[self.cursor_query_param]
+            )
+        except InvalidPage as err:
+            raise NotFound(str(err)) from err
+        return list(self.cursor_page)
+
     def get_paginated_response(self, data):
+        if self.cursor_page is not None:
+            return Response(
+                {
+                    "totalResults": None,
+                    "totalPages": None,
+                    "nextPageURL": self.get_cursor_link(self.cursor_page.next_cursor),
+                    "previousPageURL": self.get_cursor_link(
+                        self.cursor_page.previous_cursor
+                    ),
+                    "results": data,
+                }
+            )
+
         return Response(
             {
                 "totalResults": self.page.paginator.count,
@@ -13,3 +58,11 @@ class CustomPagination(PageNumberPagination):
                 "results": data,
             }
         )
+
+    def get_cursor_link(self, cursor):
+        if cursor is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, cursor)
@@ -44,11 +44,11 @@ class CategorySerializer(BaseSerializer):
     apiURL = serializers.HyperlinkedIdentityField(**categories_kwargs)
 
     children = serializers.HyperlinkedRelatedField(
-        source="get_children", read_only=True, many=True, **categories_kwargs
+        source="get_child_nodes", read_only=True, many=True, **categories_kwargs
     )
 
     parents = serializers.HyperlinkedRelatedField(
-        source="get_ancestors", read_only=True, many=True, **categories_kwargs
+        source="get_ancestor_nodes", read_only=True, many=True, **categories_kwargs
     )
 
     topicCount = serializers.IntegerField(source="topic_count", read_only=True)
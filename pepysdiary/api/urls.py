@@ -10,6 +10,7 @@ app_name = "api"
 
 router = DefaultRouter(trailing_slash=False)
 router.register(r"categories", views.CategoryViewSet)
+router.register(r"days", views.DayViewSet, basename="day")
 router.register(r"entries", views.EntryViewSet)
 router.register(r"topics", views.TopicViewSet)
 
@@ -2,11 +2,15 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from django.views.decorators.vary import vary_on_cookie
 from rest_framework import viewsets
+from rest_framework.response import Response
 from rest_framework.views import exception_handler
 
+from pepysdiary.common.utilities import make_url_absolute
 from pepysdiary.diary.models import Entry
 from pepysdiary.diary.views import date_from_string
 from pepysdiary.encyclopedia.models import Category, Topic
+from pepysdiary.events.models import DayEvent
+from pepysdiary.events.on_this_day import on_this_day
 
 from .serializers import (
     CategoryDetailSerializer,
@@ -84,6 +88,12 @@ class EntryViewSet(CachedReadOnlyModelViewSet):
 
     * `entries?page=2`
 
+    Or, for quicker paging through many results, add an empty `cursor`, and
+    then follow each response's `nextPageURL` (`totalResults` and
+    `totalPages` will be `null`), e.g.:
+
+    * `entries?cursor=`
+
     Restrict the list to specific dates, or spans of dates, using the
     `start` and `end` parameters. Entries span from `1660-01-01` to
     `1669-05-31` inclusive. e.g.:
@@ -99,6 +109,7 @@ class EntryViewSet(CachedReadOnlyModelViewSet):
 
     queryset = Entry.objects.all().order_by("diary_date")
     serializer_class = EntryListSerializer
+    cursor_ordering = ("diary_date",)
     lookup_field = "diary_date"
     lookup_url_kwarg = "entry_date"
 
@@ -148,13 +159,21 @@ class TopicViewSet(CachedReadOnlyModelViewSet):
 
     * `topics?page=2`
 
+    Or, for quicker paging through many results, add an empty `cursor`, and
+    then follow each response's `nextPageURL` (`totalResults` and
+    `totalPages` will be `null`), e.g.:
+
+    * `topics?cursor=`
+
     Fetch more data about a single Topic using its numeric ID, e.g.:
 
     * `topics/796`
     """
 
-    queryset = Topic.objects.all().order_by("id")
+    # Categories are needed to work out each Topic's kind.
+    queryset = Topic.objects.prefetch_related("categories").order_by("id")
     serializer_class = TopicListSerializer
+    cursor_ordering = ("id",)
     lookup_field = "id"
     lookup_url_kwarg = "topic_id"
 
@@ -163,3 +182,52 @@ class TopicViewSet(CachedReadOnlyModelViewSet):
             return TopicDetailSerializer
         else:
             return self.serializer_class
+
+
+class DayViewSet(viewsets.ViewSet):
+    """
+    Fetch everything that happened on a single date: its Diary Entries,
+    Letters, and other events grouped by their source. e.g.:
+
+    * `days/1660-01-01`
+
+    Any date can be fetched, but only those from `1660-01-01` to
+    `1669-05-31` will have much on them.
+    """
+
+    lookup_url_kwarg = "day_date"
+    lookup_value_regex = r"\d{4}-\d{2}-\d{2}"
+
+    @method_decorator(cache_page(60 * 15))
+    @method_decorator(vary_on_cookie)
+    def retrieve(self, request, day_date=None, format=None):
+        parts = day_date.split("-")
+        # Raises a 404 for an invalid date:
+        date = date_from_string(parts[0], "%Y", parts[1], "%m", parts[2], "%d", "-")
+
+        day = on_this_day.get(date)
+        sources = dict(DayEvent.Source.choices)
+
+        return Response(
+            {
+                "date": date.isoformat(),
+                "entries": [
+                    {"title": title, "webURL": make_url_absolute(url)}
+                    for title, url in day["entries"]
+                ],
+                "letters": [
+                    {"title": title, "webURL": make_url_absolute(url)}
+                    for title, url in day["letters"]
+                ],
+                "dayEvents": [
+                    {
+                        "source": source,
+                        "sourceName": sources[source],
+                        "events": [
+                            {"title": title, "url": url} for title, url in events
+                        ],
+                    }
+                    for source, events in day["events"]
+                ],
+            }
+        )
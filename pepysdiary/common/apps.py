@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     name = "pepysdiary.common"
     default_auto_field = "django.db.models.AutoField"
+
+    def ready(self):
+        from . import signals as common_signals  # noqa: F401
+
+        # So that its cached fragments are invalidated whenever the models
+        # they use change, even if no template has used its tags yet.
+        from .templatetags import widget_tags  # noqa: F401
@@ -0,0 +1,245 @@
+import inspect
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from hashlib import md5
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+# How long cached_fragment() keeps fragments by default. They're re-made
+# sooner if the models they use change.
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# The cache version names of the cached fragments (and other cached things)
+# that use each model. See bump_cache_version_on_change().
+_fragment_names = defaultdict(set)
+
+
+def get_cache_version(name):
+    """
+    Returns the current version string for a named set of cached things,
+    for use in their cache keys. See bump_cache_version().
+    """
+    return cache.get(f"{name}:version", "0")
+
+
+def bump_cache_version(name):
+    """
+    Changes the version string for a named set of cached things, so that any
+    keys made with the old version are no longer used.
+    """
+    cache.set(f"{name}:version", uuid.uuid4().hex, timeout=None)
+
+
+class VersionedLocalCache:
+    """
+    Keeps a value that's expensive to make, and rarely changes, in this
+    process's memory.
+
+    The value is made by calling `make_value()` the first time it's needed.
+    Calling `invalidate()` (e.g. when a model is saved) means it'll be made
+    again next time.
+
+    So that other processes also know to remake their copies, invalidating
+    also changes a version string stored in the shared Django cache. Each
+    process compares that with the version it last saw. (With DummyCache
+    that check does nothing, and only this process will know. Likewise with
+    LocMemCache, which isn't shared between processes.)
+
+    If `max_age` is set, the value is also remade once it's that many
+    seconds old, so that other processes see changes within that time even
+    if the shared cache can't tell them.
+
+    e.g.:
+
+        date_cache = VersionedLocalCache("diary:dates", make_dates_list)
+        dates = date_cache.get()
+        date_cache.invalidate()
+    """
+
+    def __init__(self, name, make_value, max_age=None):
+        self.name = name
+        self.make_value = make_value
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        # A (version, value, expires) tuple, or None. Always replaced, never
+        # changed, so that other threads can read it without the lock.
+        self._entry = None
+        # Incremented every time we're invalidated, so a value being made
+        # while that happens isn't kept.
+        self._generation = 0
+
+    def get(self):
+        "Returns the value, making it first if needed."
+        version = get_cache_version(self.name)
+        entry = self._entry
+        if (
+            entry is not None
+            and entry[0] == version
+            and (entry[2] is None or time.time() < entry[2])
+        ):
+            return entry[1]
+
+        with self._lock:
+            generation = self._generation
+            expires = None if self.max_age is None else time.time() + self.max_age
+            value = self.make_value()
+            if generation == self._generation:
+                self._entry = (version, value, expires)
+        return value
+
+    def peek(self):
+        "Returns the value if we already have it in memory, otherwise None."
+        entry = self._entry
+        return None if entry is None else entry[1]
+
+    def invalidate(self):
+        """
+        Forget the value in this process now, and tell every process to
+        forget it once the current transaction (if any) has committed.
+        """
+        self._forget()
+        transaction.on_commit(self._invalidate_everywhere)
+
+    def _forget(self):
+        self._generation += 1
+        self._entry = None
+
+    def _invalidate_everywhere(self):
+        self._forget()
+        bump_cache_version(self.name)
+
+
+class LRUCache:
+    """
+    A small, thread-safe, least-recently-used cache of values in this
+    process's memory. Once it holds `maxsize` values, adding another one
+    forgets the one that was used longest ago.
+
+    e.g.:
+
+        summaries = LRUCache(maxsize=500)
+        summaries.set(("diary.entry", 123, "cats"), html)
+        html = summaries.get(("diary.entry", 123, "cats"))
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._values = OrderedDict()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._values.move_to_end(key)
+            except KeyError:
+                return default
+            return self._values[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def __len__(self):
+        return len(self._values)
+
+
+def cached_fragment(
+    *models, template_name=None, context_vars=(), timeout=FRAGMENT_CACHE_TIMEOUT
+):
+    """
+    Decorator for the function of a template tag, so that its HTML is
+    cached until any of `models` is saved or deleted.
+
+    If template_name is set, the function should return a context dict,
+    which is rendered with that template, like an inclusion tag. Otherwise
+    it should return the HTML. Either way, register it as a simple_tag:
+
+        @register.simple_tag(takes_context=True)
+        @cached_fragment(Post, template_name="widgets/posts.html",
+                         context_vars=("date_format_long",))
+        def latest_posts(context, quantity=5):
+            return {"posts": Post.objects.all()[:quantity]}
+
+    The cache key includes the tag's arguments and, if its first argument
+    is `context`, the values of context_vars from it. So the function
+    shouldn't use anything else from the context.
+
+    Fragments are invalidated using post_save and post_delete, so make sure
+    the module that defines the tag is imported when the app is ready.
+    For changes that don't send those signals, like bulk_create(), call
+    invalidate_fragments().
+    """
+
+    def decorator(func):
+        name = f"fragment:{func.__module__}.{func.__qualname__}"
+        # Like Django, assume that takes_context means the first arg is this:
+        params = list(inspect.signature(func).parameters)
+        takes_context = bool(params) and params[0] == "context"
+
+        bump_cache_version_on_change(name, *models)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key_parts = list(args)
+            if takes_context:
+                context = args[0]
+                key_parts[0] = [context.get(var) for var in context_vars]
+            key_parts.append(sorted(kwargs.items()))
+            digest = md5(repr(key_parts).encode(), usedforsecurity=False).hexdigest()
+            cache_key = f"{name}:{get_cache_version(name)}:{digest}"
+
+            html = cache.get(cache_key)
+            if html is None:
+                html = func(*args, **kwargs)
+                if template_name is not None:
+                    html = render_to_string(template_name, html)
+                cache.set(cache_key, html, timeout=timeout)
+            return mark_safe(html)
+
+        return wrapper
+
+    return decorator
+
+
+def bump_cache_version_on_change(name, *models):
+    """
+    Changes the version of a named set of cached things whenever any of
+    `models` is saved or deleted, using post_save and post_delete. So make
+    sure this is called when the app is ready.
+    """
+    for model_class in models:
+        _fragment_names[model_class].add(name)
+        for signal in (post_save, post_delete):
+            signal.connect(
+                _fragment_model_changed,
+                sender=model_class,
+                dispatch_uid=f"cached_fragment_{model_class._meta.label_lower}",
+            )
+
+
+def invalidate_fragments(model_class, using=None):
+    """
+    Makes every cached_fragment(), or anything else using
+    bump_cache_version_on_change(), that uses model_class be re-made, once
+    the current transaction (if any) has committed.
+    """
+    for name in _fragment_names.get(model_class, ()):
+        transaction.on_commit(lambda name=name: bump_cache_version(name), using=using)
+
+
+def _fragment_model_changed(sender, using, **kwargs):
+    invalidate_fragments(sender, using=using)
@@ -1,7 +1,7 @@
 from django.conf import settings
 from django.utils.timezone import now
 
-from pepysdiary.common.models import Config
+from pepysdiary.common.site_settings import site_settings
 
 # Things that we want to be available in the context of every page.
 
@@ -46,7 +46,13 @@ def api_keys(request):
 
 
 def config(request):
-    return {"config": Config.objects.get_site_config()}
+    "The current Site's Config, which is kept in memory, so needs no query."
+    return {"config": site_settings.config}
+
+
+def visit_times(request):
+    "So the JavaScript knows where to find the times of the previous visit."
+    return {"PEPYS_VISIT_TIMES": settings.PEPYS_VISIT_TIMES}
 
 
 def url_name(request):
@@ -1,12 +1,28 @@
+from hashlib import md5
+
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django.contrib.syndication.views import Feed, add_domain
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    quote_etag,
+)
 from django.utils.encoding import force_str
 from django.utils.feedgenerator import Rss201rev2Feed
 from django.utils.html import strip_tags
+from django.utils.http import http_date, parse_http_date_safe
 
+from pepysdiary.common.caching import bump_cache_version_on_change, get_cache_version
+from pepysdiary.common.site_settings import site_settings
 from pepysdiary.common.templatetags.text_formatting_filters import smartypants
 
+# How long a rendered feed is kept, at most. It's rendered again sooner if
+# anything in it changes.
+FEED_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
 
 class ExtendedRSSFeed(Rss201rev2Feed):
     """
@@ -25,12 +41,79 @@ class ExtendedRSSFeed(Rss201rev2Feed):
 
 
 class BaseRSSFeed(Feed):
+    """
+    Feeds are polled constantly, but rarely change. So each one is only
+    rendered the first time it's requested after its content has changed,
+    and the bytes are kept in the shared cache with an ETag and
+    Last-Modified time. Requests from clients that already have the current
+    version get a 304 response without touching the database.
+
+    The feed's cached version is forgotten whenever any of its
+    `cached_models`, or the Site, is saved or deleted. Children whose
+    content also changes over time can add to get_cache_key().
+    """
+
     feed_type = ExtendedRSSFeed
 
     link = "/"
     # Children should also have:
     # title
     # description
+    # cached_models - the models whose changes mean it must be rendered again
+
+    cached_models = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.cache_name = f"feed:{cls.__module__}.{cls.__qualname__}"
+        # The Site's domain is in every feed.
+        bump_cache_version_on_change(cls.cache_name, Site, *cls.cached_models)
+
+    def __call__(self, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        feed = cache.get(key)
+        if feed is None:
+            feed = self.render_feed(request, *args, **kwargs)
+            cache.set(key, feed, timeout=FEED_CACHE_TIMEOUT)
+
+        response = HttpResponse(feed["content"], content_type=feed["content_type"])
+        response.headers["ETag"] = feed["etag"]
+        if feed["last_modified"] is not None:
+            response.headers["Last-Modified"] = http_date(feed["last_modified"])
+        # Checking the ETag is cheap, so clients should do it every time.
+        # This also stops UpdateCacheMiddleware keeping its own copy, which
+        # wouldn't be forgotten when the feed changes.
+        patch_cache_control(response, max_age=0)
+
+        return get_conditional_response(
+            request,
+            etag=feed["etag"],
+            last_modified=feed["last_modified"],
+            response=response,
+        )
+
+    def get_cache_key(self, request):
+        """
+        The key for the rendered feed, which changes whenever its content
+        does. Our feeds have no arguments, so it's the same for all requests,
+        except that links in the feed use the request's protocol.
+        """
+        version = get_cache_version(self.cache_name)
+        return f"{self.cache_name}:{version}:{request.scheme}"
+
+    def render_feed(self, request, *args, **kwargs):
+        """
+        Renders the feed and returns a dict of what's needed to respond
+        with it, to be cached.
+        """
+        response = super().__call__(request, *args, **kwargs)
+        content = response.content
+        return {
+            "content": content,
+            "content_type": response["Content-Type"],
+            "etag": quote_etag(md5(content, usedforsecurity=False).hexdigest()),
+            "last_modified": parse_http_date_safe(response.get("Last-Modified")),
+        }
 
     def item_extra_kwargs(self, item):
         return {"content_encoded": self.item_content_encoded(item)}
@@ -69,7 +152,7 @@ class BaseRSSFeed(Feed):
                 parts.append(force_str(smartypants(text)))
 
         url = add_domain(
-            Site.objects.get_current().domain,
+            site_settings.site.domain,
             url,
             secure=settings.PEPYS_USE_HTTPS,
         )
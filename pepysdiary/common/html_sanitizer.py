@@ -0,0 +1,345 @@
+import re
+from html import escape
+from urllib.parse import urlparse
+
+import lxml.html
+from lxml import etree
+
+# Attributes whose values are URIs, to check for allowed protocols.
+URI_ATTRIBUTES = frozenset(
+    {
+        "action",
+        "background",
+        "cite",
+        "data",
+        "dynsrc",
+        "formaction",
+        "href",
+        "longdesc",
+        "lowsrc",
+        "ping",
+        "poster",
+        "src",
+    }
+)
+
+# Elements that are output like <br/>, as BeautifulSoup does.
+VOID_ELEMENTS = frozenset(
+    {
+        "area",
+        "base",
+        "basefont",
+        "bgsound",
+        "br",
+        "col",
+        "command",
+        "embed",
+        "frame",
+        "hr",
+        "image",
+        "img",
+        "input",
+        "isindex",
+        "keygen",
+        "link",
+        "menuitem",
+        "meta",
+        "nextid",
+        "param",
+        "source",
+        "spacer",
+        "track",
+        "wbr",
+    }
+)
+
+# Elements that, if they're not allowed, bleach replaces with a line break.
+BLOCK_LEVEL_ELEMENTS = frozenset(
+    {
+        "address",
+        "article",
+        "aside",
+        "blockquote",
+        "details",
+        "dialog",
+        "dd",
+        "div",
+        "dl",
+        "dt",
+        "fieldset",
+        "figcaption",
+        "figure",
+        "footer",
+        "form",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "header",
+        "hgroup",
+        "hr",
+        "li",
+        "main",
+        "nav",
+        "ol",
+        "p",
+        "pre",
+        "section",
+        "table",
+        "ul",
+    }
+)
+
+# Elements whose text is output without escaping.
+RAW_TEXT_ELEMENTS = frozenset({"script", "style"})
+
+# Elements within which whitespace is left as it is.
+PRESERVE_WHITESPACE_ELEMENTS = frozenset({"pre", "textarea"})
+
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+class HTMLSanitizer:
+    """
+    Cleans untrusted HTML: only allowed elements and attributes are kept,
+    style attributes only keep allowed CSS properties, some elements are
+    removed along with their contents, and some have classes added.
+
+    It's configured once, and can then be used on any number of documents,
+    so make one per process. Each document is parsed with lxml and cleaned
+    and written out in a single walk of its tree, e.g.:
+
+        sanitizer = HTMLSanitizer(
+            tags={"p", "a", "div"},
+            attributes={"*": ["class"], "a": ["href"]},
+            remove=["div.hatnote", ".noprint", "script"],
+            add_classes={"infobox": ["table"]},
+        )
+        html = sanitizer.clean(html)
+
+    It does the same as bleach.clean(strip=True) followed by removing and
+    changing elements with BeautifulSoup, and its output is the same as
+    that BeautifulSoup's, for well-formed HTML:
+
+    tags - Elements that are kept. Other elements are removed but their
+        contents are kept.
+    attributes - Dict of element name (or "*" for all elements) to a list
+        of the attributes to keep on those elements. Attributes with URI
+        values are dropped if they use a protocol not in `protocols`.
+    css_sanitizer - A bleach CSSSanitizer for any allowed style attributes.
+    remove - Simple selectors, like "div", "div.navbar.mini" or
+        ".noprint". Any kept elements matching one are removed, along with
+        their contents.
+    add_classes - Dict of class name to a list of classes to add to any
+        element with that class.
+    """
+
+    def __init__(
+        self,
+        tags,
+        attributes,
+        css_sanitizer=None,
+        protocols=("http", "https", "mailto"),
+        remove=(),
+        add_classes=None,
+    ):
+        self.tags = frozenset(tags)
+        self.attributes = {tag: frozenset(names) for tag, names in attributes.items()}
+        self.all_attributes = self.attributes.get("*", frozenset())
+        self.css_sanitizer = css_sanitizer
+        self.protocols = frozenset(protocols)
+        self.add_classes = list((add_classes or {}).items())
+
+        # Compile the selectors into a dict of
+        # tag name (or None for any): [set of classes, ...]
+        self.remove = {}
+        for selector in remove:
+            tag, *classes = selector.split(".")
+            self.remove.setdefault(tag or None, []).append(frozenset(classes))
+
+        self.parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+
+    def clean(self, html):
+        "Returns the cleaned version of an HTML string."
+        if not html or html.isspace():
+            return ""
+        try:
+            document = lxml.html.document_fromstring(html, parser=self.parser)
+        except etree.ParserError:
+            # e.g. it's only comments.
+            return ""
+
+        out = _Output()
+        # Anything the parser moved into <head> comes before the <body>.
+        for part in document:
+            if isinstance(part.tag, str) and part.tag in ("head", "body"):
+                self._write_contents(part, out)
+        return out.getvalue()
+
+    def _write_contents(self, element, out):
+        "Writes an element's text and children, but not the element itself."
+        if element.text:
+            out.text(element.text)
+        if element.tag == "table" and "tbody" in self.tags:
+            self._write_table_contents(element, out)
+        else:
+            for child in element:
+                self._write(child, out)
+
+    def _write_table_contents(self, table, out):
+        """
+        Writes a table's children, with any rows that are directly in the
+        table wrapped in a <tbody>, like an HTML5 parser would.
+        """
+        in_tbody = False
+        for child in table:
+            if child.tag == "tr" and not in_tbody:
+                out.markup("<tbody>")
+                in_tbody = True
+            elif child.tag != "tr" and in_tbody:
+                out.markup("</tbody>")
+                in_tbody = False
+            self._write(child, out)
+        if in_tbody:
+            out.markup("</tbody>")
+
+    def _write(self, element, out, *, tail=True):
+        "Writes an element, its contents, and its tail."
+        tag = element.tag
+        if not isinstance(tag, str):
+            # Entities etc.
+            pass
+        elif tag not in self.tags:
+            # Keep the contents but not the element. Like bleach, replace
+            # the start of a block-level element with a line break.
+            if tag in BLOCK_LEVEL_ELEMENTS and out.started:
+                out.text("\n")
+            out.started = True
+            self._write_contents(element, out)
+        else:
+            out.started = True
+            classes = element.get("class", "").split()
+            if self._is_removed(tag, classes):
+                # The text either side of it isn't joined together.
+                out.flush()
+            elif tag in VOID_ELEMENTS and len(element) == 0 and not element.text:
+                out.markup(f"<{tag}{self._attributes(element, classes)}/>")
+            else:
+                out.markup(f"<{tag}{self._attributes(element, classes)}>")
+                if tag in RAW_TEXT_ELEMENTS:
+                    out.markup(element.text or "")
+                else:
+                    out.start_element(tag)
+                    self._write_contents(element, out)
+                out.markup(f"</{tag}>")
+                out.end_element(tag)
+
+        if tail and element.tail:
+            out.text(element.tail)
+
+    def _is_removed(self, tag, classes):
+        for key in (tag, None):
+            for required in self.remove.get(key, ()):
+                if required.issubset(classes):
+                    return True
+        return False
+
+    def _attributes(self, element, classes):
+        "Returns the string of an element's allowed attributes."
+        allowed = self.attributes.get(element.tag, frozenset())
+        attrs = {}
+        for name, value in element.items():
+            if name not in allowed and name not in self.all_attributes:
+                continue
+            if name in URI_ATTRIBUTES and not self._is_allowed_uri(value):
+                continue
+            if name == "style":
+                value = (
+                    self.css_sanitizer.sanitize_css(value) if self.css_sanitizer else ""
+                )
+            elif name == "class":
+                for class_name, new_classes in self.add_classes:
+                    if class_name in classes:
+                        classes = classes + new_classes
+                value = " ".join(classes)
+            attrs[name] = value
+
+        return "".join(
+            f" {name}={self._quote_attribute(value)}"
+            for name, value in sorted(attrs.items())
+        )
+
+    def _is_allowed_uri(self, value):
+        "Like bleach's sanitize_uri_value()."
+        # Strip backtick, whitespace, control and non-ASCII characters:
+        normalized = re.sub(r"[`\000-\040\177-\240\s]+", "", value)
+        normalized = re.sub(r"[^\x00-\x7f]", "", normalized).lower()
+        try:
+            scheme = urlparse(normalized).scheme
+        except ValueError:
+            return False
+        if scheme:
+            return scheme in self.protocols
+        if normalized.startswith("#"):
+            return True
+        if ":" in normalized and normalized.split(":")[0] in self.protocols:
+            return True
+        return "http" in self.protocols or "https" in self.protocols
+
+    def _quote_attribute(self, value):
+        "Quotes an attribute value the way BeautifulSoup does."
+        value = escape(value, quote=False)
+        if '"' not in value:
+            return f'"{value}"'
+        if "'" not in value:
+            return f"'{value}'"
+        return '"{}"'.format(value.replace('"', "&quot;"))
+
+
+class _Output:
+    """
+    Collects the output of HTMLSanitizer.clean() for one document.
+
+    Text is escaped, and is only written when the next tag is. So text
+    from either side of elements that were removed, but whose contents
+    were kept, is joined together. Then, like BeautifulSoup, if it's all
+    whitespace, it's shortened to a single space or line break, unless
+    it's within a <pre>.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.pending = []
+        self.pre_depth = 0
+        # Whether any element has been written, or removed, yet:
+        self.started = False
+
+    def text(self, text):
+        self.pending.append(text)
+
+    def markup(self, markup):
+        self.flush()
+        self.parts.append(markup)
+
+    def start_element(self, tag):
+        if tag in PRESERVE_WHITESPACE_ELEMENTS:
+            self.pre_depth += 1
+
+    def end_element(self, tag):
+        if tag in PRESERVE_WHITESPACE_ELEMENTS:
+            self.pre_depth -= 1
+
+    def flush(self):
+        if not self.pending:
+            return
+        text = "".join(self.pending)
+        self.pending = []
+        if not self.pre_depth and not text.strip(ASCII_SPACES):
+            text = "\n" if "\n" in text else " "
+        self.parts.append(escape(text, quote=False))
+
+    def getvalue(self):
+        self.flush()
+        return "".join(self.parts)
@@ -0,0 +1,328 @@
+import statistics
+import time
+from argparse import ArgumentParser
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.functions import Length
+from django.template.loader import render_to_string
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from pepysdiary.annotations.models import Annotation
+from pepysdiary.common.paginator import CursorPaginator
+from pepysdiary.common.search import search_index
+from pepysdiary.diary.models import Entry
+from pepysdiary.diary.views import EntryMonthArchiveView
+from pepysdiary.encyclopedia.wikipedia_fetcher import WikipediaFetcher
+
+# Saved Wikipedia pages, as fetch_wikipedia receives them.
+WIKIPEDIA_PAGES_DIR = (
+    settings.BASE_DIR / "tests" / "encyclopedia" / "fixtures" / "wikipedia_pages"
+)
+
+
+class Command(BaseCommand):
+    """
+    Times some of the site's more expensive operations, and counts the
+    database queries they make, using whatever data is in the current
+    database. Best used with a copy of the live database, to compare the
+    numbers before and after a change.
+
+    Time rendering the Diary Entries archive page for May 1663, 20 times:
+    ./manage.py benchmark month_archive --year=1663 --month=05 --repeat=20
+
+    Time fetching pages 1 and 60 of the API's list of Entries, using page
+    numbers and cursors:
+    ./manage.py benchmark api_pages --list=entries --page=60
+
+    Time saving 500 new Diary Entries, with their search_document made by
+    Python and then by database triggers (the Entries are then rolled back):
+    ./manage.py benchmark search_import --number=500
+
+    Time rendering the list of 500 annotations on a Diary Entry, using their
+    stored comment_html and rendering each comment as the page is made:
+    ./manage.py benchmark annotations --number=500
+
+    Time tidying saved Wikipedia pages with the lxml sanitizer and with the
+    old bleach and BeautifulSoup version, and check their results match:
+    ./manage.py benchmark wikipedia_tidy --dir=path/to/pages/
+    """
+
+    help = "Counts queries and measures wall time for expensive operations."
+
+    def add_arguments(self, parser):
+        # Options shared by every benchmark:
+        common = ArgumentParser(add_help=False)
+        common.add_argument(
+            "--repeat",
+            "-r",
+            action="store",
+            dest="repeat",
+            default=10,
+            type=int,
+            help="How many times to run each benchmark. Default 10.",
+        )
+
+        subparsers = parser.add_subparsers(
+            dest="benchmark", required=True, title="benchmarks"
+        )
+
+        month_archive = subparsers.add_parser(
+            "month_archive",
+            parents=[common],
+            help="Render a month's page of Diary Entries.",
+        )
+        month_archive.add_argument("--year", default="1663", help="e.g. 1663")
+        month_archive.add_argument("--month", default="05", help="e.g. 05")
+
+        api_pages = subparsers.add_parser(
+            "api_pages",
+            parents=[common],
+            help="Fetch the first and a later page of an API list.",
+        )
+        api_pages.add_argument(
+            "--list", dest="list_name", choices=("entries", "topics"), default="entries"
+        )
+        api_pages.add_argument(
+            "--page", default=100, type=int, help="The later page. Default 100."
+        )
+
+        search_import = subparsers.add_parser(
+            "search_import",
+            parents=[common],
+            help="Save new Diary Entries, and make their search_documents.",
+        )
+        search_import.add_argument(
+            "--number",
+            "-n",
+            default=200,
+            type=int,
+            help="How many Entries to save each time. Default 200.",
+        )
+
+        annotations = subparsers.add_parser(
+            "annotations",
+            parents=[common],
+            help="Render the list of Annotations on a Diary Entry.",
+        )
+        annotations.add_argument(
+            "--number",
+            "-n",
+            default=500,
+            type=int,
+            help="How many Annotations the Entry has. Default 500.",
+        )
+
+        wikipedia_tidy = subparsers.add_parser(
+            "wikipedia_tidy",
+            parents=[common],
+            help="Tidy saved Wikipedia pages, both ways, and compare them.",
+        )
+        wikipedia_tidy.add_argument(
+            "--dir",
+            dest="directory",
+            default=WIKIPEDIA_PAGES_DIR,
+            type=Path,
+            help="A directory of .html files. Default is the tests' pages.",
+        )
+
+    def handle(self, *args, **options):
+        getattr(self, f"benchmark_{options['benchmark']}")(**options)
+
+    def benchmark_month_archive(self, year, month, repeat, **kwargs):
+        entries = list(
+            Entry.objects.filter(diary_date__year=year, diary_date__month=month)
+        )
+        self.stdout.write(f"Month archive for {year}-{month}: {len(entries)} entries")
+
+        request = RequestFactory().get(f"/diary/{year}/{month}/")
+
+        def render_page():
+            response = EntryMonthArchiveView.as_view()(request, year=year, month=month)
+            response.render()
+
+        self.report("Whole page", render_page, repeat)
+
+        self.report(
+            "Tooltip references",
+            lambda: Entry.objects.get_brief_references(objects=entries),
+            repeat,
+        )
+
+    def benchmark_api_pages(self, list_name, page, repeat, **kwargs):
+        from pepysdiary.api.views import EntryViewSet, TopicViewSet
+
+        viewset = EntryViewSet if list_name == "entries" else TopicViewSet
+        # Without throttling, which would stop us after a few requests.
+        view = viewset.as_view({"get": "list"}, throttle_classes=[])
+        per_page = settings.REST_FRAMEWORK["PAGE_SIZE"]
+        queryset = viewset.queryset
+
+        self.stdout.write(f"API {list_name}: {queryset.count()} in pages of {per_page}")
+
+        # The cursor for the same page as ?page=page:
+        paginator = CursorPaginator(queryset, per_page, viewset.cursor_ordering)
+        offset = (page - 1) * per_page - 1
+        previous_obj = queryset.order_by(*viewset.cursor_ordering)[offset : offset + 1]
+        if not previous_obj:
+            self.stderr.write(f"There is no page {page}")
+            return
+        cursor = paginator.make_cursor(previous_obj[0])
+
+        for label, query_string in (
+            ("Page 1", "page=1"),
+            (f"Page {page}", f"page={page}"),
+            ("Cursor page 1", "cursor="),
+            (f"Cursor page {page}", f"cursor={cursor}"),
+        ):
+            request = RequestFactory().get(f"/api/v1/{list_name}?{query_string}")
+            self.report(label, lambda request=request: view(request).render(), repeat)
+
+    def benchmark_search_import(self, number, repeat, **kwargs):
+        # Copy the text of the longest existing Entries, if there are any:
+        texts = list(
+            Entry.objects.order_by(Length("text").desc())[:number].values_list(
+                "title", "text", "footnotes"
+            )
+        ) or [("An Entry", "<p>A test diary entry.</p>" * 100, "")]
+        self.stdout.write(
+            f"Saving {number} Entries, "
+            f"{sum(len(t[1]) for t in texts) // len(texts)} characters on average"
+        )
+
+        def import_entries():
+            # So they don't clash with real Entries' diary_dates:
+            start_date = date(1500, 1, 1)
+            with transaction.atomic():
+                for i in range(number):
+                    title, text, footnotes = texts[i % len(texts)]
+                    Entry(
+                        title=title,
+                        text=text,
+                        footnotes=footnotes,
+                        diary_date=start_date + timedelta(days=i),
+                    ).save()
+                # Rather than waiting for a commit that won't happen:
+                search_index.flush()
+                transaction.set_rollback(True)
+
+        def import_entries_in_python():
+            with (
+                override_settings(PEPYS_SEARCH_INDEX_IN_DATABASE=False),
+                transaction.atomic(),
+            ):
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "ALTER TABLE diary_entry "
+                        "DISABLE TRIGGER diary_entry_search_document"
+                    )
+                import_entries()
+                transaction.set_rollback(True)
+
+        self.report("search_document made in Python", import_entries_in_python, repeat)
+        self.report("search_document made by trigger", import_entries, repeat)
+
+    def benchmark_annotations(self, number, repeat, **kwargs):
+        # Unsaved, because the list template doesn't need anything else from
+        # the database.
+        entry = Entry(title="An Entry", diary_date=date(1663, 5, 1))
+        entry.comment_count = number
+        start_date = datetime(2003, 1, 1, 12, 0, tzinfo=UTC)
+        comment_list = []
+        for i in range(number):
+            annotation = Annotation(
+                id=i + 1,
+                user_name=f"Annotator {i}",
+                comment=(
+                    f"Annotation {i}, about https://en.wikipedia.org/wiki/"
+                    "Samuel_Pepys and www.pepysdiary.com/encyclopedia/\n\n"
+                    "A second paragraph,\nwith a line break. " * (1 + i % 4)
+                ),
+                # Spread across all the readings:
+                submit_date=start_date + timedelta(days=i * 25),
+            )
+            annotation.comment_html = annotation.render_comment_html()
+            annotation.reading = annotation.get_reading()
+            comment_list.append(annotation)
+
+        self.stdout.write(f"Annotations on an Entry: {number}")
+
+        request = RequestFactory().get("/diary/1663/05/01/")
+        request.user = AnonymousUser()
+        context = {
+            "comment_list": comment_list,
+            "object": entry,
+            "only_comments": True,
+        }
+
+        def render_list():
+            render_to_string("comments/list.html", context, request=request)
+
+        self.report("Stored comment_html", render_list, repeat)
+
+        for annotation in comment_list:
+            annotation.comment_html = ""
+        self.report("Rendering each comment", render_list, repeat)
+
+    def benchmark_wikipedia_tidy(self, directory, repeat, **kwargs):
+        pages = {
+            path.name: path.read_text(encoding="utf-8")
+            for path in sorted(Path(directory).glob("*.html"))
+        }
+        if not pages:
+            self.stderr.write(f"There are no .html files in {directory}")
+            return
+        megabytes = sum(len(html.encode("utf-8")) for html in pages.values()) / 1e6
+        self.stdout.write(f"Wikipedia pages: {len(pages)}, {megabytes:.2f} MB")
+
+        fetcher = WikipediaFetcher()
+        for label, tidy in (
+            ("bleach and BeautifulSoup", fetcher._tidy_html_with_bleach),
+            ("lxml sanitizer", fetcher._tidy_html),
+        ):
+            start = time.perf_counter()
+            for _ in range(max(repeat, 1)):
+                for html in pages.values():
+                    tidy(html)
+            seconds = (time.perf_counter() - start) / max(repeat, 1)
+            self.stdout.write(
+                f"{label}: {len(pages) / seconds:.1f} pages/s, "
+                f"{megabytes / seconds:.2f} MB/s"
+            )
+
+        different = [
+            name
+            for name, html in pages.items()
+            if fetcher._tidy_html(html) != fetcher._tidy_html_with_bleach(html)
+        ]
+        self.stdout.write(f"Identical output: {len(pages) - len(different)} pages")
+        for name in different:
+            self.stdout.write(f"Different output: {name}")
+
+    def report(self, label, func, repeat):
+        """
+        Runs func() `repeat` times and writes out the number of queries it
+        made (on the first run) and how long the runs took.
+        """
+        timings = []
+        num_queries = None
+
+        for _ in range(max(repeat, 1)):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                func()
+                timings.append((time.perf_counter() - start) * 1000)
+            if num_queries is None:
+                num_queries = len(queries)
+
+        self.stdout.write(
+            f"{label}: {num_queries} {'query' if num_queries == 1 else 'queries'}, "
+            f"min {min(timings):.1f}ms, "
+            f"median {statistics.median(timings):.1f}ms, "
+            f"max {max(timings):.1f}ms"
+        )
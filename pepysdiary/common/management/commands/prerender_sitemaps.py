@@ -0,0 +1,101 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from pepysdiary.common.sitemaps import (
+    SITEMAPS,
+    get_prerendered_cache_key,
+    render_sitemap,
+)
+
+
+class Command(BaseCommand):
+    """
+    Renders the larger sections of the sitemap (those that are LeanSitemaps)
+    and puts them in the cache, where SitemapView will find them. So that
+    nobody has to wait for them to be rendered.
+
+    Run it regularly, e.g. daily, more often than --timeout:
+    ./manage.py prerender_sitemaps
+
+    Only some sections, and also write them to files in a directory, named
+    like sitemap-entries.xml and sitemap-entries-p2.xml:
+    ./manage.py prerender_sitemaps entries topics --dir=/path/to/dir
+    """
+
+    help = "Renders the larger sitemaps and caches them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "sections",
+            nargs="*",
+            metavar="section",
+            help="Only render these sections. Default is all that can be.",
+        )
+        parser.add_argument(
+            "--dir",
+            action="store",
+            dest="dir",
+            default=None,
+            help="Also write the files to this directory.",
+        )
+        parser.add_argument(
+            "--timeout",
+            action="store",
+            dest="timeout",
+            default=60 * 60 * 25,
+            type=int,
+            help="Seconds to cache them for. Default 90000 (25 hours).",
+        )
+
+    def handle(self, *args, **options):
+        verbosity = options.get("verbosity", 1)
+
+        sitemaps = {
+            section: sitemap()
+            for section, sitemap in SITEMAPS.items()
+            if hasattr(sitemap, "iter_urls")
+        }
+        if options["sections"]:
+            unknown = set(options["sections"]) - set(sitemaps)
+            if unknown:
+                msg = (
+                    f"Can't prerender {', '.join(sorted(unknown))}. "
+                    f"Choose from: {', '.join(sorted(sitemaps))}"
+                )
+                raise CommandError(msg)
+            sitemaps = {s: sitemaps[s] for s in options["sections"]}
+
+        directory = Path(options["dir"]) if options["dir"] else None
+        if directory is not None and not directory.is_dir():
+            msg = f"{directory} is not a directory"
+            raise CommandError(msg)
+
+        site = Site.objects.get_current()
+        protocol = "https" if settings.PEPYS_USE_HTTPS else "http"
+
+        for section, sitemap in sitemaps.items():
+            start = time.perf_counter()
+            num_pages = sitemap.paginator.num_pages
+            for page in range(1, num_pages + 1):
+                content = "".join(
+                    render_sitemap(sitemap, page=page, site=site, protocol=protocol)
+                )
+                cache.set(
+                    get_prerendered_cache_key(section, str(page)),
+                    content,
+                    timeout=options["timeout"],
+                )
+                if directory is not None:
+                    suffix = "" if page == 1 else f"-p{page}"
+                    path = directory / f"sitemap-{section}{suffix}.xml"
+                    path.write_text(content, encoding="utf-8")
+            if verbosity > 0:
+                self.stdout.write(
+                    f"{section}: Rendered {num_pages} page(s) "
+                    f"in {time.perf_counter() - start:.2f}s"
+                )
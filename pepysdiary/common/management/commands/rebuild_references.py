@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.text import capfirst
+
+from pepysdiary.diary.models import Entry
+from pepysdiary.letters.models import Letter
+
+
+class Command(BaseCommand):
+    """
+    Re-makes the references from every Diary Entry and Letter to the
+    Encyclopedia Topics their texts link to. Only references that have
+    changed are written.
+
+    Each batch of Entries or Letters is done in its own transaction.
+
+    ./manage.py rebuild_references
+    ./manage.py rebuild_references --batch-size=200
+
+    Use --verbosity=0 to output nothing, or --verbosity=2 to output progress
+    after each batch.
+    """
+
+    help = "Re-makes the references from all Diary Entries and Letters to Topics."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            action="store",
+            dest="batch_size",
+            default=500,
+            type=int,
+            help="How many Entries or Letters to process at once. Default 500.",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options.get("verbosity", 1)
+        batch_size = max(options["batch_size"], 1)
+
+        for model_class in (Entry, Letter):
+            self.rebuild(model_class, batch_size)
+
+    def rebuild(self, model_class, batch_size):
+        name = capfirst(model_class._meta.verbose_name_plural)
+        qs = model_class.objects.only("pk", "text", "footnotes").order_by("pk")
+        total = qs.count()
+
+        done = added = removed = 0
+        last_pk = None
+
+        while True:
+            batch_qs = qs if last_pk is None else qs.filter(pk__gt=last_pk)
+            batch = list(batch_qs[:batch_size])
+            if len(batch) == 0:
+                break
+
+            with transaction.atomic():
+                batch_added, batch_removed = model_class.objects.make_references(batch)
+
+            done += len(batch)
+            added += batch_added
+            removed += batch_removed
+            last_pk = batch[-1].pk
+
+            if self.verbosity > 1:
+                self.stdout.write(f"{name}: {done} of {total}")
+
+        if self.verbosity > 0:
+            self.stdout.write(
+                f"{name}: Processed {done}. "
+                f"Added {added} references, removed {removed}."
+            )
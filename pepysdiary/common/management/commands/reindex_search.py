@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import capfirst
+
+from pepysdiary.common.search import search_index
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the search_document SearchVectorField for every object of the
+    searchable models (Entries, Letters, Topics, Annotations, Articles, Posts).
+
+    Rebuild all of them:
+    ./manage.py reindex_search
+
+    Rebuild only some models, with 5000 rows per UPDATE:
+    ./manage.py reindex_search diary.Entry letters.Letter --batch-size=5000
+    """
+
+    help = "Rebuilds the search indexes of all searchable models."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            metavar="app_label.ModelName",
+            help="Only reindex these models. Default is all searchable models.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            action="store",
+            dest="batch_size",
+            default=1000,
+            type=int,
+            help="How many rows to update with each UPDATE. Default 1000.",
+        )
+
+    def handle(self, *args, **options):
+        verbosity = options.get("verbosity", 1)
+        batch_size = max(options["batch_size"], 1)
+
+        models = search_index.models
+        if options["models"]:
+            labels = {m._meta.label_lower: m for m in models}
+            try:
+                models = [labels[label.lower()] for label in options["models"]]
+            except KeyError as err:
+                msg = (
+                    f"{err.args[0]} is not a searchable model. "
+                    f"Choose from: {', '.join(sorted(labels))}"
+                )
+                raise CommandError(msg) from err
+
+        for model_class in models:
+            name = capfirst(model_class._meta.verbose_name_plural)
+            start = time.perf_counter()
+            num = 0
+            for updated in search_index.reindex(model_class, batch_size=batch_size):
+                num += updated
+                if verbosity > 1:
+                    self.stdout.write(f"{name}: {num}")
+            if verbosity > 0:
+                self.stdout.write(
+                    f"{name}: Reindexed {num} in {time.perf_counter() - start:.2f}s"
+                )
@@ -1,6 +1,10 @@
-from django.contrib.sites.models import Site
+import re
+
 from django.db import models
 
+# Matches links to Encyclopedia Topics, capturing the Topic ID.
+TOPIC_LINK_RE = re.compile(r"pepysdiary.com\/encyclopedia\/(\d+)\/")
+
 
 class ReferredManagerMixin:
     """
@@ -8,6 +12,72 @@ class ReferredManagerMixin:
     references to Encyclopedia Topics.
     """
 
+    def make_references(self, objects):
+        """
+        Passed a list of Entry or Letter objects, this sets all the
+        Encyclopedia Topics that each one's text and footnotes refer to.
+
+        Only the references that have been added or removed are written.
+        Regardless of how many objects are passed in, it makes one query to
+        check the Topic IDs exist, one to get the existing references, and
+        at most one to add and one to remove references.
+
+        Returns a tuple of (number added, number removed).
+        """
+        objects = [obj for obj in objects if obj.pk is not None]
+        if len(objects) == 0:
+            return (0, 0)
+
+        # The reverse side of Topic.diary_references or Topic.letter_references:
+        topics_rel = self.model._meta.get_field("topics")
+        topic_model = topics_rel.related_model
+        through = topics_rel.through
+        # The names of the through model's ForeignKeys, eg 'topic_id', 'entry_id':
+        topic_fk = f"{topics_rel.field.m2m_field_name()}_id"
+        obj_fk = f"{topics_rel.field.m2m_reverse_field_name()}_id"
+
+        # Get all the Topic IDs mentioned in each object's text and footnotes:
+        wanted = {
+            obj.pk: {
+                int(id) for id in TOPIC_LINK_RE.findall(f"{obj.text} {obj.footnotes}")
+            }
+            for obj in objects
+        }
+
+        # Ignore invalid/broken links:
+        all_ids = set().union(*wanted.values())
+        valid_ids = set(
+            topic_model.objects.filter(pk__in=all_ids).values_list("pk", flat=True)
+        )
+
+        # The references that already exist: {obj_pk: {topic_id: through_pk}}
+        existing = {obj.pk: {} for obj in objects}
+        for through_pk, topic_id, obj_pk in through.objects.filter(
+            **{f"{obj_fk}__in": existing.keys()}
+        ).values_list("pk", topic_fk, obj_fk):
+            existing[obj_pk][topic_id] = through_pk
+
+        to_add = []
+        to_remove = []
+        for obj_pk, topic_ids in wanted.items():
+            topic_ids &= valid_ids
+            to_add.extend(
+                through(**{topic_fk: topic_id, obj_fk: obj_pk})
+                for topic_id in topic_ids - existing[obj_pk].keys()
+            )
+            to_remove.extend(
+                through_pk
+                for topic_id, through_pk in existing[obj_pk].items()
+                if topic_id not in topic_ids
+            )
+
+        if to_add:
+            through.objects.bulk_create(to_add)
+        if to_remove:
+            through.objects.filter(pk__in=to_remove).delete()
+
+        return (len(to_add), len(to_remove))
+
     def get_brief_references(self, objects):
         """
         Passed an array (or queryset) of Entry or Letter objects (well,
@@ -26,34 +96,48 @@ class ReferredManagerMixin:
             }
         Any Topics that don't have tooltip_text or thumbnails will have empty
         strings for those fields.
+
+        All the Topics are fetched in a single query, joining on the
+        `diary_references`/`letter_references` through table, rather than
+        one query per Entry/Letter.
         """
+        pks = {obj.pk for obj in objects}
+        if len(pks) == 0:
+            return {}
+
+        # The reverse side of Topic.diary_references or Topic.letter_references:
+        topics_rel = self.model._meta.get_field("topics")
+        topic_model = topics_rel.related_model
+
+        topics = (
+            topic_model.objects.filter(**{f"{topics_rel.field.name}__in": pks})
+            .only("pk", "title", "tooltip_text", "thumbnail")
+            .order_by()
+            .distinct()
+        )
+
         topic_data = {}
 
-        for obj in objects:
-            for topic in obj.topics.only("pk", "title", "tooltip_text", "thumbnail"):
-                if str(topic.pk) not in topic_data:
-                    thumbnail_url = ""
-                    if topic.thumbnail:
-                        thumbnail_url = topic.thumbnail.url
-                    topic_data[str(topic.pk)] = {
-                        "title": topic.title,
-                        "text": topic.tooltip_text,
-                        "thumbnail_url": thumbnail_url,
-                    }
+        for topic in topics:
+            thumbnail_url = ""
+            if topic.thumbnail:
+                thumbnail_url = topic.thumbnail.url
+            topic_data[str(topic.pk)] = {
+                "title": topic.title,
+                "text": topic.tooltip_text,
+                "thumbnail_url": thumbnail_url,
+            }
         return topic_data
 
 
 class ConfigManager(models.Manager):
     def get_site_config(self):
         """
-        Get the config object for the current Site.
+        Get the config object for the current Site, or None.
+        It's kept in memory, so this doesn't usually query the database.
         Usage:
             config = Config.objects.get_site_config()
         """
-        from .models import Config
+        from .site_settings import site_settings
 
-        try:
-            config = Config.objects.get(site=Site.objects.get_current())
-        except Config.DoesNotExist:
-            return None
-        return config
+        return site_settings.config
@@ -2,18 +2,40 @@ import calendar
 import contextlib
 from datetime import UTC, datetime, timedelta
 
-from django.utils.deprecation import MiddlewareMixin
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 
 
-class VisitTimeMiddleware(MiddlewareMixin):
+class VisitTimeMiddleware:
     """
     Used to set cookies with various times, which we use to mark comments as
     "new".
 
+    Only used if settings.PEPYS_VISIT_TIMES is "cookies". By default ("client")
+    the JavaScript works out the same times itself and keeps them in the
+    browser's localStorage. Then no cookies are set, nothing about the visit
+    is sent with requests, and every page can be cached.
+
     We use raw cookies rather than sessions, because we want these values
     to be directly accessible via JavaScript, so we can do the marking of
     "new" things with that, rather than in templates. So we avoid caching
     this stuff that should be dynamic.
+
+    This should be above UpdateCacheMiddleware in settings.MIDDLEWARE, so that
+    the cookies are set after a response is cached, or fetched from the cache.
+    Otherwise responses that set cookies on requests without any aren't
+    cached, and cached responses would set the cookies of whoever caused them
+    to be cached.
+
+    The times, each kept in a cookie of the same name:
+
+    last_view - The time of the last page view.
+        Set to now with every page view.
+    visit_start - When this current visit began.
+        This stays the same until visit_length seconds have elapsed,
+        at which point this "visit" is over and visit_start is set to now.
+    prev_visit_end - When the previous visit ended.
+        Comments newer than this get marked as "new".
     """
 
     # Number of days until cookies expire.
@@ -22,52 +44,38 @@ class VisitTimeMiddleware(MiddlewareMixin):
     # How long until we re-set all the "new" labels on comments? Seconds.
     visit_length = 5400
 
-    # These three are all based on values set and got from cookies:
-
-    # The time of the last page view.
-    # Set to now with every page view.
-    last_view = None
+    cookie_names = ("last_view", "visit_start", "prev_visit_end")
 
-    # When this current visit began.
-    # This stays the same until self.visit_length seconds have elapsed,
-    # at which point this "visit" is over and visit_start is set to now.
-    visit_start = None
+    def __init__(self, get_response):
+        if settings.PEPYS_VISIT_TIMES != "cookies":
+            raise MiddlewareNotUsed
+        self.get_response = get_response
 
-    # When the previous visit ended.
-    # Comments newer than this get marked as "new".
-    prev_visit_end = None
-
-    def process_response(self, request, response):
+    def __call__(self, request):
         """First we get existing cookie values, then we set new ones."""
+        response = self.get_response(request)
 
-        request = self._set_vars_from_cookies(request)
-
-        response = self._set_cookies(response)
+        # Kept per-request, because this instance is shared by all of them.
+        times = self._get_times_from_cookies(request)
 
-        return response
-
-    def _set_vars_from_cookies(self, request):
-        """Reads in any existing cookie values."""
+        return self._set_cookies(response, times)
 
-        last_view_cookie = request.COOKIES.get("last_view", "")
-        if last_view_cookie != "":
-            with contextlib.suppress(Exception):
-                self.last_view = self.cookie_value_to_datetime(last_view_cookie)
+    def _get_times_from_cookies(self, request):
+        """
+        Reads in any existing cookie values. Returns a dict of cookie name
+        to datetime, or None if it wasn't set or was invalid.
+        """
+        times = dict.fromkeys(self.cookie_names)
 
-        visit_start_cookie = request.COOKIES.get("visit_start", "")
-        if visit_start_cookie != "":
-            with contextlib.suppress(Exception):
-                self.visit_start = self.cookie_value_to_datetime(visit_start_cookie)
+        for name in self.cookie_names:
+            cookie = request.COOKIES.get(name, "")
+            if cookie != "":
+                with contextlib.suppress(Exception):
+                    times[name] = self.cookie_value_to_datetime(cookie)
 
-        prev_visit_end_cookie = request.COOKIES.get("prev_visit_end", "")
-        if prev_visit_end_cookie != "":
-            with contextlib.suppress(Exception):
-                self.prev_visit_end = self.cookie_value_to_datetime(
-                    prev_visit_end_cookie
-                )
-        return request
+        return times
 
-    def _set_cookies(self, response):
+    def _set_cookies(self, response, times):
         """Sets new cookie values."""
 
         time_now = datetime.now(UTC)
@@ -75,7 +83,7 @@ class VisitTimeMiddleware(MiddlewareMixin):
         # What time will our cookies expire?
         cookie_expire = time_now + timedelta(self.cookie_duration)
 
-        if self.last_view is None or self.visit_start is None:
+        if times["last_view"] is None or times["visit_start"] is None:
             # User hasn't been here before.
             response.set_cookie(
                 "visit_start",
@@ -84,13 +92,13 @@ class VisitTimeMiddleware(MiddlewareMixin):
             )
 
         else:
-            #  User has viewed a page before.
-            current_visit_duration = time_now - self.visit_start
+            #  User has viewed a page before.
+            current_visit_duration = time_now - times["visit_start"]
             if current_visit_duration.total_seconds() > self.visit_length:
                 # This is a new visit for the user.
                 response.set_cookie(
                     "prev_visit_end",
-                    value=self.datetime_to_cookie_value(self.last_view),
+                    value=self.datetime_to_cookie_value(times["last_view"]),
                     expires=cookie_expire,
                 )
                 response.set_cookie(
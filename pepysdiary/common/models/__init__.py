@@ -1,5 +1,5 @@
 from .abstract import PepysModel
-from .mixins import OldDateMixin
+from .mixins import ChangedFieldsMixin, OldDateMixin, SearchableMixin
 from .models import Config
 
-__all__ = [PepysModel, OldDateMixin, Config]
+__all__ = [PepysModel, ChangedFieldsMixin, OldDateMixin, SearchableMixin, Config]
@@ -53,3 +53,88 @@ class OldDateMixin:
     def day_e(self):
         """Day of the Entry like '1', '2', '31', etc."""
         return get_day_e(self.get_old_date())
+
+
+class ChangedFieldsMixin:
+    """
+    Remembers the values of the fields listed in `tracked_fields` as they
+    were when the object was loaded from, or last saved to, the database.
+    So that save() can only do expensive things, like rendering Markdown,
+    when the fields they depend on have changed. eg:
+
+        tracked_fields = ["title", "summary"]
+
+        def save(self, *args, **kwargs):
+            if self.field_has_changed("summary"):
+                self.summary_html = markdown(self.summary)
+            super().save(*args, **kwargs)
+    """
+
+    tracked_fields = []
+
+    _saved_field_values = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_tracked_fields()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_tracked_fields()
+
+    def field_has_changed(self, name):
+        """
+        Has this field's value changed since it was loaded or saved?
+        True if this is a new object, or if we don't know.
+        False if the field was deferred and hasn't been loaded since, because
+        it won't be saved.
+        """
+        if name in self.get_deferred_fields():
+            return False
+        if (
+            self._state.adding
+            or self._saved_field_values is None
+            or name not in self._saved_field_values
+        ):
+            return True
+        return self._saved_field_values[name] != getattr(self, name)
+
+    def _remember_tracked_fields(self):
+        deferred_fields = self.get_deferred_fields()
+        self._saved_field_values = {
+            name: getattr(self, name)
+            for name in self.tracked_fields
+            if name not in deferred_fields
+        }
+
+
+class SearchableMixin:
+    """
+    For models that have a `search_document` SearchVectorField.
+
+    Each model should define `search_fields`, the names of the fields that
+    make up search_document, with their weights. eg:
+
+        search_fields = (("title", "A"), ("text", "B"))
+
+    And `search_summary_fields`, the names of the fields whose text is used
+    for the excerpts shown in search results. eg:
+
+        search_summary_fields = ("title", "text_html")
+
+    And should be registered with pepysdiary.common.search.search_index so
+    that search_document is updated when the object is saved.
+    """
+
+    search_fields = ()
+    search_summary_fields = ()
+
+    def index_components(self):
+        """Used by common.search to update the SearchVector on
+        self.search_document.
+        """
+        return tuple(
+            (getattr(self, name), weight) for name, weight in self.search_fields
+        )
@@ -1,7 +1,21 @@
+import base64
+import binascii
+import datetime
+import inspect
+import json
 import math
+from collections.abc import Sequence
 from functools import reduce
 
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.core.paginator import InvalidPage, Page, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.inspect import method_has_no_args
+
+from pepysdiary.common.caching import get_cache_version
 
 # From https://djangosnippets.org/snippets/773/
 # Lets us do better pagination, so we don't need to show *every* page.
@@ -11,9 +25,81 @@ __all__ = (
     "ExPaginator",
     "DiggPaginator",
     "QuerySetDiggPaginator",
+    "CursorPaginator",
+    "ExactCount",
+    "CachedCount",
+    "CappedCount",
 )
 
 
+class ExactCount:
+    """
+    The default way for ExPaginator to count its objects: exactly, every
+    time.
+
+    A count strategy has a get_count(object_list) method that returns a
+    tuple of (count, is_capped). is_capped is True if there are more objects
+    than count.
+    """
+
+    def get_count(self, object_list):
+        c = getattr(object_list, "count", None)
+        if callable(c) and not inspect.isbuiltin(c) and method_has_no_args(c):
+            return c(), False
+        return len(object_list), False
+
+
+class CappedCount:
+    """
+    Counts no more than `cap` objects, using a LIMIT-bounded subquery, so
+    that counting lots of results is no slower than counting `cap`.
+
+    If there are more, the count is `cap`, and is_capped is True, so we can
+    say there are "1,000+".
+    """
+
+    def __init__(self, cap=1000, strategy=None):
+        self.cap = cap
+        self.strategy = strategy or ExactCount()
+
+    def get_count(self, object_list):
+        count, is_capped = self.strategy.get_count(object_list[: self.cap + 1])
+        if count > self.cap:
+            return self.cap, True
+        return count, is_capped
+
+
+class CachedCount:
+    """
+    Caches the result of another strategy (ExactCount by default).
+
+    key -- Identifies the objects being counted, like the search string and
+           the kind of thing being searched.
+    version_name -- Optional name of the cache version to include in the
+           key, so that counts can be invalidated with bump_cache_version().
+    """
+
+    def __init__(self, key, version_name=None, timeout=None, strategy=None):
+        self.key = key
+        self.version_name = version_name
+        self.timeout = timeout
+        self.strategy = strategy or ExactCount()
+
+    def get_cache_key(self):
+        if self.version_name is None:
+            return f"count:{self.key}"
+        version = get_cache_version(self.version_name)
+        return f"count:{version}:{self.key}"
+
+    def get_count(self, object_list):
+        key = self.get_cache_key()
+        result = cache.get(key)
+        if result is None:
+            result = self.strategy.get_count(object_list)
+            cache.set(key, result, timeout=self.timeout)
+        return tuple(result)
+
+
 class ExPaginator(Paginator):
     """Adds a ``softlimit`` option to ``page()``. If True, querying a
     page number larger than max. will not fail, but instead return the
@@ -36,8 +122,33 @@ class ExPaginator(Paginator):
     >>> paginator.page("str")
     Traceback (most recent call last):
     InvalidPage: That page number is not an integer
+
+    Also takes a ``count_strategy`` option, which is how ``count`` is worked
+    out: ExactCount (the default), CachedCount or CappedCount. If the count
+    is capped, ``count_is_capped`` is True, and there may be more pages than
+    ``num_pages``.
+
+    >>> paginator = ExPaginator(queryset, 10, count_strategy=CappedCount(100))
+    >>> paginator.count, paginator.count_is_capped
+    (100, True)
     """
 
+    def __init__(self, *args, **kwargs):
+        self.count_strategy = kwargs.pop("count_strategy", None) or ExactCount()
+        super().__init__(*args, **kwargs)
+
+    @cached_property
+    def _count_result(self):
+        return self.count_strategy.get_count(self.object_list)
+
+    @cached_property
+    def count(self):
+        return self._count_result[0]
+
+    @property
+    def count_is_capped(self):
+        return self._count_result[1]
+
     def _ensure_int(self, num, e):
         # see Django #7307
         try:
@@ -102,7 +213,8 @@ class DiggPaginator(ExPaginator):
     When ``align_left`` is set to ``True``, the paginator operates in a
     special mode that always skips the right tail, e.g. does not display the
     end block unless necessary. This is useful for situations in which the
-    exact number of items/pages is not actually known.
+    exact number of items/pages is not actually known. It's used
+    automatically if the count is capped (see ExPaginator).
 
     # odd body length
     >>> print DiggPaginator(range(1,1000), 10, body=5).page(1)
@@ -254,7 +366,7 @@ class DiggPaginator(ExPaginator):
         else:
             leading = list(range(1, tail + 1))
         # basically same for trailing range, but not in ``left_align`` mode
-        if self.align_left:
+        if self.align_left or self.count_is_capped:
             trailing = []
         else:
             if main_range[1] >= num_pages - (tail + margin) + 1:
@@ -310,6 +422,183 @@ class QuerySetDiggPaginator(DiggPaginator, Paginator):
     pass
 
 
+class CursorPaginator:
+    """
+    Pages through a QuerySet using "keyset" pagination: rather than using
+    OFFSET, each page is fetched with a WHERE clause that starts after (or
+    before) the last (or first) object on the current page. And we don't
+    COUNT all the objects. So fetching page 100 is as fast as page 1.
+
+    But there are no page numbers; only cursors for the next and previous
+    pages. A cursor is an opaque string, for use in a URL, that encodes the
+    values of the `ordering` fields for the object a page starts after.
+
+    ordering -- Like the arguments to order_by(). e.g. ("diary_date",) or
+                ("-submit_date", "-pk"). The fields, together, must be
+                unique for each object, and can't be NULL.
+
+    >>> paginator = CursorPaginator(Entry.objects.all(), 50, ("diary_date",))
+    >>> page = paginator.page()
+    >>> page = paginator.page(page.next_cursor)
+    """
+
+    def __init__(self, object_list, per_page, ordering):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.model = object_list.model
+
+    @cached_property
+    def count(self):
+        """
+        The total number of objects. Only for templates that need it, as
+        counting is what this paginator is meant to avoid.
+        """
+        return self.object_list.count()
+
+    def page(self, cursor=None):
+        """
+        Returns the CursorPage starting at this cursor, or the first page if
+        it's empty. Raises InvalidPage if the cursor is invalid.
+        """
+        if cursor:
+            backwards, values = self.decode_cursor(cursor)
+        else:
+            backwards, values = False, None
+
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._make_filter(values, backwards=backwards))
+        ordering = self._reverse_ordering() if backwards else self.ordering
+        objects = list(queryset.order_by(*ordering)[: self.per_page + 1])
+
+        has_more = len(objects) > self.per_page
+        objects = objects[: self.per_page]
+        if backwards:
+            objects.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = values is not None, has_more
+
+        return CursorPage(
+            objects,
+            self,
+            next_cursor=(
+                self.make_cursor(objects[-1]) if has_next and objects else None
+            ),
+            previous_cursor=(
+                self.make_cursor(objects[0], backwards=True)
+                if has_previous and objects
+                else None
+            ),
+        )
+
+    def make_cursor(self, obj, backwards=False):  # noqa: FBT002
+        """
+        Returns the cursor for the page after obj (or before it, if
+        backwards is True).
+        """
+        values = [getattr(obj, name) for name, _ in self._fields()]
+        data = json.dumps([int(backwards), values], cls=_CursorJSONEncoder)
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        "Returns a tuple of (backwards, values) or raises InvalidPage."
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            backwards, values = json.loads(data)
+            if len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                self.model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self._fields(), values, strict=True)
+            ]
+        except (
+            binascii.Error,
+            TypeError,
+            UnicodeDecodeError,
+            ValueError,
+            ValidationError,
+        ) as err:
+            msg = "That cursor is not valid"
+            raise InvalidPage(msg) from err
+        return bool(backwards), values
+
+    def _fields(self):
+        "A list of (field name, descending) tuples."
+        fields = []
+        for order in self.ordering:
+            name = order.lstrip("-")
+            if name == "pk":
+                name = self.model._meta.pk.name
+            fields.append((name, order.startswith("-")))
+        return fields
+
+    def _reverse_ordering(self):
+        return tuple(o[1:] if o.startswith("-") else f"-{o}" for o in self.ordering)
+
+    def _make_filter(self, values, backwards):
+        """
+        For ordering (a, b) and values (x, y) this is the equivalent of
+        WHERE (a > x) OR (a = x AND b > y).
+        With < instead of > for descending fields, or going backwards.
+        """
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self._fields(), values, strict=True):
+            lookup = "lt" if descending != backwards else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+
+class _CursorJSONEncoder(DjangoJSONEncoder):
+    """
+    Like DjangoJSONEncoder, but keeps the microseconds of datetimes and
+    times, which it shortens to milliseconds. Otherwise objects within the
+    same millisecond as the end of a page would be repeated, or skipped.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CursorPage(Sequence):
+    """
+    One page of objects from a CursorPaginator. Like Django's Page, but
+    with cursors instead of page numbers.
+    """
+
+    # So that templates can tell it apart from a numbered Page:
+    is_cursor_page = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
 # if __name__ == "__main__":
 # import doctest
 # doctest.testmod()
@@ -0,0 +1,367 @@
+import operator
+import threading
+from functools import reduce
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchVector
+from django.db import transaction
+from django.db.models import F, Func, Max, Min, TextField, Value
+from django.db.models.signals import post_delete, post_save
+from django.utils.safestring import mark_safe
+
+from pepysdiary.common.caching import bump_cache_version
+
+# All this originally inspired by
+# https://github.com/simonw/simonwillisonblog/blob/master/blog/signals.py
+
+# Put around the matching words in excerpts made by make_headline(), and
+# replaced with <b></b> by headline_to_html(). Removed from the text first,
+# so they can only be ours.
+HEADLINE_START = "\x02"
+HEADLINE_STOP = "\x03"
+
+# A PostgreSQL regular expression matching an "&" that doesn't start an HTML
+# entity like "&amp;", "&#160;" or "&#xA0;".
+HEADLINE_BARE_AMPERSAND = r"&(?!(#[0-9]+|#[xX][0-9a-fA-F]+|[a-zA-Z][a-zA-Z0-9]*);)"
+
+# The options for the excerpts made by SearchIndex.make_headline().
+# Roughly the same as those made by the search_summary template tag.
+HEADLINE_OPTIONS = {
+    "start_sel": HEADLINE_START,
+    "stop_sel": HEADLINE_STOP,
+    "min_words": 5,
+    "max_words": 12,
+    "max_fragments": 10,
+    "fragment_delimiter": " … ",
+}
+
+
+class SearchIndex:
+    """
+    Keeps the `search_document` SearchVectorFields of registered models up
+    to date.
+
+    Models should use SearchableMixin and be registered, like:
+
+        search_index.register(Entry)
+
+    Normally search_document is kept up to date by database triggers (see
+    search_trigger_sql()), and this does nothing when objects are saved.
+
+    If settings.PEPYS_SEARCH_INDEX_IN_DATABASE is False, then when a
+    registered object is saved, its search_document is updated after the
+    transaction commits, from the values of its fields in the database.
+    All the objects of a model saved in one transaction are updated with one
+    UPDATE, however many times each was saved.
+
+    reindex() rebuilds search_document for all of a model's objects, using
+    set-based UPDATEs.
+
+    Whenever registered objects are saved or deleted, the cache version
+    called `cache_name` is changed, after the transaction commits, so that
+    anything cached about search results (like their counts) is remade.
+    """
+
+    cache_name = "search"
+
+    def __init__(self):
+        self._models = []
+        # The objects waiting to be updated, per thread and database alias.
+        self._local = threading.local()
+
+    @property
+    def models(self):
+        "The registered model classes."
+        return list(self._models)
+
+    def register(self, model_class):
+        if model_class in self._models:
+            return
+        if not model_class.search_fields:
+            msg = f"{model_class.__name__} has no search_fields."
+            raise ValueError(msg)
+        self._models.append(model_class)
+        post_save.connect(
+            self._on_save,
+            sender=model_class,
+            dispatch_uid=f"search_index_{model_class._meta.label_lower}",
+        )
+        post_delete.connect(
+            self._on_delete,
+            sender=model_class,
+            dispatch_uid=f"search_index_{model_class._meta.label_lower}",
+        )
+
+    def make_vector(self, components):
+        """
+        Passed a tuple of (text, weight) tuples, returns the SearchVector
+        expression for them.
+        """
+        return reduce(
+            operator.add,
+            [
+                SearchVector(Value(text, output_field=TextField()), weight=weight)
+                for text, weight in components
+            ],
+        )
+
+    def make_fields_vector(self, model_class):
+        """
+        Returns the SearchVector expression made from a model's fields,
+        for updating many rows at once.
+        """
+        return reduce(
+            operator.add,
+            [
+                SearchVector(name, weight=weight)
+                for name, weight in model_class.search_fields
+            ],
+        )
+
+    def make_headline(self, model_class, query):
+        """
+        Returns a SearchHeadline expression, for annotating a queryset, that
+        makes excerpts of the text of model_class's search_summary_fields
+        that match the SearchQuery `query`, with the matches between
+        HEADLINE_START and HEADLINE_STOP. Use headline_to_html() to make
+        them HTML.
+
+        HTML tags are removed from the text first, like strip_tags(). But
+        that can't remove unclosed tags, so then any "<" and ">" left are
+        escaped. As is any "&" that doesn't start an entity: most of the
+        fields are HTML, whose entities, like "&amp;" and "&#160;", should
+        be displayed as they are.
+        """
+        texts = [
+            Func(
+                F(name),
+                Value("<[^>]*>"),
+                Value(""),
+                Value("g"),
+                function="regexp_replace",
+                output_field=TextField(),
+            )
+            for name in model_class.search_summary_fields
+        ]
+        # Join each field's text with a space:
+        text = Func(Value(" "), *texts, function="CONCAT_WS", output_field=TextField())
+        text = Func(
+            text,
+            Value(HEADLINE_START + HEADLINE_STOP),
+            Value(""),
+            function="translate",
+            output_field=TextField(),
+        )
+        # "&" first, so the others' entities aren't escaped again:
+        text = Func(
+            text,
+            Value(HEADLINE_BARE_AMPERSAND),
+            Value("&amp;"),
+            Value("g"),
+            function="regexp_replace",
+            output_field=TextField(),
+        )
+        for char, entity in (("<", "&lt;"), (">", "&gt;")):
+            text = Func(
+                text,
+                Value(char),
+                Value(entity),
+                function="replace",
+                output_field=TextField(),
+            )
+        return SearchHeadline(text, query, **HEADLINE_OPTIONS)
+
+    def headline_to_html(self, headline):
+        """
+        Returns the safe HTML of a headline made by make_headline(), with the
+        matches in <b></b>. Its text was HTML-escaped in the database.
+        """
+        return mark_safe(
+            headline.replace(HEADLINE_START, "<b>").replace(HEADLINE_STOP, "</b>")
+        )
+
+    def headline_deferred_fields(self, model_class):
+        """
+        The names of model_class's large text fields that aren't needed when
+        displaying a search result that has a headline.
+        """
+        names = {name for name, _ in model_class.search_fields}
+        names.update(model_class.search_summary_fields)
+        names.add("search_document")
+        names.discard("title")
+        return sorted(names)
+
+    def queue(self, instance, using="default"):
+        """
+        Queue an object to have its search_document updated when the current
+        transaction commits (or now, if we're not in a transaction).
+        """
+        self._add_to_batch(using, type(instance), [instance.pk])
+
+    def flush(self, using="default"):
+        """
+        Update the search_document of any objects queued in the current
+        transaction now, rather than waiting for it to commit.
+        """
+        batch = getattr(self._local, using, None)
+        if batch is not None:
+            batch.flush()
+
+    def reindex(self, model_class, batch_size=1000):
+        """
+        Rebuilds search_document for every object of model_class, one range
+        of up to batch_size primary keys per UPDATE.
+
+        Yields the number of rows updated by each UPDATE.
+        """
+        manager = model_class._base_manager
+        pk_range = manager.aggregate(min=Min("pk"), max=Max("pk"))
+        if pk_range["min"] is None:
+            return
+
+        vector = self.make_fields_vector(model_class)
+        start = pk_range["min"]
+        while start <= pk_range["max"]:
+            with transaction.atomic():
+                yield manager.filter(pk__gte=start, pk__lt=start + batch_size).update(
+                    search_document=vector
+                )
+            start += batch_size
+        bump_cache_version(self.cache_name)
+
+    def objects_changed(self, model_class, pks, using="default"):
+        """
+        Call after updating objects of a registered model without sending
+        signals, e.g. with bulk_update(). Updates their search_document now,
+        if the database doesn't, and changes the cache version after the
+        transaction commits.
+        """
+        if pks and not settings.PEPYS_SEARCH_INDEX_IN_DATABASE:
+            model_class._base_manager.using(using).filter(pk__in=pks).update(
+                search_document=self.make_fields_vector(model_class)
+            )
+        self._add_to_batch(using)
+
+    def _on_save(self, sender, instance, using, **kwargs):
+        if settings.PEPYS_SEARCH_INDEX_IN_DATABASE:
+            # Nothing to update, but the cache version will still change.
+            self._add_to_batch(using)
+        else:
+            self.queue(instance, using=using)
+
+    def _on_delete(self, sender, instance, using, **kwargs):
+        self._add_to_batch(using)
+
+    def _add_to_batch(self, using, model_class=None, pks=()):
+        """
+        Adds objects' pks to the batch for the current transaction, making a
+        new batch if needed, and makes sure it'll be flushed on commit.
+        """
+        batch = getattr(self._local, using, None)
+        if batch is None:
+            batch = _PendingBatch(self, using)
+            setattr(self._local, using, batch)
+        if model_class is not None:
+            batch.items.setdefault(model_class, set()).update(pks)
+        # If we're not in a transaction this calls flush() immediately.
+        batch.schedule_flush()
+
+
+class _PendingBatch:
+    """
+    The objects in a transaction that need their search_document updating,
+    and a note that the search cache version needs changing.
+
+    Its flush() is added to the transaction's on-commit callbacks whenever
+    something's added, because an earlier one will have been discarded if
+    a savepoint was rolled back. Only the first of them does anything. Each
+    object's search_document is made from its fields in the database, so
+    anything left from a rolled-back transaction does no harm.
+    """
+
+    def __init__(self, index, using):
+        self.index = index
+        self.using = using
+        # model class: set of pks
+        self.items = {}
+        # Whether flush() needs calling:
+        self.flush_scheduled = False
+
+    def schedule_flush(self):
+        self.flush_scheduled = True
+        transaction.on_commit(self.flush, using=self.using)
+
+    def flush(self):
+        if not self.flush_scheduled:
+            return
+        self.flush_scheduled = False
+        if getattr(self.index._local, self.using, None) is self:
+            delattr(self.index._local, self.using)
+        # If triggers keep search_document up to date, any items are
+        # leftovers, e.g. from a rolled-back transaction before the setting
+        # changed.
+        if settings.PEPYS_SEARCH_INDEX_IN_DATABASE:
+            self.items = {}
+        for model_class, pks in self.items.items():
+            model_class._base_manager.using(self.using).filter(pk__in=pks).update(
+                search_document=self.index.make_fields_vector(model_class)
+            )
+        self.items = {}
+        bump_cache_version(self.index.cache_name)
+
+
+search_index = SearchIndex()
+
+
+def search_trigger_sql(table, search_fields):
+    """
+    Returns the SQL to create, and to drop, the trigger that sets
+    search_document on a table's rows when they're inserted, or when one of
+    their search_fields changes.
+
+    search_fields is like a model's search_fields, e.g.
+    (("title", "A"), ("text", "B")). The vector is the same as that made by
+    SearchIndex.make_vector().
+
+    Django writes every field when saving an object, including a
+    search_document that's None because the object was only just created.
+    So if nothing it's made from has changed, and it's being set to NULL, we
+    keep the existing value.
+
+    For making migrations. Copy the SQL it returns into the migration,
+    rather than calling this from it, so that the migration stays the same
+    if this changes. e.g., in ./manage.py shell:
+
+        sql, reverse_sql = search_trigger_sql("diary_entry", Entry.search_fields)
+    """
+    function = f"{table}_search_document"
+    vector = " || ".join(
+        f"setweight(to_tsvector(COALESCE(NEW.{name}, '')), '{weight}')"
+        for name, weight in search_fields
+    )
+    changed = " OR ".join(
+        f"OLD.{name} IS DISTINCT FROM NEW.{name}" for name, _ in search_fields
+    )
+    columns = ", ".join(name for name, _ in search_fields)
+
+    sql = f"""
+        CREATE FUNCTION {function}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' OR {changed} THEN
+                NEW.search_document := {vector};
+            ELSIF NEW.search_document IS NULL THEN
+                NEW.search_document := OLD.search_document;
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER {function}
+            BEFORE INSERT OR UPDATE OF {columns}, search_document ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {function}();
+    """
+    reverse_sql = f"""
+        DROP TRIGGER IF EXISTS {function} ON {table};
+        DROP FUNCTION IF EXISTS {function}();
+    """
+    return sql, reverse_sql
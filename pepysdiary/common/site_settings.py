@@ -0,0 +1,60 @@
+from django.conf import settings
+
+from pepysdiary.common.caching import VersionedLocalCache
+
+
+class SiteSettings:
+    """
+    The current Site, and its Config, kept in memory, so that we don't
+    query the database for them on every request.
+
+    They're used by every page (via the `config` context processor), by
+    the registration, login and comment forms, and when making absolute
+    URLs. But they rarely change. They're loaded the first time they're
+    needed, and reloaded after any Config or Site is saved or deleted (see
+    common/signals.py). Other processes only hear about that if the cache
+    is shared between them, so they're also reloaded every max_age
+    seconds, so that a change to e.g. allow_login reaches every process
+    soon.
+
+    Use the shared instance:
+
+        from pepysdiary.common.site_settings import site_settings
+        if site_settings.config and site_settings.config.allow_login:
+            ...
+    """
+
+    # How many seconds to keep them before reloading them anyway:
+    max_age = 60
+
+    def __init__(self):
+        self._cache = VersionedLocalCache(
+            "common:site-settings", self._load, max_age=self.max_age
+        )
+
+    @property
+    def site(self):
+        "The current Site."
+        return self._cache.get()[0]
+
+    @property
+    def config(self):
+        "The current Site's Config, or None if it doesn't have one."
+        return self._cache.get()[1]
+
+    def invalidate(self):
+        self._cache.invalidate()
+
+    def _load(self):
+        from django.contrib.sites.models import Site
+
+        from .models import Config
+
+        # Not Site.objects.get_current(), because its cache isn't cleared
+        # when another process changes the Site.
+        site = Site.objects.get(pk=settings.SITE_ID)
+        config = Config.objects.filter(site=site).first()
+        return (site, config)
+
+
+site_settings = SiteSettings()
@@ -1,51 +1,130 @@
+from django.contrib.flatpages.sitemaps import FlatPageSitemap
 from django.contrib.sitemaps import Sitemap
+from django.db.models import Max
 from django.urls import reverse_lazy
+from django.utils.html import escape
+from django.utils.timezone import template_localtime
 
 from pepysdiary.diary.models import Entry
-from pepysdiary.encyclopedia.models import Category, Topic
+from pepysdiary.encyclopedia.category_tree import category_tree
+from pepysdiary.encyclopedia.models import Topic
 from pepysdiary.indepth.models import Article
 from pepysdiary.letters.models import Letter
 from pepysdiary.news.models import Post
 
 
-class EntrySitemap(Sitemap):
-    """Lists all Diary Entries for the sitemap."""
+class ChunkedQuerySet:
+    """
+    Wraps a QuerySet so that slicing it, as Django's Paginator does, returns
+    an iterator that fetches chunk_size objects at a time, rather than a
+    list of every object in the slice.
+    """
 
-    changefreq = "monthly"
-    priority = 0.8
+    def __init__(self, queryset, chunk_size):
+        self.queryset = queryset
+        self.chunk_size = chunk_size
 
-    def items(self):
-        return Entry.objects.all()
+    @property
+    def ordered(self):
+        return self.queryset.ordered
 
-    def lastmod(self, obj):
-        return obj.date_modified
+    def count(self):
+        return self.queryset.count()
 
+    def __len__(self):
+        return self.count()
 
-class LetterSitemap(Sitemap):
-    """Lists all Letters for the sitemap."""
+    def __iter__(self):
+        return self.queryset.iterator(chunk_size=self.chunk_size)
 
-    changefreq = "monthly"
-    priority = 0.7
+    def __getitem__(self, key):
+        return self.queryset[key].iterator(chunk_size=self.chunk_size)
 
-    def items(self):
-        return Letter.objects.all()
 
-    def lastmod(self, obj):
-        return obj.date_modified
+class LeanSitemap(Sitemap):
+    """
+    A Sitemap for models with lots of objects.
 
+    It only fetches the fields needed for each object's URL and lastmod
+    (`fields`), chunk_size objects at a time. And iter_urls() generates the
+    URLs one at a time, so that SitemapView can stream them.
 
-class TopicSitemap(Sitemap):
-    """Lists all Topics for the sitemap."""
+    Child classes should set model, and the fields and ordering if the
+    defaults aren't right. Or override get_queryset().
+    """
 
     changefreq = "monthly"
-    priority = 0.6
+    chunk_size = 2000
+    model = None
+    # The fields needed by get_absolute_url() and lastmod():
+    fields = ("date_modified",)
+    # Must be a unique ordering, so that pages don't overlap:
+    ordering = ("pk",)
+
+    def get_queryset(self):
+        return self.model._default_manager.order_by(*self.ordering)
 
     def items(self):
-        return Topic.objects.all()
+        return ChunkedQuerySet(
+            self.get_queryset().only(*self.fields), chunk_size=self.chunk_size
+        )
 
     def lastmod(self, obj):
         return obj.date_modified
 
+    def get_latest_lastmod(self):
+        "Used by the sitemap index. Without fetching every object."
+        return self.get_queryset().aggregate(latest=Max("date_modified"))["latest"]
+
+    def iter_urls(self, page=1, site=None, protocol=None):
+        """
+        Like get_urls() but returns an iterator of dicts, each with location,
+        lastmod, changefreq and priority.
+
+        Raises EmptyPage or PageNotAnInteger immediately, before any
+        objects are fetched.
+        """
+        protocol = self.get_protocol(protocol)
+        domain = self.get_domain(site)
+        objects = self.paginator.page(page).object_list
+        return (
+            {
+                "location": f"{protocol}://{domain}{self.location(obj)}",
+                "lastmod": self.lastmod(obj),
+                "changefreq": self.changefreq,
+                "priority": str(self.priority if self.priority is not None else ""),
+            }
+            for obj in objects
+        )
+
+
+class EntrySitemap(LeanSitemap):
+    """Lists all Diary Entries for the sitemap."""
+
+    priority = 0.8
+    model = Entry
+    fields = ("diary_date", "date_modified")
+    ordering = ("diary_date",)
+
+    def get_queryset(self):
+        return Entry.objects.published().order_by(*self.ordering)
+
+
+class LetterSitemap(LeanSitemap):
+    """Lists all Letters for the sitemap."""
+
+    priority = 0.7
+    model = Letter
+    fields = ("letter_date", "slug", "date_modified")
+    ordering = ("letter_date", "pk")
+
+
+class TopicSitemap(LeanSitemap):
+    """Lists all Topics for the sitemap."""
+
+    priority = 0.6
+    model = Topic
+
 
 class ArticleSitemap(Sitemap):
     """Lists all In-Depth Articles for the sitemap."""
@@ -162,9 +241,9 @@ class ArchiveSitemap(Sitemap):
 
     def _encyclopedia_categories_sitemaps(self):
         sitemaps = []
-        for c in Category.objects.all():
+        for node in category_tree.nodes():
             sitemap_class = AbstractSitemapClass()
-            sitemap_class.url = c.get_absolute_url()
+            sitemap_class.url = node.get_absolute_url()
             sitemaps.append(sitemap_class)
         return sitemaps
 
@@ -185,3 +264,61 @@ class ArchiveSitemap(Sitemap):
             sitemap_class.url = reverse_lazy("summary_year_archive", kwargs={"year": y})
             sitemaps.append(sitemap_class)
         return sitemaps
+
+
+SITEMAPS = {
+    "main": StaticSitemap,
+    "entries": EntrySitemap,
+    "letters": LetterSitemap,
+    "topics": TopicSitemap,
+    "articles": ArticleSitemap,
+    "posts": PostSitemap,
+    "archives": ArchiveSitemap,
+    "flatpages": FlatPageSitemap,
+}
+
+
+def get_prerendered_cache_key(section, page):
+    "Where the prerender_sitemaps command puts a page of a sitemap."
+    return f"sitemap:{section}:{page}"
+
+
+def render_sitemap(sitemap, page=1, site=None, protocol=None, chunk_urls=500):
+    """
+    Returns an iterator of strings that make the XML for one page of a
+    LeanSitemap, the same as Django's sitemap.xml template, with chunk_urls
+    <url>s in each string.
+
+    Raises EmptyPage or PageNotAnInteger if the page is invalid.
+    """
+    urls = sitemap.iter_urls(page=page, site=site, protocol=protocol)
+
+    def generate():
+        yield (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+            'xmlns:xhtml="http://www.w3.org/1999/xhtml">\n'
+        )
+        lines = []
+        for url in urls:
+            lines.append(_render_url(url))
+            if len(lines) == chunk_urls:
+                yield "".join(lines)
+                lines = []
+        lines.append("\n</urlset>\n")
+        yield "".join(lines)
+
+    return generate()
+
+
+def _render_url(url):
+    parts = ["<url><loc>", escape(url["location"]), "</loc>"]
+    if url["lastmod"]:
+        lastmod = template_localtime(url["lastmod"]).strftime("%Y-%m-%d")
+        parts += ["<lastmod>", lastmod, "</lastmod>"]
+    if url["changefreq"]:
+        parts += ["<changefreq>", escape(url["changefreq"]), "</changefreq>"]
+    if url["priority"]:
+        parts += ["<priority>", escape(url["priority"]), "</priority>"]
+    parts.append("</url>")
+    return "".join(parts)
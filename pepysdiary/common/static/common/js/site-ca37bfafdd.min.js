@@ -31,4 +31,4 @@ if(k&&j[k]&&(e||j[k].data)||void 0!==d||"string"!=typeof b)return k||(k=i?a[h]=c
  * Config saved to config.json and https://gist.github.com/5c11b6e5aab0281fcdfc
  */
 if("undefined"==typeof jQuery)throw new Error("Bootstrap's JavaScript requires jQuery");+function(t){var e=t.fn.jquery.split(" ")[0].split(".");if(e[0]<2&&e[1]<9||1==e[0]&&9==e[1]&&e[2]<1)throw new Error("Bootstrap's JavaScript requires jQuery version 1.9.1 or higher")}(jQuery),+function(t){"use strict";function e(e){return this.each(function(){var o=t(this),n=o.data("bs.alert");n||o.data("bs.alert",n=new i(this)),"string"==typeof e&&n[e].call(o)})}var o='[data-dismiss="alert"]',i=function(e){t(e).on("click",o,this.close)};i.VERSION="3.3.1",i.TRANSITION_DURATION=150,i.prototype.close=function(e){function o(){r.detach().trigger("closed.bs.alert").remove()}var n=t(this),s=n.attr("data-target");s||(s=n.attr("href"),s=s&&s.replace(/.*(?=#[^\s]*$)/,""));var r=t(s);e&&e.preventDefault(),r.length||(r=n.closest(".alert")),r.trigger(e=t.Event("close.bs.alert")),e.isDefaultPrevented()||(r.removeClass("in"),t.support.transition&&r.hasClass("fade")?r.one("bsTransitionEnd",o).emulateTransitionEnd(i.TRANSITION_DURATION):o())};var n=t.fn.alert;t.fn.alert=e,t.fn.alert.Constructor=i,t.fn.alert.noConflict=function(){return t.fn.alert=n,this},t(document).on("click.bs.alert.data-api",o,i.prototype.close)}(jQuery),+function(t){"use strict";function e(e){e&&3===e.which||(t(n).remove(),t(s).each(function(){var i=t(this),n=o(i),s={relatedTarget:this};n.hasClass("open")&&(n.trigger(e=t.Event("hide.bs.dropdown",s)),e.isDefaultPrevented()||(i.attr("aria-expanded","false"),n.removeClass("open").trigger("hidden.bs.dropdown",s)))}))}function o(e){var o=e.attr("data-target");o||(o=e.attr("href"),o=o&&/#[A-Za-z]/.test(o)&&o.replace(/.*(?=#[^\s]*$)/,""));var i=o&&t(o);return i&&i.length?i:e.parent()}function i(e){return this.each(function(){var o=t(this),i=o.data("bs.dropdown");i||o.data("bs.dropdown",i=new r(this)),"string"==typeof e&&i[e].call(o)})}var n=".dropdown-backdrop",s='[data-toggle="dropdown"]',r=function(e){t(e).on("click.bs.dropdown",this.toggle)};r.VERSION="3.3.1",r.prototype.toggle=function(i){var n=t(this);if(!n.is(".disabled, :disabled")){var s=o(n),r=s.hasClass("open");if(e(),!r){"ontouchstart"in document.documentElement&&!s.closest(".navbar-nav").length&&t('<div class="dropdown-backdrop"/>').insertAfter(t(this)).on("click",e);var a={relatedTarget:this};if(s.trigger(i=t.Event("show.bs.dropdown",a)),i.isDefaultPrevented())return;n.trigger("focus").attr("aria-expanded","true"),s.toggleClass("open").trigger("shown.bs.dropdown",a)}return!1}},r.prototype.keydown=function(e){if(/(38|40|27|32)/.test(e.which)&&!/input|textarea/i.test(e.target.tagName)){var i=t(this);if(e.preventDefault(),e.stopPropagation(),!i.is(".disabled, :disabled")){var n=o(i),r=n.hasClass("open");if(!r&&27!=e.which||r&&27==e.which)return 27==e.which&&n.find(s).trigger("focus"),i.trigger("click");var a=" li:not(.divider):visible a",l=n.find('[role="menu"]'+a+', [role="listbox"]'+a);if(l.length){var p=l.index(e.target);38==e.which&&p>0&&p--,40==e.which&&p<l.length-1&&p++,~p||(p=0),l.eq(p).trigger("focus")}}}};var a=t.fn.dropdown;t.fn.dropdown=i,t.fn.dropdown.Constructor=r,t.fn.dropdown.noConflict=function(){return t.fn.dropdown=a,this},t(document).on("click.bs.dropdown.data-api",e).on("click.bs.dropdown.data-api",".dropdown form",function(t){t.stopPropagation()}).on("click.bs.dropdown.data-api",s,r.prototype.toggle).on("keydown.bs.dropdown.data-api",s,r.prototype.keydown).on("keydown.bs.dropdown.data-api",'[role="menu"]',r.prototype.keydown).on("keydown.bs.dropdown.data-api",'[role="listbox"]',r.prototype.keydown)}(jQuery),+function(t){"use strict";function e(e){return this.each(function(){var i=t(this),n=i.data("bs.tooltip"),s="object"==typeof e&&e,r=s&&s.selector;(n||"destroy"!=e)&&(r?(n||i.data("bs.tooltip",n={}),n[r]||(n[r]=new o(this,s))):n||i.data("bs.tooltip",n=new o(this,s)),"string"==typeof e&&n[e]())})}var o=function(t,e){this.type=this.options=this.enabled=this.timeout=this.hoverState=this.$element=null,this.init("tooltip",t,e)};o.VERSION="3.3.1",o.TRANSITION_DURATION=150,o.DEFAULTS={animation:!0,placement:"top",selector:!1,template:'<div class="tooltip" role="tooltip"><div class="tooltip-arrow"></div><div class="tooltip-inner"></div></div>',trigger:"hover focus",title:"",delay:0,html:!1,container:!1,viewport:{selector:"body",padding:0}},o.prototype.init=function(e,o,i){this.enabled=!0,this.type=e,this.$element=t(o),this.options=this.getOptions(i),this.$viewport=this.options.viewport&&t(this.options.viewport.selector||this.options.viewport);for(var n=this.options.trigger.split(" "),s=n.length;s--;){var r=n[s];if("click"==r)this.$element.on("click."+this.type,this.options.selector,t.proxy(this.toggle,this));else if("manual"!=r){var a="hover"==r?"mouseenter":"focusin",l="hover"==r?"mouseleave":"focusout";this.$element.on(a+"."+this.type,this.options.selector,t.proxy(this.enter,this)),this.$element.on(l+"."+this.type,this.options.selector,t.proxy(this.leave,this))}}this.options.selector?this._options=t.extend({},this.options,{trigger:"manual",selector:""}):this.fixTitle()},o.prototype.getDefaults=function(){return o.DEFAULTS},o.prototype.getOptions=function(e){return e=t.extend({},this.getDefaults(),this.$element.data(),e),e.delay&&"number"==typeof e.delay&&(e.delay={show:e.delay,hide:e.delay}),e},o.prototype.getDelegateOptions=function(){var e={},o=this.getDefaults();return this._options&&t.each(this._options,function(t,i){o[t]!=i&&(e[t]=i)}),e},o.prototype.enter=function(e){var o=e instanceof this.constructor?e:t(e.currentTarget).data("bs."+this.type);return o&&o.$tip&&o.$tip.is(":visible")?void(o.hoverState="in"):(o||(o=new this.constructor(e.currentTarget,this.getDelegateOptions()),t(e.currentTarget).data("bs."+this.type,o)),clearTimeout(o.timeout),o.hoverState="in",o.options.delay&&o.options.delay.show?void(o.timeout=setTimeout(function(){"in"==o.hoverState&&o.show()},o.options.delay.show)):o.show())},o.prototype.leave=function(e){var o=e instanceof this.constructor?e:t(e.currentTarget).data("bs."+this.type);return o||(o=new this.constructor(e.currentTarget,this.getDelegateOptions()),t(e.currentTarget).data("bs."+this.type,o)),clearTimeout(o.timeout),o.hoverState="out",o.options.delay&&o.options.delay.hide?void(o.timeout=setTimeout(function(){"out"==o.hoverState&&o.hide()},o.options.delay.hide)):o.hide()},o.prototype.show=function(){var e=t.Event("show.bs."+this.type);if(this.hasContent()&&this.enabled){this.$element.trigger(e);var i=t.contains(this.$element[0].ownerDocument.documentElement,this.$element[0]);if(e.isDefaultPrevented()||!i)return;var n=this,s=this.tip(),r=this.getUID(this.type);this.setContent(),s.attr("id",r),this.$element.attr("aria-describedby",r),this.options.animation&&s.addClass("fade");var a="function"==typeof this.options.placement?this.options.placement.call(this,s[0],this.$element[0]):this.options.placement,l=/\s?auto?\s?/i,p=l.test(a);p&&(a=a.replace(l,"")||"top"),s.detach().css({top:0,left:0,display:"block"}).addClass(a).data("bs."+this.type,this),this.options.container?s.appendTo(this.options.container):s.insertAfter(this.$element);var h=this.getPosition(),d=s[0].offsetWidth,c=s[0].offsetHeight;if(p){var f=a,u=this.options.container?t(this.options.container):this.$element.parent(),g=this.getPosition(u);a="bottom"==a&&h.bottom+c>g.bottom?"top":"top"==a&&h.top-c<g.top?"bottom":"right"==a&&h.right+d>g.width?"left":"left"==a&&h.left-d<g.left?"right":a,s.removeClass(f).addClass(a)}var v=this.getCalculatedOffset(a,h,d,c);this.applyPlacement(v,a);var m=function(){var t=n.hoverState;n.$element.trigger("shown.bs."+n.type),n.hoverState=null,"out"==t&&n.leave(n)};t.support.transition&&this.$tip.hasClass("fade")?s.one("bsTransitionEnd",m).emulateTransitionEnd(o.TRANSITION_DURATION):m()}},o.prototype.applyPlacement=function(e,o){var i=this.tip(),n=i[0].offsetWidth,s=i[0].offsetHeight,r=parseInt(i.css("margin-top"),10),a=parseInt(i.css("margin-left"),10);isNaN(r)&&(r=0),isNaN(a)&&(a=0),e.top=e.top+r,e.left=e.left+a,t.offset.setOffset(i[0],t.extend({using:function(t){i.css({top:Math.round(t.top),left:Math.round(t.left)})}},e),0),i.addClass("in");var l=i[0].offsetWidth,p=i[0].offsetHeight;"top"==o&&p!=s&&(e.top=e.top+s-p);var h=this.getViewportAdjustedDelta(o,e,l,p);h.left?e.left+=h.left:e.top+=h.top;var d=/top|bottom/.test(o),c=d?2*h.left-n+l:2*h.top-s+p,f=d?"offsetWidth":"offsetHeight";i.offset(e),this.replaceArrow(c,i[0][f],d)},o.prototype.replaceArrow=function(t,e,o){this.arrow().css(o?"left":"top",50*(1-t/e)+"%").css(o?"top":"left","")},o.prototype.setContent=function(){var t=this.tip(),e=this.getTitle();t.find(".tooltip-inner")[this.options.html?"html":"text"](e),t.removeClass("fade in top bottom left right")},o.prototype.hide=function(e){function i(){"in"!=n.hoverState&&s.detach(),n.$element.removeAttr("aria-describedby").trigger("hidden.bs."+n.type),e&&e()}var n=this,s=this.tip(),r=t.Event("hide.bs."+this.type);return this.$element.trigger(r),r.isDefaultPrevented()?void 0:(s.removeClass("in"),t.support.transition&&this.$tip.hasClass("fade")?s.one("bsTransitionEnd",i).emulateTransitionEnd(o.TRANSITION_DURATION):i(),this.hoverState=null,this)},o.prototype.fixTitle=function(){var t=this.$element;(t.attr("title")||"string"!=typeof t.attr("data-original-title"))&&t.attr("data-original-title",t.attr("title")||"").attr("title","")},o.prototype.hasContent=function(){return this.getTitle()},o.prototype.getPosition=function(e){e=e||this.$element;var o=e[0],i="BODY"==o.tagName,n=o.getBoundingClientRect();null==n.width&&(n=t.extend({},n,{width:n.right-n.left,height:n.bottom-n.top}));var s=i?{top:0,left:0}:e.offset(),r={scroll:i?document.documentElement.scrollTop||document.body.scrollTop:e.scrollTop()},a=i?{width:t(window).width(),height:t(window).height()}:null;return t.extend({},n,r,a,s)},o.prototype.getCalculatedOffset=function(t,e,o,i){return"bottom"==t?{top:e.top+e.height,left:e.left+e.width/2-o/2}:"top"==t?{top:e.top-i,left:e.left+e.width/2-o/2}:"left"==t?{top:e.top+e.height/2-i/2,left:e.left-o}:{top:e.top+e.height/2-i/2,left:e.left+e.width}},o.prototype.getViewportAdjustedDelta=function(t,e,o,i){var n={top:0,left:0};if(!this.$viewport)return n;var s=this.options.viewport&&this.options.viewport.padding||0,r=this.getPosition(this.$viewport);if(/right|left/.test(t)){var a=e.top-s-r.scroll,l=e.top+s-r.scroll+i;a<r.top?n.top=r.top-a:l>r.top+r.height&&(n.top=r.top+r.height-l)}else{var p=e.left-s,h=e.left+s+o;p<r.left?n.left=r.left-p:h>r.width&&(n.left=r.left+r.width-h)}return n},o.prototype.getTitle=function(){var t,e=this.$element,o=this.options;return t=e.attr("data-original-title")||("function"==typeof o.title?o.title.call(e[0]):o.title)},o.prototype.getUID=function(t){do t+=~~(1e6*Math.random());while(document.getElementById(t));return t},o.prototype.tip=function(){return this.$tip=this.$tip||t(this.options.template)},o.prototype.arrow=function(){return this.$arrow=this.$arrow||this.tip().find(".tooltip-arrow")},o.prototype.enable=function(){this.enabled=!0},o.prototype.disable=function(){this.enabled=!1},o.prototype.toggleEnabled=function(){this.enabled=!this.enabled},o.prototype.toggle=function(e){var o=this;e&&(o=t(e.currentTarget).data("bs."+this.type),o||(o=new this.constructor(e.currentTarget,this.getDelegateOptions()),t(e.currentTarget).data("bs."+this.type,o))),o.tip().hasClass("in")?o.leave(o):o.enter(o)},o.prototype.destroy=function(){var t=this;clearTimeout(this.timeout),this.hide(function(){t.$element.off("."+t.type).removeData("bs."+t.type)})};var i=t.fn.tooltip;t.fn.tooltip=e,t.fn.tooltip.Constructor=o,t.fn.tooltip.noConflict=function(){return t.fn.tooltip=i,this}}(jQuery),+function(t){"use strict";function e(e){return this.each(function(){var i=t(this),n=i.data("bs.popover"),s="object"==typeof e&&e,r=s&&s.selector;(n||"destroy"!=e)&&(r?(n||i.data("bs.popover",n={}),n[r]||(n[r]=new o(this,s))):n||i.data("bs.popover",n=new o(this,s)),"string"==typeof e&&n[e]())})}var o=function(t,e){this.init("popover",t,e)};if(!t.fn.tooltip)throw new Error("Popover requires tooltip.js");o.VERSION="3.3.1",o.DEFAULTS=t.extend({},t.fn.tooltip.Constructor.DEFAULTS,{placement:"right",trigger:"click",content:"",template:'<div class="popover" role="tooltip"><div class="arrow"></div><h3 class="popover-title"></h3><div class="popover-content"></div></div>'}),o.prototype=t.extend({},t.fn.tooltip.Constructor.prototype),o.prototype.constructor=o,o.prototype.getDefaults=function(){return o.DEFAULTS},o.prototype.setContent=function(){var t=this.tip(),e=this.getTitle(),o=this.getContent();t.find(".popover-title")[this.options.html?"html":"text"](e),t.find(".popover-content").children().detach().end()[this.options.html?"string"==typeof o?"html":"append":"text"](o),t.removeClass("fade top bottom left right in"),t.find(".popover-title").html()||t.find(".popover-title").hide()},o.prototype.hasContent=function(){return this.getTitle()||this.getContent()},o.prototype.getContent=function(){var t=this.$element,e=this.options;return t.attr("data-content")||("function"==typeof e.content?e.content.call(t[0]):e.content)},o.prototype.arrow=function(){return this.$arrow=this.$arrow||this.tip().find(".arrow")},o.prototype.tip=function(){return this.$tip||(this.$tip=t(this.options.template)),this.$tip};var i=t.fn.popover;t.fn.popover=e,t.fn.popover.Constructor=o,t.fn.popover.noConflict=function(){return t.fn.popover=i,this}}(jQuery),+function(t){"use strict";function e(e){return this.each(function(){var i=t(this),n=i.data("bs.tab");n||i.data("bs.tab",n=new o(this)),"string"==typeof e&&n[e]()})}var o=function(e){this.element=t(e)};o.VERSION="3.3.1",o.TRANSITION_DURATION=150,o.prototype.show=function(){var e=this.element,o=e.closest("ul:not(.dropdown-menu)"),i=e.data("target");if(i||(i=e.attr("href"),i=i&&i.replace(/.*(?=#[^\s]*$)/,"")),!e.parent("li").hasClass("active")){var n=o.find(".active:last a"),s=t.Event("hide.bs.tab",{relatedTarget:e[0]}),r=t.Event("show.bs.tab",{relatedTarget:n[0]});if(n.trigger(s),e.trigger(r),!r.isDefaultPrevented()&&!s.isDefaultPrevented()){var a=t(i);this.activate(e.closest("li"),o),this.activate(a,a.parent(),function(){n.trigger({type:"hidden.bs.tab",relatedTarget:e[0]}),e.trigger({type:"shown.bs.tab",relatedTarget:n[0]})})}}},o.prototype.activate=function(e,i,n){function s(){r.removeClass("active").find("> .dropdown-menu > .active").removeClass("active").end().find('[data-toggle="tab"]').attr("aria-expanded",!1),e.addClass("active").find('[data-toggle="tab"]').attr("aria-expanded",!0),a?(e[0].offsetWidth,e.addClass("in")):e.removeClass("fade"),e.parent(".dropdown-menu")&&e.closest("li.dropdown").addClass("active").end().find('[data-toggle="tab"]').attr("aria-expanded",!0),n&&n()}var r=i.find("> .active"),a=n&&t.support.transition&&(r.length&&r.hasClass("fade")||!!i.find("> .fade").length);r.length&&a?r.one("bsTransitionEnd",s).emulateTransitionEnd(o.TRANSITION_DURATION):s(),r.removeClass("in")};var i=t.fn.tab;t.fn.tab=e,t.fn.tab.Constructor=o,t.fn.tab.noConflict=function(){return t.fn.tab=i,this};var n=function(o){o.preventDefault(),e.call(t(this),"show")};t(document).on("click.bs.tab.data-api",'[data-toggle="tab"]',n).on("click.bs.tab.data-api",'[data-toggle="pill"]',n)}(jQuery),+function(t){"use strict";function e(e){var o,i=e.attr("data-target")||(o=e.attr("href"))&&o.replace(/.*(?=#[^\s]+$)/,"");return t(i)}function o(e){return this.each(function(){var o=t(this),n=o.data("bs.collapse"),s=t.extend({},i.DEFAULTS,o.data(),"object"==typeof e&&e);!n&&s.toggle&&"show"==e&&(s.toggle=!1),n||o.data("bs.collapse",n=new i(this,s)),"string"==typeof e&&n[e]()})}var i=function(e,o){this.$element=t(e),this.options=t.extend({},i.DEFAULTS,o),this.$trigger=t(this.options.trigger).filter('[href="#'+e.id+'"], [data-target="#'+e.id+'"]'),this.transitioning=null,this.options.parent?this.$parent=this.getParent():this.addAriaAndCollapsedClass(this.$element,this.$trigger),this.options.toggle&&this.toggle()};i.VERSION="3.3.1",i.TRANSITION_DURATION=350,i.DEFAULTS={toggle:!0,trigger:'[data-toggle="collapse"]'},i.prototype.dimension=function(){var t=this.$element.hasClass("width");return t?"width":"height"},i.prototype.show=function(){if(!this.transitioning&&!this.$element.hasClass("in")){var e,n=this.$parent&&this.$parent.find("> .panel").children(".in, .collapsing");if(!(n&&n.length&&(e=n.data("bs.collapse"),e&&e.transitioning))){var s=t.Event("show.bs.collapse");if(this.$element.trigger(s),!s.isDefaultPrevented()){n&&n.length&&(o.call(n,"hide"),e||n.data("bs.collapse",null));var r=this.dimension();this.$element.removeClass("collapse").addClass("collapsing")[r](0).attr("aria-expanded",!0),this.$trigger.removeClass("collapsed").attr("aria-expanded",!0),this.transitioning=1;var a=function(){this.$element.removeClass("collapsing").addClass("collapse in")[r](""),this.transitioning=0,this.$element.trigger("shown.bs.collapse")};if(!t.support.transition)return a.call(this);var l=t.camelCase(["scroll",r].join("-"));this.$element.one("bsTransitionEnd",t.proxy(a,this)).emulateTransitionEnd(i.TRANSITION_DURATION)[r](this.$element[0][l])}}}},i.prototype.hide=function(){if(!this.transitioning&&this.$element.hasClass("in")){var e=t.Event("hide.bs.collapse");if(this.$element.trigger(e),!e.isDefaultPrevented()){var o=this.dimension();this.$element[o](this.$element[o]())[0].offsetHeight,this.$element.addClass("collapsing").removeClass("collapse in").attr("aria-expanded",!1),this.$trigger.addClass("collapsed").attr("aria-expanded",!1),this.transitioning=1;var n=function(){this.transitioning=0,this.$element.removeClass("collapsing").addClass("collapse").trigger("hidden.bs.collapse")};return t.support.transition?void this.$element[o](0).one("bsTransitionEnd",t.proxy(n,this)).emulateTransitionEnd(i.TRANSITION_DURATION):n.call(this)}}},i.prototype.toggle=function(){this[this.$element.hasClass("in")?"hide":"show"]()},i.prototype.getParent=function(){return t(this.options.parent).find('[data-toggle="collapse"][data-parent="'+this.options.parent+'"]').each(t.proxy(function(o,i){var n=t(i);this.addAriaAndCollapsedClass(e(n),n)},this)).end()},i.prototype.addAriaAndCollapsedClass=function(t,e){var o=t.hasClass("in");t.attr("aria-expanded",o),e.toggleClass("collapsed",!o).attr("aria-expanded",o)};var n=t.fn.collapse;t.fn.collapse=o,t.fn.collapse.Constructor=i,t.fn.collapse.noConflict=function(){return t.fn.collapse=n,this},t(document).on("click.bs.collapse.data-api",'[data-toggle="collapse"]',function(i){var n=t(this);n.attr("data-target")||i.preventDefault();var s=e(n),r=s.data("bs.collapse"),a=r?"toggle":t.extend({},n.data(),{trigger:this});o.call(s,a)})}(jQuery);
-function isNumber(t){return!isNaN(parseFloat(t))&&isFinite(t)}jQuery.fn.exists=function(){return 0<jQuery(this).length},window.pepys={},window.pepys.controller={config:{mapbox_map_id:"",mapbox_access_token:"",static_prefix:""},init:function(t){"config"in t&&$.extend(this.config,t.config),"tooltips"in t&&pepys.tooltips.init(t.tooltips),pepys.search.init(),pepys.comments.init(),pepys.topic.init(),$.timeago.settings.cutoff=6048e5,$("time.timeago").timeago()}},window.pepys.utilities={diary_years_months:function(){return{1660:{Jan:31,Feb:29,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1661:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1662:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1663:{Jan:31,Feb:28,Mar:31,"Apr/":30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1664:{Jan:31,Feb:29,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1665:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1666:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1667:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1668:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1669:{Jan:31,Feb:29,Mar:31,Apr:30,May:31}}}},window.pepys.search={init:function(){var i;0!==$(".js-search-form").length&&("c"==getUrlParameter("k")&&this.hideTitleOption(),i=this,$(".js-search-kind").on("change",function(t){var e;"c"==$(this).val()?i.hideTitleOption():0===$(".js-search-order-title").length&&(e=$(".js-search-order option")[0],$('<option class="js-search-order-title" value="az">Title</option>').insertAfter(e))}))},hideTitleOption:function(){$(".js-search-order-title").remove()}},window.pepys.tooltips={tooltips:{},encyclopedia_link_re:null,init:function(t){this.tooltips=t,this.encyclopedia_link_re=/\/(\d+)\/$/,this.prepare_tooltips()},prepare_tooltips:function(){var i=this;$("article.entry, article.letter-text").find("a").each(function(t){var e;id=i.id_from_encyclopedia_url($(this).attr("href")),id in i.tooltips&&(e={title:i.tooltips[id].title,content:i.tooltip_content(i.tooltips[id].text,i.tooltips[id].thumbnail_url),trigger:"hover click",placement:"auto left",html:!0},i.tooltips[id].thumbnail_url&&(e.template='<div class="popover popover-hasthumbnail" role="tooltip"><div class="arrow"></div><h3 class="popover-title"></h3><div class="popover-content"></div></div>'),$(this).popover(e))})},id_from_encyclopedia_url:function(t){return!t||-1==t.indexOf("/encyclopedia/")?"":this.encyclopedia_link_re.exec(t)[1]},tooltip_content:function(t,e){return e?'<img src="'+e+'" class="thumbnail" width="100" height="120" alt="Thumbnail" />'+t:t}},window.pepys.comments={prev_visit_end:null,init:function(){this.init_hash_link(),this.init_newables()},init_hash_link:function(){var t=window.location.hash.substring(1);t&&t.match(/^c\d+$/)&&$("#"+t).exists()&&$("#"+t).addClass("focused")},init_newables:function(){this.get_cookies(),this.set_markers()},get_cookies:function(){cookie_value=readCookie("prev_visit_end"),isNumber(cookie_value)&&(this.prev_visit_end=parseInt(cookie_value,10))},set_markers:function(){var e=this;$(".newable").each(function(t){(null===e.prev_visit_end||parseInt($(this).data("time"),10)>e.prev_visit_end)&&$("span.newflag",$(this)).addClass("is-new").attr("title","New since your last visit").after('<span class="sr-only">New since your last visit</span>')})}},window.pepys.category={category_id:null,valid_map_category_ids:[],topics:[],start_coords:{britain:{latitude:52.5,longitude:-1.9,zoom:6},london:{latitude:51.508,longitude:-.1091,zoom:14},environs:{latitude:51.508,longitude:-.1791,zoom:11},waterways:{latitude:52,longitude:-1.3,zoom:7},whitehall:{latitude:51.5035,longitude:-.1257,zoom:17},world:{latitude:24.0389,longitude:25.045,zoom:2}},categories_start_coords:{30:"britain",45:"world",180:"whitehall",209:"waterways",214:"environs"},init_map:function(t){this.resize_map();var e=this;$(window).resize(function(){e.resize_map()}),this.valid_map_category_ids=t.valid_map_category_ids,this.topics=t.topics,this.is_valid_map_category_id(t.category_id)&&(this.category_id=t.category_id,this.draw_category_map(this.category_id)),this.init_form()},init_form:function(){$("#category-form button").hide(),$("#category-form select").change(function(){$("#category-form").submit()})},draw_category_map:function(t){this.is_valid_map_category_id(t)&&(this.category_id=t,t=this.start_coords.london,this.category_id.toString()in this.categories_start_coords&&(t=this.start_coords[this.categories_start_coords[this.category_id.toString()]]),pepys.maps.init(t),$.each(this.topics,function(t,e){pepys.maps.add_place(e,{link_to_topic:!0})}))},resize_map:function(){var t=$("#content"),e=$("#map-frame"),i=$(window).height()-t.offset().top-(t.outerHeight(!0)-t.height()),a=(i=i<600?600:i)-(e.offset().top-t.offset().top)-$(".mapkey").height();t.height(i+"px"),e.height(a+"px")},is_valid_map_category_id:function(t){return-1!=$.inArray(t,this.valid_map_category_ids)}},window.pepys.topic={valid_tabs:["map","summary","wikipedia","wheatley","discussion","references","letters"],init:function(){0!==$(".nav-tabs").length&&(this.init_tabs(),this.draw_wealth_chart())},init_tabs:function(){var t=window.location.hash.substring(1);t&&((t.match(/^c\d+$/)||"latest"===t)&&$("#"+t).exists()?($("#tab-discussion a").tab("show"),$("html, body").animate({scrollTop:$("#"+t).offset().top},500)):0<=$.inArray(t,this.valid_tabs)?($("#tab-"+t+" a").tab("show"),$("html, body").animate({scrollTop:0},1)):$("#row-wikipedia").exists()&&$("#wikipedia").exists()&&$("#tab-wikipedia a").tab("show")),$(".nav-tabs a").on("shown.bs.tab",function(t){t=t.target.hash.substring(1);history.pushState?history.pushState(null,null,"#"+t):window.location.hash="#"+t})},draw_map:function(t){pepys.maps.init({latitude:t.latitude,longitude:t.longitude,zoom:t.zoom}),pepys.maps.add_place(t,{show_popup:!0})},chart_tooltip:function(){},draw_wealth_chart:function(){var a,o,n,t,r,e,i,s,l,c,p,u,h,f,m;0!==$(".js-wealth-chart").length&&0!==$(".js-wealth-table").length&&(a=d3.time.format("%Y-%m-%d").parse,o=d3.time.format("%_d %b %Y"),n=function(t){return"£"+d3.format(",")(t)},t="14px",r=[],$(".js-wealth-table tbody tr").each(function(t){var e=$("time",$(this)).attr("datetime"),i=(i=$("td",$(this)).eq(1).text()).replace(",","");i=parseInt(i),r.push({date:a(e),value:i})}),s=(e=$(".js-wealth-chart").width())-(c=50)-5,l=(i=(i=Math.round(e/3))<200?200:i)-(h=15)-25,c=d3.select(".js-wealth-chart").append("svg").attr("class","chart").attr("width",e).attr("height",i).append("g").attr("transform","translate("+c+","+h+")"),p=d3.time.scale().domain([a("1660-01-01"),a("1669-05-31")]).range([0,s],0),u=d3.scale.linear().domain([0,7e3]).range([l,0]),h=d3.svg.axis().scale(u).orient("left").innerTickSize(-s).outerTickSize(0).tickPadding(5).tickFormat(n),c.append("g").attr("class","axis axis-y").call(h),h=d3.svg.axis().scale(p).orient("bottom").tickSize(5,0,0).tickPadding(7).tickFormat(o).tickValues([a("1660-01-01"),a("1662-01-01"),a("1664-01-01"),a("1666-01-01"),a("1668-01-01")]),s<340&&h.tickValues([a("1660-01-01"),a("1663-01-01"),a("1666-01-01")]),c.append("g").attr("class","axis axis-x").attr("transform","translate(0,"+l+")").call(h),c.selectAll(".axis text").attr("font-size",t),h=d3.svg.line().x(function(t){return p(t.date)}).y(function(t){return u(t.value)}),c.append("path").datum(r).attr("class","valueline").attr("fill","none").attr("stroke-linejoin","round").attr("stroke-linecap","round").attr("d",h),(f=c.append("g").attr("class","focus").style("display","none")).append("circle").attr("r",4.5),f.append("text").attr("class","focus-date-b").style("stroke","#f8f8f1").style("stroke-width","5px").style("font-size",t).style("opacity",.8).attr("dx",10).attr("dy","-.3em"),f.append("text").attr("class","focus-date-f").style("font-size",t).attr("dx",10).attr("dy","-.3em"),f.append("text").attr("class","focus-value-b").style("stroke","#f8f8f1").style("stroke-width","5px").style("font-size",t).style("opacity",.8).attr("dx",10).attr("dy","1em"),f.append("text").attr("class","focus-value-f").style("font-size",t).attr("dx",10).attr("dy","1em"),m=d3.bisector(function(t){return t.date}).left,c.append("rect").attr("class","overlay").attr("width",s).attr("height",l).on("mouseover",function(){f.style("display",null)}).on("mouseout",function(){f.style("display","none")}).on("mousemove",function(){var t=p.invert(d3.mouse(this)[0]),e=m(r,t,1),i=r[e-1],e=r[e];i&&e&&(d=t-i.date>e.date-t?e:i,i="translate("+p(d.date)+","+u(d.value)+")",f.select("circle").attr("transform",i),f.select(".focus-date-b").attr("transform",i).text(o(d.date)),f.select(".focus-date-f").attr("transform",i).text(o(d.date)),f.select(".focus-value-b").attr("transform",i).text(n(d.value)),f.select(".focus-value-f").attr("transform",i).text(n(d.value)))}))},draw_references_chart:function(n){var r=[];$.each(pepys.utilities.diary_years_months(),function(o,t){$.each(t,function(t,e){var i=t+" "+o,a=0,t=0;i in n&&(a=n[i],t=Math.round(a/e*100)),r.push({name:i,num_refs:a,percent_refs:t})})});var t=$(".tab-content").width(),e=Math.round(t/3.8),i=0,a=0,o=t-a-0,s=e-i-20,a=d3.select("#chart-references").append("svg").attr("class","chart").attr("width",t).attr("height",e).append("g").attr("transform","translate("+a+","+i+")"),l=d3.scale.ordinal().domain(d3.range(r.length)).rangeBands([0,o],0),c=d3.scale.linear().domain([0,100]).range([s,0]),i=d3.svg.axis().scale(l).orient("bottom").tickValues([0,12,24,36,48,60,72,84,96,108]).tickSize(8,0,0).tickPadding(5).tickFormat(function(t,e){return r[t].name.substring(4,8)});a.append("g").attr("class","axis axis-x").attr("transform","translate(-"+l.rangeBand()/2+","+s+")").call(i),a.selectAll("text").attr("dx",function(t,e){var i=6*l.rangeBand();return i=9<=e?2.5*l.rangeBand():i}).attr("dy",14/3).attr("font-size","14px");o=d3.svg.axis().scale(c).orient("left").tickValues([25,50,75,100]).tickSize(-o,0,0).tickFormat("");a.append("g").attr("class","axis axis-y").call(o);var p=d3.select("body").append("div").attr("class","chart-tooltip").style("font-size","14px").style("padding-left","7px").style("padding-right","7px");a.selectAll(".bar").data(r).enter().append("rect").attr("class","bar").attr("x",function(t,e){return l(e)}).attr("y",function(t){return c(t.percent_refs)}).attr("width",l.rangeBand()).attr("height",function(t,e){return s-c(t.percent_refs)}).on("mouseover",function(t,e){p.html("<strong>"+t.num_refs+"</strong> ("+t.name+")"),d3.select(this).classed("highlight",!0),p.style("visibility","visible")}).on("mousemove",function(){p.style("top",event.pageY-10+"px").style("left",event.pageX+10+"px")}).on("mouseout",function(){d3.select(this).classed("highlight",!1),p.style("visibility","hidden")})}},window.pepys.maps={map:null,init:function(t){var e;this.map=L.map("map-frame").setView(L.latLng(t.latitude,t.longitude),t.zoom),L.tileLayer.provider("MapBox",{id:pepys.controller.config.mapbox_map_id,accessToken:pepys.controller.config.mapbox_access_token}).addTo(this.map),this.map.scrollWheelZoom.disable(),this.init_overlays(),$("#tab-map").exists()&&(e=this,$('a[data-toggle="tab"]').on("shown",function(t){return"#map"==$(t.target).attr("href")&&e.map.invalidateSize(!1),!0}))},init_overlays:function(){var t=L.layerGroup([L.polyline([[51.511046,-.104113],[51.513864,-.104027],[51.513824,-.102482],[51.516494,-.101473],[51.516641,-.095927],[51.517823,-.095347],[51.51781,-.095192],[51.518608,-.094644],[51.517643,-.090101],[51.516862,-.085562],[51.516214,-.081636],[51.515112,-.079147],[51.514024,-.077151],[51.51365,-.076593],[51.509424,-.075821]],{stroke:!0,color:"#333333",opacity:.8})]),e=L.layerGroup([L.polygon([[51.494931,-.12454],[51.495172,-.132179],[51.495813,-.13308],[51.49795,-.13381],[51.498912,-.137758],[51.49803,-.139647],[51.499473,-.14235],[51.500542,-.139904],[51.501984,-.140891],[51.50324,-.13763],[51.504869,-.139604],[51.507941,-.131879],[51.50949,-.133424],[51.509864,-.133038],[51.510746,-.13381],[51.512722,-.130806],[51.516488,-.133166],[51.516675,-.130849],[51.517236,-.125828],[51.519505,-.121279],[51.521588,-.114112],[51.522229,-.111065],[51.52311,-.110335],[51.523377,-.107288],[51.523217,-.10673],[51.523751,-.106645],[51.524392,-.103126],[51.524232,-.102696],[51.526795,-.091453],[51.52303,-.090208],[51.523324,-.087161],[51.523591,-.081453],[51.524045,-.079265],[51.529038,-.078492],[51.528931,-.077419],[51.525353,-.076432],[51.523805,-.076132],[51.520734,-.073729],[51.517049,-.071154],[51.523217,-.044374],[51.521722,-.043087],[51.515313,-.069523],[51.510772,-.066776],[51.512375,-.053043],[51.510826,-.051842],[51.512642,-.037766],[51.50949,-.028667],[51.508101,-.027294],[51.506499,-.028667],[51.508796,-.034676],[51.509544,-.038023],[51.509651,-.04283],[51.509223,-.046091],[51.508101,-.049009],[51.506819,-.051327],[51.506125,-.052271],[51.50324,-.048065],[51.501477,-.051584],[51.499981,-.056734],[51.499286,-.062828],[51.498565,-.067849],[51.499526,-.071239],[51.497469,-.078664],[51.497736,-.081968],[51.499179,-.081882],[51.501156,-.082655],[51.502465,-.083385],[51.503881,-.084071],[51.502118,-.085144],[51.502679,-.091066],[51.50121,-.092268],[51.494611,-.083942],[51.493756,-.085444],[51.499126,-.09407],[51.498404,-.095787],[51.49966,-.097718],[51.502759,-.093598],[51.503934,-.095959],[51.50551,-.096259],[51.507006,-.095873],[51.507113,-.099478],[51.505163,-.101109],[51.502225,-.100508],[51.500568,-.101066],[51.50121,-.102096],[51.503667,-.102053],[51.505297,-.102267],[51.507861,-.103855],[51.508021,-.106859],[51.507621,-.11085],[51.507006,-.113597],[51.505323,-.112438],[51.504068,-.110722],[51.502305,-.108962],[51.501156,-.107889],[51.500916,-.109563],[51.503534,-.111752],[51.504869,-.113811],[51.506632,-.114799],[51.505965,-.116472],[51.504282,-.117803],[51.502625,-.118446],[51.501584,-.115786],[51.500889,-.114884],[51.499767,-.112782],[51.499339,-.113597],[51.499927,-.115614],[51.49974,-.116773],[51.499259,-.118232],[51.499794,-.118361],[51.500488,-.115571],[51.502011,-.118833],[51.499607,-.119562],[51.496641,-.120292],[51.495332,-.120034],[51.494664,-.117202],[51.491725,-.120292],[51.489053,-.121837],[51.486514,-.12351],[51.487102,-.125527],[51.490148,-.123124],[51.492633,-.121751],[51.494664,-.12115],[51.494931,-.12454]],{stroke:!1,fill:!0,fillColor:"#666666",fillOpacity:.4})]),i=L.layerGroup([L.polygon([[51.514204,-.109756],[51.514885,-.109928],[51.515353,-.109756],[51.515807,-.109456],[51.515753,-.108511],[51.516154,-.108318],[51.516114,-.107481],[51.516394,-.10731],[51.517022,-.106516],[51.516595,-.106452],[51.516955,-.105164],[51.516955,-.104885],[51.517329,-.104842],[51.517556,-.104477],[51.51781,-.103619],[51.51773,-.102847],[51.517369,-.102503],[51.517189,-.102476],[51.517085,-.101339],[51.516822,-.100003],[51.516812,-.098716],[51.516621,-.095932],[51.517803,-.095283],[51.51781,-.095192],[51.518608,-.094644],[51.517636,-.09023],[51.517222,-.089757],[51.517102,-.089382],[51.516862,-.088341],[51.516528,-.088041],[51.516007,-.088148],[51.515927,-.087891],[51.51568,-.085959],[51.515613,-.085745],[51.515486,-.085831],[51.515313,-.085369],[51.515046,-.084983],[51.514438,-.084243],[51.513477,-.084254],[51.513437,-.084007],[51.513016,-.084189],[51.512889,-.083545],[51.513096,-.083385],[51.512989,-.082451],[51.512789,-.082515],[51.512729,-.082194],[51.512602,-.082194],[51.512261,-.081207],[51.512054,-.080616],[51.511494,-.08037],[51.510959,-.080509],[51.510011,-.080745],[51.50953,-.079629],[51.50927,-.079823],[51.509043,-.079147],[51.508863,-.078771],[51.508302,-.079179],[51.507841,-.079361],[51.508328,-.081389],[51.508542,-.083621],[51.508909,-.087011],[51.509023,-.087837],[51.508983,-.090272],[51.509197,-.09201],[51.509677,-.093534],[51.510265,-.095787],[51.510692,-.098534],[51.510826,-.100272],[51.510853,-.103126],[51.510866,-.106409],[51.510893,-.109477],[51.513911,-.109949],[51.513964,-.109627],[51.514204,-.109756]],{stroke:!1,fill:!0,fillColor:"#cc6666",fillOpacity:.3})]);L.control.layers({},{"City of London wall":t,"Built-up London (approx.)":e,"Great Fire damage":i}).addTo(this.map)},add_place:function(t,e){e=e||{};var i,a=pepys.controller.config.static_prefix;(i="polygon"in t?L.polygon(this.string_to_coords(t.polygon),{color:"#a02b2d",opacity:.75,fill:"#a02b2d",fillOpacity:.4,weight:2}):"path"in t?L.polyline(this.string_to_coords(t.path),{color:"#a02b2d",opacity:.5}):(i={iconUrl:a+"img/marker-icon.png",iconRetinaUrl:a+"img/marker-icon-2x.png",iconAnchor:[12.5,41],iconSize:[25,41],popupAnchor:[0,-35],shadowUrl:a+"img/marker-shadow.png",shadowAnchor:[12.5,41]},"pepys_home"in t&&!0===t.pepys_home&&(i.iconUrl=a+"img/marker-icon-b.png",i.iconRetinaUrl=a+"img/marker-icon-b-2x.png"),o=L.icon(i),L.marker(L.latLng(t.latitude,t.longitude),{icon:o}))).addTo(this.map);var o="<strong>"+t.title+"</strong>";"tooltip_text"in t&&""!==t.tooltip_text&&(o+="<br />"+t.tooltip_text),"link_to_topic"in e&&!0===e.link_to_topic&&(o+='<br /><a href="'+t.url+'" title="See more about this topic">In the Encyclopedia</a>'),i.bindPopup(o,{minWidth:150}),"show_popup"in e&&!0===e.show_popup&&i.openPopup()},string_to_coords:function(t){var i=[];return $.each(t.split(";"),function(t,e){ll=e.split(","),i.push([parseFloat(ll[0]),parseFloat(ll[1])])}),i}};var getUrlParameter=function(t){for(var e,i=window.location.search.substring(1).split("&"),a=0;a<i.length;a++)if((e=i[a].split("="))[0]===t)return void 0===e[1]||decodeURIComponent(e[1])};!function(){var o;window.readCookie=function(t,e,i,a){if(o)return o[t];for(e=document.cookie.split("; "),o={},a=e.length-1;0<=a;a--)i=e[a].split("="),o[i[0]]=i[1];return o[t]}}();
\ No newline at end of file
+function isNumber(t){return!isNaN(parseFloat(t))&&isFinite(t)}jQuery.fn.exists=function(){return 0<jQuery(this).length},window.pepys={},window.pepys.controller={config:{mapbox_map_id:"",mapbox_access_token:"",static_prefix:"",visit_times:"client"},init:function(t){"config"in t&&$.extend(this.config,t.config),"tooltips"in t&&pepys.tooltips.init(t.tooltips),pepys.search.init(),pepys.comments.init(),pepys.topic.init(),$.timeago.settings.cutoff=6048e5,$("time.timeago").timeago()}},window.pepys.utilities={diary_years_months:function(){return{1660:{Jan:31,Feb:29,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1661:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1662:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1663:{Jan:31,Feb:28,Mar:31,"Apr/":30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1664:{Jan:31,Feb:29,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1665:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1666:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1667:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1668:{Jan:31,Feb:28,Mar:31,Apr:30,May:31,Jun:30,Jul:31,Aug:31,Sep:30,Oct:31,Nov:30,Dec:31},1669:{Jan:31,Feb:29,Mar:31,Apr:30,May:31}}}},window.pepys.search={init:function(){var i;0!==$(".js-search-form").length&&("c"==getUrlParameter("k")&&this.hideTitleOption(),i=this,$(".js-search-kind").on("change",function(t){var e;"c"==$(this).val()?i.hideTitleOption():0===$(".js-search-order-title").length&&(e=$(".js-search-order option")[0],$('<option class="js-search-order-title" value="az">Title</option>').insertAfter(e))}))},hideTitleOption:function(){$(".js-search-order-title").remove()}},window.pepys.tooltips={tooltips:{},encyclopedia_link_re:null,init:function(t){this.tooltips=t,this.encyclopedia_link_re=/\/(\d+)\/$/,this.prepare_tooltips()},prepare_tooltips:function(){var i=this;$("article.entry, article.letter-text").find("a").each(function(t){var e;id=i.id_from_encyclopedia_url($(this).attr("href")),id in i.tooltips&&(e={title:i.tooltips[id].title,content:i.tooltip_content(i.tooltips[id].text,i.tooltips[id].thumbnail_url),trigger:"hover click",placement:"auto left",html:!0},i.tooltips[id].thumbnail_url&&(e.template='<div class="popover popover-hasthumbnail" role="tooltip"><div class="arrow"></div><h3 class="popover-title"></h3><div class="popover-content"></div></div>'),$(this).popover(e))})},id_from_encyclopedia_url:function(t){return!t||-1==t.indexOf("/encyclopedia/")?"":this.encyclopedia_link_re.exec(t)[1]},tooltip_content:function(t,e){return e?'<img src="'+e+'" class="thumbnail" width="100" height="120" alt="Thumbnail" />'+t:t}},window.pepys.comments={prev_visit_end:null,visit_length:5400,storage_key:"pepys_visit_times",cookie_names:["last_view","visit_start","prev_visit_end"],init:function(){this.init_hash_link(),this.init_newables()},init_hash_link:function(){var t=window.location.hash.substring(1);t&&t.match(/^c\d+$/)&&$("#"+t).exists()&&$("#"+t).addClass("focused")},init_newables:function(){"cookies"===pepys.controller.config.visit_times?this.get_cookies():this.update_visit_times(),this.set_markers()},get_cookies:function(){var t=parseInt(readCookie("prev_visit_end"),10);Number.isNaN(t)||(this.prev_visit_end=t)},update_visit_times:function(){var t=Math.floor(Date.now()/1e3),e=this.read_visit_times();null===e.last_view||null===e.visit_start?e.visit_start=t:t-e.visit_start>this.visit_length&&(e.prev_visit_end=e.last_view,e.visit_start=t),e.last_view=t,this.prev_visit_end=e.prev_visit_end;try{window.localStorage.setItem(this.storage_key,JSON.stringify(e))}catch(t){}},read_visit_times:function(){var i={last_view:null,visit_start:null,prev_visit_end:null},n=null;try{n=JSON.parse(window.localStorage.getItem(this.storage_key))}catch(t){}return this.cookie_names.forEach(function(t){var e=parseInt(null===n?readCookie(t):n[t],10);Number.isNaN(e)||(i[t]=e),document.cookie=t+"=; expires=Thu, 01 Jan 1970 00:00:00 GMT; path=/"}),i},set_markers:function(){var e=this;$(".newable").each(function(t){(null===e.prev_visit_end||parseInt($(this).data("time"),10)>e.prev_visit_end)&&$("span.newflag",$(this)).addClass("is-new").attr("title","New since your last visit").after('<span class="sr-only">New since your last visit</span>')})}},window.pepys.category={category_id:null,valid_map_category_ids:[],topics:[],start_coords:{britain:{latitude:52.5,longitude:-1.9,zoom:6},london:{latitude:51.508,longitude:-.1091,zoom:14},environs:{latitude:51.508,longitude:-.1791,zoom:11},waterways:{latitude:52,longitude:-1.3,zoom:7},whitehall:{latitude:51.5035,longitude:-.1257,zoom:17},world:{latitude:24.0389,longitude:25.045,zoom:2}},categories_start_coords:{30:"britain",45:"world",180:"whitehall",209:"waterways",214:"environs"},init_map:function(t){this.resize_map();var e=this;$(window).resize(function(){e.resize_map()}),this.valid_map_category_ids=t.valid_map_category_ids,this.topics=t.topics,this.is_valid_map_category_id(t.category_id)&&(this.category_id=t.category_id,this.draw_category_map(this.category_id)),this.init_form()},init_form:function(){$("#category-form button").hide(),$("#category-form select").change(function(){$("#category-form").submit()})},draw_category_map:function(t){this.is_valid_map_category_id(t)&&(this.category_id=t,t=this.start_coords.london,this.category_id.toString()in this.categories_start_coords&&(t=this.start_coords[this.categories_start_coords[this.category_id.toString()]]),pepys.maps.init(t),$.each(this.topics,function(t,e){pepys.maps.add_place(e,{link_to_topic:!0})}))},resize_map:function(){var t=$("#content"),e=$("#map-frame"),i=$(window).height()-t.offset().top-(t.outerHeight(!0)-t.height()),a=(i=i<600?600:i)-(e.offset().top-t.offset().top)-$(".mapkey").height();t.height(i+"px"),e.height(a+"px")},is_valid_map_category_id:function(t){return-1!=$.inArray(t,this.valid_map_category_ids)}},window.pepys.topic={valid_tabs:["map","summary","wikipedia","wheatley","discussion","references","letters"],init:function(){0!==$(".nav-tabs").length&&(this.init_tabs(),this.draw_wealth_chart())},init_tabs:function(){var t=window.location.hash.substring(1);t&&((t.match(/^c\d+$/)||"latest"===t)&&$("#"+t).exists()?($("#tab-discussion a").tab("show"),$("html, body").animate({scrollTop:$("#"+t).offset().top},500)):0<=$.inArray(t,this.valid_tabs)?($("#tab-"+t+" a").tab("show"),$("html, body").animate({scrollTop:0},1)):$("#row-wikipedia").exists()&&$("#wikipedia").exists()&&$("#tab-wikipedia a").tab("show")),$(".nav-tabs a").on("shown.bs.tab",function(t){t=t.target.hash.substring(1);history.pushState?history.pushState(null,null,"#"+t):window.location.hash="#"+t})},draw_map:function(t){pepys.maps.init({latitude:t.latitude,longitude:t.longitude,zoom:t.zoom}),pepys.maps.add_place(t,{show_popup:!0})},chart_tooltip:function(){},draw_wealth_chart:function(){var a,o,n,t,r,e,i,s,l,c,p,u,h,f,m;0!==$(".js-wealth-chart").length&&0!==$(".js-wealth-table").length&&(a=d3.time.format("%Y-%m-%d").parse,o=d3.time.format("%_d %b %Y"),n=function(t){return"£"+d3.format(",")(t)},t="14px",r=[],$(".js-wealth-table tbody tr").each(function(t){var e=$("time",$(this)).attr("datetime"),i=(i=$("td",$(this)).eq(1).text()).replace(",","");i=parseInt(i),r.push({date:a(e),value:i})}),s=(e=$(".js-wealth-chart").width())-(c=50)-5,l=(i=(i=Math.round(e/3))<200?200:i)-(h=15)-25,c=d3.select(".js-wealth-chart").append("svg").attr("class","chart").attr("width",e).attr("height",i).append("g").attr("transform","translate("+c+","+h+")"),p=d3.time.scale().domain([a("1660-01-01"),a("1669-05-31")]).range([0,s],0),u=d3.scale.linear().domain([0,7e3]).range([l,0]),h=d3.svg.axis().scale(u).orient("left").innerTickSize(-s).outerTickSize(0).tickPadding(5).tickFormat(n),c.append("g").attr("class","axis axis-y").call(h),h=d3.svg.axis().scale(p).orient("bottom").tickSize(5,0,0).tickPadding(7).tickFormat(o).tickValues([a("1660-01-01"),a("1662-01-01"),a("1664-01-01"),a("1666-01-01"),a("1668-01-01")]),s<340&&h.tickValues([a("1660-01-01"),a("1663-01-01"),a("1666-01-01")]),c.append("g").attr("class","axis axis-x").attr("transform","translate(0,"+l+")").call(h),c.selectAll(".axis text").attr("font-size",t),h=d3.svg.line().x(function(t){return p(t.date)}).y(function(t){return u(t.value)}),c.append("path").datum(r).attr("class","valueline").attr("fill","none").attr("stroke-linejoin","round").attr("stroke-linecap","round").attr("d",h),(f=c.append("g").attr("class","focus").style("display","none")).append("circle").attr("r",4.5),f.append("text").attr("class","focus-date-b").style("stroke","#f8f8f1").style("stroke-width","5px").style("font-size",t).style("opacity",.8).attr("dx",10).attr("dy","-.3em"),f.append("text").attr("class","focus-date-f").style("font-size",t).attr("dx",10).attr("dy","-.3em"),f.append("text").attr("class","focus-value-b").style("stroke","#f8f8f1").style("stroke-width","5px").style("font-size",t).style("opacity",.8).attr("dx",10).attr("dy","1em"),f.append("text").attr("class","focus-value-f").style("font-size",t).attr("dx",10).attr("dy","1em"),m=d3.bisector(function(t){return t.date}).left,c.append("rect").attr("class","overlay").attr("width",s).attr("height",l).on("mouseover",function(){f.style("display",null)}).on("mouseout",function(){f.style("display","none")}).on("mousemove",function(){var t=p.invert(d3.mouse(this)[0]),e=m(r,t,1),i=r[e-1],e=r[e];i&&e&&(d=t-i.date>e.date-t?e:i,i="translate("+p(d.date)+","+u(d.value)+")",f.select("circle").attr("transform",i),f.select(".focus-date-b").attr("transform",i).text(o(d.date)),f.select(".focus-date-f").attr("transform",i).text(o(d.date)),f.select(".focus-value-b").attr("transform",i).text(n(d.value)),f.select(".focus-value-f").attr("transform",i).text(n(d.value)))}))},draw_references_chart:function(n){var r=[];$.each(pepys.utilities.diary_years_months(),function(o,t){$.each(t,function(t,e){var i=t+" "+o,a=0,t=0;i in n&&(a=n[i],t=Math.round(a/e*100)),r.push({name:i,num_refs:a,percent_refs:t})})});var t=$(".tab-content").width(),e=Math.round(t/3.8),i=0,a=0,o=t-a-0,s=e-i-20,a=d3.select("#chart-references").append("svg").attr("class","chart").attr("width",t).attr("height",e).append("g").attr("transform","translate("+a+","+i+")"),l=d3.scale.ordinal().domain(d3.range(r.length)).rangeBands([0,o],0),c=d3.scale.linear().domain([0,100]).range([s,0]),i=d3.svg.axis().scale(l).orient("bottom").tickValues([0,12,24,36,48,60,72,84,96,108]).tickSize(8,0,0).tickPadding(5).tickFormat(function(t,e){return r[t].name.substring(4,8)});a.append("g").attr("class","axis axis-x").attr("transform","translate(-"+l.rangeBand()/2+","+s+")").call(i),a.selectAll("text").attr("dx",function(t,e){var i=6*l.rangeBand();return i=9<=e?2.5*l.rangeBand():i}).attr("dy",14/3).attr("font-size","14px");o=d3.svg.axis().scale(c).orient("left").tickValues([25,50,75,100]).tickSize(-o,0,0).tickFormat("");a.append("g").attr("class","axis axis-y").call(o);var p=d3.select("body").append("div").attr("class","chart-tooltip").style("font-size","14px").style("padding-left","7px").style("padding-right","7px");a.selectAll(".bar").data(r).enter().append("rect").attr("class","bar").attr("x",function(t,e){return l(e)}).attr("y",function(t){return c(t.percent_refs)}).attr("width",l.rangeBand()).attr("height",function(t,e){return s-c(t.percent_refs)}).on("mouseover",function(t,e){p.html("<strong>"+t.num_refs+"</strong> ("+t.name+")"),d3.select(this).classed("highlight",!0),p.style("visibility","visible")}).on("mousemove",function(){p.style("top",event.pageY-10+"px").style("left",event.pageX+10+"px")}).on("mouseout",function(){d3.select(this).classed("highlight",!1),p.style("visibility","hidden")})}},window.pepys.maps={map:null,init:function(t){var e;this.map=L.map("map-frame").setView(L.latLng(t.latitude,t.longitude),t.zoom),L.tileLayer.provider("MapBox",{id:pepys.controller.config.mapbox_map_id,accessToken:pepys.controller.config.mapbox_access_token}).addTo(this.map),this.map.scrollWheelZoom.disable(),this.init_overlays(),$("#tab-map").exists()&&(e=this,$('a[data-toggle="tab"]').on("shown",function(t){return"#map"==$(t.target).attr("href")&&e.map.invalidateSize(!1),!0}))},init_overlays:function(){var t=L.layerGroup([L.polyline([[51.511046,-.104113],[51.513864,-.104027],[51.513824,-.102482],[51.516494,-.101473],[51.516641,-.095927],[51.517823,-.095347],[51.51781,-.095192],[51.518608,-.094644],[51.517643,-.090101],[51.516862,-.085562],[51.516214,-.081636],[51.515112,-.079147],[51.514024,-.077151],[51.51365,-.076593],[51.509424,-.075821]],{stroke:!0,color:"#333333",opacity:.8})]),e=L.layerGroup([L.polygon([[51.494931,-.12454],[51.495172,-.132179],[51.495813,-.13308],[51.49795,-.13381],[51.498912,-.137758],[51.49803,-.139647],[51.499473,-.14235],[51.500542,-.139904],[51.501984,-.140891],[51.50324,-.13763],[51.504869,-.139604],[51.507941,-.131879],[51.50949,-.133424],[51.509864,-.133038],[51.510746,-.13381],[51.512722,-.130806],[51.516488,-.133166],[51.516675,-.130849],[51.517236,-.125828],[51.519505,-.121279],[51.521588,-.114112],[51.522229,-.111065],[51.52311,-.110335],[51.523377,-.107288],[51.523217,-.10673],[51.523751,-.106645],[51.524392,-.103126],[51.524232,-.102696],[51.526795,-.091453],[51.52303,-.090208],[51.523324,-.087161],[51.523591,-.081453],[51.524045,-.079265],[51.529038,-.078492],[51.528931,-.077419],[51.525353,-.076432],[51.523805,-.076132],[51.520734,-.073729],[51.517049,-.071154],[51.523217,-.044374],[51.521722,-.043087],[51.515313,-.069523],[51.510772,-.066776],[51.512375,-.053043],[51.510826,-.051842],[51.512642,-.037766],[51.50949,-.028667],[51.508101,-.027294],[51.506499,-.028667],[51.508796,-.034676],[51.509544,-.038023],[51.509651,-.04283],[51.509223,-.046091],[51.508101,-.049009],[51.506819,-.051327],[51.506125,-.052271],[51.50324,-.048065],[51.501477,-.051584],[51.499981,-.056734],[51.499286,-.062828],[51.498565,-.067849],[51.499526,-.071239],[51.497469,-.078664],[51.497736,-.081968],[51.499179,-.081882],[51.501156,-.082655],[51.502465,-.083385],[51.503881,-.084071],[51.502118,-.085144],[51.502679,-.091066],[51.50121,-.092268],[51.494611,-.083942],[51.493756,-.085444],[51.499126,-.09407],[51.498404,-.095787],[51.49966,-.097718],[51.502759,-.093598],[51.503934,-.095959],[51.50551,-.096259],[51.507006,-.095873],[51.507113,-.099478],[51.505163,-.101109],[51.502225,-.100508],[51.500568,-.101066],[51.50121,-.102096],[51.503667,-.102053],[51.505297,-.102267],[51.507861,-.103855],[51.508021,-.106859],[51.507621,-.11085],[51.507006,-.113597],[51.505323,-.112438],[51.504068,-.110722],[51.502305,-.108962],[51.501156,-.107889],[51.500916,-.109563],[51.503534,-.111752],[51.504869,-.113811],[51.506632,-.114799],[51.505965,-.116472],[51.504282,-.117803],[51.502625,-.118446],[51.501584,-.115786],[51.500889,-.114884],[51.499767,-.112782],[51.499339,-.113597],[51.499927,-.115614],[51.49974,-.116773],[51.499259,-.118232],[51.499794,-.118361],[51.500488,-.115571],[51.502011,-.118833],[51.499607,-.119562],[51.496641,-.120292],[51.495332,-.120034],[51.494664,-.117202],[51.491725,-.120292],[51.489053,-.121837],[51.486514,-.12351],[51.487102,-.125527],[51.490148,-.123124],[51.492633,-.121751],[51.494664,-.12115],[51.494931,-.12454]],{stroke:!1,fill:!0,fillColor:"#666666",fillOpacity:.4})]),i=L.layerGroup([L.polygon([[51.514204,-.109756],[51.514885,-.109928],[51.515353,-.109756],[51.515807,-.109456],[51.515753,-.108511],[51.516154,-.108318],[51.516114,-.107481],[51.516394,-.10731],[51.517022,-.106516],[51.516595,-.106452],[51.516955,-.105164],[51.516955,-.104885],[51.517329,-.104842],[51.517556,-.104477],[51.51781,-.103619],[51.51773,-.102847],[51.517369,-.102503],[51.517189,-.102476],[51.517085,-.101339],[51.516822,-.100003],[51.516812,-.098716],[51.516621,-.095932],[51.517803,-.095283],[51.51781,-.095192],[51.518608,-.094644],[51.517636,-.09023],[51.517222,-.089757],[51.517102,-.089382],[51.516862,-.088341],[51.516528,-.088041],[51.516007,-.088148],[51.515927,-.087891],[51.51568,-.085959],[51.515613,-.085745],[51.515486,-.085831],[51.515313,-.085369],[51.515046,-.084983],[51.514438,-.084243],[51.513477,-.084254],[51.513437,-.084007],[51.513016,-.084189],[51.512889,-.083545],[51.513096,-.083385],[51.512989,-.082451],[51.512789,-.082515],[51.512729,-.082194],[51.512602,-.082194],[51.512261,-.081207],[51.512054,-.080616],[51.511494,-.08037],[51.510959,-.080509],[51.510011,-.080745],[51.50953,-.079629],[51.50927,-.079823],[51.509043,-.079147],[51.508863,-.078771],[51.508302,-.079179],[51.507841,-.079361],[51.508328,-.081389],[51.508542,-.083621],[51.508909,-.087011],[51.509023,-.087837],[51.508983,-.090272],[51.509197,-.09201],[51.509677,-.093534],[51.510265,-.095787],[51.510692,-.098534],[51.510826,-.100272],[51.510853,-.103126],[51.510866,-.106409],[51.510893,-.109477],[51.513911,-.109949],[51.513964,-.109627],[51.514204,-.109756]],{stroke:!1,fill:!0,fillColor:"#cc6666",fillOpacity:.3})]);L.control.layers({},{"City of London wall":t,"Built-up London (approx.)":e,"Great Fire damage":i}).addTo(this.map)},add_place:function(t,e){e=e||{};var i,a=pepys.controller.config.static_prefix;(i="polygon"in t?L.polygon(this.string_to_coords(t.polygon),{color:"#a02b2d",opacity:.75,fill:"#a02b2d",fillOpacity:.4,weight:2}):"path"in t?L.polyline(this.string_to_coords(t.path),{color:"#a02b2d",opacity:.5}):(i={iconUrl:a+"img/marker-icon.png",iconRetinaUrl:a+"img/marker-icon-2x.png",iconAnchor:[12.5,41],iconSize:[25,41],popupAnchor:[0,-35],shadowUrl:a+"img/marker-shadow.png",shadowAnchor:[12.5,41]},"pepys_home"in t&&!0===t.pepys_home&&(i.iconUrl=a+"img/marker-icon-b.png",i.iconRetinaUrl=a+"img/marker-icon-b-2x.png"),o=L.icon(i),L.marker(L.latLng(t.latitude,t.longitude),{icon:o}))).addTo(this.map);var o="<strong>"+t.title+"</strong>";"tooltip_text"in t&&""!==t.tooltip_text&&(o+="<br />"+t.tooltip_text),"link_to_topic"in e&&!0===e.link_to_topic&&(o+='<br /><a href="'+t.url+'" title="See more about this topic">In the Encyclopedia</a>'),i.bindPopup(o,{minWidth:150}),"show_popup"in e&&!0===e.show_popup&&i.openPopup()},string_to_coords:function(t){var i=[];return $.each(t.split(";"),function(t,e){ll=e.split(","),i.push([parseFloat(ll[0]),parseFloat(ll[1])])}),i}};var getUrlParameter=function(t){for(var e,i=window.location.search.substring(1).split("&"),a=0;a<i.length;a++)if((e=i[a].split("="))[0]===t)return void 0===e[1]||decodeURIComponent(e[1])};!function(){var o;window.readCookie=function(t,e,i,a){if(o)return o[t];for(e=document.cookie.split("; "),o={},a=e.length-1;0<=a;a--)i=e[a].split("="),o[i[0]]=i[1];return o[t]}}();
\ No newline at end of file
@@ -1,10 +1,16 @@
 import calendar
+from hashlib import md5
 
 from django import template
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Q
+from django.template.loader import render_to_string
 from django.utils.html import strip_tags
+from django.utils.safestring import mark_safe
 
 from pepysdiary.annotations.models import Annotation
+from pepysdiary.common.caching import get_cache_version
 from pepysdiary.common.utilities import smart_truncate
 from pepysdiary.diary.models import Entry
 from pepysdiary.encyclopedia.models import Topic
@@ -15,43 +21,151 @@ from pepysdiary.news.models import Post
 register = template.Library()
 
 
-def _commented_objects_list(context, title, quantity, model_class):
+# Used for the cache keys of rendered lists of comments.
+# The version is changed by annotations/signals.py whenever an Annotation
+# is saved or deleted.
+COMMENTED_LISTS_CACHE_NAME = "list-tags:commented-lists"
+
+# How long the rendered lists are kept, at most. The version changes often,
+# so the keys of old versions mustn't stay in the cache forever.
+COMMENTED_LISTS_CACHE_TIMEOUT = 60 * 60
+
+# The lists of recently-commented-on things shown by latest_commented_lists.
+# Each is (title, model class, quantity).
+COMMENTED_LISTS = (
+    ("Most recently annotated Diary Entries", Entry, 10),
+    ("Most recently annotated Encyclopedia Topics", Topic, 5),
+    ("Most recently annotated Letters", Letter, 5),
+    ("Most recently commented-on In-Depth Articles", Article, 5),
+    ("Most recently commented-on Site News Posts", Post, 5),
+)
+
+
+def _latest_comments(models_quantities):
+    """
+    Passed a list of (model_class, quantity) tuples, it returns a list, in
+    the same order, of lists of (obj, comment) tuples.
+
+    Each list has the `quantity` most recently commented-on objects of
+    that model, each with the latest visible Annotation on it.
+
+    Makes one query per model to get the objects, and then one query to get
+    all of the Annotations, using DISTINCT ON to get only the latest per
+    object.
+    """
+    objects_lists = []
+    comment_filter = Q()
+    for model_class, quantity in models_quantities:
+        objects = list(
+            model_class.objects.filter(last_comment_time__isnull=False).order_by(
+                "-last_comment_time"
+            )[:quantity]
+        )
+        if objects:
+            ct = ContentType.objects.get_for_model(model_class)
+            comment_filter |= Q(
+                content_type_id=ct.id, object_pk__in=[str(obj.pk) for obj in objects]
+            )
+        objects_lists.append((model_class, objects))
+
+    latest_comments = {}
+    if comment_filter:
+        comments = (
+            Annotation.visible_objects.filter(comment_filter)
+            .select_related(None)
+            .order_by("content_type_id", "object_pk", "-submit_date")
+            .distinct("content_type_id", "object_pk")
+        )
+        latest_comments = {(c.content_type_id, c.object_pk): c for c in comments}
+
+    results = []
+    for model_class, objects in objects_lists:
+        ct = ContentType.objects.get_for_model(model_class)
+        results.append(
+            [
+                (obj, latest_comments[(ct.id, str(obj.pk))])
+                for obj in objects
+                if (ct.id, str(obj.pk)) in latest_comments
+            ]
+        )
+    return results
+
+
+def _commented_objects_context(context, title, objects_comments):
     """
-    Passed a queryset of Entries, Topics, Articles, etc, it returns the context
-    data for use with the common/inc/commented_objects_list.html template.
+    Passed a list of (obj, comment) tuples, it returns the context data for
+    use with the common/inc/commented_objects_list.html template.
     """
+    if not objects_comments:
+        return None
+
     # Defaults, just in case we don't have these set in context:
     date_format = context.get("date_format_mid_strftime", "%d %b %Y")
     time_format = context.get("time_format_strftime", "%I:%M%p")
 
-    queryset = model_class.objects.filter(last_comment_time__isnull=False).order_by(
-        "-last_comment_time"
-    )[:quantity]
-    if queryset:
-        template_context = {"comments": [], "title": title}
-        ct = ContentType.objects.get_for_model(queryset[0])
-        for obj in queryset:
-            comment = Annotation.visible_objects.filter(
-                object_pk=obj.pk, content_type_id=ct.id
-            ).latest("submit_date")
-
-            template_context["comments"].append(
-                {
-                    "data_time": calendar.timegm(comment.submit_date.timetuple()),
-                    "date": comment.submit_date.strftime(date_format).lstrip("0"),
-                    "iso_datetime": comment.submit_date.strftime("%Y-%m-%dT%H:%M:%S%z"),
-                    "obj_title": obj.title,
-                    "time": comment.submit_date.strftime(time_format)
-                    .lstrip("0")
-                    .lower(),
-                    "text": strip_tags(smart_truncate(comment.comment, 70)),
-                    "url": comment.get_absolute_url(),
-                    "user_name": strip_tags(comment.get_user_name()),
-                }
+    template_context = {"comments": [], "title": title}
+    for obj, comment in objects_comments:
+        template_context["comments"].append(
+            {
+                "data_time": calendar.timegm(comment.submit_date.timetuple()),
+                "date": comment.submit_date.strftime(date_format).lstrip("0"),
+                "iso_datetime": comment.submit_date.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "obj_title": obj.title,
+                "time": comment.submit_date.strftime(time_format).lstrip("0").lower(),
+                "text": strip_tags(smart_truncate(comment.comment, 70)),
+                "url": comment.get_absolute_url(),
+                "user_name": strip_tags(comment.get_user_name()),
+            }
+        )
+    return template_context
+
+
+def _commented_objects_list(context, title, quantity, model_class):
+    """
+    Passed a model class, like Entry, Topic, Article, etc, it returns the
+    context data for use with the common/inc/commented_objects_list.html
+    template.
+    """
+    objects_comments = _latest_comments([(model_class, quantity)])[0]
+    return _commented_objects_context(context, title, objects_comments)
+
+
+@register.simple_tag(takes_context=True)
+def latest_commented_lists(context):
+    """
+    Displays all of the lists in COMMENTED_LISTS, of things ordered by
+    most recently-commented-on.
+
+    The rendered HTML is cached until an Annotation is next saved or deleted,
+    or for an hour at most.
+    """
+    date_format = context.get("date_format_mid_strftime", "")
+    time_format = context.get("time_format_strftime", "")
+    cache_key = "{}:{}:{}".format(
+        COMMENTED_LISTS_CACHE_NAME,
+        get_cache_version(COMMENTED_LISTS_CACHE_NAME),
+        md5(f"{date_format}|{time_format}".encode(), usedforsecurity=False).hexdigest(),
+    )
+
+    html = cache.get(cache_key)
+    if html is None:
+        objects_comments_lists = _latest_comments(
+            [(model_class, quantity) for _, model_class, quantity in COMMENTED_LISTS]
+        )
+        html = ""
+        for (title, _, _), objects_comments in zip(
+            COMMENTED_LISTS, objects_comments_lists, strict=True
+        ):
+            template_context = _commented_objects_context(
+                context, title, objects_comments
             )
-        return template_context
-    else:
-        return None
+            if template_context is not None:
+                html += render_to_string(
+                    "common/inc/commented_objects_list.html", template_context
+                )
+        cache.set(cache_key, html, timeout=COMMENTED_LISTS_CACHE_TIMEOUT)
+
+    return mark_safe(html)
 
 
 @register.inclusion_tag("common/inc/commented_objects_list.html", takes_context=True)
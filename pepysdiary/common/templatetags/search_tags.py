@@ -1,11 +1,18 @@
+from hashlib import md5
+
 from django import template
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
+from pepysdiary.common.caching import LRUCache
+from pepysdiary.common.search import search_index
 from pepysdiary.common.utilities import hilite_words, trim_hilites
 
 register = template.Library()
 
+# Summaries made in Python, keyed by the text and the search string.
+_summaries = LRUCache(maxsize=1000)
+
 
 @register.simple_tag()
 def search_summary(obj, search_string):
@@ -15,27 +22,28 @@ def search_summary(obj, search_string):
     It's a series of bits of the object's text fields that contain the
     searched-for string, with the search term highlighted.
 
+    If the object has a `search_headline` attribute, made in the database by
+    SearchView (see SearchIndex.make_headline()), we use that. Otherwise we
+    make it from the object's search_summary_fields here.
+
     obj - One of Annotation, Article, Entry, Letter, Post, Topic
     search_string - The string that was searched for.
     """
-    obj_name = obj.__class__.__name__
-
-    contents = []
-
-    if obj_name == "Entry":
-        contents = [obj.text, obj.footnotes]
-    elif obj_name == "Topic":
-        contents = [obj.title, obj.summary_html, obj.wheatley_html, obj.wikipedia_html]
-    elif obj_name == "Annotation":
-        contents = [obj.comment]
-    elif obj_name == "Letter":
-        contents = [obj.title, obj.text, obj.footnotes]
-    else:
-        # Article, Post
-        contents = [obj.title, obj.intro_html, obj.text_html]
+    headline = getattr(obj, "search_headline", None)
+    if headline is not None:
+        return search_index.headline_to_html(headline)
+
+    content = " ".join(getattr(obj, name) for name in obj.search_summary_fields)
+    # Not every model has a date_modified, so key on the text itself:
+    key = (md5(content.encode(), usedforsecurity=False).hexdigest(), search_string)
+    summary = _summaries.get(key)
+    if summary is None:
+        summary = _make_search_summary(content, search_string)
+        _summaries.set(key, summary)
+    return summary
 
-    content = " ".join(contents)
 
+def _make_search_summary(content, search_string):
     content = hilite_words(content, search_string)
 
     hilites = trim_hilites(content, allow_empty=False, max_hilites_to_show=10)
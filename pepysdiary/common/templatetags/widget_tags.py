@@ -2,6 +2,7 @@ from django import template
 from django.urls import reverse
 from django.utils.html import mark_safe
 
+from pepysdiary.common.caching import cached_fragment
 from pepysdiary.diary.models import Entry
 from pepysdiary.encyclopedia import topic_lookups
 from pepysdiary.encyclopedia.models import Topic
@@ -11,6 +12,7 @@ from pepysdiary.news.models import Post
 register = template.Library()
 
 # Things that appear in the sidebar or footer on several pages.
+# Those that need the database are cached until the models they use change.
 
 
 @register.inclusion_tag("common/widgets/credit.html")
@@ -96,7 +98,12 @@ def rss_feeds(*args):
     return {"feeds": feeds}
 
 
-@register.inclusion_tag("common/widgets/recent_list.html", takes_context=True)
+@register.simple_tag(takes_context=True)
+@cached_fragment(
+    Post,
+    template_name="common/widgets/recent_list.html",
+    context_vars=("date_format_long",),
+)
 def latest_posts(context, quantity=5):
     """
     Displays links to the most recent Site News Posts.
@@ -111,7 +118,12 @@ def latest_posts(context, quantity=5):
     }
 
 
-@register.inclusion_tag("common/widgets/recent_list.html", takes_context=True)
+@register.simple_tag(takes_context=True)
+@cached_fragment(
+    Article,
+    template_name="common/widgets/recent_list.html",
+    context_vars=("date_format_long",),
+)
 def latest_articles(context, quantity=5):
     """
     Displays links to the most recent In-Depth Articles.
@@ -127,7 +139,12 @@ def latest_articles(context, quantity=5):
     }
 
 
-@register.inclusion_tag("common/widgets/recent_list.html", takes_context=True)
+@register.simple_tag(takes_context=True)
+@cached_fragment(
+    Topic,
+    template_name="common/widgets/recent_list.html",
+    context_vars=("date_format_long",),
+)
 def latest_topics(context, quantity=5):
     """Displays links to the most recent Encyclopedia Topics"""
     topic_list = Topic.objects.order_by("-date_created").only("title", "date_created")[
@@ -140,7 +157,12 @@ def latest_topics(context, quantity=5):
     }
 
 
-@register.inclusion_tag("common/widgets/all_articles.html", takes_context=True)
+@register.simple_tag(takes_context=True)
+@cached_fragment(
+    Article,
+    template_name="common/widgets/all_articles.html",
+    context_vars=("date_format_long",),
+)
 def all_articles(context, exclude_id=None):
     """
     Displays links to all the In-Depth Articles.
@@ -157,6 +179,7 @@ def all_articles(context, exclude_id=None):
 
 
 @register.simple_tag
+@cached_fragment(Entry)
 def summary_year_navigation(current_year):
     """
     The list of years for the Diary Summary sidebar navigation.
@@ -192,7 +215,7 @@ def summary_year_navigation(current_year):
     html += (
         f'<a class="list-group-item" href="{href}">After the diary (in Articles)</a>'
     )
-    return mark_safe(f'<div class="list-group">{html}</div>')
+    return f'<div class="list-group">{html}</div>'
 
 
 @register.inclusion_tag("common/widgets/family_tree_link.html")
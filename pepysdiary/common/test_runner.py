@@ -1,4 +1,16 @@
 from django.test.runner import DiscoverRunner
+from django.test.utils import iter_test_cases
+
+from pepysdiary.common.site_settings import site_settings
+
+
+def forget_site_settings():
+    """
+    The Site and Config are kept in memory, but the database changes made
+    by each test are rolled back without sending any signals. So each test
+    must forget them, in case it changed them.
+    """
+    site_settings.invalidate()
 
 
 class PepysDiaryTestRunner(DiscoverRunner):
@@ -13,3 +25,9 @@ class PepysDiaryTestRunner(DiscoverRunner):
         # Run tests in random order.
         if self.shuffle is False:
             self.shuffle = None  # means “autogenerate a seed”
+
+    def build_suite(self, *args, **kwargs):
+        suite = super().build_suite(*args, **kwargs)
+        for test in iter_test_cases(suite):
+            test.addCleanup(forget_site_settings)
+        return suite
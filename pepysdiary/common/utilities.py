@@ -2,9 +2,10 @@ import re
 from datetime import UTC, datetime
 
 from django.conf import settings
-from django.contrib.sites.models import Site
 from django.utils.html import strip_tags
 
+from pepysdiary.common.site_settings import site_settings
+
 
 def make_date(d):
     "For convenience."
@@ -430,6 +431,6 @@ def make_url_absolute(url):
     else:
         protocol = "https" if settings.SECURE_SSL_REDIRECT else "http"
 
-        domain = Site.objects.get_current().domain
+        domain = site_settings.site.domain
 
         return f"{protocol}://{domain}{url}"
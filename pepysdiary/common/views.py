@@ -1,12 +1,32 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.contrib.sitemaps import views as sitemaps_views
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger
 from django.db.models import F
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.urls import reverse
 from django.views.decorators.cache import cache_page
-from django.views.generic import ListView, RedirectView
+from django.views.generic import ListView, RedirectView, View
 from django.views.generic.base import TemplateView
 
 from pepysdiary.annotations.models import Annotation
-from pepysdiary.common.paginator import DiggPaginator
+from pepysdiary.common.paginator import (
+    CachedCount,
+    CappedCount,
+    CursorPaginator,
+    DiggPaginator,
+    InvalidPage,
+)
+from pepysdiary.common.search import search_index
+from pepysdiary.common.sitemaps import (
+    SITEMAPS,
+    get_prerendered_cache_key,
+    render_sitemap,
+)
 from pepysdiary.diary.models import Entry
 from pepysdiary.encyclopedia.models import Topic
 from pepysdiary.indepth.models import Article
@@ -30,13 +50,26 @@ class CacheMixin:
 
 
 class PaginatedListView(ListView):
-    """Replacement for ListView that uses our DiggPaginator."""
+    """Replacement for ListView that uses our DiggPaginator.
+
+    If cursor_ordering is set, and there's a 'cursor' GET argument, it uses
+    a CursorPaginator instead, which is quicker for deep pages (but has no
+    page numbers). An empty cursor gets the first page.
+
+    Override get_count_strategy() to change how the DiggPaginator counts
+    the objects (see ExPaginator).
+    """
 
     paginator_class = DiggPaginator
     paginate_by = 30
     page_kwarg = "page"
     allow_empty = False
 
+    # The ordering for the CursorPaginator, like ("-submit_date", "-pk").
+    # The fields, together, must be unique.
+    cursor_ordering = None
+    cursor_kwarg = "cursor"
+
     # See pepysdiary.common.paginator for what these mean:
     paginator_body = 5
     paginator_margin = 2
@@ -61,9 +94,29 @@ class PaginatedListView(ListView):
             margin=self.paginator_margin,
             padding=self.paginator_padding,
             tail=self.paginator_tail,
+            count_strategy=self.get_count_strategy(),
             **kwargs,
         )
 
+    def get_count_strategy(self):
+        "None means the paginator's default, an exact count."
+        return None
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_cursor_ordering()
+        if ordering is None or self.cursor_kwarg not in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size, ordering)
+        try:
+            page = paginator.page(self.request.GET[self.cursor_kwarg])
+        except InvalidPage as err:
+            raise Http404(str(err)) from err
+        return (paginator, page, page.object_list, page.has_other_pages())
+
 
 class HomeView(TemplateView):
     """Front page of the whole site."""
@@ -76,9 +129,7 @@ class HomeView(TemplateView):
         # Show the most recent "published" entries:
         # If we change the number of Entries, the template will need tweaking
         # too...
-        context["entry_list"] = Entry.objects.filter(
-            diary_date__lte=Entry.objects.most_recent_entry_date()
-        ).order_by("-diary_date")[:8]
+        context["entry_list"] = Entry.objects.published().order_by("-diary_date")[:8]
 
         context["tooltip_references"] = Entry.objects.get_brief_references(
             objects=context["entry_list"]
@@ -104,7 +155,7 @@ class SearchView(PaginatedListView):
         * Add a mention of it further down search.html ("Searching for
           [string] in [kind]").
         * Maybe customise its search result display in search.html
-        * Add it to the search_tags.search_summary() template tag.
+        * Give its model search_summary_fields, used for the excerpts.
 
     GET arguments allowed:
         * 'q': The search term(s)
@@ -131,6 +182,13 @@ class SearchView(PaginatedListView):
     date_order_field = None
     az_order_field = "title"
 
+    # If settings.PEPYS_SEARCH_COUNT is "capped", count no more than this:
+    count_cap = 1000
+
+    # If settings.PEPYS_SEARCH_COUNT is "cached", cache counts for this long
+    # at most, in seconds:
+    count_cache_timeout = 60 * 60
+
     def dispatch(self, request, *args, **kwargs):
         """Before the parent's dispatch() method, set self.model based on
         supplied GET args.
@@ -148,7 +206,13 @@ class SearchView(PaginatedListView):
             #     queryset = self.queryset.filter(comment__search=query_string)
             # else:
             query = SearchQuery(query_string)
-            queryset = self.queryset.filter(search_document=query)
+            # Make the excerpts shown in the results in the database, and
+            # don't fetch the large text fields they're made from.
+            queryset = (
+                self.queryset.filter(search_document=query)
+                .annotate(search_headline=search_index.make_headline(self.model, query))
+                .defer(*search_index.headline_deferred_fields(self.model))
+            )
 
             ordering = self.get_ordering()
 
@@ -172,6 +236,28 @@ class SearchView(PaginatedListView):
 
         return context
 
+    def get_count_strategy(self):
+        """
+        Counting the results of a full-text search is slow, so, depending on
+        settings.PEPYS_SEARCH_COUNT, we either cache the count until any
+        searchable thing changes (or for count_cache_timeout seconds), or
+        count no more than count_cap results.
+        """
+        method = settings.PEPYS_SEARCH_COUNT
+        if method == "capped":
+            return CappedCount(cap=self.count_cap)
+        elif method == "cached":
+            # The ordering doesn't change the count, so isn't in the key.
+            search_hash = hashlib.md5(
+                self.get_search_string().encode(), usedforsecurity=False
+            ).hexdigest()
+            return CachedCount(
+                f"search:{self.model._meta.label_lower}:{search_hash}",
+                version_name=search_index.cache_name,
+                timeout=self.count_cache_timeout,
+            )
+        return None
+
     def get_search_string(self):
         q = self.request.GET.get("q", "").strip()
         # Null character causes an error when used in a database query
@@ -182,6 +268,16 @@ class SearchView(PaginatedListView):
     def get_order_string(self):
         return self.request.GET.get("o", "").strip()
 
+    def get_cursor_ordering(self):
+        """
+        We can't use a CursorPaginator when ordering by relevancy, and
+        Annotations' comments are too long to put in a cursor.
+        """
+        ordering = self.get_ordering()
+        if ordering in ("rank", "-rank", "comment"):
+            return None
+        return (ordering, "-pk" if ordering.startswith("-") else "pk")
+
     def get_ordering(self):
         """Get the order for the queryset, based on the 'o' GET arg.
         Assumes we've set self.model already, as orders are model-specific.
@@ -210,7 +306,7 @@ class SearchView(PaginatedListView):
             self.date_order_field = "date_published"
         elif kind == "c":
             self.model = Annotation
-            self.queryset = Annotation.visible_objects
+            self.queryset = Annotation.visible_objects.prefetch_content_objects()
             self.date_order_field = "submit_date"
             # We don't have a 'title' field on Annotations, so:
             self.az_order_field = "comment"
@@ -234,6 +330,57 @@ class SearchView(PaginatedListView):
             self.date_order_field = "diary_date"
 
 
+class SitemapView(View):
+    """
+    One section of the sitemap, like /sitemap-entries.xml?p=2
+
+    If the prerender_sitemaps command has put this page in the cache, we
+    return that. Otherwise LeanSitemaps are streamed, and other sitemaps
+    are handled by Django's sitemap view, and cached for cache_timeout
+    seconds.
+    """
+
+    sitemaps = SITEMAPS
+    content_type = "application/xml"
+    cache_timeout = 86400
+
+    def get(self, request, section):
+        response = self.get_sitemap_response(request, section)
+        # As Django's sitemap views do:
+        response["X-Robots-Tag"] = "noindex, noodp, noarchive"
+        return response
+
+    def get_sitemap_response(self, request, section):
+        if section not in self.sitemaps:
+            msg = f"No sitemap available for section: {section!r}"
+            raise Http404(msg)
+        page = request.GET.get("p", "1")
+
+        content = cache.get(get_prerendered_cache_key(section, page))
+        if content is not None:
+            return HttpResponse(content, content_type=self.content_type)
+
+        sitemap = self.sitemaps[section]
+        if not hasattr(sitemap, "iter_urls"):
+            # Before instantiating it, which might query the database.
+            view = cache_page(self.cache_timeout)(sitemaps_views.sitemap)
+            return view(request, self.sitemaps, section=section)
+        if callable(sitemap):
+            sitemap = sitemap()
+
+        try:
+            chunks = render_sitemap(
+                sitemap,
+                page=page,
+                site=get_current_site(request),
+                protocol=request.scheme,
+            )
+        except (EmptyPage, PageNotAnInteger) as err:
+            msg = f"No page {page!r}"
+            raise Http404(msg) from err
+        return StreamingHttpResponse(chunks, content_type=self.content_type)
+
+
 class RecentView(CacheMixin, TemplateView):
     """Recent Activity page."""
 
@@ -66,6 +66,9 @@ MIDDLEWARE = [
     # * LocaleMiddleware (adds Accept-Language)
     # Should go near top of the list:
     "django.middleware.security.SecurityMiddleware",
+    # Only used if PEPYS_VISIT_TIMES is "cookies".
+    # Before UpdateCacheMiddleware, so its cookies aren't cached:
+    "pepysdiary.common.middleware.VisitTimeMiddleware",
     # Must be before those that modify the `Vary` header:
     "django.middleware.cache.UpdateCacheMiddleware",
     # Before any middleware that may change or use the response body:
@@ -82,7 +85,6 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.contrib.redirects.middleware.RedirectFallbackMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "pepysdiary.common.middleware.VisitTimeMiddleware",
     # Must be before those that modify the `Vary` header:
     "django.middleware.cache.FetchFromCacheMiddleware",
 ]
@@ -106,6 +108,7 @@ TEMPLATES = [
                 "pepysdiary.common.context_processors.config",
                 "pepysdiary.common.context_processors.date_formats",
                 "pepysdiary.common.context_processors.url_name",
+                "pepysdiary.common.context_processors.visit_times",
             ]
         },
     }
@@ -414,6 +417,27 @@ PEOPLE_CATEGORY_ID = 2
 # treatment, so we store its ID here:
 PEPYS_TOPIC_ID = 29
 
+# Each searchable model's search_document is kept up to date by database
+# triggers, added in migrations. If those triggers aren't in the database,
+# set this to False and search_document will be updated from Python instead,
+# whenever objects are saved. See common/search.py.
+PEPYS_SEARCH_INDEX_IN_DATABASE = (
+    os.getenv("PEPYS_SEARCH_INDEX_IN_DATABASE", default="True") == "True"
+)
+
+# How SearchView counts the results for its pagination. One of:
+# "exact" - COUNT them all on every request.
+# "cached" - Count them all, and cache that, until searchable things change.
+# "capped" - Count no more than 1,000 of them, and say "More than 1,000".
+PEPYS_SEARCH_COUNT = os.getenv("PEPYS_SEARCH_COUNT", default="cached")
+
+# How we remember when a visitor's previous visit ended, to mark newer
+# comments as "new". One of:
+# "client" - The JavaScript keeps the times in localStorage. Nothing is sent
+#            to or from the server, so pages can be cached for everyone.
+# "cookies" - VisitTimeMiddleware sets cookies on every response.
+PEPYS_VISIT_TIMES = os.getenv("PEPYS_VISIT_TIMES", default="client")
+
 # When did each 'reading' of the diary begin?
 # Used to mark which annotations belong to which reading.
 PEPYS_READING_DATETIMES = [
@@ -1,14 +1,13 @@
 from django.conf import settings
 from django.contrib import admin
 from django.contrib.flatpages import views as flatpages_views
-from django.contrib.flatpages.sitemaps import FlatPageSitemap
 from django.contrib.sitemaps import views as sitemaps_views
 from django.templatetags.static import static as static_tag
 from django.urls import include, path, re_path, reverse_lazy
 from django.views.decorators.cache import cache_page
 from django.views.generic import RedirectView, TemplateView
 
-from pepysdiary.common import sitemaps
+from pepysdiary.common.sitemaps import SITEMAPS
 from pepysdiary.common.views import (
     ArticleRedirectView,
     DiaryEntryRedirectView,
@@ -17,21 +16,10 @@ from pepysdiary.common.views import (
     EncyclopediaTopicRedirectView,
     LetterRedirectView,
     PostRedirectView,
+    SitemapView,
     SummaryYearRedirectView,
 )
 
-sitemaps = {
-    "main": sitemaps.StaticSitemap,
-    "entries": sitemaps.EntrySitemap,
-    "letters": sitemaps.LetterSitemap,
-    "topics": sitemaps.TopicSitemap,
-    "articles": sitemaps.ArticleSitemap,
-    "posts": sitemaps.PostSitemap,
-    "archives": sitemaps.ArchiveSitemap,
-    "flatpages": FlatPageSitemap,
-}
-
-
 # FLATPAGES
 # Comes before other URLs so that they take precedence.
 # e.g. so the /encyclopedia/familytree/ flatpage URL isn't matched
@@ -112,15 +100,10 @@ urlpatterns += [
     path(
         "sitemap.xml",
         cache_page(86400)(sitemaps_views.index),
-        {"sitemaps": sitemaps, "sitemap_url_name": "sitemaps"},
+        {"sitemaps": SITEMAPS, "sitemap_url_name": "sitemaps"},
         name="sitemap",
     ),
-    path(
-        "sitemap-<path:section>.xml",
-        cache_page(86400)(sitemaps_views.sitemap),
-        {"sitemaps": sitemaps},
-        name="sitemaps",
-    ),
+    path("sitemap-<path:section>.xml", SitemapView.as_view(), name="sitemaps"),
     path(
         "robots.txt",
         TemplateView.as_view(
@@ -6,4 +6,5 @@ class DiaryConfig(AppConfig):
     default_auto_field = "django.db.models.AutoField"
 
     def ready(self):
-        from pepysdiary.common import signals  # noqa: F401
+        from . import feeds as diary_feeds  # noqa: F401
+        from . import signals as diary_signals  # noqa: F401
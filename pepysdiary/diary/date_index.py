@@ -0,0 +1,84 @@
+from bisect import bisect_left, bisect_right
+
+from pepysdiary.common.caching import VersionedLocalCache
+
+
+class EntryDateIndex:
+    """
+    A sorted list of every Entry's diary_date, kept in memory, so that we
+    can find whether an Entry exists for a date, and which Entries come
+    before and after it, without querying the database.
+
+    There are only a few thousand Entries, and they rarely change. The
+    index is loaded the first time it's needed, and reloaded after any
+    Entry's date or title changes, or an Entry is deleted (see
+    diary/signals.py).
+
+    Use the shared instance:
+
+        from pepysdiary.diary.date_index import entry_date_index
+        entry_date_index.previous_entry(date)
+    """
+
+    def __init__(self):
+        self._cache = VersionedLocalCache("diary:entry-date-index", self._load)
+
+    def exists(self, date):
+        "Is there an Entry for this date?"
+        dates, rows = self._cache.get()
+        i = bisect_left(dates, date)
+        return i < len(dates) and dates[i] == date
+
+    def previous_entry(self, date):
+        """
+        Returns the Entry before this date, or None.
+        It will be a partial Entry object: only pk, diary_date and title.
+        """
+        dates, rows = self._cache.get()
+        i = bisect_left(dates, date)
+        return self._make_entry(rows[i - 1]) if i > 0 else None
+
+    def next_entry(self, date):
+        """
+        Returns the Entry after this date, or None.
+        It will be a partial Entry object: only pk, diary_date and title.
+        """
+        dates, rows = self._cache.get()
+        i = bisect_right(dates, date)
+        return self._make_entry(rows[i]) if i < len(dates) else None
+
+    def entry_changed(self, entry):
+        """
+        Call after an Entry has been saved. Only invalidates the index if
+        the Entry is new or its date or title has changed, because Entries
+        are also saved every time they're commented on.
+        """
+        index = self._cache.peek()
+        if index is not None:
+            dates, rows = index
+            i = bisect_left(dates, entry.diary_date)
+            if i < len(dates) and rows[i] == (entry.diary_date, entry.pk, entry.title):
+                return
+        self.invalidate()
+
+    def invalidate(self):
+        self._cache.invalidate()
+
+    def _load(self):
+        from .models import Entry
+
+        rows = list(
+            Entry.objects.order_by("diary_date").values_list(
+                "diary_date", "pk", "title"
+            )
+        )
+        return ([row[0] for row in rows], rows)
+
+    def _make_entry(self, row):
+        from .models import Entry
+
+        diary_date, pk, title = row
+        return Entry(pk=pk, diary_date=diary_date, title=title)
+
+
+entry_date_index = EntryDateIndex()
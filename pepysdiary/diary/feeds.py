@@ -1,16 +1,20 @@
 from pepysdiary.common.feeds import BaseRSSFeed
 
 from .models import Entry
+from .publication import publication_clock
 
 
 class LatestEntriesFeed(BaseRSSFeed):
     title = "The Diary of Samuel Pepys"
     description = "Daily entries from the 17th century London diary"
+    cached_models = (Entry,)
+
+    def get_cache_key(self, request):
+        "It also changes when the next Entry is published."
+        return publication_clock.cache_key(super().get_cache_key(request))
 
     def items(self):
-        return Entry.objects.filter(
-            diary_date__lte=Entry.objects.most_recent_entry_date()
-        ).order_by("-diary_date")[:5]
+        return Entry.objects.published().order_by("-diary_date")[:5]
 
     def item_description(self, item):
         return self.make_item_description(item.text)
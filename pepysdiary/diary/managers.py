@@ -1,36 +1,30 @@
-from datetime import UTC, date, datetime, timedelta
-from zoneinfo import ZoneInfo
-
-from django.conf import settings
 from django.db import models
 
 from pepysdiary.common.managers import ReferredManagerMixin
-from pepysdiary.common.utilities import is_leap_year
+
+from .publication import publication_clock
+
+
+class EntryQuerySet(models.QuerySet):
+    def published(self):
+        """
+        Only the Entries that have been 'published' so far.
+        See EntryManager.most_recent_entry_date().
+        """
+        return self.filter(diary_date__lte=publication_clock.most_recent_entry_date())
 
 
-class EntryManager(models.Manager, ReferredManagerMixin):
+class EntryManager(models.Manager.from_queryset(EntryQuerySet), ReferredManagerMixin):
     def most_recent_entry_date(self):
         """
         Returns the date of the most recent diary entry 'published'.
         This is always "today's" date, 353 (or whatever) years ago
         (depending on settings.YEARS_OFFSET).
-        Except "today's" entry is only published at 23:00 UK time. Until then
+        Except "today's" entry is only published at 23:00 UTC. Until then
         we see "yesterday's" entry.
+        The date is only worked out once per day; see PublicationClock.
         """
-        time_now = datetime.now(tz=UTC).replace(tzinfo=ZoneInfo("Europe/London"))
-        if int(time_now.strftime("%H")) < 23:
-            # It's before 11pm, so we still show yesterday's entry.
-
-            time_now = time_now - timedelta(days=1)
-
-        entry_year = int(time_now.strftime("%Y")) - settings.YEARS_OFFSET
-        entry_month = int(time_now.strftime("%m"))
-        entry_day = int(time_now.strftime("%d"))
-
-        if time_now.strftime("%m-%d") == "02-29" and is_leap_year(entry_year) is False:
-            entry_day = entry_day - 1
-
-        return date(entry_year, entry_month, entry_day)
+        return publication_clock.most_recent_entry_date()
 
     def all_years_months(self, month_format="b"):
         """
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Made by pepysdiary.common.search.search_trigger_sql() from the model's
+# search_fields at the time, and copied here so that it doesn't change.
+SQL = """
+    CREATE FUNCTION diary_entry_search_document() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT'
+                OR OLD.title IS DISTINCT FROM NEW.title
+                OR OLD.text IS DISTINCT FROM NEW.text
+                OR OLD.footnotes IS DISTINCT FROM NEW.footnotes THEN
+            NEW.search_document :=
+                setweight(to_tsvector(COALESCE(NEW.title, '')), 'A') ||
+                setweight(to_tsvector(COALESCE(NEW.text, '')), 'B') ||
+                setweight(to_tsvector(COALESCE(NEW.footnotes, '')), 'C');
+        ELSIF NEW.search_document IS NULL THEN
+            NEW.search_document := OLD.search_document;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER diary_entry_search_document
+        BEFORE INSERT OR UPDATE OF title, text, footnotes, search_document
+        ON diary_entry
+        FOR EACH ROW EXECUTE FUNCTION diary_entry_search_document();
+"""
+
+REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS diary_entry_search_document ON diary_entry;
+    DROP FUNCTION IF EXISTS diary_entry_search_document();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("diary", "0005_fix_l_and_,m"),
+    ]
+
+    operations = [
+        migrations.RunSQL(SQL, REVERSE_SQL),
+    ]
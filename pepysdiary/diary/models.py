@@ -10,13 +10,13 @@ from django.urls import reverse
 from django_comments.moderation import CommentModerator, moderator
 from markdown import markdown
 
-from pepysdiary.common.models import OldDateMixin, PepysModel
-from pepysdiary.encyclopedia.models import Topic
+from pepysdiary.common.models import OldDateMixin, PepysModel, SearchableMixin
+from pepysdiary.common.search import search_index
 
 from .managers import EntryManager
 
 
-class Entry(PepysModel, OldDateMixin):
+class Entry(SearchableMixin, PepysModel, OldDateMixin):
     title = models.CharField(max_length=100, blank=False, null=False)
     diary_date = models.DateField(blank=False, null=False, unique=True)
     text = models.TextField(
@@ -29,8 +29,10 @@ class Entry(PepysModel, OldDateMixin):
     last_comment_time = models.DateTimeField(blank=True, null=True)
     allow_comments = models.BooleanField(blank=False, null=False, default=True)
 
-    # Also see index_components() method.
+    # Made from search_fields. See common.search.
     search_document = SearchVectorField(null=True)
+    search_fields = (("title", "A"), ("text", "B"), ("footnotes", "C"))
+    search_summary_fields = ("text", "footnotes")
 
     # Will also have a 'topics' ManyToMany field, from Topic.
 
@@ -57,12 +59,6 @@ class Entry(PepysModel, OldDateMixin):
             kwargs={"year": self.year, "month": self.month, "day": self.day},
         )
 
-    def index_components(self):
-        """Used by common.signals.on_save() to update the SearchVector on
-        self.search_document.
-        """
-        return ((self.title, "A"), (self.text, "B"), (self.footnotes, "C"))
-
     @property
     def date_published(self):
         """The modern-day datetime this item would be published."""
@@ -134,24 +130,7 @@ class Entry(PepysModel, OldDateMixin):
         Sets all the Encyclopedia Topics the text of this entry (and footnotes)
         refers to. Saves them to the database.
         """
-        self.topics.clear()
-        # Get a list of all the Topic IDs mentioned in text and footnotes:
-        ids = re.findall(
-            r"pepysdiary.com\/encyclopedia\/(\d+)\/", f"{self.text} {self.footnotes}"
-        )
-        # Make sure list of Topic IDs is unique:
-        # From http://stackoverflow.com/a/480227/250962
-        seen = set()
-        seen_add = seen.add
-        unique_ids = [id for id in ids if id not in seen and not seen_add(id)]
-
-        for id in unique_ids:
-            try:
-                topic = Topic.objects.get(pk=id)
-                topic.diary_references.add(self)
-            except Topic.DoesNotExist:
-                # Ignore invalid/broken links
-                pass
+        Entry.objects.make_references([self])
 
 
 class EntryModerator(CommentModerator):
@@ -190,3 +169,6 @@ class Summary(PepysModel, OldDateMixin):
     def save(self, *args, **kwargs):
         self.text_html = markdown(self.text)
         super().save(*args, **kwargs)
+
+
+search_index.register(Entry)
@@ -0,0 +1,87 @@
+from datetime import UTC, date, datetime, timedelta
+
+from django.conf import settings
+
+from pepysdiary.common.utilities import is_leap_year
+
+# The hour, each day, at which the next diary Entry is "published".
+PUBLICATION_HOUR = 23
+
+
+class PublicationClock:
+    """
+    Works out the date of the most recent diary Entry that has been
+    'published'. That's "today's" date, settings.YEARS_OFFSET years ago,
+    except that "today's" Entry is only published at 23:00. Until then it's
+    "yesterday's" Entry.
+
+    The answer only changes once a day, so we remember it, and the span of
+    time it's valid for, and only work it out again once we've passed the
+    next publication time (or if YEARS_OFFSET has changed).
+
+    Use the shared instance:
+
+        from pepysdiary.diary.publication import publication_clock
+        publication_clock.most_recent_entry_date()
+    """
+
+    def __init__(self):
+        # Will be a tuple of:
+        # (entry date, valid from datetime, valid until datetime, years offset)
+        self._state = None
+
+    def most_recent_entry_date(self):
+        "The date of the most recently published Entry."
+        return self._get_state()[0]
+
+    def next_publication_time(self):
+        "The datetime at which the next Entry will be published."
+        return self._get_state()[2]
+
+    def cache_key(self, prefix):
+        """
+        A cache key that's the same for everyone until the next Entry is
+        published. e.g. 'diary-home:1663-05-01'.
+        """
+        return f"{prefix}:{self.most_recent_entry_date().isoformat()}"
+
+    def clear(self):
+        "Forget the remembered date, so it's worked out next time it's needed."
+        self._state = None
+
+    def _get_state(self):
+        time_now = datetime.now(tz=UTC)
+        state = self._state
+        if (
+            state is None
+            or state[3] != settings.YEARS_OFFSET
+            or not (state[1] <= time_now < state[2])
+        ):
+            state = self._make_state(time_now)
+            self._state = state
+        return state
+
+    def _make_state(self, time_now):
+        publication_time = time_now.replace(
+            hour=PUBLICATION_HOUR, minute=0, second=0, microsecond=0
+        )
+        if time_now < publication_time:
+            # It's before 11pm, so we still show yesterday's entry.
+            valid_from = publication_time - timedelta(days=1)
+        else:
+            valid_from = publication_time
+        valid_until = valid_from + timedelta(days=1)
+
+        entry_year = valid_from.year - settings.YEARS_OFFSET
+        entry_month = valid_from.month
+        entry_day = valid_from.day
+
+        if entry_month == 2 and entry_day == 29 and is_leap_year(entry_year) is False:
+            entry_day = entry_day - 1
+
+        entry_date = date(entry_year, entry_month, entry_day)
+
+        return (entry_date, valid_from, valid_until, settings.YEARS_OFFSET)
+
+
+publication_clock = PublicationClock()
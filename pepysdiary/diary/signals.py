@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .date_index import entry_date_index
+from .models import Entry
+
+
+@receiver(post_save, sender=Entry)
+def entry_post_save(sender, instance, **kwargs):
+    "Keep the in-memory index of Entry dates up to date."
+    entry_date_index.entry_changed(instance)
+
+
+@receiver(post_delete, sender=Entry)
+def entry_post_delete(sender, instance, **kwargs):
+    entry_date_index.invalidate()
@@ -9,6 +9,7 @@ from django.views.generic.dates import (
     YearArchiveView,
 )
 
+from .date_index import entry_date_index
 from .models import Entry, Summary
 
 
@@ -70,19 +71,29 @@ class EntryDetailView(EntryMixin, DateDetailView):
             self.get_day_format(),
         )
 
+        # Keep this for get_next_previous():
+        self.date = date
+
         # Deleted some things from DateDetailView.get_object() that we don't use.
 
         # Use a custom queryset if provided
         qs = queryset or self.get_queryset()
+
+        msg = _("No %(verbose_name)s found matching the query") % {
+            "verbose_name": qs.model._meta.verbose_name
+        }
+
         qs = qs.filter(**{self.date_field: date})
 
         try:
             obj = qs.get()
         except qs.model.DoesNotExist as err:
-            msg = _("No %(verbose_name)s found matching the query") % {
-                "verbose_name": qs.model._meta.verbose_name
-            }
             raise Http404(msg) from err
+
+        if not entry_date_index.exists(date):
+            # This Entry was added by another process, and our index of dates
+            # (used for the next/previous links) is out of date.
+            entry_date_index.invalidate()
         return obj
 
     def get_context_data(self, **kwargs):
@@ -97,37 +108,11 @@ class EntryDetailView(EntryMixin, DateDetailView):
     def get_next_previous(self):
         """
         Get the next/previous Entries based on the current Entry's date.
+        These are partial Entry objects from the in-memory index, with only
+        pk, diary_date and title.
         """
-        year = self.get_year()
-        month = self.get_month()
-        day = self.get_day()
-
-        date = date_from_string(
-            year,
-            self.get_year_format(),
-            month,
-            self.get_month_format(),
-            day,
-            self.get_day_format(),
-        )
-
-        try:
-            previous_entry = (
-                self.model.objects.filter(diary_date__lt=date)
-                .order_by("-diary_date")[:1]
-                .get()
-            )
-        except self.model.DoesNotExist:
-            previous_entry = None
-
-        try:
-            next_entry = (
-                self.model.objects.filter(diary_date__gt=date)
-                .order_by("diary_date")[:1]
-                .get()
-            )
-        except self.model.DoesNotExist:
-            next_entry = None
+        previous_entry = entry_date_index.previous_entry(self.date)
+        next_entry = entry_date_index.next_entry(self.date)
 
         return {
             "previous_entry": previous_entry,
@@ -6,6 +6,5 @@ class EncyclopediaConfig(AppConfig):
     default_auto_field = "django.db.models.AutoField"
 
     def ready(self):
-        from pepysdiary.common import signals  # noqa: F401
-
+        from . import feeds as encyclopedia_feeds  # noqa: F401
         from . import signals as encyclopedia_signals  # noqa: F401
@@ -0,0 +1,154 @@
+from typing import NamedTuple
+
+from django.urls import reverse
+
+from pepysdiary.common.caching import VersionedLocalCache
+
+
+class CategoryNode(NamedTuple):
+    "What CategoryTree knows about one Category."
+
+    id: int
+    path: str
+    slug: str
+    title: str
+    # All the slugs from the root down to this one, e.g. 'fooddrink/drink':
+    slug_path: str
+    depth: int
+    root_id: int
+    # In the same order as Category.get_children():
+    children_ids: tuple
+
+    def get_absolute_url(self):
+        return reverse("category_detail", kwargs={"slugs": self.slug_path})
+
+
+class CategoryTree:
+    """
+    Information about every Category's place in the tree, kept in memory,
+    so that we can find things like a Category's root, URL, ancestors and
+    children without querying the database.
+
+    There are only a few hundred Categories, and their structure rarely
+    changes. The tree is loaded, with one query, the first time it's needed,
+    and reloaded after any Category is added, moved, deleted, or has its
+    path, slug or title changed (see encyclopedia/signals.py and
+    Category.move()).
+
+    Use the shared instance:
+
+        from pepysdiary.encyclopedia.category_tree import category_tree
+        category_tree.root_id(category)
+    """
+
+    def __init__(self):
+        self._cache = VersionedLocalCache("encyclopedia:category-tree", self._load)
+
+    def nodes(self):
+        "Returns CategoryNodes for every Category, in tree order."
+        return list(self._cache.get()["nodes"].values())
+
+    def get(self, category_id):
+        "Returns the CategoryNode for this ID, or None if there isn't one."
+        return self._cache.get()["nodes"].get(category_id)
+
+    def root_id(self, category):
+        """
+        Returns the ID of the root Category that this Category is beneath
+        (or its own ID if it's a root). Uses the materialized path, so only
+        needs the Category's path, not its ancestors.
+        """
+        paths = self._cache.get()["paths"]
+        return paths.get(category.path[: category.steplen])
+
+    def slug_path(self, category):
+        """
+        Returns the slugs of the Category and its ancestors, joined with
+        slashes, e.g. 'fooddrink/drink/alcdrinks', or None if it's not in
+        the tree.
+        """
+        node = self.get(category.pk)
+        return None if node is None else node.slug_path
+
+    def ancestors(self, category):
+        """
+        Returns CategoryNodes for the Category's ancestors, root first.
+
+        If any of them aren't in the tree (e.g. this Category was moved by
+        another process since the tree was loaded) returns the Categories
+        from category.get_ancestors() instead, which have the same
+        attributes that we use.
+        """
+        tree = self._cache.get()
+        steplen = category.steplen
+        try:
+            return [
+                tree["nodes"][tree["paths"][category.path[:end]]]
+                for end in range(steplen, len(category.path), steplen)
+            ]
+        except KeyError:
+            return list(category.get_ancestors())
+
+    def children(self, category):
+        "Returns CategoryNodes for the Category's children."
+        nodes = self._cache.get()["nodes"]
+        node = nodes.get(category.pk)
+        if node is None:
+            return []
+        return [nodes[pk] for pk in node.children_ids]
+
+    def category_changed(self, category):
+        """
+        Call after a Category has been saved. Only invalidates the tree if
+        the Category is new or its path, slug or title has changed, because
+        Categories are also saved when their topic_count changes.
+        """
+        tree = self._cache.peek()
+        if tree is not None:
+            node = tree["nodes"].get(category.pk)
+            if (
+                node is not None
+                and node.path == category.path
+                and node.slug == category.slug
+                and node.title == category.title
+            ):
+                return
+        self.invalidate()
+
+    def invalidate(self):
+        self._cache.invalidate()
+
+    def _load(self):
+        from .models import Category
+
+        steplen = Category.steplen
+        paths = {}
+        nodes = {}
+        children = {}
+        # Ordered by path, so parents come before their children:
+        for pk, path, slug, title, depth in Category.objects.order_by(
+            "path"
+        ).values_list("pk", "path", "slug", "title", "depth"):
+            paths[path] = pk
+            children[pk] = []
+            parent_path = path[:-steplen]
+            if parent_path:
+                parent = nodes[paths[parent_path]]
+                children[parent.id].append(pk)
+                slug_path = f"{parent.slug_path}/{slug}"
+                root_id = parent.root_id
+            else:
+                slug_path = slug
+                root_id = pk
+            nodes[pk] = CategoryNode(
+                pk, path, slug, title, slug_path, depth, root_id, children[pk]
+            )
+
+        nodes = {
+            pk: node._replace(children_ids=tuple(children[pk]))
+            for pk, node in nodes.items()
+        }
+        return {"paths": paths, "nodes": nodes}
+
+
+category_tree = CategoryTree()
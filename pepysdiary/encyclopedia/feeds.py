@@ -6,6 +6,7 @@ from .models import Topic
 class LatestTopicsFeed(BaseRSSFeed):
     title = "Pepys' Diary - Encyclopedia Topics"
     description = "New topics about Samuel Pepys and his world"
+    cached_models = (Topic,)
 
     def items(self):
         return Topic.objects.all().order_by("-date_created")[:8]
@@ -16,6 +16,13 @@ class Command(BaseCommand):
     Gets it for the 20 Topics that have been fetched least recently:
     ./manage.py fetch_wikipedia --num=20
 
+    Gets it for all Topics, 4 pages at a time, no more than 5 per second,
+    skipping pages that haven't changed since they were last fetched:
+    ./manage.py fetch_wikipedia --all --concurrency=4 --rate=5
+
+    Add --force to fetch those unchanged pages too, and --processes=n to
+    set how many processes tidy the HTML (default, one per CPU).
+
     Add verbosity with:
     ./manage.py fetch_wikipedia --num=20 --verbosity=2
 
@@ -58,15 +65,62 @@ class Command(BaseCommand):
             "with these id(s)",
         )
 
+        parser.add_argument(
+            "--concurrency",
+            "-c",
+            action="store",
+            dest="concurrency",
+            default=None,
+            type=int,
+            help="Fetch this many pages at a time. Default is one at a time, "
+            "waiting between each.",
+        )
+        parser.add_argument(
+            "--rate",
+            action="store",
+            dest="rate",
+            default=5,
+            type=float,
+            help="With --concurrency, the most pages to fetch per second. Default 5.",
+        )
+        parser.add_argument(
+            "--processes",
+            action="store",
+            dest="processes",
+            default=None,
+            type=int,
+            help="With --concurrency, how many processes tidy the fetched HTML. "
+            "Default is one per CPU.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            dest="force",
+            default=False,
+            help="With --concurrency, fetch pages even if they haven't changed "
+            "since they were last fetched.",
+        )
+
     def handle(self, *args, **options):
         args_error_message = "Specify --ids, --all topics or --num=n topics."
 
+        kwargs = {}
+        if options["concurrency"]:
+            kwargs = {
+                "concurrency": options["concurrency"],
+                "rate": options["rate"],
+                "processes": options["processes"],
+                "force": options["force"],
+            }
+
         if options["all"]:
-            updated = Topic.objects.fetch_wikipedia_texts(num="all")
+            updated = Topic.objects.fetch_wikipedia_texts(num="all", **kwargs)
         elif options["num"]:
-            updated = Topic.objects.fetch_wikipedia_texts(num=options["num"])
+            updated = Topic.objects.fetch_wikipedia_texts(num=options["num"], **kwargs)
         elif options["ids"]:
-            updated = Topic.objects.fetch_wikipedia_texts(topic_ids=options["ids"])
+            updated = Topic.objects.fetch_wikipedia_texts(
+                topic_ids=options["ids"], **kwargs
+            )
         else:
             raise CommandError(args_error_message)
 
@@ -79,6 +133,10 @@ class Command(BaseCommand):
                 ids = ", ".join(str(id) for id in updated["success"])
                 self.stdout.write(f"IDs: {ids}")
 
+            if updated.get("unchanged"):
+                num_topics = len(updated["unchanged"])
+                self.stdout.write(f"{num_topics} topic(s) were unchanged")
+
             if len(updated["failure"]) > 0:
                 num_topics = len(updated["failure"])
                 self.stderr.write(
@@ -1,15 +1,39 @@
 import re
 import time
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from treebeard.mp_tree import MP_NodeManager
 
+from pepysdiary.common.search import search_index
 from pepysdiary.encyclopedia import category_lookups
-from pepysdiary.encyclopedia.wikipedia_fetcher import WikipediaFetcher
+from pepysdiary.encyclopedia.wikipedia_fetcher import (
+    ConcurrentWikipediaFetcher,
+    WikipediaFetcher,
+)
 
 
 class CategoryManager(MP_NodeManager):
+    def update_topic_counts(self, category_ids):
+        """
+        Sets the topic_count on all of these Categories, with one UPDATE.
+        Should be called whenever Topics are added to, or removed from,
+        Categories.
+        """
+        counts = (
+            self.model.topics.through.objects.filter(category_id=OuterRef("pk"))
+            .order_by()
+            .values("category_id")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        self.filter(pk__in=category_ids).update(
+            topic_count=Coalesce(Subquery(counts), Value(0))
+        )
+
     def map_category_choices(self):
         """
         The categories we DO use on the maps page.
@@ -69,11 +93,45 @@ class CategoryManager(MP_NodeManager):
 
 
 class TopicManager(models.Manager):
+    def update_order_titles(self, topic_ids):
+        """
+        Re-makes the order_title for all of these Topics.
+        Should be called whenever Topics are added to, or removed from, the
+        People Category, because people's order_titles are different.
+        Only updates the order_title fields of Topics whose order_title has
+        changed, with one query, rather than saving the Topics.
+        Returns a dict of Topic ID to its order_title.
+        """
+        person_ids = set(
+            self.model.categories.through.objects.filter(
+                topic_id__in=topic_ids, category_id=settings.PEOPLE_CATEGORY_ID
+            ).values_list("topic_id", flat=True)
+        )
+        order_titles = {}
+        changed = []
+        for pk, title, old_order_title in self.filter(pk__in=topic_ids).values_list(
+            "pk", "title", "order_title"
+        ):
+            order_titles[pk] = self.make_order_title(title, is_person=pk in person_ids)
+            if order_titles[pk] != old_order_title:
+                changed.append(self.model(pk=pk, order_title=order_titles[pk]))
+        self.bulk_update(changed, ["order_title"])
+        return order_titles
+
     def pepys_homes_ids(self):
         """The IDs of the Topics about the places Pepys has lived."""
         return [102, 1023]
 
-    def fetch_wikipedia_texts(self, topic_ids=None, num=None):
+    def fetch_wikipedia_texts(
+        self,
+        topic_ids=None,
+        num=None,
+        *,
+        concurrency=None,
+        rate=5,
+        processes=None,
+        force=False,
+    ):
         """
         Passed a list of Topic IDs, this calls the method that fetches and
         munges the Wikipedia HTML for any of those Topics that have
@@ -86,10 +144,17 @@ class TopicManager(models.Manager):
 
         By default, this method will fetch nothing.
 
-        Returns a dict with 'success' and 'failure' elements. Each of those is
-        a list containing the relevant Topic IDs.
+        If concurrency is set, pages are fetched that many at a time, using
+        ConcurrentWikipediaFetcher, no more than `rate` per second, and
+        tidied in `processes` processes. Then, unless `force` is True,
+        pages that haven't changed since they were last fetched aren't
+        fetched again. See _fetch_wikipedia_texts_concurrently().
+
+        Returns a dict with 'success', 'failure' and 'unchanged' elements.
+        Each of those is a list containing the relevant Topic IDs.
         Success is when we fetched the Wikipedia text for a topic.
         Failure is when we tried but failed.
+        Unchanged is when the page hadn't changed since it was last fetched.
         Topics that have no Wikipedia URL fragments aren't counted (as we
         don't even try to fetch their texts).
         """
@@ -99,11 +164,16 @@ class TopicManager(models.Manager):
         results = {
             "success": [],
             "failure": [],
+            "unchanged": [],
         }
 
         qs = self.model.objects.only("id", "wikipedia_fragment").exclude(
             wikipedia_fragment__exact=""
         )
+        if concurrency:
+            qs = qs.only("id", "wikipedia_fragment", "wikipedia_last_fetch").annotate(
+                has_html=~Q(wikipedia_html="")
+            )
 
         if num == "all":
             # We don't modify the QuerySet
@@ -120,6 +190,14 @@ class TopicManager(models.Manager):
         else:
             qs = qs.filter(pk__in=topic_ids)
 
+        if concurrency:
+            fetcher = ConcurrentWikipediaFetcher(
+                concurrency=concurrency, rate=rate, processes=processes
+            )
+            return self._fetch_wikipedia_texts_concurrently(
+                qs, fetcher, results, force=force
+            )
+
         fetcher = WikipediaFetcher()
 
         if qs.count() > 0:
@@ -128,7 +206,13 @@ class TopicManager(models.Manager):
                 if fetched["success"] is True:
                     topic.wikipedia_html = fetched["content"]
                     topic.wikipedia_last_fetch = timezone.now()
-                    topic.save()
+                    topic.save(
+                        update_fields=[
+                            "wikipedia_html",
+                            "wikipedia_last_fetch",
+                            "date_modified",
+                        ]
+                    )
                     results["success"].append(topic.id)
                 else:
                     results["failure"].append(topic.id)
@@ -137,6 +221,71 @@ class TopicManager(models.Manager):
 
         return results
 
+    def _fetch_wikipedia_texts_concurrently(
+        self, qs, fetcher, results, *, force=False, batch_size=50
+    ):
+        """
+        Used by fetch_wikipedia_texts() to fetch the Topics in qs using a
+        ConcurrentWikipediaFetcher.
+
+        qs must have wikipedia_last_fetch, and be annotated with has_html.
+        If a Topic already has wikipedia_html, and force is False, its page
+        is only fetched if it's changed since wikipedia_last_fetch.
+
+        Topics are written in batches of batch_size, with bulk_update(),
+        rather than saved one at a time, so none of save()'s other work is
+        done. Then search_index is told about the changes.
+        """
+        topics = {topic.pk: topic for topic in qs}
+        pages = [
+            (
+                topic.pk,
+                topic.wikipedia_fragment,
+                None if force or not topic.has_html else topic.wikipedia_last_fetch,
+            )
+            for topic in topics.values()
+        ]
+
+        changed = []
+        unchanged = []
+
+        def write():
+            now = timezone.now()
+            for topic in changed + unchanged:
+                topic.wikipedia_last_fetch = now
+            for topic in changed:
+                topic.date_modified = now
+            with transaction.atomic():
+                self.bulk_update(
+                    changed,
+                    ["wikipedia_html", "wikipedia_last_fetch", "date_modified"],
+                )
+                self.bulk_update(unchanged, ["wikipedia_last_fetch"])
+                search_index.objects_changed(
+                    self.model, [topic.pk for topic in changed]
+                )
+            changed.clear()
+            unchanged.clear()
+
+        for pk, fetched in fetcher.fetch_many(pages):
+            topic = topics[pk]
+            if not fetched["success"]:
+                results["failure"].append(pk)
+            elif fetched["content"] is None:
+                unchanged.append(topic)
+                results["unchanged"].append(pk)
+            else:
+                topic.wikipedia_html = fetched["content"]
+                changed.append(topic)
+                results["success"].append(pk)
+            if len(changed) + len(unchanged) >= batch_size:
+                write()
+
+        if changed or unchanged:
+            write()
+
+        return results
+
     def make_order_title(self, text, *, is_person=False):
         """
         If is_person we change:
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# Made by pepysdiary.common.search.search_trigger_sql() from the model's
+# search_fields at the time, and copied here so that it doesn't change.
+SQL = """
+    CREATE FUNCTION encyclopedia_topic_search_document() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT'
+                OR OLD.title IS DISTINCT FROM NEW.title
+                OR OLD.summary IS DISTINCT FROM NEW.summary
+                OR OLD.wheatley IS DISTINCT FROM NEW.wheatley
+                OR OLD.wikipedia_html IS DISTINCT FROM NEW.wikipedia_html THEN
+            NEW.search_document :=
+                setweight(to_tsvector(COALESCE(NEW.title, '')), 'A') ||
+                setweight(to_tsvector(COALESCE(NEW.summary, '')), 'B') ||
+                setweight(to_tsvector(COALESCE(NEW.wheatley, '')), 'B') ||
+                setweight(to_tsvector(COALESCE(NEW.wikipedia_html, '')), 'C');
+        ELSIF NEW.search_document IS NULL THEN
+            NEW.search_document := OLD.search_document;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER encyclopedia_topic_search_document
+        BEFORE INSERT OR UPDATE OF title, summary, wheatley, wikipedia_html, search_document
+        ON encyclopedia_topic
+        FOR EACH ROW EXECUTE FUNCTION encyclopedia_topic_search_document();
+"""
+
+REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS encyclopedia_topic_search_document ON encyclopedia_topic;
+    DROP FUNCTION IF EXISTS encyclopedia_topic_search_document();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("encyclopedia", "0009_alter_topic_order_title"),
+    ]
+
+    operations = [
+        migrations.RunSQL(SQL, REVERSE_SQL),
+    ]
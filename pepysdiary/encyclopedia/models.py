@@ -6,9 +6,11 @@ from django_comments.moderation import CommentModerator, moderator
 from markdown import markdown
 from treebeard.mp_tree import MP_Node
 
-from pepysdiary.common.models import PepysModel
+from pepysdiary.common.models import ChangedFieldsMixin, PepysModel, SearchableMixin
+from pepysdiary.common.search import search_index
 
 from . import category_lookups, topic_lookups
+from .category_tree import category_tree
 from .managers import CategoryManager, TopicManager
 
 
@@ -40,10 +42,29 @@ class Category(MP_Node):
     def get_absolute_url(self):
         # Join all the parent categories' slugs, eg:
         # 'fooddrink/drink/alcdrinks'.
-        parent_slugs = "/".join([c.slug for c in self.get_ancestors()])
-        path = f"{parent_slugs}/{self.slug}" if parent_slugs else str(self.slug)
+        path = category_tree.slug_path(self)
+        if path is None:
+            # Not saved yet, so not in the tree.
+            parent_slugs = "/".join([c.slug for c in self.get_ancestors()])
+            path = f"{parent_slugs}/{self.slug}" if parent_slugs else str(self.slug)
         return reverse("category_detail", kwargs={"slugs": path})
 
+    def get_ancestor_nodes(self):
+        """
+        Like get_ancestors() but returns CategoryNodes, usually without a
+        query. They have id, slug, title, get_absolute_url() etc.
+        """
+        return category_tree.ancestors(self)
+
+    def get_child_nodes(self):
+        "Like get_children() but returns CategoryNodes, without a query."
+        return category_tree.children(self)
+
+    def move(self, target, pos=None):
+        # treebeard moves nodes with UPDATEs, so no signals are sent.
+        super().move(target, pos=pos)
+        category_tree.invalidate()
+
     def set_topic_count(self):
         """
         Should be called when we add/delete a Topic.
@@ -54,7 +75,7 @@ class Category(MP_Node):
         self.save()
 
 
-class Topic(PepysModel):
+class Topic(ChangedFieldsMixin, SearchableMixin, PepysModel):
     class MapCategory(models.TextChoices):
         #  These are inherited from Movable Type data, but I'm not sure we
         # actually use them...
@@ -157,13 +178,22 @@ class Topic(PepysModel):
     diary_references = models.ManyToManyField("diary.Entry", related_name="topics")
     letter_references = models.ManyToManyField("letters.Letter", related_name="topics")
 
-    # Also see index_components() method.
+    # Made from search_fields. See common.search.
     search_document = SearchVectorField(null=True)
+    search_fields = (
+        ("title", "A"),
+        ("summary", "B"),
+        ("wheatley", "B"),
+        ("wikipedia_html", "C"),
+    )
+    search_summary_fields = ("title", "summary_html", "wheatley_html", "wikipedia_html")
 
     comment_name = "annotation"
 
-    # Keeps track of whether we've made the order_title for this model yet.
-    _order_title_made = False
+    # So that save() knows when these have changed. See ChangedFieldsMixin.
+    tracked_fields = ["title", "summary", "wheatley"]
+
+    # Used by signals to keep track of categories when they're changed.
     _original_categories_pks = []
 
     objects = TopicManager()
@@ -175,21 +205,34 @@ class Topic(PepysModel):
         return self.title
 
     def save(self, *args, **kwargs):
-        self.summary_html = markdown(self.summary)
-        self.wheatley_html = markdown(self.wheatley)
-        super().save(*args, **kwargs)
+        """
+        Only re-makes the HTML and order_title fields if the fields they're
+        made from have changed.
+        When the Topic's categories change, its order_title, and the
+        categories' topic_counts, are updated by signals.
+        """
+        update_fields = kwargs.get("update_fields")
+        made_fields = set()
+
+        def will_save(name):
+            return update_fields is None or name in update_fields
+
+        if will_save("summary") and self.field_has_changed("summary"):
+            self.summary_html = markdown(self.summary)
+            made_fields.add("summary_html")
 
-        if self._order_title_made is False:
-            # When importing data we need to do the make_order_title() after
-            # we've saved the model, and its category ManyToMany field, but
-            # we don't want to get into an infinite loop. So this makes sure
-            # we only save the model one extra time:
+        if will_save("wheatley") and self.field_has_changed("wheatley"):
+            self.wheatley_html = markdown(self.wheatley)
+            made_fields.add("wheatley_html")
+
+        if will_save("title") and self.field_has_changed("title"):
             self.make_order_title()
-            self._order_title_made = True
-            self.save()
-            for cat in self.categories.all():
-                cat.set_topic_count()
-            self._order_title_made = False
+            made_fields.add("order_title")
+
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | made_fields
+
+        super().save(*args, **kwargs)
 
     @property
     def has_location(self):
@@ -248,35 +291,19 @@ class Topic(PepysModel):
     def make_order_title(self):
         """
         Set the order_title, depending on what type of Topic this is.
+        A new Topic won't have any categories yet, so isn't a person.
         """
-        try:
-            people_category = Category.objects.get(pk=settings.PEOPLE_CATEGORY_ID)
-        except Category.DoesNotExist:
-            people_category = None
-
-        if people_category is not None and people_category in self.categories.all():
-            self.order_title = Topic.objects.make_order_title(
-                self.title, is_person=True
-            )
-        else:
-            self.order_title = Topic.objects.make_order_title(
-                self.title, is_person=False
-            )
+        is_person = (
+            not self._state.adding
+            and self.categories.filter(pk=settings.PEOPLE_CATEGORY_ID).exists()
+        )
+        self.order_title = Topic.objects.make_order_title(
+            self.title, is_person=is_person
+        )
 
     def get_absolute_url(self):
         return reverse("topic_detail", kwargs={"pk": self.pk})
 
-    def index_components(self):
-        """Used by common.signals.on_save() to update the SearchVector on
-        self.search_document.
-        """
-        return (
-            (self.title, "A"),
-            (self.summary, "B"),
-            (self.wheatley, "B"),
-            (self.wikipedia_html, "C"),
-        )
-
     def get_annotated_diary_references(self):
         """
         Returns a list of lists, of this Topic's diary entry references.
@@ -345,10 +372,10 @@ class Topic(PepysModel):
         If this Topic is somewhere beneath the Places top-level category, then
         true, else false.
         """
-        for c in self.categories.all():
-            if c.get_root().id == category_lookups.PLACES:
-                return True
-        return False
+        return any(
+            category_tree.root_id(c) == category_lookups.PLACES
+            for c in self.categories.all()
+        )
 
 
 class TopicModerator(CommentModerator):
@@ -357,3 +384,5 @@ class TopicModerator(CommentModerator):
 
 
 moderator.register(Topic, TopicModerator)
+
+search_index.register(Topic)
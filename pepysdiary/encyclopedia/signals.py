@@ -1,39 +1,53 @@
-from django.db.models.signals import m2m_changed, post_delete, pre_delete
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 
+from .category_tree import category_tree
 from .models import Category, Topic
 
 
-def topic_categories_changed(sender, **kwargs):
+def topic_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
     """
-    When we add or remove categories on this topic, we need to re-set those
-    categories' topic counts.
+    When we add or remove categories on a topic, or topics on a category,
+    we need to re-set those categories' topic counts.
+    And if the People category is involved, the topics' order_titles.
     """
-    if kwargs["reverse"]:
-        # We're changing a Category's topics, so set that Category's count.
-        if kwargs["instance"] is not None:
-            kwargs["instance"].set_topic_count()
-    else:
-        # We're changing the categories on a topic.
-        if kwargs["action"] == "pre_clear":
-            # Before we do anything,
-            # store the PKs of the current categories on this topic.
-            kwargs["instance"]._original_categories_pks = [
-                c.pk for c in kwargs["instance"].categories.all()
-            ]
-
-        elif kwargs["action"] in ["post_add", "post_remove"]:
-            # Finished the action, so now change the old and new categories'
-            # topic counts.
-            # The PKs of the categories the topic has now:
-            new_pks = kwargs.get("pk_set", [])
-            # Make a list of both the new and old categories' PKs:
-            pks = kwargs["instance"]._original_categories_pks + list(
-                set(new_pks) - set(kwargs["instance"]._original_categories_pks)
+    if action == "pre_clear":
+        # post_clear won't tell us what was removed, so store the PKs of
+        # the current categories on this topic, or topics in this category.
+        if reverse:
+            instance._original_topics_pks = list(
+                instance.topics.values_list("pk", flat=True)
+            )
+        else:
+            instance._original_categories_pks = list(
+                instance.categories.values_list("pk", flat=True)
             )
-            # For all the old and new categories, set the counts:
-            for pk in pks:
-                cat = Category.objects.get(pk=pk)
-                cat.set_topic_count()
+        return
+
+    if action == "post_clear":
+        if reverse:
+            pk_set = set(instance._original_topics_pks)
+        else:
+            pk_set = set(instance._original_categories_pks)
+    elif action not in ["post_add", "post_remove"]:
+        return
+
+    if not pk_set:
+        return
+
+    if reverse:
+        # We've changed a Category's topics.
+        category_pks, topic_pks = {instance.pk}, pk_set
+    else:
+        # We've changed a Topic's categories.
+        category_pks, topic_pks = pk_set, {instance.pk}
+
+    Category.objects.update_topic_counts(category_pks)
+
+    if settings.PEOPLE_CATEGORY_ID in category_pks:
+        order_titles = Topic.objects.update_order_titles(topic_pks)
+        if not reverse:
+            instance.order_title = order_titles.get(instance.pk, instance.order_title)
 
 
 m2m_changed.connect(topic_categories_changed, sender=Topic.categories.through)
@@ -43,9 +57,9 @@ def topic_pre_delete(sender, **kwargs):
     """
     Before deleting the topic, store the categories it has so that...
     """
-    kwargs["instance"]._original_categories_pks = [
-        c.pk for c in kwargs["instance"].categories.all()
-    ]
+    kwargs["instance"]._original_categories_pks = list(
+        kwargs["instance"].categories.values_list("pk", flat=True)
+    )
 
 
 pre_delete.connect(topic_pre_delete, sender=Topic)
@@ -55,9 +69,22 @@ def topic_post_delete(sender, **kwargs):
     """
     ...after deleting the topic, we re-set its categories' topic counts.
     """
-    for pk in kwargs["instance"]._original_categories_pks:
-        cat = Category.objects.get(pk=pk)
-        cat.set_topic_count()
+    Category.objects.update_topic_counts(kwargs["instance"]._original_categories_pks)
 
 
 post_delete.connect(topic_post_delete, sender=Topic)
+
+
+def category_post_save(sender, instance, **kwargs):
+    "Keep the in-memory tree of Categories up to date."
+    category_tree.category_changed(instance)
+
+
+post_save.connect(category_post_save, sender=Category)
+
+
+def category_post_delete(sender, **kwargs):
+    category_tree.invalidate()
+
+
+post_delete.connect(category_post_delete, sender=Category)
@@ -1,30 +1,204 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
 import bleach
 import requests
 from bleach.css_sanitizer import CSSSanitizer
 from bs4 import BeautifulSoup
 from django.conf import settings
+from django.utils.http import http_date
+
+from pepysdiary.common.html_sanitizer import HTMLSanitizer
+
+# The rules for tidying Wikipedia's HTML.
+
+# Pretty much most elements, but no forms or audio/video.
+ALLOWED_TAGS = {
+    "a",
+    "abbr",
+    "acronym",
+    "address",
+    "area",
+    "article",
+    "b",
+    "blockquote",
+    "br",
+    "caption",
+    "cite",
+    "code",
+    "col",
+    "colgroup",
+    "dd",
+    "del",
+    "dfn",
+    "div",
+    "dl",
+    "dt",
+    "em",
+    "figcaption",
+    "figure",
+    "footer",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "header",
+    "hgroup",
+    "hr",
+    "i",
+    "img",
+    "ins",
+    "kbd",
+    "li",
+    "map",
+    "nav",
+    "ol",
+    "p",
+    "pre",
+    "q",
+    "s",
+    "samp",
+    "section",
+    "small",
+    "span",
+    "strong",
+    "sub",
+    "sup",
+    "table",
+    "tbody",
+    "td",
+    "tfoot",
+    "th",
+    "thead",
+    "time",
+    "tr",
+    "ul",
+    "var",
+    # We allow script and style here, so we can close/un-mis-nest
+    # its tags, but then they're removed completely, with their contents:
+    "script",
+    "style",
+}
+
+# These attributes will not be removed from any of the allowed tags.
+ALLOWED_ATTRIBUTES = {
+    "*": ["class", "id"],
+    "a": ["href", "title"],
+    "abbr": ["title"],
+    "acronym": ["title"],
+    "img": ["alt", "src", "srcset"],
+    # Ugh. Don't know why this page doesn't use .tright like others
+    # http://127.0.0.1:8000/encyclopedia/5040/
+    "table": ["align"],
+    "td": ["colspan", "rowspan", "style"],
+    "th": ["colspan", "rowspan", "scope"],
+}
+
+# These CSS properties are allowed within style attributes
+# Added for the family tree on /encyclopedia/5825/
+# Hopefully doesn't make anything else too hideous.
+ALLOWED_CSS_PROPERTIES = [
+    "background",
+    "border",
+    "border-bottom",
+    "border-collapse",
+    "border-left",
+    "border-radius",
+    "border-right",
+    "border-spacing",
+    "border-top",
+    "height",
+    "padding",
+    "text-align",
+    "width",
+]
+
+# CSS selectors. Strip these and their contents.
+STRIP_SELECTORS = [
+    "div.hatnote",
+    "div.navbar.mini",  # Will also match div.mini.navbar
+    # Bottom of https://en.wikipedia.org/wiki/Charles_II_of_England :
+    "div.topicon",
+    "a.mw-headline-anchor",
+    "script",
+    "style",
+]
+
+# Strip any element that has one of these classes.
+STRIP_CLASSES = [
+    # "This article may be expanded with text translated from..."
+    # https://en.wikipedia.org/wiki/Afonso_VI_of_Portugal
+    "ambox-notice",
+    "magnify",
+    # eg audio on https://en.wikipedia.org/wiki/Bagpipes
+    "mediaContainer",
+    "navbox",
+    "noprint",
+]
+
+# Any element has a class matching a key, it will have the classes
+# in the value added.
+ADD_CLASSES = {
+    # Give these tables standard Bootstrap styles.
+    "infobox": ["table", "table-bordered"],
+    "ambox": ["table", "table-bordered"],
+    "wikitable": ["table", "table-bordered"],
+}
+
+sanitizer = HTMLSanitizer(
+    tags=ALLOWED_TAGS,
+    attributes=ALLOWED_ATTRIBUTES,
+    css_sanitizer=CSSSanitizer(allowed_css_properties=ALLOWED_CSS_PROPERTIES),
+    remove=STRIP_SELECTORS + [f".{name}" for name in STRIP_CLASSES],
+    add_classes=ADD_CLASSES,
+)
 
 
 class WikipediaFetcher:
-    def fetch(self, page_name):
+    base_url = "https://en.wikipedia.org/wiki/"
+
+    def __init__(self, base_url=None, session=None):
+        """
+        base_url - To fetch pages from somewhere other than Wikipedia.
+        session - A requests.Session to reuse connections between requests.
+        """
+        if base_url is not None:
+            self.base_url = base_url
+        self.session = session if session is not None else requests
+
+    def fetch(self, page_name, modified_since=None):
         """
         Passed a Wikipedia page's URL fragment, like
         'Edward_Montagu,_1st_Earl_of_Sandwich', this will fetch the page's
         main contents, tidy the HTML, strip out any elements we don't want
         and return the final HTML string.
 
+        If modified_since is a datetime, the page is only fetched if it's
+        changed since then.
+
         Returns a dict with two elements:
             'success' is either True or, if we couldn't fetch the page, False.
             'content' is the HTML if success==True, or else an error message.
+                It's None if the page hasn't changed since modified_since.
         """
-        result = self._get_html(page_name)
+        result = self._get_html(page_name, modified_since=modified_since)
 
-        if result["success"]:
+        if result["success"] and result["content"] is not None:
             result["content"] = self._tidy_html(result["content"])
 
         return result
 
-    def _get_html(self, page_name):
+    def _get_html(self, page_name, modified_since=None):
         """
         Passed the name of a Wikipedia page (eg, 'Samuel_Pepys'), it fetches
         the HTML content (not the entire HTML page) and returns it.
@@ -32,16 +206,21 @@ class WikipediaFetcher:
         Returns a dict with two elements:
             'success' is either True or, if we couldn't fetch the page, False.
             'content' is the HTML if success==True, or else an error message.
+                It's None if the page hasn't changed since modified_since.
         """
         error_message = ""
 
-        url = f"https://en.wikipedia.org/wiki/{page_name}"
+        url = f"{self.base_url}{page_name}"
+
+        headers = {"user-agent": settings.WIKIPEDIA_FETCHER_USER_AGENT}
+        if modified_since is not None:
+            headers["If-Modified-Since"] = http_date(modified_since.timestamp())
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
                 params={"action": "render"},
-                headers={"user-agent": settings.WIKIPEDIA_FETCHER_USER_AGENT},
+                headers=headers,
                 timeout=5,
             )
         except requests.exceptions.ConnectionError:
@@ -62,6 +241,8 @@ class WikipediaFetcher:
 
         if error_message:
             return {"success": False, "content": error_message}
+        elif response.status_code == 304:
+            return {"success": True, "content": None}
         else:
             return {"success": True, "content": response.text}
 
@@ -70,6 +251,16 @@ class WikipediaFetcher:
         Passed the raw Wikipedia HTML, this returns valid HTML, with all
         disallowed elements stripped out.
         """
+        return sanitizer.clean(html)
+
+    def _tidy_html_with_bleach(self, html):
+        """
+        Does the same as _tidy_html(), more slowly, by cleaning the HTML
+        with bleach and then parsing it again with BeautifulSoup.
+
+        This is how it used to be done. It's kept so that the benchmark
+        command can check the two have the same results.
+        """
         html = self._bleach_html(html)
         html = self._strip_html(html)
         return html
@@ -82,122 +273,14 @@ class WikipediaFetcher:
 
         Pass it an HTML string, it'll return the bleached HTML string.
         """
-
-        # Pretty much most elements, but no forms or audio/video.
-        allowed_tags = {
-            "a",
-            "abbr",
-            "acronym",
-            "address",
-            "area",
-            "article",
-            "b",
-            "blockquote",
-            "br",
-            "caption",
-            "cite",
-            "code",
-            "col",
-            "colgroup",
-            "dd",
-            "del",
-            "dfn",
-            "div",
-            "dl",
-            "dt",
-            "em",
-            "figcaption",
-            "figure",
-            "footer",
-            "h1",
-            "h2",
-            "h3",
-            "h4",
-            "h5",
-            "h6",
-            "header",
-            "hgroup",
-            "hr",
-            "i",
-            "img",
-            "ins",
-            "kbd",
-            "li",
-            "map",
-            "nav",
-            "ol",
-            "p",
-            "pre",
-            "q",
-            "s",
-            "samp",
-            "section",
-            "small",
-            "span",
-            "strong",
-            "sub",
-            "sup",
-            "table",
-            "tbody",
-            "td",
-            "tfoot",
-            "th",
-            "thead",
-            "time",
-            "tr",
-            "ul",
-            "var",
-            # We allow script and style here, so we can close/un-mis-nest
-            # its tags, but then it's removed completely in _strip_html():
-            "script",
-            "style",
-        }
-
-        # These attributes will not be removed from any of the allowed tags.
-        allowed_attributes = {
-            "*": ["class", "id"],
-            "a": ["href", "title"],
-            "abbr": ["title"],
-            "acronym": ["title"],
-            "img": ["alt", "src", "srcset"],
-            # Ugh. Don't know why this page doesn't use .tright like others
-            # http://127.0.0.1:8000/encyclopedia/5040/
-            "table": ["align"],
-            "td": ["colspan", "rowspan", "style"],
-            "th": ["colspan", "rowspan", "scope"],
-        }
-
-        # These CSS properties are allowed within style attributes
-        # Added for the family tree on /encyclopedia/5825/
-        # Hopefully doesn't make anything else too hideous.
-        allowed_css_properties = [
-            "background",
-            "border",
-            "border-bottom",
-            "border-collapse",
-            "border-left",
-            "border-radius",
-            "border-right",
-            "border-spacing",
-            "border-top",
-            "height",
-            "padding",
-            "text-align",
-            "width",
-        ]
-
-        css_sanitizer = CSSSanitizer(allowed_css_properties=allowed_css_properties)
-
-        a = bleach.clean(
+        return bleach.clean(
             html,
-            tags=allowed_tags,
-            attributes=allowed_attributes,
-            css_sanitizer=css_sanitizer,
+            tags=ALLOWED_TAGS,
+            attributes=ALLOWED_ATTRIBUTES,
+            css_sanitizer=CSSSanitizer(allowed_css_properties=ALLOWED_CSS_PROPERTIES),
             strip=True,
         )
 
-        return a
-
     def _strip_html(self, html):
         """
         Takes out any tags, and their contents, that we don't want at all.
@@ -206,48 +289,15 @@ class WikipediaFetcher:
 
         Pass it an HTML string, it returns the stripped HTML string.
         """
-
-        # CSS selectors. Strip these and their contents.
-        selectors = [
-            "div.hatnote",
-            "div.navbar.mini",  # Will also match div.mini.navbar
-            # Bottom of https://en.wikipedia.org/wiki/Charles_II_of_England :
-            "div.topicon",
-            "a.mw-headline-anchor",
-            "script",
-            "style",
-        ]
-
-        # Strip any element that has one of these classes.
-        classes = [
-            # "This article may be expanded with text translated from..."
-            # https://en.wikipedia.org/wiki/Afonso_VI_of_Portugal
-            "ambox-notice",
-            "magnify",
-            # eg audio on https://en.wikipedia.org/wiki/Bagpipes
-            "mediaContainer",
-            "navbox",
-            "noprint",
-        ]
-
-        # Any element has a class matching a key, it will have the classes
-        # in the value added.
-        add_classes = {
-            # Give these tables standard Bootstrap styles.
-            "infobox": ["table", "table-bordered"],
-            "ambox": ["table", "table-bordered"],
-            "wikitable": ["table", "table-bordered"],
-        }
-
         soup = BeautifulSoup(html, "lxml")
 
-        for selector in selectors:
+        for selector in STRIP_SELECTORS:
             [tag.decompose() for tag in soup.select(selector)]
 
-        for clss in classes:
+        for clss in STRIP_CLASSES:
             [tag.decompose() for tag in soup.find_all(attrs={"class": clss})]
 
-        for clss, new_classes in add_classes.items():
+        for clss, new_classes in ADD_CLASSES.items():
             for tag in soup.find_all(attrs={"class": clss}):
                 tag["class"] = tag.get("class", []) + new_classes
 
@@ -262,3 +312,127 @@ class WikipediaFetcher:
         html = "".join(str(tag) for tag in soup.contents)
 
         return html
+
+
+def tidy_html(html):
+    """
+    Tidies raw Wikipedia HTML like WikipediaFetcher.fetch() does.
+    A function so it can be run in another process.
+    """
+    return WikipediaFetcher()._tidy_html(html)
+
+
+class TokenBucket:
+    """
+    Limits how often something happens, across threads: on average `rate`
+    times per second, in bursts of no more than `capacity`.
+
+        bucket = TokenBucket(rate=5)
+        bucket.acquire()  # Waits if needed
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        "Waits until a token is available, and takes it."
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class ConcurrentWikipediaFetcher:
+    """
+    Fetches many Wikipedia pages at once, for refreshing lots of Topics.
+
+    Up to `concurrency` requests are made at a time, reusing connections,
+    but no more than `rate` per second overall, to stay polite. Each page's
+    HTML is tidied in a pool of `processes` processes (default, one per
+    CPU) while other pages are being fetched. If `processes` is 0, or we're
+    in a daemonic process, it's tidied in the fetching thread instead.
+
+        fetcher = ConcurrentWikipediaFetcher(concurrency=4, rate=5)
+        for key, result in fetcher.fetch_many(pages):
+            ...
+    """
+
+    def __init__(
+        self, concurrency=4, rate=5, processes=None, base_url=None, session=None
+    ):
+        self.concurrency = concurrency
+        self.processes = os.cpu_count() if processes is None else processes
+        if multiprocessing.current_process().daemon:
+            # Daemonic processes can't start others.
+            self.processes = 0
+        self.bucket = TokenBucket(rate)
+        if session is None:
+            session = requests.Session()
+            # Enough pooled connections for all the threads:
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.fetcher = WikipediaFetcher(base_url=base_url, session=session)
+
+    def fetch_many(self, pages):
+        """
+        pages is an iterable of (key, page_name, modified_since) tuples,
+        where modified_since is a datetime or None, like for
+        WikipediaFetcher.fetch().
+
+        Yields a (key, result) tuple for each page, in the order they're
+        finished, where result is like that returned by
+        WikipediaFetcher.fetch().
+        """
+        tidy_pool = (
+            ProcessPoolExecutor(max_workers=self.processes)
+            if self.processes > 0
+            else None
+        )
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as fetch_pool:
+                # future: (key, result or None)
+                pending = {
+                    fetch_pool.submit(self._get_html, name, since): (key, None)
+                    for key, name, since in pages
+                }
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key, fetched = pending.pop(future)
+                        if fetched is not None:
+                            # A tidied page.
+                            fetched["content"] = future.result()
+                            yield key, fetched
+                            continue
+
+                        fetched = future.result()
+                        if not fetched["success"] or fetched["content"] is None:
+                            yield key, fetched
+                        elif tidy_pool is None:
+                            fetched["content"] = tidy_html(fetched["content"])
+                            yield key, fetched
+                        else:
+                            tidy_future = tidy_pool.submit(
+                                tidy_html, fetched["content"]
+                            )
+                            pending[tidy_future] = (key, fetched)
+        finally:
+            if tidy_pool is not None:
+                tidy_pool.shutdown(cancel_futures=True)
+
+    def _get_html(self, page_name, modified_since):
+        self.bucket.acquire()
+        return self.fetcher._get_html(page_name, modified_since=modified_since)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     name = "pepysdiary.events"
     default_auto_field = "django.db.models.AutoField"
+
+    def ready(self):
+        from . import signals as events_signals  # noqa: F401
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pepysdiary.events.on_this_day import on_this_day
+
+
+class Command(BaseCommand):
+    """
+    Fills the cache with the on-this-day index: the Diary Entries, Letters
+    and DayEvents for every date. Otherwise each date is fetched the first
+    time it's displayed.
+
+    Run it after deploying, clearing the cache, or importing DayEvents:
+    ./manage.py build_on_this_day
+    """
+
+    help = "Caches the Entries, Letters and DayEvents for every date."
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        num = on_this_day.build()
+        if options.get("verbosity", 1) > 0:
+            self.stdout.write(
+                f"Cached {num} dates in {time.perf_counter() - start:.2f}s"
+            )
@@ -1,6 +1,6 @@
 import json
 import time
-from datetime import UTC, datetime, timezone
+from datetime import UTC, datetime
 
 import requests
 from bs4 import BeautifulSoup
@@ -57,25 +57,67 @@ URLS = {
 
 class Command(BaseCommand):
     """
-    Generates a JSON fixture file suitable for importing as DayEvent
-    objects linking to British History pages for the Commons and Lords.
+    Creates, updates or deletes DayEvents linking to British History pages
+    for the Commons and Lords, so that they match the links found at URLS.
+    Running it again when nothing has changed changes nothing.
 
-    Grabs all of the urls in URLs, and generates a file at FIXTURE_FILE_PATH.
+    Optionally also writes the links to a JSON fixture file at
+    FIXTURE_FILE_PATH:
 
-    This could then be loaded into the database as DayEvents:
+        ./manage.py fetch_parliament_urls --write-fixture
 
-        ./manage.py loaddata pepysdiary/events/fixtures/dayevents_parliament.json
+    Or, instead of fetching the pages, use the links in that file:
 
-    BUT FIRST, delete all existing Commons and Lords DayEvents:
-
-        from pepysdiary.events.models import DayEvent
-        DayEvent.objects.filter(source=DayEvent.Source.PARLIAMENT).delete()
+        ./manage.py fetch_parliament_urls --from-fixture
     """
 
-    help = "Generates a JSON fixture file suitable for importing as DayEvent objects linking to British History pages for the Commons and Lords."  # noqa: E501
-
-    def handle(self, *args, **kwargs):
-        data_for_fixture = []
+    help = "Creates or updates DayEvents linking to British History pages for the Commons and Lords."  # noqa: E501
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--write-fixture",
+            action="store_true",
+            help=f"Also write the links found to {FIXTURE_FILE_PATH}",
+        )
+        group.add_argument(
+            "--from-fixture",
+            action="store_true",
+            help=f"Use the links in {FIXTURE_FILE_PATH} instead of fetching them",
+        )
+
+    def handle(self, *args, **options):
+        self.had_errors = False
+
+        if options["from_fixture"]:
+            events = self._read_fixture()
+        else:
+            events = self._fetch_events()
+            if options["write_fixture"]:
+                self._write_fixture(events)
+
+        counts = DayEvent.objects.sync_source(
+            DayEvent.Source.PARLIAMENT,
+            events,
+            key_fields=("event_date", "url"),
+            start_date=FIRST_DATE,
+            end_date=LAST_DATE,
+            # If we couldn't fetch some pages, their links will be missing:
+            delete_missing=not self.had_errors,
+        )
+
+        self.stdout.write(
+            "DONE: "
+            f"{counts['created']} created, {counts['updated']} updated, "
+            f"{counts['unchanged']} the same, {counts['deleted']} deleted"
+        )
+
+    def _fetch_events(self):
+        """
+        Returns a list of dicts, one per DayEvent, for all of the links
+        found at URLS that are between FIRST_DATE and LAST_DATE.
+        """
+        events = []
 
         for place, urls in URLS.items():
             links = self._fetch_links_from_urls(urls)
@@ -83,30 +125,54 @@ class Command(BaseCommand):
 
             for link in links:
                 if link[1] >= FIRST_DATE and link[1] <= LAST_DATE:
-                    data_for_fixture.append(
-                        {
-                            "pk": None,
-                            "model": "events.dayevent",
-                            "fields": {
-                                "url": link[0],
-                                "event_date": link[1].strftime("%Y-%m-%d"),
-                                "title": place,
-                                "source": DayEvent.Source.PARLIAMENT,
-                                # NOTE: These values will actually be used for these
-                                # "auto_now" fields:
-                                "date_created": timezone.now().strftime(
-                                    "%Y-%m-%dT%H:%M:%S%z"
-                                ),
-                                "date_modified": timezone.now().strftime(
-                                    "%Y-%m-%dT%H:%M:%S%z"
-                                ),
-                            },
-                        }
+                    events.append(
+                        {"url": link[0], "event_date": link[1], "title": place}
                     )
                     link_count += 1
 
             self.stdout.write(f"Found {link_count} URLs for {place}")
 
+        return events
+
+    def _read_fixture(self):
+        "Returns a list of dicts, one per DayEvent, from FIXTURE_FILE_PATH."
+        with open(FIXTURE_FILE_PATH) as f:
+            data = json.load(f)
+
+        return [
+            {
+                "url": item["fields"]["url"],
+                "event_date": datetime.strptime(
+                    item["fields"]["event_date"], "%Y-%m-%d"
+                )
+                .replace(tzinfo=UTC)
+                .date(),
+                "title": item["fields"]["title"],
+            }
+            for item in data
+        ]
+
+    def _write_fixture(self, events):
+        "Writes a JSON fixture file of DayEvents to FIXTURE_FILE_PATH."
+        now = datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%S%z")
+        data_for_fixture = [
+            {
+                "pk": None,
+                "model": "events.dayevent",
+                "fields": {
+                    "url": event["url"],
+                    "event_date": event["event_date"].strftime("%Y-%m-%d"),
+                    "title": event["title"],
+                    "source": DayEvent.Source.PARLIAMENT,
+                    # NOTE: These values will actually be used for these
+                    # "auto_now" fields:
+                    "date_created": now,
+                    "date_modified": now,
+                },
+            }
+            for event in events
+        ]
+
         with open(FIXTURE_FILE_PATH, "w") as f:
             json.dump(data_for_fixture, f, indent=2)
 
@@ -130,6 +196,7 @@ class Command(BaseCommand):
             result = self._fetch_url(url)
             if result["success"] is False:
                 self.stderr.write(f"Error fetching: {url}: {result['content']}")
+                self.had_errors = True
             else:
                 links += self._extract_links_from_html(result["content"])
             # Be nice:
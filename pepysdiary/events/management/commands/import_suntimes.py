@@ -15,14 +15,19 @@ LAST_DATE = datetime.strptime("1669-05-31", "%Y-%m-%d").replace(tzinfo=UTC).date
 
 
 class Command(BaseCommand):
-    created = 0
-    updated = 0
-    ignored = 0
+    """
+    Creates or updates the sunrise and sunset DayEvents for every date in
+    the diary, from FIXTURE_FILE_PATH. Running it again with the same data
+    changes nothing.
+    """
+
+    help = "Creates or updates sunrise and sunset DayEvents from the fixture."
 
     def handle(self, *args, **kwargs):
         with open(FIXTURE_FILE_PATH) as f:
             data = json.load(f)
 
+        events = []
         for k, v in data.items():
             gregorian = datetime.strptime(k, "%Y-%m-%d").replace(tzinfo=UTC).date()
             julian = gregorian - timedelta(days=10)
@@ -42,39 +47,23 @@ class Command(BaseCommand):
                     .lower()
                 )
 
-                self._create_or_update(julian, f"{sunrise} sunrise", 1)
-                self._create_or_update(julian, f"{sunset} sunset", 2)
+                events.append(
+                    {"event_date": julian, "title": f"{sunrise} sunrise", "order": 1}
+                )
+                events.append(
+                    {"event_date": julian, "title": f"{sunset} sunset", "order": 2}
+                )
+
+        counts = DayEvent.objects.sync_source(
+            DayEvent.Source.TIMEANDDATE,
+            events,
+            key_fields=("event_date", "order"),
+            start_date=FIRST_DATE,
+            end_date=LAST_DATE,
+        )
 
         self.stdout.write(
             "DONE: "
-            f"{self.created} created, {self.updated} updated, {self.ignored} the same"
+            f"{counts['created']} created, {counts['updated']} updated, "
+            f"{counts['unchanged']} the same"
         )
-
-    def _create_or_update(self, date, title, order):
-        """
-        Creates a DayEvent with this date, title and order, or updates
-        the title if one already exists for that date and order.
-
-        date - Date object
-        title - String
-        order - Integer
-        """
-        try:
-            sunrise = DayEvent.objects.get(
-                source=DayEvent.Source.TIMEANDDATE, event_date=date, order=order
-            )
-        except DayEvent.DoesNotExist:
-            DayEvent.objects.create(
-                source=DayEvent.Source.TIMEANDDATE,
-                event_date=date,
-                order=order,
-                title=title,
-            )
-            self.created += 1
-        else:
-            if title == title:
-                self.ignored += 1
-            else:
-                sunrise.title = title
-                sunrise.save(update_fields=["title"])
-                self.updated += 1
@@ -0,0 +1,106 @@
+from django.db import models, transaction
+from django.utils import timezone
+
+from .on_this_day import on_this_day
+
+# The fields of a DayEvent that sync_source() sets.
+SYNCED_FIELDS = ("event_date", "title", "url", "order")
+
+
+class DayEventManager(models.Manager):
+    def sync_source(
+        self,
+        source,
+        events,
+        *,
+        key_fields,
+        start_date,
+        end_date,
+        delete_missing=False,
+        batch_size=1000,
+    ):
+        """
+        Makes the DayEvents of one Source, between start_date and end_date
+        inclusive, match `events`.
+
+        events - An iterable of dicts, each with an "event_date" and
+            "title", and optionally a "url" and "order".
+        key_fields - The names of the fields that identify an event, so
+            we know whether it already exists, e.g. ("event_date", "order").
+        delete_missing - If True, existing DayEvents that aren't in
+            `events` are deleted.
+
+        The existing DayEvents are read with one query and compared with
+        `events` in memory. Only new, changed, or deleted DayEvents are
+        written, in batches, in one transaction. So running it again with
+        the same data only does that one query.
+
+        Returns a dict with the numbers "created", "updated", "unchanged"
+        and "deleted".
+        """
+        existing = {}
+        duplicates = []
+        for event in self.filter(
+            source=source, event_date__gte=start_date, event_date__lte=end_date
+        ).order_by("pk"):
+            key = tuple(getattr(event, name) for name in key_fields)
+            if key in existing:
+                duplicates.append(event)
+            else:
+                existing[key] = event
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        # The dates of everything created, updated or deleted:
+        changed_dates = set()
+        seen = set()
+        unchanged = 0
+        for data in events:
+            values = {"url": "", "order": None, **data}
+            key = tuple(values[name] for name in key_fields)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            event = existing.get(key)
+            if event is None:
+                to_create.append(self.model(source=source, **values))
+                changed_dates.add(values["event_date"])
+            elif any(getattr(event, name) != values[name] for name in SYNCED_FIELDS):
+                changed_dates.update([event.event_date, values["event_date"]])
+                for name in SYNCED_FIELDS:
+                    setattr(event, name, values[name])
+                # bulk_update() doesn't set auto_now fields:
+                event.date_modified = now
+                to_update.append(event)
+            else:
+                unchanged += 1
+
+        to_delete = duplicates
+        if delete_missing:
+            to_delete += [event for key, event in existing.items() if key not in seen]
+        changed_dates.update(event.event_date for event in to_delete)
+
+        if to_create or to_update or to_delete:
+            with transaction.atomic(using=self.db):
+                self.bulk_create(to_create, batch_size=batch_size)
+                self.bulk_update(
+                    to_update,
+                    [*SYNCED_FIELDS, "date_modified"],
+                    batch_size=batch_size,
+                )
+                for i in range(0, len(to_delete), batch_size):
+                    self.filter(
+                        pk__in=[event.pk for event in to_delete[i : i + batch_size]]
+                    ).delete()
+                # Bulk operations don't send the signals that would keep the
+                # on-this-day index up to date.
+                on_this_day.dates_changed(changed_dates, using=self.db)
+
+        return {
+            "created": len(to_create),
+            "updated": len(to_update),
+            "unchanged": unchanged,
+            "deleted": len(to_delete),
+        }
@@ -2,6 +2,8 @@ from django.db import models
 
 from pepysdiary.common.models import OldDateMixin, PepysModel
 
+from .managers import DayEventManager
+
 
 class DayEvent(PepysModel, OldDateMixin):
     class Source(models.IntegerChoices):
@@ -20,6 +22,8 @@ class DayEvent(PepysModel, OldDateMixin):
         help_text="Optionally used to order events when grouped by Source",
     )
 
+    objects = DayEventManager()
+
     old_date_field = "event_date"
 
     class Meta:
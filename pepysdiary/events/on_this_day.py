@@ -0,0 +1,123 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from pepysdiary.common.caching import (
+    FRAGMENT_CACHE_TIMEOUT,
+    bump_cache_version,
+    get_cache_version,
+)
+
+
+class OnThisDayIndex:
+    """
+    Everything that happened on each date: its Diary Entries, Letters, and
+    DayEvents grouped by their Source. Kept in the shared Django cache, one
+    key per date, so that displaying them is a single lookup.
+
+    Each date's value is a dict like:
+
+        {
+            "entries": [(title, url), ...],
+            "letters": [(title, url), ...],
+            # Only the Sources that have events on this date, in order:
+            "events": [(source, [(title, url), ...]), ...],
+        }
+
+    A date is fetched from the database, with three queries, the first time
+    it's needed. Or the build_on_this_day command fills the cache for every
+    date at once. When an Entry, Letter or DayEvent is saved or deleted,
+    its date is forgotten (see events/signals.py). And dates expire after
+    cache_timeout seconds anyway, in case a change was missed.
+
+    Use the shared instance:
+
+        from pepysdiary.events.on_this_day import on_this_day
+        on_this_day.get(date)
+    """
+
+    cache_name = "events:on-this-day"
+    cache_timeout = FRAGMENT_CACHE_TIMEOUT
+
+    def get(self, date):
+        "Returns the dict of things that happened on this date."
+        key = self._cache_key(date)
+        day = cache.get(key)
+        if day is None:
+            day = self._build(date=date).get(date, self._empty_day())
+            cache.set(key, day, timeout=self.cache_timeout)
+        return day
+
+    def build(self):
+        """
+        Fetches everything for every date and puts it in the cache, in place
+        of anything already there. Returns the number of dates.
+        """
+        days = self._build()
+        self.invalidate()
+        cache.set_many(
+            {self._cache_key(date): day for date, day in days.items()},
+            timeout=self.cache_timeout,
+        )
+        return len(days)
+
+    def dates_changed(self, dates, using=None):
+        """
+        Call after things on these dates have been saved or deleted.
+        They're forgotten once the current transaction (if any) commits.
+        """
+        keys = {self._cache_key(date) for date in dates if date is not None}
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys), using=using)
+
+    def invalidate(self):
+        "Forget every date."
+        bump_cache_version(self.cache_name)
+
+    def _cache_key(self, date):
+        return f"{self.cache_name}:{get_cache_version(self.cache_name)}:{date}"
+
+    def _empty_day(self):
+        return {"entries": [], "letters": [], "events": []}
+
+    def _build(self, date=None):
+        """
+        Returns a dict of date: day dict, for every date with anything on
+        it, or only for `date`.
+        """
+        from pepysdiary.diary.models import Entry
+        from pepysdiary.letters.models import Letter
+
+        from .models import DayEvent
+
+        entries = Entry.objects.only("diary_date", "title")
+        letters = Letter.objects.only("letter_date", "title", "slug")
+        events = DayEvent.objects.filter(source__in=DayEvent.Source.values).order_by(
+            "event_date", "source", "order"
+        )
+        if date is not None:
+            entries = entries.filter(diary_date=date)
+            letters = letters.filter(letter_date=date)
+            events = events.filter(event_date=date)
+
+        days = defaultdict(self._empty_day)
+        for entry in entries:
+            days[entry.diary_date]["entries"].append(
+                (entry.title, entry.get_absolute_url())
+            )
+        for letter in letters:
+            days[letter.letter_date]["letters"].append(
+                (letter.title, letter.get_absolute_url())
+            )
+        for event_date, source, title, url in events.values_list(
+            "event_date", "source", "title", "url"
+        ):
+            day_events = days[event_date]["events"]
+            if not day_events or day_events[-1][0] != source:
+                day_events.append((source, []))
+            day_events[-1][1].append((title, url))
+        return dict(days)
+
+
+on_this_day = OnThisDayIndex()
@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from pepysdiary.diary.models import Entry
+from pepysdiary.letters.models import Letter
+
+from .models import DayEvent
+from .on_this_day import on_this_day
+
+# For each model in the on-this-day index: its date field, and the fields
+# the index uses. Saves that don't change any of those can be ignored.
+INDEXED_FIELDS = {
+    Entry: ("diary_date", {"diary_date", "title"}),
+    Letter: ("letter_date", {"letter_date", "title", "slug"}),
+    DayEvent: ("event_date", {"event_date", "title", "url", "source", "order"}),
+}
+
+
+def _is_relevant(sender, update_fields):
+    return update_fields is None or not INDEXED_FIELDS[sender][1].isdisjoint(
+        update_fields
+    )
+
+
+def indexed_pre_save(sender, instance, update_fields=None, **kwargs):
+    """
+    Before saving an existing object, store the date it had, in case it's
+    being moved to a different date...
+    """
+    instance._on_this_day_old_date = None
+    if instance._state.adding or not _is_relevant(sender, update_fields):
+        return
+    date_field = INDEXED_FIELDS[sender][0]
+    instance._on_this_day_old_date = (
+        sender._base_manager.filter(pk=instance.pk)
+        .values_list(date_field, flat=True)
+        .first()
+    )
+
+
+def indexed_post_save(sender, instance, using, update_fields=None, **kwargs):
+    "...then forget both its old and new dates in the on-this-day index."
+    if not _is_relevant(sender, update_fields):
+        return
+    date_field = INDEXED_FIELDS[sender][0]
+    on_this_day.dates_changed(
+        [
+            getattr(instance, date_field),
+            getattr(instance, "_on_this_day_old_date", None),
+        ],
+        using=using,
+    )
+
+
+def indexed_post_delete(sender, instance, using, **kwargs):
+    on_this_day.dates_changed(
+        [getattr(instance, INDEXED_FIELDS[sender][0])], using=using
+    )
+
+
+for model in INDEXED_FIELDS:
+    pre_save.connect(indexed_pre_save, sender=model)
+    post_save.connect(indexed_post_save, sender=model)
+    post_delete.connect(indexed_post_delete, sender=model)
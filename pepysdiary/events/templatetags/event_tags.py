@@ -2,9 +2,8 @@ from django import template
 from django.urls import reverse
 from django.utils.html import mark_safe
 
-from pepysdiary.diary.models import Entry
 from pepysdiary.events.models import DayEvent
-from pepysdiary.letters.models import Letter
+from pepysdiary.events.on_this_day import on_this_day
 
 register = template.Library()
 
@@ -30,52 +29,46 @@ def events_html(title, event_list):
     return html
 
 
-# Functions that generate HTML for DayEvents, Entries or Letters for a particular day.
+# Functions that generate HTML for DayEvents, Entries or Letters for a
+# particular day. Each is passed that day's dict from the on-this-day index.
 
 
-def dayevents_for_day(date):
+def dayevents_for_day(day):
     """
-    Returns HTML for displaying any DayEvents that happen on `date`.
+    Returns HTML for displaying any DayEvents on the day.
     Or an empty string if there aren't any.
     """
     html = ""
 
-    sources = {str(key): label for (key, label) in DayEvent.Source.choices}
+    sources = {key: label for (key, label) in DayEvent.Source.choices}
 
     # Temporarily remove the Josselin events as links are broken (#339):
-    # del sources[str(DayEvent.Source.JOSSELIN)]
-
-    # Makes a dict like:
-    # {"10": {}, "20": {}, "30": {}, "40": {}}
-    events_by_source = {key: {} for key in sources}
-
-    for ev in DayEvent.objects.filter(event_date=date).order_by("source", "order"):
-        # For each source, there *might* be several events with the same title
-        # so we create a list of events for each title, within each source.
-        source = str(ev.source)
-        if source in events_by_source:
-            if ev.title not in events_by_source[source]:
-                events_by_source[source][ev.title] = []
-            events_by_source[source][ev.title].append(ev)
-
-    for source_key, titles in list(events_by_source.items()):
-        if len(titles) > 0:
-            event_list = []
-            for title, events in list(titles.items()):
-                # So, title is the string that all the events share.
-                # events is now a list of DayEvent objects.
-                if len(events) == 1:
-                    # Only one event, so just list it.
-                    event_list.append({"url": events[0].url, "text": events[0].title})
-                else:
-                    #  Many events with the same title. So show numbered links.
-                    event_html = f"{title}: "
-                    for n, event in enumerate(events):
-                        event_html += f'<a href="{event.url}">{n + 1}</a> '
-                    event_list.append({"text": event_html})
-
-            # Make the HTML. sources[source_key] is like 'In Parliament'.
-            html += events_html(sources[source_key], event_list)
+    # del sources[DayEvent.Source.JOSSELIN]
+
+    for source, events in day["events"]:
+        if source not in sources:
+            continue
+
+        # There *might* be several events with the same title, so we make
+        # a list of the URLs of events for each title, within the source.
+        urls_by_title = {}
+        for title, url in events:
+            urls_by_title.setdefault(title, []).append(url)
+
+        event_list = []
+        for title, urls in urls_by_title.items():
+            if len(urls) == 1:
+                # Only one event, so just list it.
+                event_list.append({"url": urls[0], "text": title})
+            else:
+                #  Many events with the same title. So show numbered links.
+                event_html = f"{title}: "
+                for n, url in enumerate(urls):
+                    event_html += f'<a href="{url}">{n + 1}</a> '
+                event_list.append({"text": event_html})
+
+        # Make the HTML. sources[source] is like 'In Parliament'.
+        html += events_html(sources[source], event_list)
 
     if html != "":
         html += (
@@ -86,29 +79,21 @@ def dayevents_for_day(date):
     return html
 
 
-def entries_for_day(date):
+def entries_for_day(day):
     """
-    Returns HTML for links to any Diary Entries that were written on `date`.
+    Returns HTML for links to any Diary Entries that were written on the day.
     Or an empty string if there aren't any.
     """
-    event_list = []
-    entries = Entry.objects.filter(diary_date=date)
-    if len(entries) > 0:
-        for entry in entries:
-            event_list.append({"url": entry.get_absolute_url(), "text": entry.title})
+    event_list = [{"url": url, "text": title} for title, url in day["entries"]]
     return mark_safe(events_html("In the Diary", event_list))
 
 
-def letters_for_day(date):
+def letters_for_day(day):
     """
-    Returns HTML for links to any Letters that were written on `date`.
+    Returns HTML for links to any Letters that were written on the day.
     Or an empty string if there aren't any.
     """
-    event_list = []
-    letters = Letter.objects.filter(letter_date=date)
-    if len(letters) > 0:
-        for letter in letters:
-            event_list.append({"url": letter.get_absolute_url(), "text": letter.title})
+    event_list = [{"url": url, "text": title} for title, url in day["letters"]]
     return mark_safe(events_html("Letters", event_list))
 
 
@@ -117,12 +102,13 @@ def letters_for_day(date):
 
 @register.simple_tag
 def events_for_day(date, exclude=None):
+    day = on_this_day.get(date)
     html = ""
     if exclude != "entries":
-        html += entries_for_day(date)
+        html += entries_for_day(day)
     if exclude != "letters":
-        html += letters_for_day(date)
-    html += dayevents_for_day(date)
+        html += letters_for_day(day)
+    html += dayevents_for_day(day)
     return mark_safe(html)
 
 
@@ -6,4 +6,5 @@ class IndepthConfig(AppConfig):
     default_auto_field = "django.db.models.AutoField"
 
     def ready(self):
-        from pepysdiary.common import signals  # noqa: F401
+        # So that its cached feed is forgotten whenever its models change.
+        from . import feeds as indepth_feeds  # noqa: F401
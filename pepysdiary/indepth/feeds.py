@@ -6,6 +6,7 @@ from .models import Article
 class LatestArticlesFeed(BaseRSSFeed):
     title = "The Diary of Samuel Pepys - In-Depth Articles"
     description = "Articles about Samuel Pepys and his world"
+    cached_models = (Article,)
 
     def items(self):
         return Article.published_articles.all().order_by("-date_published")[:2]
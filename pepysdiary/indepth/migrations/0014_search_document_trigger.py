@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Made by pepysdiary.common.search.search_trigger_sql() from the model's
+# search_fields at the time, and copied here so that it doesn't change.
+SQL = """
+    CREATE FUNCTION indepth_article_search_document() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT'
+                OR OLD.title IS DISTINCT FROM NEW.title
+                OR OLD.intro IS DISTINCT FROM NEW.intro
+                OR OLD.text IS DISTINCT FROM NEW.text THEN
+            NEW.search_document :=
+                setweight(to_tsvector(COALESCE(NEW.title, '')), 'A') ||
+                setweight(to_tsvector(COALESCE(NEW.intro, '')), 'B') ||
+                setweight(to_tsvector(COALESCE(NEW.text, '')), 'B');
+        ELSIF NEW.search_document IS NULL THEN
+            NEW.search_document := OLD.search_document;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER indepth_article_search_document
+        BEFORE INSERT OR UPDATE OF title, intro, text, search_document
+        ON indepth_article
+        FOR EACH ROW EXECUTE FUNCTION indepth_article_search_document();
+"""
+
+REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS indepth_article_search_document ON indepth_article;
+    DROP FUNCTION IF EXISTS indepth_article_search_document();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("indepth", "0013_auto_20211112_1643"),
+    ]
+
+    operations = [
+        migrations.RunSQL(SQL, REVERSE_SQL),
+    ]
@@ -6,12 +6,13 @@ from django.utils import timezone
 from django_comments.moderation import CommentModerator, moderator
 from markdown import markdown
 
-from pepysdiary.common.models import PepysModel
+from pepysdiary.common.models import PepysModel, SearchableMixin
+from pepysdiary.common.search import search_index
 
 from .managers import PublishedArticleManager
 
 
-class Article(PepysModel):
+class Article(SearchableMixin, PepysModel):
     """
     An In-Depth Article.
     """
@@ -104,8 +105,10 @@ class Article(PepysModel):
         help_text="e.g. if this is a book review, the author(s) of the book",
     )
 
-    # Also see index_components() method.
+    # Made from search_fields. See common.search.
     search_document = SearchVectorField(null=True)
+    search_fields = (("title", "A"), ("intro", "B"), ("text", "B"))
+    search_summary_fields = ("title", "intro_html", "text_html")
 
     objects = models.Manager()
     published_articles = PublishedArticleManager()
@@ -137,12 +140,6 @@ class Article(PepysModel):
             },
         )
 
-    def index_components(self):
-        """Used by common.signals.on_save() to update the SearchVector on
-        self.search_document.
-        """
-        return ((self.title, "A"), (self.intro, "B"), (self.text, "B"))
-
     @property
     def category_title(self):
         """
@@ -176,3 +173,5 @@ class ArticleModerator(CommentModerator):
 
 
 moderator.register(Article, ArticleModerator)
+
+search_index.register(Article)
@@ -6,6 +6,7 @@ from .models import Letter
 class LatestLettersFeed(BaseRSSFeed):
     title = "Pepys' Diary - Letters"
     description = "Letters sent by or to Samuel Pepys"
+    cached_models = (Letter,)
 
     def items(self):
         return Letter.objects.all().order_by("-date_created")[:3]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Made by pepysdiary.common.search.search_trigger_sql() from the model's
+# search_fields at the time, and copied here so that it doesn't change.
+SQL = """
+    CREATE FUNCTION letters_letter_search_document() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT'
+                OR OLD.title IS DISTINCT FROM NEW.title
+                OR OLD.text IS DISTINCT FROM NEW.text
+                OR OLD.footnotes IS DISTINCT FROM NEW.footnotes THEN
+            NEW.search_document :=
+                setweight(to_tsvector(COALESCE(NEW.title, '')), 'A') ||
+                setweight(to_tsvector(COALESCE(NEW.text, '')), 'B') ||
+                setweight(to_tsvector(COALESCE(NEW.footnotes, '')), 'C');
+        ELSIF NEW.search_document IS NULL THEN
+            NEW.search_document := OLD.search_document;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER letters_letter_search_document
+        BEFORE INSERT OR UPDATE OF title, text, footnotes, search_document
+        ON letters_letter
+        FOR EACH ROW EXECUTE FUNCTION letters_letter_search_document();
+"""
+
+REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS letters_letter_search_document ON letters_letter;
+    DROP FUNCTION IF EXISTS letters_letter_search_document();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("letters", "0010_letter_intro"),
+    ]
+
+    operations = [
+        migrations.RunSQL(SQL, REVERSE_SQL),
+    ]
@@ -1,18 +1,16 @@
-import re
-
 from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.urls import reverse
 from django_comments.moderation import CommentModerator, moderator
 
-from pepysdiary.common.models import OldDateMixin, PepysModel
-from pepysdiary.encyclopedia.models import Topic
+from pepysdiary.common.models import OldDateMixin, PepysModel, SearchableMixin
+from pepysdiary.common.search import search_index
 
 from .managers import LetterManager
 
 
-class Letter(PepysModel, OldDateMixin):
+class Letter(SearchableMixin, PepysModel, OldDateMixin):
     class Source(models.IntegerChoices):
         GUY_DE_LA_BEDOYERE = 10, "Guy de la Bédoyère - Particular Friends"
         GUY_DE_LA_BEDOYERE_2 = 15, "Guy de la Bédoyère - The Letters of Samuel Pepys"
@@ -77,8 +75,10 @@ class Letter(PepysModel, OldDateMixin):
     old_date_field = "letter_date"
     comment_name = "annotation"
 
-    # Also see index_components() method.
+    # Made from search_fields. See common.search.
     search_document = SearchVectorField(null=True)
+    search_fields = (("title", "A"), ("text", "B"), ("footnotes", "C"))
+    search_summary_fields = ("title", "text", "footnotes")
 
     # Will also have a 'topics' ManyToMany field, from Topic.
 
@@ -109,39 +109,12 @@ class Letter(PepysModel, OldDateMixin):
             },
         )
 
-    def index_components(self):
-        """Used by common.signals.on_save() to update the SearchVector on
-        self.search_document.
-        """
-        return (
-            (self.title, "A"),
-            (self.text, "B"),
-            (self.footnotes, "C"),
-        )
-
     def make_references(self):
         """
         Sets all the Encyclopedia Topics the text of this letter (and
         footnotes) refers to. Saves them to the database.
         """
-        self.topics.clear()
-        # Get a list of all the Topic IDs mentioned in text and footnotes:
-        ids = re.findall(
-            r"pepysdiary.com\/encyclopedia\/(\d+)\/", f"{self.text} {self.footnotes}"
-        )
-        # Make sure list of Topic IDs is unique:
-        # From http://stackoverflow.com/a/480227/250962
-        seen = set()
-        seen_add = seen.add
-        unique_ids = [id for id in ids if id not in seen and not seen_add(id)]
-
-        for id in unique_ids:
-            try:
-                topic = Topic.objects.get(pk=id)
-                topic.letter_references.add(self)
-            except Topic.DoesNotExist:
-                # Ignore invalid/broken links
-                pass
+        Letter.objects.make_references([self])
 
     @property
     def short_date(self):
@@ -165,3 +138,5 @@ class LetterModerator(CommentModerator):
 
 
 moderator.register(Letter, LetterModerator)
+
+search_index.register(Letter)
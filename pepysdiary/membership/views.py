@@ -210,6 +210,7 @@ class ProfileView(SingleObjectMixin, PaginatedListView):
     template_name = "membership/person_detail.html"
     paginate_by = 20
     allow_empty = True
+    cursor_ordering = ("-submit_date", "-pk")
 
     def get(self, request, *args, **kwargs):
         self.object = self.get_object(
@@ -224,8 +225,10 @@ class ProfileView(SingleObjectMixin, PaginatedListView):
         return context
 
     def get_queryset(self):
-        return Annotation.visible_objects.filter(user=self.object).order_by(
-            "-submit_date"
+        return (
+            Annotation.visible_objects.filter(user=self.object)
+            .prefetch_content_objects()
+            .order_by("-submit_date", "-pk")
         )
 
 
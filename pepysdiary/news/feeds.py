@@ -6,6 +6,7 @@ from .models import Post
 class LatestPostsFeed(BaseRSSFeed):
     title = "The Diary of Samuel Pepys - Site News"
     description = "News about the Diary of Samuel Pepys website"
+    cached_models = (Post,)
 
     def items(self):
         return Post.published_posts.all().order_by("-date_published")[:3]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Made by pepysdiary.common.search.search_trigger_sql() from the model's
+# search_fields at the time, and copied here so that it doesn't change.
+SQL = """
+    CREATE FUNCTION news_post_search_document() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT'
+                OR OLD.title IS DISTINCT FROM NEW.title
+                OR OLD.intro IS DISTINCT FROM NEW.intro
+                OR OLD.text IS DISTINCT FROM NEW.text THEN
+            NEW.search_document :=
+                setweight(to_tsvector(COALESCE(NEW.title, '')), 'A') ||
+                setweight(to_tsvector(COALESCE(NEW.intro, '')), 'B') ||
+                setweight(to_tsvector(COALESCE(NEW.text, '')), 'B');
+        ELSIF NEW.search_document IS NULL THEN
+            NEW.search_document := OLD.search_document;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER news_post_search_document
+        BEFORE INSERT OR UPDATE OF title, intro, text, search_document
+        ON news_post
+        FOR EACH ROW EXECUTE FUNCTION news_post_search_document();
+"""
+
+REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS news_post_search_document ON news_post;
+    DROP FUNCTION IF EXISTS news_post_search_document();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("news", "0004_populate_post_search_index"),
+    ]
+
+    operations = [
+        migrations.RunSQL(SQL, REVERSE_SQL),
+    ]
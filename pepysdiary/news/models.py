@@ -5,12 +5,13 @@ from django.utils import timezone
 from django_comments.moderation import CommentModerator, moderator
 from markdown import markdown
 
-from pepysdiary.common.models import PepysModel
+from pepysdiary.common.models import PepysModel, SearchableMixin
+from pepysdiary.common.search import search_index
 
 from .managers import PublishedPostManager
 
 
-class Post(PepysModel):
+class Post(SearchableMixin, PepysModel):
     """
     A Site News Post.
     """
@@ -59,8 +60,10 @@ class Post(PepysModel):
         max_length=25, blank=False, null=False, db_index=True, choices=Category.choices
     )
 
-    # Also see index_components() method.
+    # Made from search_fields. See common.search.
     search_document = SearchVectorField(null=True)
+    search_fields = (("title", "A"), ("intro", "B"), ("text", "B"))
+    search_summary_fields = ("title", "intro_html", "text_html")
 
     objects = models.Manager()
     published_posts = PublishedPostManager()
@@ -92,12 +95,6 @@ class Post(PepysModel):
             },
         )
 
-    def index_components(self):
-        """Used by common.signals.on_save() to update the SearchVector on
-        self.search_document.
-        """
-        return ((self.title, "A"), (self.intro, "B"), (self.text, "B"))
-
     @property
     def category_title(self):
         """
@@ -131,3 +128,5 @@ class PostModerator(CommentModerator):
 
 
 moderator.register(Post, PostModerator)
+
+search_index.register(Post)
@@ -0,0 +1,88 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from pepysdiary.annotations.factories import (
+    EntryAnnotationFactory,
+    TopicAnnotationFactory,
+)
+from pepysdiary.annotations.models import Annotation
+from pepysdiary.common.utilities import make_datetime
+from pepysdiary.diary.factories import EntryFactory
+from pepysdiary.diary.models import Entry
+from pepysdiary.encyclopedia.factories import TopicFactory
+from pepysdiary.encyclopedia.models import Topic
+
+
+class RecountCommentsTestCase(TestCase):
+    def test_recounts(self):
+        "It should fix comment_counts and last_comment_times that are wrong"
+        entry_1 = EntryFactory()
+        entry_2 = EntryFactory()
+        topic = TopicFactory()
+        EntryAnnotationFactory(
+            content_object=entry_1, submit_date=make_datetime("2021-04-09 12:00:00")
+        )
+        EntryAnnotationFactory(
+            content_object=entry_1, submit_date=make_datetime("2021-04-10 12:00:00")
+        )
+        EntryAnnotationFactory(
+            content_object=entry_1,
+            submit_date=make_datetime("2021-04-11 12:00:00"),
+            is_removed=True,
+        )
+        TopicAnnotationFactory(
+            content_object=topic, submit_date=make_datetime("2021-04-12 12:00:00")
+        )
+
+        Entry.objects.update(comment_count=99, last_comment_time=None)
+        Topic.objects.update(comment_count=0, last_comment_time=None)
+
+        out = StringIO()
+        call_command("recount_comments", stdout=out)
+
+        entry_1.refresh_from_db()
+        self.assertEqual(entry_1.comment_count, 2)
+        self.assertEqual(
+            entry_1.last_comment_time, make_datetime("2021-04-10 12:00:00")
+        )
+
+        entry_2.refresh_from_db()
+        self.assertEqual(entry_2.comment_count, 0)
+        self.assertIsNone(entry_2.last_comment_time)
+
+        topic.refresh_from_db()
+        self.assertEqual(topic.comment_count, 1)
+        self.assertEqual(topic.last_comment_time, make_datetime("2021-04-12 12:00:00"))
+
+        self.assertIn("Recounted comments on 2 Entries.", out.getvalue())
+
+
+class RenderCommentsTestCase(TestCase):
+    def test_renders(self):
+        "It should set the comment_html and reading of Annotations that need it"
+        annotation_1 = EntryAnnotationFactory(
+            comment="One", submit_date=make_datetime("2013-01-02 12:00:00")
+        )
+        annotation_2 = EntryAnnotationFactory(
+            comment="Two", submit_date=make_datetime("2003-01-02 12:00:00")
+        )
+        EntryAnnotationFactory(
+            comment="Three", submit_date=make_datetime("2023-01-02 12:00:00")
+        )
+        Annotation.objects.filter(pk__in=[annotation_1.pk, annotation_2.pk]).update(
+            comment_html="", reading=0
+        )
+
+        out = StringIO()
+        # Small batches, to check they all get done:
+        call_command("render_comments", "--batch-size=2", stdout=out)
+
+        annotation_1.refresh_from_db()
+        self.assertEqual(annotation_1.comment_html, "<p>One</p>")
+        self.assertEqual(annotation_1.reading, 2)
+        annotation_2.refresh_from_db()
+        self.assertEqual(annotation_2.comment_html, "<p>Two</p>")
+        self.assertEqual(annotation_2.reading, 1)
+        self.assertIn("Rendered 2 annotations.", out.getvalue())
@@ -4,7 +4,13 @@ from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
 
-from pepysdiary.annotations.factories import EntryAnnotationFactory
+from pepysdiary.annotations.factories import (
+    ArticleAnnotationFactory,
+    EntryAnnotationFactory,
+    LetterAnnotationFactory,
+    PostAnnotationFactory,
+    TopicAnnotationFactory,
+)
 from pepysdiary.annotations.models import Annotation
 from pepysdiary.common.utilities import make_datetime
 from pepysdiary.diary.factories import EntryFactory
@@ -147,6 +153,58 @@ class AnnotationTestCase(TestCase):
         self.assertEqual(entry.comment_count, 1)
         self.assertEqual(entry.last_comment_time, annotation_1.submit_date)
 
+    def test_parent_comment_data_on_removing(self):
+        "When an annotation is removed, the parent's comment data should be updated"
+        entry = EntryFactory()
+        annotation_1 = EntryAnnotationFactory(
+            content_object=entry, submit_date=make_datetime("2021-04-09 12:00:00")
+        )
+        annotation_2 = EntryAnnotationFactory(
+            content_object=entry, submit_date=make_datetime("2021-04-10 12:00:00")
+        )
+
+        annotation_2.is_removed = True
+        annotation_2.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.comment_count, 1)
+        self.assertEqual(entry.last_comment_time, annotation_1.submit_date)
+
+        # And back again, after fetching it fresh:
+        annotation_2 = Annotation.objects.get(pk=annotation_2.pk)
+        annotation_2.is_removed = False
+        annotation_2.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.comment_count, 2)
+        self.assertEqual(entry.last_comment_time, annotation_2.submit_date)
+
+    def test_parent_comment_data_on_changing_date(self):
+        "If the submit_date changes, the parent's last_comment_time should change"
+        entry = EntryFactory()
+        annotation_1 = EntryAnnotationFactory(
+            content_object=entry, submit_date=make_datetime("2021-04-09 12:00:00")
+        )
+        annotation_2 = EntryAnnotationFactory(
+            content_object=entry, submit_date=make_datetime("2021-04-10 12:00:00")
+        )
+
+        annotation_2.submit_date = make_datetime("2021-04-08 12:00:00")
+        annotation_2.save()
+        entry.refresh_from_db()
+
+        self.assertEqual(entry.comment_count, 2)
+        self.assertEqual(entry.last_comment_time, annotation_1.submit_date)
+
+    def test_parent_comment_data_does_not_save_parent(self):
+        "Only the parent's comment fields should be updated, not the whole object"
+        entry = EntryFactory()
+        date_modified = entry.date_modified
+
+        EntryAnnotationFactory(content_object=entry)
+        entry.refresh_from_db()
+
+        self.assertEqual(entry.comment_count, 1)
+        self.assertEqual(entry.date_modified, date_modified)
+
     def test_parent_comment_data_no_content_type_model(self):
         "If the content_type has no associated model saving should raise an exception"
         ct = ContentType()
@@ -270,6 +328,28 @@ class AnnotationTestCase(TestCase):
         )
         self.assertEqual(annotation.reading, 3)
 
+    def test_comment_html(self):
+        "It should store the comment with linked URLs and paragraphs"
+        annotation = EntryAnnotationFactory(
+            comment="See https://www.example.com/page\n\nThanks <b>all</b>"
+        )
+        self.assertEqual(
+            annotation.comment_html,
+            '<p>See <a href="https://www.example.com/page" rel="nofollow">'
+            "www.example.com/page</a></p>\n\n<p>Thanks all</p>",
+        )
+
+    def test_comment_html_update_fields(self):
+        "Saving only the comment should also save its comment_html and reading"
+        annotation = EntryAnnotationFactory(comment="Hello")
+        annotation.comment = "Goodbye"
+        annotation.submit_date = datetime(2023, 1, 1, 1, 0, 0, tzinfo=UTC)
+        annotation.save(update_fields=["comment", "submit_date"])
+
+        annotation.refresh_from_db()
+        self.assertEqual(annotation.comment_html, "<p>Goodbye</p>")
+        self.assertEqual(annotation.reading, 3)
+
     def test_reading_unknown(self):
         "Should return the biggest reading num for an annotation posted way beyond it"
         annotation = EntryAnnotationFactory(
@@ -304,3 +384,31 @@ class AnnotationTestCase(TestCase):
         "It should return the url from the annotation if there's no user object"
         annotation = EntryAnnotationFactory(user=None, user_url="http://foo.com")
         self.assertEqual(annotation.get_user_url(), "http://foo.com")
+
+
+class AnnotationQuerySetTestCase(TestCase):
+    def test_prefetch_content_objects(self):
+        "It should fetch the objects with one query per model"
+        entry = EntryFactory(title="An Entry")
+        annotations = [
+            EntryAnnotationFactory(content_object=entry),
+            EntryAnnotationFactory(content_object=entry),
+            LetterAnnotationFactory(),
+            TopicAnnotationFactory(),
+            ArticleAnnotationFactory(),
+            PostAnnotationFactory(),
+        ]
+
+        # 1 for the Annotations, 1 for each of the 5 kinds of object:
+        with self.assertNumQueries(6):
+            fetched = list(Annotation.objects.prefetch_content_objects().order_by("pk"))
+            links = [
+                (a.content_object.title, a.content_object.get_absolute_url())
+                for a in fetched
+            ]
+
+        self.assertEqual(fetched, annotations)
+        self.assertEqual(links[0], ("An Entry", entry.get_absolute_url()))
+        self.assertEqual(fetched[0].content_object, entry)
+        self.assertEqual(fetched[0].content_object.title, "An Entry")
+        self.assertIn("text", fetched[0].content_object.get_deferred_fields())
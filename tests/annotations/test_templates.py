@@ -1,6 +1,7 @@
 from django.test import TestCase
 
 from pepysdiary.annotations.factories import EntryAnnotationFactory
+from pepysdiary.annotations.models import Annotation
 from pepysdiary.diary.factories import EntryFactory
 from pepysdiary.membership.factories import PersonFactory
 
@@ -9,7 +10,9 @@ class CommentTemplateTest(TestCase):
     def setUp(self):
         self.user = PersonFactory()
         self.entry = EntryFactory()
-        EntryAnnotationFactory(content_object=self.entry, user=self.user)
+        self.annotation = EntryAnnotationFactory(
+            content_object=self.entry, user=self.user, comment="Hello www.example.com"
+        )
 
     def test_profile_link_enabled_when_user_active(self):
         expected_link = (
@@ -33,3 +36,23 @@ class CommentTemplateTest(TestCase):
 
         self.assertContains(response, "1 Annotation", html=True)
         self.assertNotContains(response, expected_link, html=True)
+
+    def test_uses_stored_comment_html(self):
+        Annotation.objects.filter(pk=self.annotation.pk).update(
+            comment_html="<p>Stored HTML</p>"
+        )
+        response = self.client.get(self.entry.get_absolute_url())
+
+        self.assertContains(response, "<p>Stored HTML</p>", html=True)
+
+    def test_renders_comment_without_stored_html(self):
+        "Annotations saved before comment_html existed should still display"
+        Annotation.objects.filter(pk=self.annotation.pk).update(comment_html="")
+        response = self.client.get(self.entry.get_absolute_url())
+
+        self.assertContains(
+            response,
+            '<p>Hello <a href="http://www.example.com" rel="nofollow">'
+            "www.example.com</a></p>",
+            html=True,
+        )
@@ -14,12 +14,16 @@ from pepysdiary.annotations.factories import (
 )
 from pepysdiary.common.utilities import make_date, make_datetime
 from pepysdiary.diary.factories import EntryFactory
+from pepysdiary.encyclopedia import category_lookups
 from pepysdiary.encyclopedia.factories import (
     PersonTopicFactory,
     PlaceTopicFactory,
     TopicFactory,
 )
 from pepysdiary.encyclopedia.models import Category
+from pepysdiary.events.factories import DayEventFactory
+from pepysdiary.events.models import DayEvent
+from pepysdiary.letters.factories import LetterFactory
 
 
 class SiteAPITestCase(APITestCase):
@@ -208,6 +212,24 @@ class CategoryListViewTestCase(SiteAPITestCase):
         )
         self.assertEqual(len(response.data["results"]), 50)
 
+    def test_num_queries(self):
+        "It shouldn't make extra queries for each Category's parents and children"
+        animals = Category.add_root(id=9990, title="Animals", slug="animals")
+        for n in range(10):
+            dog = animals.add_child(id=9991 + n, title=f"Dog {n}", slug=f"dog-{n}")
+            animals = Category.objects.get(pk=animals.pk)
+            dog.add_child(id=9901 + n, title=f"Puppy {n}", slug=f"puppy-{n}")
+
+        url = reverse("api:category-list", kwargs={"format": "json"})
+        # Loads the in-memory tree of Categories:
+        self.client.get(url, SERVER_NAME="example.com")
+
+        # Count and Categories:
+        with self.assertNumQueries(2):
+            response = self.client.get(url, SERVER_NAME="example.com")
+
+        self.assertEqual(len(response.data["results"]), 21)
+
 
 class CategoryDetailViewTestCase(SiteAPITestCase):
     def test_response_200(self):
@@ -263,6 +285,73 @@ class CategoryDetailViewTestCase(SiteAPITestCase):
         )
 
 
+class DayDetailViewTestCase(SiteAPITestCase):
+    def test_response_200(self):
+        "It should return 200, even for a date with nothing on it"
+        response = self.client.get(
+            reverse(
+                "api:day-detail", kwargs={"day_date": "1660-01-02", "format": "json"}
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_response_404(self):
+        "It should return 404 for an invalid date"
+        response = self.client.get(
+            reverse(
+                "api:day-detail", kwargs={"day_date": "1660-02-31", "format": "json"}
+            )
+        )
+        self.assertEqual(response.data["status_code"], 404)
+
+    def test_response_data(self):
+        "It should return the correct data"
+        date = make_date("1660-01-02")
+        EntryFactory(title="Entry 1", diary_date=date)
+        LetterFactory(title="Letter 1", slug="letter-1", letter_date=date)
+        DayEventFactory(
+            title="Event 1",
+            url="https://example.org/1",
+            source=DayEvent.Source.PARLIAMENT,
+            event_date=date,
+        )
+        # Shouldn't be included:
+        EntryFactory(diary_date=make_date("1660-01-03"))
+
+        response = self.client.get(
+            reverse("api:day-detail", kwargs={"day_date": "1660-01-02"}),
+            SERVER_NAME="example.com",
+        )
+
+        self.assertEqual(
+            response.data,
+            {
+                "date": "1660-01-02",
+                "entries": [
+                    {
+                        "title": "Entry 1",
+                        "webURL": "http://example.com/diary/1660/01/02/",
+                    }
+                ],
+                "letters": [
+                    {
+                        "title": "Letter 1",
+                        "webURL": "http://example.com/letters/1660/01/02/letter-1/",
+                    }
+                ],
+                "dayEvents": [
+                    {
+                        "source": 20,
+                        "sourceName": "In Parliament",
+                        "events": [
+                            {"title": "Event 1", "url": "https://example.org/1"}
+                        ],
+                    }
+                ],
+            },
+        )
+
+
 class EntryListViewTestCase(SiteAPITestCase):
     def test_response_200(self):
         "It should return 200"
@@ -558,6 +647,36 @@ class TopicListViewTestCase(SiteAPITestCase):
             ),
         )
 
+    def test_num_queries(self):
+        "It shouldn't make extra queries for each Topic's kind"
+        people = Category.add_root(
+            id=category_lookups.PEOPLE, title="People", slug="people"
+        )
+        places = Category.add_root(
+            id=category_lookups.PLACES, title="Places", slug="places"
+        )
+        london = places.add_child(id=9997, title="London", slug="london")
+        streets = london.add_child(id=9998, title="Streets", slug="streets")
+        other = Category.add_root(id=9999, title="Animals", slug="animals")
+
+        for _ in range(10):
+            PersonTopicFactory(categories=[people])
+            PlaceTopicFactory(categories=[streets, london])
+            TopicFactory(categories=[other])
+
+        url = reverse("api:topic-list", kwargs={"format": "json"})
+        # Loads the in-memory tree of Categories:
+        self.client.get(url, SERVER_NAME="example.com")
+
+        # Count, Topics, and their Categories:
+        with self.assertNumQueries(3):
+            response = self.client.get(url, SERVER_NAME="example.com")
+
+        kinds = [result["kind"] for result in response.data["results"]]
+        self.assertEqual(kinds.count("person"), 10)
+        self.assertEqual(kinds.count("place"), 10)
+        self.assertEqual(kinds.count("default"), 10)
+
     def test_response_pagination(self):
         """Pagination-related results should be correct."""
         cat = Category.add_root(title="Animals", slug="animals")
@@ -1,4 +1,6 @@
-from django.test import TestCase
+import time_machine
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 from pepysdiary.annotations.factories import (
     ArticleAnnotationFactory,
@@ -11,6 +13,7 @@ from pepysdiary.common.templatetags.list_tags import (
     latest_commented_articles,
     latest_commented_entries,
     latest_commented_letters,
+    latest_commented_lists,
     latest_commented_posts,
     latest_commented_topics,
 )
@@ -345,3 +348,110 @@ class ListTagsTestCase(TestCase):
     def test_no_results(self):
         "If there are no commented items it should return None"
         self.assertIsNone(latest_commented_entries({}, "Title"))
+
+    def test_latest_comment_per_object(self):
+        "Only the most recent visible comment on each object should be used"
+        entry = EntryFactory()
+        EntryAnnotationFactory(
+            user_name="Name 1",
+            content_object=entry,
+            submit_date=make_datetime("2021-04-09 01:00:00"),
+        )
+        EntryAnnotationFactory(
+            user_name="Name 2",
+            content_object=entry,
+            submit_date=make_datetime("2021-04-10 01:00:00"),
+        )
+        EntryAnnotationFactory(
+            user_name="Name 3",
+            content_object=entry,
+            submit_date=make_datetime("2021-04-11 01:00:00"),
+            is_removed=True,
+        )
+
+        result = latest_commented_entries({}, "Test Title")
+
+        self.assertEqual(len(result["comments"]), 1)
+        self.assertEqual(result["comments"][0]["user_name"], "Name 2")
+
+    def test_num_queries(self):
+        "It should use one query for the objects and one for the comments"
+        for _ in range(3):
+            EntryAnnotationFactory(content_object=EntryFactory())
+
+        # Once first, to cache the ContentType and current Site:
+        latest_commented_entries({}, "Test Title")
+        with self.assertNumQueries(2):
+            latest_commented_entries({}, "Test Title")
+
+
+class LatestCommentedListsTestCase(TestCase):
+    def test_lists(self):
+        "It should render a list for each kind of thing that has comments"
+        entry = EntryFactory()
+        topic = TopicFactory()
+        EntryAnnotationFactory(content_object=entry, user_name="Entry Name")
+        TopicAnnotationFactory(content_object=topic, user_name="Topic Name")
+
+        html = latest_commented_lists({})
+
+        self.assertIn("Most recently annotated Diary Entries", html)
+        self.assertIn(entry.title, html)
+        self.assertIn("Entry Name", html)
+        self.assertIn("Most recently annotated Encyclopedia Topics", html)
+        self.assertIn(topic.title, html)
+        self.assertIn("Topic Name", html)
+        self.assertNotIn("Most recently annotated Letters", html)
+
+    def test_num_queries(self):
+        "It should use one query per model and one for all the comments"
+        EntryAnnotationFactory(content_object=EntryFactory())
+        TopicAnnotationFactory(content_object=TopicFactory())
+        LetterAnnotationFactory(content_object=LetterFactory())
+        ArticleAnnotationFactory(content_object=PublishedArticleFactory())
+        PostAnnotationFactory(content_object=PublishedPostFactory())
+
+        # Once first, to cache the ContentTypes and current Site:
+        latest_commented_lists({})
+        with self.assertNumQueries(6):
+            latest_commented_lists({})
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_cached_until_annotation_saved(self):
+        "The HTML should be cached until an Annotation is saved"
+        entry = EntryFactory()
+        EntryAnnotationFactory(
+            content_object=entry,
+            user_name="Name 1",
+            submit_date=make_datetime("2021-04-09 01:00:00"),
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            latest_commented_lists({})
+
+        with self.assertNumQueries(0):
+            latest_commented_lists({})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EntryAnnotationFactory(
+                content_object=entry,
+                user_name="Name 2",
+                submit_date=make_datetime("2021-04-10 01:00:00"),
+            )
+
+        self.assertIn("Name 2", latest_commented_lists({}))
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_cache_expires(self):
+        "The cached HTML shouldn't be kept forever"
+        cache.clear()
+        EntryAnnotationFactory(content_object=EntryFactory())
+        with time_machine.travel("2021-04-10 12:00:00 +0000", tick=False) as t:
+            latest_commented_lists({})
+            t.move_to("2021-04-10 13:01:00 +0000")
+            with self.assertNumQueries(6):
+                latest_commented_lists({})
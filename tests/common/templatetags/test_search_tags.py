@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 
 from pepysdiary.annotations.factories import ArticleAnnotationFactory
+from pepysdiary.common.templatetags import search_tags
 from pepysdiary.common.templatetags.search_tags import search_summary
 from pepysdiary.diary.factories import EntryFactory
 from pepysdiary.encyclopedia.factories import TopicFactory
@@ -10,6 +13,42 @@ from pepysdiary.news.factories import PublishedPostFactory
 
 
 class SearchSummaryTestCase(TestCase):
+    def setUp(self):
+        search_tags._summaries.clear()
+
+    def test_search_headline(self):
+        "It should use the headline made in the database, if there is one"
+        entry = EntryFactory(text="This is about cats.")
+        entry.search_headline = "This is about \x02cats\x03 &amp; &lt;dogs"
+
+        self.assertEqual(
+            search_summary(entry, "cats"), "This is about <b>cats</b> &amp; &lt;dogs"
+        )
+
+    def test_cached(self):
+        "It should only make the summary once per text and search string"
+        entry = EntryFactory(text="This is about cats.")
+        with patch.object(
+            search_tags,
+            "_make_search_summary",
+            wraps=search_tags._make_search_summary,
+        ) as make_search_summary:
+            result = search_summary(entry, "cats")
+            self.assertEqual(search_summary(entry, "cats"), result)
+            self.assertEqual(make_search_summary.call_count, 1)
+
+            self.assertNotEqual(search_summary(entry, "dogs"), result)
+            self.assertEqual(make_search_summary.call_count, 2)
+
+    def test_cached_annotation_edited(self):
+        "An edited Annotation, which has no date_modified, gets a new summary"
+        annotation = ArticleAnnotationFactory(comment="This is about cats.")
+        result = search_summary(annotation, "cats")
+
+        annotation.comment = "This is still about cats."
+        annotation.save()
+        self.assertNotEqual(search_summary(annotation, "cats"), result)
+
     def test_annotation(self):
         annotation = ArticleAnnotationFactory(
             comment=(
@@ -1,5 +1,6 @@
+from django.core.cache import cache
 from django.template import Context, Template
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from pepysdiary.common.templatetags.widget_tags import (
@@ -307,6 +308,46 @@ class AllArticlesTestCase(TestCase):
         )
 
 
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class CachedWidgetsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_latest_posts_cached_until_post_saved(self):
+        PublishedPostFactory(title="Post 1")
+        context = Context({"date_format_long": "Y-m-d"})
+        template_to_render = Template("{% load widget_tags %}{% latest_posts %}")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            template_to_render.render(context)
+
+        with self.assertNumQueries(0):
+            rendered_template = template_to_render.render(context)
+        self.assertIn("Post 1", rendered_template)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PublishedPostFactory(title="Post 2")
+
+        rendered_template = template_to_render.render(context)
+        self.assertIn("Post 2", rendered_template)
+
+    def test_date_format_in_key(self):
+        "It should cache the HTML separately for each date_format_long"
+        PublishedPostFactory(date_published=make_datetime("2021-04-01 12:00:00"))
+        template_to_render = Template("{% load widget_tags %}{% latest_posts %}")
+
+        rendered_1 = template_to_render.render(Context({"date_format_long": "Y-m-d"}))
+        rendered_2 = template_to_render.render(Context({"date_format_long": "d/m/Y"}))
+
+        self.assertIn("2021-04-01", rendered_1)
+        self.assertIn("01/04/2021", rendered_2)
+
+
 class SummaryYearNavigationTestCase(TestCase):
     def test_before_active(self):
         "It should output the correct HTML when current_year='before'"
@@ -0,0 +1,152 @@
+import time_machine
+from django.core.cache import cache
+from django.template import Context
+from django.test import TestCase, override_settings
+
+from pepysdiary.common.caching import (
+    LRUCache,
+    VersionedLocalCache,
+    cached_fragment,
+    invalidate_fragments,
+)
+from pepysdiary.letters.factories import LetterFactory
+from pepysdiary.letters.models import Letter
+
+
+class VersionedLocalCacheTestCase(TestCase):
+    def setUp(self):
+        self.calls = 0
+
+        def make_value():
+            self.calls += 1
+            return self.calls
+
+        self.cache = VersionedLocalCache("test", make_value)
+
+    def test_get_makes_value_once(self):
+        self.assertEqual(self.cache.get(), 1)
+        self.assertEqual(self.cache.get(), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_peek(self):
+        self.assertIsNone(self.cache.peek())
+        self.cache.get()
+        self.assertEqual(self.cache.peek(), 1)
+
+    def test_invalidate(self):
+        self.cache.get()
+        self.cache.invalidate()
+        self.assertIsNone(self.cache.peek())
+        self.assertEqual(self.cache.get(), 2)
+
+    def test_invalidated_while_making_value(self):
+        "If invalidated while making it, the new value is returned, not kept"
+
+        def make_value():
+            self.calls += 1
+            self.cache.invalidate()
+            return self.calls
+
+        self.cache.make_value = make_value
+        self.assertEqual(self.cache.get(), 1)
+        self.assertIsNone(self.cache.peek())
+
+    def test_max_age(self):
+        "With a max_age, the value should be remade once it's that old"
+        self.cache.max_age = 60
+        with time_machine.travel("2021-04-10 12:00:00 +0000", tick=False) as t:
+            self.assertEqual(self.cache.get(), 1)
+            t.move_to("2021-04-10 12:00:59 +0000")
+            self.assertEqual(self.cache.get(), 1)
+            t.move_to("2021-04-10 12:01:00 +0000")
+            self.assertEqual(self.cache.get(), 2)
+
+
+class LRUCacheTestCase(TestCase):
+    def test_get_and_set(self):
+        cache = LRUCache(maxsize=2)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("a", "default"), "default")
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_forgets_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.set("a", 1)
+        cache.clear()
+        self.assertIsNone(cache.get("a"))
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class CachedFragmentTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+        @cached_fragment(Letter)
+        def letters_tag(name, quantity=5):
+            self.calls.append((name, quantity))
+            return f"<p>{name} {quantity}</p>"
+
+        @cached_fragment(Letter, context_vars=("format",))
+        def context_tag(context, name):
+            self.calls.append((context["format"], name))
+            return f"<p>{context['format']} {name}</p>"
+
+        self.letters_tag = letters_tag
+        self.context_tag = context_tag
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_cached(self):
+        self.assertEqual(self.letters_tag("Bob"), "<p>Bob 5</p>")
+        self.assertEqual(self.letters_tag("Bob"), "<p>Bob 5</p>")
+        self.assertEqual(self.calls, [("Bob", 5)])
+
+    def test_arguments_in_key(self):
+        self.letters_tag("Bob")
+        self.letters_tag("Bob", quantity=2)
+        self.letters_tag("Jo")
+        self.assertEqual(self.calls, [("Bob", 5), ("Bob", 2), ("Jo", 5)])
+
+    def test_context_vars_in_key(self):
+        "Only the context_vars should be in the key, not the rest of the context"
+        self.context_tag(Context({"format": "a", "other": 1}), "Bob")
+        self.context_tag(Context({"format": "a", "other": 2}), "Bob")
+        self.context_tag(Context({"format": "b", "other": 1}), "Bob")
+        self.assertEqual(self.calls, [("a", "Bob"), ("b", "Bob")])
+
+    def test_safe(self):
+        self.assertTrue(hasattr(self.letters_tag("Bob"), "__html__"))
+
+    def test_invalidated_on_save(self):
+        self.letters_tag("Bob")
+        with self.captureOnCommitCallbacks(execute=True):
+            letter = LetterFactory()
+        self.letters_tag("Bob")
+        with self.captureOnCommitCallbacks(execute=True):
+            letter.delete()
+        self.letters_tag("Bob")
+        self.assertEqual(len(self.calls), 3)
+
+    def test_invalidate_fragments(self):
+        self.letters_tag("Bob")
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_fragments(Letter)
+        self.letters_tag("Bob")
+        self.assertEqual(len(self.calls), 2)
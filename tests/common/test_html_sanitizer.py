@@ -0,0 +1,73 @@
+from django.test import TestCase
+
+from pepysdiary.common.html_sanitizer import HTMLSanitizer
+
+
+class HTMLSanitizerTestCase(TestCase):
+    def setUp(self):
+        self.sanitizer = HTMLSanitizer(
+            tags={"a", "b", "div", "img", "p", "pre", "table", "tbody", "td", "tr"},
+            attributes={"*": ["class"], "a": ["href"], "img": ["src"]},
+            remove=["div.hatnote", ".noprint"],
+            add_classes={"infobox": ["table"]},
+        )
+
+    def test_empty(self):
+        self.assertEqual(self.sanitizer.clean(""), "")
+        self.assertEqual(self.sanitizer.clean("  \n"), "")
+        self.assertEqual(self.sanitizer.clean("<!-- Comment -->"), "")
+
+    def test_keeps_allowed_elements_and_attributes(self):
+        self.assertEqual(
+            self.sanitizer.clean('<p class="a" id="b">Hi <a href="/x">there</a></p>'),
+            '<p class="a">Hi <a href="/x">there</a></p>',
+        )
+
+    def test_strips_disallowed_elements(self):
+        "Their contents should be kept"
+        self.assertEqual(
+            self.sanitizer.clean("<p>A <span><i>B</i></span> C</p>"), "<p>A B C</p>"
+        )
+
+    def test_removes_selectors(self):
+        "Matching elements should be removed with their contents"
+        self.assertEqual(
+            self.sanitizer.clean(
+                '<div class="hatnote x">No</div><p class="noprint">No</p>'
+                '<p class="hatnote">Yes</p>'
+            ),
+            '<p class="hatnote">Yes</p>',
+        )
+
+    def test_adds_classes(self):
+        self.assertEqual(
+            self.sanitizer.clean('<div class="infobox  vcard">X</div>'),
+            '<div class="infobox vcard table">X</div>',
+        )
+
+    def test_disallowed_protocols(self):
+        self.assertEqual(
+            self.sanitizer.clean(
+                '<a href="javascript:alert(1)">A</a><a href=" mailto:a@b.c">B</a>'
+            ),
+            '<a>A</a><a href=" mailto:a@b.c">B</a>',
+        )
+
+    def test_void_elements_and_escaping(self):
+        self.assertEqual(
+            self.sanitizer.clean("<p>1 &lt; 2 &amp; <img src='/a.png'></p>"),
+            '<p>1 &lt; 2 &amp; <img src="/a.png"/></p>',
+        )
+
+    def test_whitespace(self):
+        "Whitespace-only text should be shortened, except in <pre>"
+        self.assertEqual(
+            self.sanitizer.clean("<div>  <b>A</b> \n </div><pre>  \n</pre>"),
+            "<div> <b>A</b>\n</div><pre>  \n</pre>",
+        )
+
+    def test_adds_tbody(self):
+        self.assertEqual(
+            self.sanitizer.clean("<table><tr><td>A</td></tr></table>"),
+            "<table><tbody><tr><td>A</td></tr></tbody></table>",
+        )
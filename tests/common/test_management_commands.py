@@ -0,0 +1,194 @@
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.postgres.search import SearchQuery
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from pepysdiary.annotations.models import Annotation
+from pepysdiary.common.sitemaps import get_prerendered_cache_key
+from pepysdiary.common.utilities import make_date
+from pepysdiary.diary.factories import EntryFactory
+from pepysdiary.diary.models import Entry
+from pepysdiary.encyclopedia.factories import TopicFactory
+from pepysdiary.letters.factories import LetterFactory
+
+
+class BenchmarkTestCase(TestCase):
+    def test_month_archive(self):
+        "It should report the number of entries, queries and timings"
+        EntryFactory(diary_date=make_date("1663-05-01"))
+        EntryFactory(diary_date=make_date("1663-05-02"))
+        out = StringIO()
+
+        call_command(
+            "benchmark",
+            "month_archive",
+            "--year=1663",
+            "--month=05",
+            "-r",
+            "2",
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        self.assertIn("Month archive for 1663-05: 2 entries", output)
+        self.assertIn("Whole page: ", output)
+        self.assertIn("Tooltip references: 1 query,", output)
+
+    def test_api_pages(self):
+        "It should time pages by number and by cursor"
+        for day in range(1, 52):
+            EntryFactory(diary_date=make_date("1660-01-01") + timedelta(days=day))
+        out = StringIO()
+
+        call_command("benchmark", "api_pages", "--page=2", "-r", "1", stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("API entries: 51 in pages of 50", output)
+        self.assertIn("Page 2: ", output)
+        self.assertIn("Cursor page 2: 1 query,", output)
+
+    def test_search_import(self):
+        "It should save Entries both ways, and not keep them"
+        EntryFactory(diary_date=make_date("1663-05-01"))
+        out = StringIO()
+
+        call_command("benchmark", "search_import", "-n", "3", "-r", "1", stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("Saving 3 Entries", output)
+        self.assertIn("search_document made in Python: ", output)
+        self.assertIn("search_document made by trigger: ", output)
+        self.assertEqual(Entry.objects.count(), 1)
+
+    def test_annotations(self):
+        "It should time rendering the list both ways, without saving anything"
+        out = StringIO()
+
+        call_command("benchmark", "annotations", "-n", "5", "-r", "1", stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("Annotations on an Entry: 5", output)
+        self.assertIn("Stored comment_html: ", output)
+        self.assertIn("Rendering each comment: ", output)
+        self.assertFalse(Annotation.objects.exists())
+
+    def test_wikipedia_tidy(self):
+        "It should time both ways of tidying, and compare their output"
+        with tempfile.TemporaryDirectory() as directory:
+            Path(directory, "a.html").write_text("<p>Hello <b>there</b></p>")
+            Path(directory, "b.html").write_text("<form><p>Hi</p></form>")
+            out = StringIO()
+
+            call_command(
+                "benchmark",
+                "wikipedia_tidy",
+                f"--dir={directory}",
+                "-r",
+                "1",
+                stdout=out,
+            )
+
+        output = out.getvalue()
+        self.assertIn("Wikipedia pages: 2, ", output)
+        self.assertIn("bleach and BeautifulSoup: ", output)
+        self.assertIn("lxml sanitizer: ", output)
+        self.assertIn("Identical output: 2 pages", output)
+        self.assertNotIn("Different output", output)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class PrerenderSitemapsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_caches_sitemaps(self):
+        EntryFactory(diary_date=make_date("1660-01-01"))
+
+        out = StringIO()
+        call_command("prerender_sitemaps", stdout=out)
+
+        content = cache.get(get_prerendered_cache_key("entries", "1"))
+        self.assertIn("/diary/1660/01/01/</loc>", content)
+        self.assertIsNotNone(cache.get(get_prerendered_cache_key("topics", "1")))
+        self.assertIn("entries: Rendered 1 page(s) in ", out.getvalue())
+
+        response = self.client.get("/sitemap-entries.xml")
+        self.assertEqual(response.text, content)
+
+    def test_writes_files(self):
+        EntryFactory(diary_date=make_date("1660-01-01"))
+
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                "prerender_sitemaps", "entries", dir=directory, stdout=StringIO()
+            )
+            self.assertEqual(
+                [p.name for p in Path(directory).iterdir()], ["sitemap-entries.xml"]
+            )
+            content = (Path(directory) / "sitemap-entries.xml").read_text()
+
+        self.assertIn("/diary/1660/01/01/</loc>", content)
+        self.assertIsNone(cache.get(get_prerendered_cache_key("letters", "1")))
+
+    def test_invalid_section(self):
+        with self.assertRaises(CommandError):
+            call_command("prerender_sitemaps", "archives", stdout=StringIO())
+
+
+class RebuildReferencesTestCase(TestCase):
+    def test_rebuilds(self):
+        topic_1 = TopicFactory()
+        topic_2 = TopicFactory()
+        entry = EntryFactory(
+            text=f'<a href="https://www.pepysdiary.com/encyclopedia/{topic_1.id}/">1</a>'
+        )
+        letter = LetterFactory(
+            text=f'<a href="https://www.pepysdiary.com/encyclopedia/{topic_2.id}/">2</a>'
+        )
+        # Make the references wrong:
+        topic_1.diary_references.clear()
+        topic_2.diary_references.add(entry)
+        topic_2.letter_references.clear()
+
+        out = StringIO()
+        call_command("rebuild_references", batch_size=1, stdout=out)
+
+        self.assertEqual(list(topic_1.diary_references.all()), [entry])
+        self.assertEqual(list(topic_2.diary_references.all()), [])
+        self.assertEqual(list(topic_2.letter_references.all()), [letter])
+        self.assertIn(
+            "Entries: Processed 1. Added 1 references, removed 1.", out.getvalue()
+        )
+        self.assertIn(
+            "Letters: Processed 1. Added 1 references, removed 0.", out.getvalue()
+        )
+
+
+class ReindexSearchTestCase(TestCase):
+    def test_reindexes(self):
+        entry = EntryFactory(text="Dogs")
+        Entry.objects.update(search_document=None)
+
+        out = StringIO()
+        call_command("reindex_search", "diary.Entry", stdout=out)
+
+        self.assertEqual(
+            Entry.objects.filter(search_document=SearchQuery("dogs")).get(), entry
+        )
+        self.assertIn("Entries: Reindexed 1 in ", out.getvalue())
+        self.assertNotIn("Letters", out.getvalue())
+
+    def test_invalid_model(self):
+        with self.assertRaises(CommandError):
+            call_command("reindex_search", "diary.Summary", stdout=StringIO())
@@ -1,10 +1,16 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
 from http.cookies import SimpleCookie
+from unittest.mock import patch
 
 import time_machine
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TestCase, override_settings
 
+from pepysdiary.common.factories import ConfigFactory
 from pepysdiary.common.utilities import make_datetime
+from pepysdiary.common.views import HomeView
 
 # Format used for the cookies' expires parameter:
 EXPIRES_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
@@ -15,6 +21,7 @@ EXPIRES_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 MAX_AGE = (14 * 86400) + 1
 
 
+@override_settings(PEPYS_VISIT_TIMES="cookies")
 class CookiesTestCase(TestCase):
     def _set_cookie_data(self, key, expires_time):
         self.client.cookies[key]["expires"] = expires_time.strftime(EXPIRES_FORMAT)
@@ -259,3 +266,64 @@ class InvalidCookiesTestCase(CookiesTestCase):
             self.client.cookies["prev_visit_end"].value,
             str(int(make_datetime("2021-04-08 12:00:00").timestamp())),
         )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class PageCacheTestCase(TestCase):
+    "How visit times affect the full-page cache"
+
+    def setUp(self):
+        cache.clear()
+        ConfigFactory()
+
+    def tearDown(self):
+        cache.clear()
+
+    def count_views(self):
+        "Patches HomeView, to count how many times it's not served from cache"
+        return patch.object(HomeView, "get", autospec=True, side_effect=HomeView.get)
+
+    def test_no_cookies(self):
+        "By default no visit cookies should be set"
+        response = self.client.get("/")
+
+        self.assertEqual(response.cookies, SimpleCookie())
+        self.assertContains(response, "visit_times: 'client'")
+
+    def test_concurrent_cache_hits(self):
+        "Concurrent requests for a cached page should all be served from cache"
+
+        def get_page():
+            try:
+                return Client().get("/")
+            finally:
+                # In case there was a cache miss that used the database.
+                connections.close_all()
+
+        with self.count_views() as view:
+            first_response = self.client.get("/")
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                responses = list(executor.map(lambda _: get_page(), range(16)))
+
+        self.assertEqual(view.call_count, 1)
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, first_response.content)
+            self.assertEqual(response.cookies, SimpleCookie())
+
+    @override_settings(PEPYS_VISIT_TIMES="cookies")
+    def test_cookies_not_cached(self):
+        "Cached responses should have new cookies, not those of the first one"
+        with self.count_views() as view:
+            with time_machine.travel("2021-04-10 12:00:00 +0000", tick=False):
+                self.client.get("/")
+            with time_machine.travel("2021-04-10 12:05:00 +0000", tick=False):
+                response = Client().get("/")
+
+        self.assertEqual(view.call_count, 1)
+        self.assertEqual(
+            response.cookies["last_view"].value,
+            str(int(make_datetime("2021-04-10 12:05:00").timestamp())),
+        )
@@ -1,7 +1,25 @@
-from django.core import paginator as django_paginator
-from django.test import TestCase
+from datetime import UTC, datetime
 
-from pepysdiary.common.paginator import DiggPaginator
+from django.core import paginator as django_paginator
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from pepysdiary.annotations.factories import EntryAnnotationFactory
+from pepysdiary.annotations.models import Annotation
+from pepysdiary.common.caching import bump_cache_version
+from pepysdiary.common.paginator import (
+    CachedCount,
+    CappedCount,
+    CursorPaginator,
+    DiggPaginator,
+    ExactCount,
+    InvalidPage,
+)
+from pepysdiary.common.utilities import make_date
+from pepysdiary.diary.factories import EntryFactory
+from pepysdiary.diary.models import Entry
+from pepysdiary.encyclopedia.factories import TopicFactory
+from pepysdiary.encyclopedia.models import Topic
 
 
 class PaginatorTestCase(TestCase):
@@ -159,3 +177,162 @@ class PaginatorTestCase(TestCase):
     def test_padding_sanity_check(self):
         with self.assertRaises(ValueError):
             DiggPaginator(range(1, 1000), 10, body=5, padding=3)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class CountStrategyTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        for day in range(1, 6):
+            EntryFactory(diary_date=make_date(f"1660-01-0{day}"))
+        self.queryset = Entry.objects.order_by("diary_date")
+
+    def test_exact(self):
+        self.assertEqual(ExactCount().get_count(self.queryset), (5, False))
+        self.assertEqual(ExactCount().get_count(range(3)), (3, False))
+
+    def test_default_is_exact(self):
+        paginator = DiggPaginator(self.queryset, 2)
+        self.assertEqual(paginator.count, 5)
+        self.assertFalse(paginator.count_is_capped)
+
+    def test_capped(self):
+        paginator = DiggPaginator(self.queryset, 1, count_strategy=CappedCount(3))
+        self.assertEqual(paginator.count, 3)
+        self.assertTrue(paginator.count_is_capped)
+        self.assertEqual(paginator.num_pages, 3)
+
+    def test_capped_not_reached(self):
+        paginator = DiggPaginator(self.queryset, 1, count_strategy=CappedCount(5))
+        self.assertEqual(paginator.count, 5)
+        self.assertFalse(paginator.count_is_capped)
+
+    def test_capped_uses_limit(self):
+        "It should count using a subquery with a LIMIT"
+        with self.assertNumQueries(1) as queries:
+            CappedCount(3).get_count(self.queryset)
+        self.assertIn("LIMIT 4", queries.captured_queries[0]["sql"])
+
+    def test_capped_is_aligned_left(self):
+        "There should be no trailing range when the count is capped"
+        paginator = DiggPaginator(
+            range(1, 1000), 10, body=5, count_strategy=CappedCount(500)
+        )
+        self.assertEqual(paginator.page(1).page_range, [1, 2, 3, 4, 5])
+
+    def test_capped_softlimit(self):
+        paginator = DiggPaginator(self.queryset, 1, count_strategy=CappedCount(3))
+        self.assertEqual(paginator.page(4, softlimit=True).number, 3)
+
+    def test_cached(self):
+        strategy = CachedCount("entries")
+        self.assertEqual(strategy.get_count(self.queryset), (5, False))
+
+        EntryFactory(diary_date=make_date("1660-01-06"))
+        with self.assertNumQueries(0):
+            self.assertEqual(strategy.get_count(self.queryset), (5, False))
+
+    def test_cached_version(self):
+        "Bumping the cache version should mean the count is remade"
+        strategy = CachedCount("entries", version_name="test-count")
+        strategy.get_count(self.queryset)
+
+        EntryFactory(diary_date=make_date("1660-01-06"))
+        bump_cache_version("test-count")
+        self.assertEqual(strategy.get_count(self.queryset), (6, False))
+
+    def test_cached_capped(self):
+        strategy = CachedCount("entries", strategy=CappedCount(3))
+        self.assertEqual(strategy.get_count(self.queryset), (3, True))
+        with self.assertNumQueries(0):
+            self.assertEqual(strategy.get_count(self.queryset), (3, True))
+
+
+class CursorPaginatorTestCase(TestCase):
+    def setUp(self):
+        # Some with the same order_title, to test the second ordering field:
+        self.topics = [
+            TopicFactory(title=title)
+            for title in ("Apples", "Bananas", "Bananas", "Bananas", "Cherries")
+        ]
+        self.paginator = CursorPaginator(Topic.objects.all(), 2, ("order_title", "pk"))
+
+    def test_first_page(self):
+        page = self.paginator.page()
+        self.assertEqual(list(page), self.topics[:2])
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+        self.assertIsNone(page.previous_cursor)
+
+    def test_next_pages(self):
+        page_2 = self.paginator.page(self.paginator.page().next_cursor)
+        self.assertEqual(list(page_2), self.topics[2:4])
+        self.assertTrue(page_2.has_previous())
+        self.assertTrue(page_2.has_next())
+
+        page_3 = self.paginator.page(page_2.next_cursor)
+        self.assertEqual(list(page_3), self.topics[4:])
+        self.assertTrue(page_3.has_previous())
+        self.assertFalse(page_3.has_next())
+
+    def test_previous_pages(self):
+        page_2 = self.paginator.page(self.paginator.page().next_cursor)
+        page_3 = self.paginator.page(page_2.next_cursor)
+
+        previous = self.paginator.page(page_3.previous_cursor)
+        self.assertEqual(list(previous), self.topics[2:4])
+        self.assertTrue(previous.has_previous())
+        self.assertTrue(previous.has_next())
+
+        first = self.paginator.page(previous.previous_cursor)
+        self.assertEqual(list(first), self.topics[:2])
+        self.assertFalse(first.has_previous())
+
+    def test_descending(self):
+        paginator = CursorPaginator(Topic.objects.all(), 3, ("-order_title", "-pk"))
+        page_1 = paginator.page()
+        page_2 = paginator.page(page_1.next_cursor)
+        self.assertEqual(list(page_1), self.topics[:1:-1])
+        self.assertEqual(list(page_2), self.topics[1::-1])
+
+    def test_dates(self):
+        "It should work with dates in the cursor"
+        entries = [
+            EntryFactory(diary_date=make_date(d))
+            for d in ("1660-01-01", "1660-01-02", "1660-01-03")
+        ]
+        paginator = CursorPaginator(Entry.objects.all(), 2, ("diary_date",))
+        page_2 = paginator.page(paginator.page().next_cursor)
+        self.assertEqual(list(page_2), entries[2:])
+
+    def test_datetimes(self):
+        "It should use the full precision of datetimes in the cursor"
+        annotations = [
+            EntryAnnotationFactory(
+                submit_date=datetime(2021, 4, 7, 12, 0, 0, microsecond, tzinfo=UTC)
+            )
+            for microsecond in (100, 200, 300)
+        ]
+        for ordering in (("submit_date",), ("-submit_date",)):
+            with self.subTest(ordering=ordering):
+                paginator = CursorPaginator(Annotation.objects.all(), 1, ordering)
+                pages = [paginator.page()]
+                while pages[-1].has_next():
+                    pages.append(paginator.page(pages[-1].next_cursor))
+
+                expected = (
+                    annotations if ordering[0] == "submit_date" else (annotations[::-1])
+                )
+                self.assertEqual([page[0] for page in pages], expected)
+
+    def test_one_query(self):
+        cursor = self.paginator.page().next_cursor
+        with self.assertNumQueries(1):
+            self.paginator.page(cursor)
+
+    def test_invalid_cursor(self):
+        for cursor in ("foo", "W10", "WzAsIFsiYSJdXQ", "WzAsIFsiYSIsICJiIl1d"):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidPage):
+                self.paginator.page(cursor)
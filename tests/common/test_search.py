@@ -0,0 +1,190 @@
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from pepysdiary.annotations.factories import EntryAnnotationFactory
+from pepysdiary.common.search import _PendingBatch, search_index
+from pepysdiary.diary.factories import EntryFactory
+from pepysdiary.diary.models import Entry
+from pepysdiary.encyclopedia.factories import TopicFactory
+from pepysdiary.encyclopedia.models import Topic
+from pepysdiary.indepth.factories import PublishedArticleFactory
+from pepysdiary.letters.factories import LetterFactory
+from pepysdiary.news.factories import PublishedPostFactory
+from pepysdiary.news.models import Post
+
+
+@override_settings(PEPYS_SEARCH_INDEX_IN_DATABASE=False)
+class SearchIndexTestCase(TestCase):
+    def test_models(self):
+        "All the searchable models should be registered"
+        self.assertIn(Entry, search_index.models)
+        self.assertIn(Topic, search_index.models)
+        self.assertIn(Post, search_index.models)
+
+    def test_updates_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            entry = EntryFactory(title="Cats", text="Dogs")
+
+        self.assertEqual(
+            Entry.objects.filter(search_document=SearchQuery("dogs")).get(),
+            entry,
+        )
+
+    def test_coalesces_saves(self):
+        "Saving an object several times in a transaction only updates it once"
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            entry = EntryFactory(title="Cats", text="Dogs")
+            entry.text = "Fish"
+            entry.save()
+            entry.text = "Birds"
+            entry.save()
+
+        # Other things also happen on commit; we only want the search index.
+        flushes = [
+            c
+            for c in callbacks
+            if isinstance(getattr(c, "__self__", None), _PendingBatch)
+        ]
+
+        # Only the first of them does anything:
+        with CaptureQueriesContext(connection) as queries:
+            for flush in flushes:
+                flush()
+        self.assertEqual(len(queries), 1)
+
+        self.assertEqual(
+            Entry.objects.filter(search_document=SearchQuery("birds")).get(),
+            entry,
+        )
+        self.assertFalse(
+            Entry.objects.filter(search_document=SearchQuery("fish")).exists()
+        )
+
+    def test_after_rollback(self):
+        "After a rolled-back transaction, saves should still be indexed"
+        try:
+            with transaction.atomic():
+                EntryFactory(title="Cats", text="Dogs")
+                raise ValueError
+        except ValueError:
+            pass
+
+        with self.captureOnCommitCallbacks(execute=True):
+            entry = EntryFactory(title="Cats", text="Fish")
+
+        self.assertEqual(
+            Entry.objects.filter(search_document=SearchQuery("fish")).get(),
+            entry,
+        )
+
+    def test_after_rollback_of_first_save(self):
+        "If the savepoint with the first save is rolled back, others are indexed"
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    EntryFactory(title="Cats", text="Dogs")
+                    raise ValueError
+            except ValueError:
+                pass
+            entry = EntryFactory(title="Cats", text="Fish")
+
+        self.assertEqual(
+            Entry.objects.filter(search_document=SearchQuery("fish")).get(),
+            entry,
+        )
+
+    def test_reindex(self):
+        entries = [EntryFactory(text="Dogs") for _ in range(3)]
+        Entry.objects.update(search_document=None)
+
+        updated = list(search_index.reindex(Entry, batch_size=2))
+
+        self.assertEqual(sum(updated), 3)
+        self.assertEqual(
+            set(Entry.objects.filter(search_document=SearchQuery("dogs"))),
+            set(entries),
+        )
+
+
+class SearchTriggerTestCase(TestCase):
+    "Testing the database triggers that set search_document"
+
+    def assert_matches_python_vector(self, obj):
+        "The trigger's vector should be the same as SearchIndex makes"
+        vector = search_index.make_vector(obj.index_components())
+        document, expected = (
+            type(obj)
+            .objects.filter(pk=obj.pk)
+            .annotate(expected=vector)
+            .values_list("search_document", "expected")
+            .get()
+        )
+        self.assertTrue(document)
+        self.assertEqual(document, expected)
+
+    def test_all_models(self):
+        for factory in (
+            EntryAnnotationFactory,
+            EntryFactory,
+            LetterFactory,
+            PublishedArticleFactory,
+            PublishedPostFactory,
+            TopicFactory,
+        ):
+            with self.subTest(factory=factory.__name__):
+                self.assert_matches_python_vector(factory())
+
+    def test_on_insert(self):
+        "It's set when saving without the Python updater"
+        with (
+            CaptureQueriesContext(connection) as queries,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            entry = EntryFactory(title="Cats", text="Dogs")
+
+        self.assertFalse(
+            [
+                q
+                for q in queries
+                if q["sql"].startswith("UPDATE") and "search_document" in q["sql"]
+            ],
+        )
+        self.assertEqual(
+            Entry.objects.filter(search_document=SearchQuery("dogs")).get(),
+            entry,
+        )
+
+    def test_on_update(self):
+        entry = EntryFactory(title="Cats", text="Dogs")
+        entry.text = "Fish"
+        entry.save()
+
+        self.assert_matches_python_vector(entry)
+        self.assertTrue(
+            Entry.objects.filter(search_document=SearchQuery("fish")).exists()
+        )
+
+    def test_saving_unchanged(self):
+        "Saving without changing any search_fields keeps search_document"
+        entry = EntryFactory(title="Cats", text="Dogs")
+        # Django will write search_document as None:
+        self.assertIsNone(entry.search_document)
+        entry.save()
+
+        self.assert_matches_python_vector(entry)
+
+    def test_unchanged_fields(self):
+        "It's not remade when other fields are updated"
+        entry = EntryFactory(title="Cats", text="Dogs")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE diary_entry SET search_document = ''::tsvector WHERE id = %s",
+                [entry.pk],
+            )
+
+        Entry.objects.filter(pk=entry.pk).update(comment_count=3)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.search_document, "")
@@ -0,0 +1,82 @@
+import time_machine
+from django.contrib.sites.models import Site
+from django.test import TestCase
+
+from pepysdiary.common.factories import ConfigFactory
+from pepysdiary.common.models import Config
+from pepysdiary.common.site_settings import SiteSettings, site_settings
+
+
+class SiteSettingsTestCase(TestCase):
+    def setUp(self):
+        self.settings = SiteSettings()
+
+    def test_site(self):
+        self.assertEqual(self.settings.site, Site.objects.get_current())
+
+    def test_config(self):
+        config = ConfigFactory(allow_comments=False)
+        self.assertEqual(self.settings.config, config)
+        self.assertFalse(self.settings.config.allow_comments)
+
+    def test_no_config(self):
+        self.assertIsNone(self.settings.config)
+
+    def test_no_queries_once_loaded(self):
+        config = ConfigFactory()
+        self.assertEqual(self.settings.config, config)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.settings.site.pk, config.site_id)
+            self.assertEqual(self.settings.config, config)
+
+    def test_reloaded_after_max_age(self):
+        "Changes made by other processes should be seen within max_age"
+        ConfigFactory(allow_login=True)
+        with time_machine.travel("2021-04-10 12:00:00 +0000", tick=False) as t:
+            self.assertTrue(self.settings.config.allow_login)
+            # Like another process changing it: no signals, and the cache
+            # isn't shared, so the version doesn't change.
+            Config.objects.update(allow_login=False)
+            self.assertTrue(self.settings.config.allow_login)
+
+            t.move_to("2021-04-10 12:01:00 +0000")
+            self.assertFalse(self.settings.config.allow_login)
+
+
+class SiteSettingsSignalsTestCase(TestCase):
+    "The shared instance should be reloaded when a Config or Site changes."
+
+    def setUp(self):
+        site_settings.invalidate()
+
+    def test_config_created(self):
+        self.assertIsNone(site_settings.config)
+        ConfigFactory()
+        self.assertIsNotNone(site_settings.config)
+
+    def test_config_saved(self):
+        config = ConfigFactory(allow_login=True)
+        self.assertTrue(site_settings.config.allow_login)
+        config.allow_login = False
+        config.save()
+        self.assertFalse(site_settings.config.allow_login)
+
+    def test_config_deleted(self):
+        ConfigFactory()
+        self.assertIsNotNone(site_settings.config)
+        Config.objects.all().delete()
+        self.assertIsNone(site_settings.config)
+
+    def test_site_saved(self):
+        site = Site.objects.get_current()
+        self.assertEqual(site_settings.site.domain, site.domain)
+        site.domain = "example.org"
+        site.save()
+        self.assertEqual(site_settings.site.domain, "example.org")
+
+    def test_get_site_config(self):
+        "Config.objects.get_site_config() should use the shared instance"
+        config = ConfigFactory()
+        self.assertEqual(Config.objects.get_site_config(), config)
+        with self.assertNumQueries(0):
+            Config.objects.get_site_config()
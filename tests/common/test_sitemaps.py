@@ -1,9 +1,16 @@
 from django.contrib.sites.models import Site
 from django.core.cache import cache
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from pepysdiary.common.sitemaps import (
+    ArchiveSitemap,
+    EntrySitemap,
+    get_prerendered_cache_key,
+)
 from pepysdiary.common.utilities import make_date, make_datetime
 from pepysdiary.diary.factories import EntryFactory
+from pepysdiary.diary.models import Entry
+from pepysdiary.encyclopedia.category_tree import category_tree
 from pepysdiary.encyclopedia.factories import TopicFactory
 from pepysdiary.encyclopedia.models import Category
 from pepysdiary.indepth.factories import PublishedArticleFactory
@@ -70,26 +77,28 @@ class SitemapsTestCase(TestCase):
         entry_3 = EntryFactory(diary_date=make_date("1660-01-03"))
 
         response = self.client.get("/sitemap-entries.xml")
+        # It's a StreamingHttpResponse:
+        text = response.getvalue().decode()
         self.assertIn(
             (
                 "<loc>http://example.com/diary/1660/01/01/</loc>"
                 f"<lastmod>{entry_1.date_modified.strftime('%Y-%m-%d')}</lastmod>"
             ),
-            response.text,
+            text,
         )
         self.assertIn(
             (
                 "<loc>http://example.com/diary/1660/01/02/</loc>"
                 f"<lastmod>{entry_2.date_modified.strftime('%Y-%m-%d')}</lastmod>"
             ),
-            response.text,
+            text,
         )
         self.assertIn(
             (
                 "<loc>http://example.com/diary/1660/01/03/</loc>"
                 f"<lastmod>{entry_3.date_modified.strftime('%Y-%m-%d')}</lastmod>"
             ),
-            response.text,
+            text,
         )
 
     def test_letter_sitemap_response(self):
@@ -102,26 +111,28 @@ class SitemapsTestCase(TestCase):
         letter_3 = LetterFactory(letter_date=make_date("1660-01-03"), slug="letter3")
 
         response = self.client.get("/sitemap-letters.xml")
+        # It's a StreamingHttpResponse:
+        text = response.getvalue().decode()
         self.assertIn(
             (
                 "<loc>http://example.com/letters/1660/01/01/letter1/</loc>"
                 f"<lastmod>{letter_1.date_modified.strftime('%Y-%m-%d')}</lastmod>"
             ),
-            response.text,
+            text,
         )
         self.assertIn(
             (
                 "<loc>http://example.com/letters/1660/01/02/letter2/</loc>"
                 f"<lastmod>{letter_2.date_modified.strftime('%Y-%m-%d')}</lastmod>"
             ),
-            response.text,
+            text,
         )
         self.assertIn(
             (
                 "<loc>http://example.com/letters/1660/01/03/letter3/</loc>"
                 f"<lastmod>{letter_3.date_modified.strftime('%Y-%m-%d')}</lastmod>"
             ),
-            response.text,
+            text,
         )
 
     def test_topic_sitemap_response(self):
@@ -134,26 +145,28 @@ class SitemapsTestCase(TestCase):
         topic_3 = TopicFactory()
 
         response = self.client.get("/sitemap-topics.xml")
+        # It's a StreamingHttpResponse:
+        text = response.getvalue().decode()
         self.assertIn(
             (
                 f"<loc>http://example.com/encyclopedia/{topic_1.pk}/</loc>"
                 f"<lastmod>{topic_1.date_modified.strftime('%Y-%m-%d')}</lastmod>"
             ),
-            response.text,
+            text,
         )
         self.assertIn(
             (
                 f"<loc>http://example.com/encyclopedia/{topic_2.pk}/</loc>"
                 f"<lastmod>{topic_2.date_modified.strftime('%Y-%m-%d')}</lastmod>"
             ),
-            response.text,
+            text,
         )
         self.assertIn(
             (
                 f"<loc>http://example.com/encyclopedia/{topic_3.pk}/</loc>"
                 f"<lastmod>{topic_3.date_modified.strftime('%Y-%m-%d')}</lastmod>"
             ),
-            response.text,
+            text,
         )
 
     def test_article_sitemap_response(self):
@@ -275,3 +288,96 @@ class SitemapsTestCase(TestCase):
         self.assertIn(
             "<loc>http://example.com/diary/summary/1661/</loc>", response.text
         )
+
+    def test_lean_sitemaps_stream(self):
+        "The Entries, Letters and Topics sitemaps should be streamed"
+        for section in ("entries", "letters", "topics"):
+            with self.subTest(section=section):
+                response = self.client.get(f"/sitemap-{section}.xml")
+                self.assertTrue(response.streaming)
+                self.assertEqual(response["Content-Type"], "application/xml")
+
+    def test_lean_sitemap_fields(self):
+        "It should only fetch the fields needed for URLs and lastmod"
+        EntryFactory(diary_date=make_date("1660-01-01"))
+
+        urls = list(EntrySitemap().iter_urls(page=1, protocol="http"))
+
+        self.assertEqual(len(urls), 1)
+        self.assertEqual(urls[0]["location"], "http://example.com/diary/1660/01/01/")
+        entry = EntrySitemap().items()[0:1]
+        self.assertEqual(
+            next(entry).get_deferred_fields(),
+            {f.attname for f in Entry._meta.concrete_fields}
+            - {"id", "diary_date", "date_modified"},
+        )
+
+    def test_lean_sitemap_invalid_page(self):
+        response = self.client.get("/sitemap-entries.xml?p=2")
+        self.assertEqual(response.status_code, 404)
+
+    def test_lean_sitemap_latest_lastmod(self):
+        entry = EntryFactory(diary_date=make_date("1660-01-01"))
+        self.assertEqual(EntrySitemap().get_latest_lastmod(), entry.date_modified)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_prerendered_sitemap(self):
+        "It should return a prerendered sitemap from the cache"
+        cache.set(get_prerendered_cache_key("entries", "1"), "<urlset></urlset>")
+
+        response = self.client.get("/sitemap-entries.xml")
+
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.text, "<urlset></urlset>")
+        cache.clear()
+
+    def test_x_robots_tag(self):
+        "Every sitemap should tell search engines not to index it"
+        for section in ("entries", "articles"):
+            with self.subTest(section=section):
+                response = self.client.get(f"/sitemap-{section}.xml")
+                self.assertEqual(response["X-Robots-Tag"], "noindex, noodp, noarchive")
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_prerendered_sitemap_x_robots_tag(self):
+        cache.set(get_prerendered_cache_key("entries", "1"), "<urlset></urlset>")
+
+        response = self.client.get("/sitemap-entries.xml")
+
+        self.assertEqual(response["X-Robots-Tag"], "noindex, noodp, noarchive")
+        cache.clear()
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_other_sitemaps_cached(self):
+        "Sitemaps that aren't LeanSitemaps should be cached"
+        cache.clear()
+        PublishedArticleFactory()
+        EntryFactory(diary_date=make_date("1660-01-01"))
+        for section in ("articles", "archives"):
+            with self.subTest(section=section):
+                self.client.get(f"/sitemap-{section}.xml")
+                with self.assertNumQueries(0):
+                    response = self.client.get(f"/sitemap-{section}.xml")
+                self.assertEqual(response.status_code, 200)
+        cache.clear()
+
+    def test_archive_sitemap_categories_queries(self):
+        "It should get all the Categories' URLs with one query"
+        root = Category.add_root(id=9990, title="Animals", slug="animals")
+        dogs = Category.objects.get(pk=root.pk).add_child(
+            id=9991, title="Dogs", slug="dogs"
+        )
+        dogs.add_child(id=9992, title="Terriers", slug="terriers")
+
+        sitemap = ArchiveSitemap()
+        category_tree.invalidate()
+        with self.assertNumQueries(1):
+            urls = [s.url for s in sitemap._encyclopedia_categories_sitemaps()]
+
+        self.assertIn("/encyclopedia/animals/dogs/terriers/", urls)
@@ -2,14 +2,17 @@ import os
 import tempfile
 
 import time_machine
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.http.request import QueryDict
 from django.test import override_settings
 
 from pepysdiary.annotations.factories import EntryAnnotationFactory
 from pepysdiary.common import views
+from pepysdiary.common.search import search_index
 from pepysdiary.common.utilities import make_date, make_datetime
 from pepysdiary.diary.factories import EntryFactory
+from pepysdiary.diary.models import Entry
 from pepysdiary.encyclopedia.factories import TopicFactory
 from pepysdiary.indepth.factories import DraftArticleFactory, PublishedArticleFactory
 from pepysdiary.letters.factories import LetterFactory
@@ -292,6 +295,136 @@ class SearchViewTestCase(ViewTransactionTestCase):
 
         self.assertEqual(data["object_list"], data["entry_list"])
 
+    def test_headlines(self):
+        "It should make the excerpts in the database and defer large fields"
+        entry = EntryFactory(
+            text="<p>This is about <em>Cats</em>.</p>", footnotes="<p>Dogs.</p>"
+        )
+
+        self.request.GET = QueryDict("k=d&q=cats")
+        response = views.SearchView.as_view()(self.request)
+        result = response.context_data["object_list"][0]
+
+        self.assertEqual(result, entry)
+        self.assertEqual(result.search_headline, "This is about \x02Cats\x03. Dogs")
+        self.assertEqual(
+            result.get_deferred_fields(), {"footnotes", "search_document", "text"}
+        )
+
+        response.render()
+        self.assertContains(response, "This is about <b>Cats</b>. Dogs")
+
+    def test_headlines_escaped(self):
+        "Any HTML that isn't stripped from the text should be escaped"
+        EntryAnnotationFactory(comment="Pepys <img src=x onerror=alert(1) & cats")
+
+        self.request.GET = QueryDict("k=c&q=pepys")
+        response = views.SearchView.as_view()(self.request)
+        response.render()
+
+        self.assertNotContains(response, "<img")
+        self.assertContains(
+            response, "<b>Pepys</b> &lt;img src=x onerror=alert(1) &amp; cats"
+        )
+
+    def test_headlines_keep_entities(self):
+        "Entities in the HTML fields should be displayed unchanged"
+        EntryFactory(text="<p>Cats &amp;c. and dogs</p>")
+        TopicFactory(title="Dog", wikipedia_html="<p>A&#160;dog &#xA0;here</p>")
+
+        self.request.GET = QueryDict("k=d&q=cats")
+        response = views.SearchView.as_view()(self.request)
+        response.render()
+        self.assertContains(response, "<b>Cats</b> &amp;c. and dogs")
+
+        self.request.GET = QueryDict("k=t&q=dog")
+        response = views.SearchView.as_view()(self.request)
+        response.render()
+        self.assertContains(response, "A&#160;<b>dog</b> &#xA0;here")
+
+    def test_cursor_pagination(self):
+        "It should use a CursorPaginator when asked, unless ordering by rank"
+        EntryFactory(text="Cats", diary_date=make_date("1660-01-01"))
+        EntryFactory(text="Cats", diary_date=make_date("1660-01-02"))
+
+        self.request.GET = QueryDict("q=cats&o=dd&cursor=")
+        response = views.SearchView.as_view()(self.request)
+        data = response.context_data
+        self.assertTrue(data["page_obj"].is_cursor_page)
+        self.assertEqual(data["object_list"][0].diary_date, make_date("1660-01-02"))
+
+        self.request.GET = QueryDict("q=cats&o=r&cursor=")
+        response = views.SearchView.as_view()(self.request)
+        self.assertEqual(response.context_data["page_obj"].number, 1)
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        PEPYS_SEARCH_COUNT="cached",
+    )
+    def test_count_cached(self):
+        "The count should be cached until a searchable object is saved"
+        cache.clear()
+        EntryFactory(text="Cats")
+
+        self.request.GET = QueryDict("q=cats")
+        response = views.SearchView.as_view()(self.request)
+        self.assertEqual(response.context_data["paginator"].count, 1)
+
+        # A TransactionTestCase, so the count's cache version is changed:
+        EntryFactory(text="Cats and kittens")
+        response = views.SearchView.as_view()(self.request)
+        self.assertEqual(response.context_data["paginator"].count, 2)
+
+        # Other searches are cached separately:
+        self.request.GET = QueryDict("q=kittens")
+        response = views.SearchView.as_view()(self.request)
+        self.assertEqual(response.context_data["paginator"].count, 1)
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        PEPYS_SEARCH_COUNT="cached",
+    )
+    def test_count_cache_expires(self):
+        "Cached counts shouldn't be kept forever"
+        cache.clear()
+        self.request.GET = QueryDict("q=cats")
+        view = views.SearchView.as_view(count_cache_timeout=60)
+        with time_machine.travel("2021-04-10 12:00:00 +0000", tick=False) as t:
+            response = view(self.request)
+            self.assertEqual(response.context_data["paginator"].count, 0)
+
+            # Added without signals, so the count's cache version is unchanged:
+            Entry.objects.bulk_create([EntryFactory.build(text="Cats")])
+            Entry.objects.update(search_document=search_index.make_fields_vector(Entry))
+
+            t.move_to("2021-04-10 12:00:59 +0000")
+            response = view(self.request)
+            self.assertEqual(response.context_data["paginator"].count, 0)
+
+            t.move_to("2021-04-10 12:01:01 +0000")
+            response = view(self.request)
+            self.assertEqual(response.context_data["paginator"].count, 1)
+
+    @override_settings(PEPYS_SEARCH_COUNT="capped")
+    def test_count_capped(self):
+        "It should only count up to count_cap results"
+        for _ in range(3):
+            EntryFactory(text="Cats")
+
+        self.request.GET = QueryDict("q=cats")
+        view = views.SearchView.as_view(count_cap=2, paginate_by=1)
+        response = view(self.request)
+        paginator = response.context_data["paginator"]
+        self.assertEqual(paginator.count, 2)
+        self.assertTrue(paginator.count_is_capped)
+
+        response.render()
+        self.assertContains(response, "More than 2 found.")
+
     def test_ordering_rank(self):
         "It should order results by rank"
         entry_1 = EntryFactory(title="x", text="Cats", footnotes="x")
@@ -0,0 +1,69 @@
+from django.test import TestCase
+
+from pepysdiary.common.utilities import make_date
+from pepysdiary.diary.date_index import EntryDateIndex, entry_date_index
+from pepysdiary.diary.factories import EntryFactory
+
+
+class EntryDateIndexTestCase(TestCase):
+    def setUp(self):
+        self.index = EntryDateIndex()
+        self.entry_1 = EntryFactory(diary_date=make_date("1661-01-01"))
+        self.entry_2 = EntryFactory(diary_date=make_date("1661-01-02"))
+        self.entry_3 = EntryFactory(diary_date=make_date("1661-01-05"))
+
+    def test_exists(self):
+        self.assertTrue(self.index.exists(make_date("1661-01-02")))
+        self.assertFalse(self.index.exists(make_date("1661-01-03")))
+        self.assertFalse(self.index.exists(make_date("1661-01-06")))
+
+    def test_previous_entry(self):
+        previous_entry = self.index.previous_entry(make_date("1661-01-05"))
+        self.assertEqual(previous_entry, self.entry_2)
+        self.assertEqual(previous_entry.title, self.entry_2.title)
+        self.assertEqual(previous_entry.get_absolute_url(), "/diary/1661/01/02/")
+
+    def test_previous_entry_none(self):
+        self.assertIsNone(self.index.previous_entry(make_date("1661-01-01")))
+
+    def test_next_entry_missing_date(self):
+        "It should find the next Entry after a date with no Entry"
+        self.assertEqual(self.index.next_entry(make_date("1661-01-03")), self.entry_3)
+
+    def test_next_entry_none(self):
+        self.assertIsNone(self.index.next_entry(make_date("1661-01-05")))
+
+    def test_no_queries_once_loaded(self):
+        self.index.exists(make_date("1661-01-01"))
+        with self.assertNumQueries(0):
+            self.index.previous_entry(make_date("1661-01-02"))
+            self.index.next_entry(make_date("1661-01-02"))
+            self.index.exists(make_date("1661-01-03"))
+
+    def test_new_entry(self):
+        "Saving a new Entry should update the shared index"
+        entry_date_index.exists(make_date("1661-01-01"))
+        entry = EntryFactory(diary_date=make_date("1661-01-03"))
+        self.assertEqual(entry_date_index.next_entry(make_date("1661-01-02")), entry)
+
+    def test_deleted_entry(self):
+        "Deleting an Entry should update the shared index"
+        entry_date_index.exists(make_date("1661-01-01"))
+        self.entry_2.delete()
+        self.assertFalse(entry_date_index.exists(make_date("1661-01-02")))
+
+    def test_unchanged_entry(self):
+        "Saving an Entry without changing its date or title keeps the index"
+        entry_date_index.exists(make_date("1661-01-01"))
+        self.entry_2.comment_count = 3
+        self.entry_2.save()
+        with self.assertNumQueries(0):
+            entry_date_index.exists(make_date("1661-01-01"))
+
+    def test_changed_title(self):
+        "Changing an Entry's title should update the shared index"
+        entry_date_index.exists(make_date("1661-01-01"))
+        self.entry_2.title = "New title"
+        self.entry_2.save()
+        entry = entry_date_index.previous_entry(make_date("1661-01-05"))
+        self.assertEqual(entry.title, "New title")
@@ -1,3 +1,5 @@
+from xml.dom import minidom
+
 import time_machine
 from django.test import override_settings
 from django.utils.feedgenerator import rfc2822_date
@@ -138,3 +140,75 @@ class LatestEntriesFeedTestCase(FeedTestCase):
                 )
             },
         )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    YEARS_OFFSET=353,
+)
+class LatestEntriesFeedCacheTestCase(FeedTestCase):
+    def get_item_titles(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [
+            item.getElementsByTagName("title")[0].firstChild.wholeText
+            for item in minidom.parseString(response.content).getElementsByTagName(
+                "item"
+            )
+        ]
+
+    @time_machine.travel("2021-04-07 12:00:00 +0000", tick=False)
+    def test_not_modified(self):
+        "A request with the current ETag should get a 304 without any queries"
+        EntryFactory(title="Entry 6", diary_date=make_date("1668-04-06"))
+        response = self.client.get("/diary/rss/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Last-Modified", response)
+        self.assertEqual(response["Cache-Control"], "max-age=0")
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/diary/rss/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    @time_machine.travel("2021-04-07 12:00:00 +0000", tick=False)
+    def test_rendered_once(self):
+        "Requests without an ETag should get the cached feed, without queries"
+        EntryFactory(title="Entry 6", diary_date=make_date("1668-04-06"))
+        content = self.client.get("/diary/rss/").content
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/diary/rss/")
+        self.assertEqual(response.content, content)
+
+    @time_machine.travel("2021-04-07 12:00:00 +0000", tick=False)
+    def test_entry_saved(self):
+        "Saving an Entry should mean the feed is rendered again"
+        with self.captureOnCommitCallbacks(execute=True):
+            entry = EntryFactory(title="Entry 6", diary_date=make_date("1668-04-06"))
+        response = self.client.get("/diary/rss/")
+        self.assertEqual(self.get_item_titles(response), ["Entry 6"])
+        etag = response["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.title = "New title"
+            entry.save()
+
+        response = self.client.get("/diary/rss/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.get_item_titles(response), ["New title"])
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_next_entry_published(self):
+        "The feed should be rendered again once the next Entry is published"
+        EntryFactory(title="Entry 6", diary_date=make_date("1668-04-06"))
+        EntryFactory(title="Entry 7", diary_date=make_date("1668-04-07"))
+
+        with time_machine.travel("2021-04-07 22:59:00 +0000", tick=False) as t:
+            response = self.client.get("/diary/rss/")
+            self.assertEqual(self.get_item_titles(response), ["Entry 6"])
+
+            t.move_to("2021-04-07 23:00:00 +0000")
+            response = self.client.get(
+                "/diary/rss/", HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+            self.assertEqual(self.get_item_titles(response), ["Entry 7", "Entry 6"])
@@ -50,6 +50,16 @@ class EntryManagerTestCase(TestCase):
         d = Entry.objects.most_recent_entry_date()
         self.assertEqual(d, make_date("1667-02-28"))
 
+    @time_machine.travel("2021-02-01 23:00:00 +0000", tick=False)
+    @override_settings(YEARS_OFFSET=353)
+    def test_published(self):
+        "It should only return Entries up to the most recent entry date"
+        entry_1 = EntryFactory(diary_date=make_date("1668-01-31"))
+        entry_2 = EntryFactory(diary_date=make_date("1668-02-01"))
+        EntryFactory(diary_date=make_date("1668-02-02"))
+        entries = Entry.objects.published().order_by("diary_date")
+        self.assertEqual(list(entries), [entry_1, entry_2])
+
     def test_all_years_months_invalid_format(self):
         with self.assertRaises(ValueError):
             Entry.objects.all_years_months(month_format="c")
@@ -145,3 +155,30 @@ class EntryManagerTestCase(TestCase):
 
         # Tidy up the file
         topic_1.thumbnail.delete()
+
+    def test_get_brief_references_num_queries(self):
+        "It should fetch all the Topics in one query, however many Entries"
+        topic_1 = TopicFactory(title="Cats")
+        topic_2 = TopicFactory(title="Dogs")
+        entries = [
+            EntryFactory(
+                diary_date=make_date(f"1660-01-{day:02}"),
+                text=(
+                    f'<a href="http://www.pepysdiary.com/encyclopedia/{topic_1.id}/">'
+                    "cats</a> and "
+                    f'<a href="http://www.pepysdiary.com/encyclopedia/{topic_2.id}/">'
+                    "dogs</a>"
+                ),
+            )
+            for day in range(1, 11)
+        ]
+
+        with self.assertNumQueries(1):
+            references = Entry.objects.get_brief_references(entries)
+
+        self.assertEqual(set(references.keys()), {str(topic_1.pk), str(topic_2.pk)})
+
+    def test_get_brief_references_no_objects(self):
+        "It should return an empty dict, without querying, if given no objects"
+        with self.assertNumQueries(0):
+            self.assertEqual(Entry.objects.get_brief_references([]), {})
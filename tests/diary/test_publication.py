@@ -0,0 +1,57 @@
+from datetime import UTC, datetime
+
+import time_machine
+from django.test import TestCase, override_settings
+
+from pepysdiary.common.utilities import make_date
+from pepysdiary.diary.publication import PublicationClock
+
+
+@override_settings(YEARS_OFFSET=353)
+class PublicationClockTestCase(TestCase):
+    def setUp(self):
+        self.clock = PublicationClock()
+
+    def test_changes_at_publication_time(self):
+        "The date should stay the same until 23:00 and then change"
+        with time_machine.travel("2021-02-01 09:00:00 +0000", tick=False):
+            self.assertEqual(
+                self.clock.most_recent_entry_date(), make_date("1668-01-31")
+            )
+        with time_machine.travel("2021-02-01 22:59:59 +0000", tick=False):
+            self.assertEqual(
+                self.clock.most_recent_entry_date(), make_date("1668-01-31")
+            )
+        with time_machine.travel("2021-02-01 23:00:00 +0000", tick=False):
+            self.assertEqual(
+                self.clock.most_recent_entry_date(), make_date("1668-02-01")
+            )
+
+    def test_going_back_in_time(self):
+        "A remembered date shouldn't be used for an earlier time"
+        with time_machine.travel("2021-02-01 23:00:00 +0000", tick=False):
+            self.clock.most_recent_entry_date()
+        with time_machine.travel("2021-01-15 12:00:00 +0000", tick=False):
+            self.assertEqual(
+                self.clock.most_recent_entry_date(), make_date("1668-01-14")
+            )
+
+    @time_machine.travel("2021-02-01 12:00:00 +0000", tick=False)
+    def test_years_offset_changed(self):
+        "A remembered date shouldn't be used if YEARS_OFFSET has changed"
+        self.clock.most_recent_entry_date()
+        with override_settings(YEARS_OFFSET=360):
+            self.assertEqual(
+                self.clock.most_recent_entry_date(), make_date("1661-01-31")
+            )
+
+    @time_machine.travel("2021-02-01 12:00:00 +0000", tick=False)
+    def test_next_publication_time(self):
+        self.assertEqual(
+            self.clock.next_publication_time(),
+            datetime(2021, 2, 1, 23, 0, 0, tzinfo=UTC),
+        )
+
+    @time_machine.travel("2021-02-01 23:30:00 +0000", tick=False)
+    def test_cache_key(self):
+        self.assertEqual(self.clock.cache_key("home"), "home:1668-02-01")
@@ -2,7 +2,9 @@ from django.http.response import Http404
 
 from pepysdiary.common.utilities import make_date
 from pepysdiary.diary import views
+from pepysdiary.diary.date_index import entry_date_index
 from pepysdiary.diary.factories import EntryFactory, SummaryFactory
+from pepysdiary.diary.models import Entry
 from pepysdiary.encyclopedia.factories import TopicFactory
 from tests import ViewTestCase
 
@@ -30,6 +32,24 @@ class EntryDetailViewTestCase(ViewTestCase):
                 self.request, year="1661", month="01", day="02"
             )
 
+    def test_entry_missing_from_index(self):
+        "It should find an Entry that was added by another process"
+        EntryFactory(diary_date=make_date("1661-01-01"))
+        entry_date_index.exists(make_date("1661-01-01"))  # Load the index.
+        # Like another process adding one: no signals to update our index.
+        Entry.objects.bulk_create(
+            [EntryFactory.build(diary_date=make_date("1661-01-02"))]
+        )
+
+        response = views.EntryDetailView.as_view()(
+            self.request, year="1661", month="01", day="02"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context_data["previous_entry"].diary_date,
+            make_date("1661-01-01"),
+        )
+
     def test_context_data_entry(self):
         "The entry should be sent to the template"
         entry = EntryFactory(diary_date=make_date("1661-01-02"))
@@ -87,6 +107,19 @@ class EntryDetailViewTestCase(ViewTestCase):
         self.assertIn("next_entry", response.context_data)
         self.assertEqual(response.context_data["next_entry"], next_entry)
 
+    def test_next_previous_num_queries(self):
+        "Finding next and previous entries shouldn't need any queries"
+        EntryFactory(diary_date=make_date("1661-01-01"))
+        EntryFactory(diary_date=make_date("1661-01-02"))
+        EntryFactory(diary_date=make_date("1661-01-03"))
+        view = views.EntryDetailView()
+        view.date = make_date("1661-01-02")
+        view.get_next_previous()  # Load the index.
+        with self.assertNumQueries(0):
+            context = view.get_next_previous()
+        self.assertEqual(context["previous_entry"].diary_date, make_date("1661-01-01"))
+        self.assertEqual(context["next_entry"].diary_date, make_date("1661-01-03"))
+
     def test_context_data_no_next_previous(self):
         "If there's no next and previous entries, None is sent to the template"
         EntryFactory(diary_date=make_date("1661-01-02"))
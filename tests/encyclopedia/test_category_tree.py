@@ -0,0 +1,119 @@
+from django.test import TestCase
+
+from pepysdiary.encyclopedia.category_tree import category_tree
+from pepysdiary.encyclopedia.models import Category
+
+
+class CategoryTreeTestCase(TestCase):
+    def setUp(self):
+        self.animals = Category.add_root(id=1001, title="Animals", slug="animals")
+        self.dogs = self.animals.add_child(id=1002, title="Dogs", slug="dogs")
+        self.terriers = self.dogs.add_child(id=1003, title="Terriers", slug="terriers")
+        self.plants = Category.add_root(id=1004, title="Plants", slug="plants")
+
+    def test_root_id(self):
+        self.assertEqual(category_tree.root_id(self.animals), 1001)
+        self.assertEqual(category_tree.root_id(self.terriers), 1001)
+        self.assertEqual(category_tree.root_id(self.plants), 1004)
+
+    def test_slug_path(self):
+        self.assertEqual(category_tree.slug_path(self.animals), "animals")
+        self.assertEqual(
+            category_tree.slug_path(self.terriers), "animals/dogs/terriers"
+        )
+        self.assertIsNone(category_tree.slug_path(Category(pk=9999)))
+
+    def test_get(self):
+        node = category_tree.get(1002)
+        self.assertEqual(node.slug, "dogs")
+        self.assertEqual(node.title, "Dogs")
+        self.assertEqual(node.depth, 2)
+        self.assertEqual(node.root_id, 1001)
+        self.assertEqual(node.children_ids, (1003,))
+        self.assertEqual(node.get_absolute_url(), "/encyclopedia/animals/dogs/")
+
+    def test_nodes(self):
+        "It should return all the nodes in tree order"
+        self.assertEqual(
+            [n.id for n in category_tree.nodes()], [1001, 1002, 1003, 1004]
+        )
+
+    def test_ancestors(self):
+        self.assertEqual(category_tree.ancestors(self.animals), [])
+        self.assertEqual(
+            [n.id for n in category_tree.ancestors(self.terriers)], [1001, 1002]
+        )
+
+    def test_ancestors_not_in_tree(self):
+        "It should get them from the database if the tree is out of date"
+        category_tree.nodes()  # Load the tree.
+        # Like another process moving them: no signals to update our tree.
+        for category in Category.objects.filter(path__startswith=self.animals.path):
+            Category.objects.filter(pk=category.pk).update(path="Z" + category.path[1:])
+        terriers = Category.objects.get(pk=1003)
+
+        ancestors = category_tree.ancestors(terriers)
+
+        self.assertEqual([c.pk for c in ancestors], [1001, 1002])
+        self.assertEqual(ancestors[1].title, "Dogs")
+
+    def test_children(self):
+        animals = Category.objects.get(pk=1001)
+        cats = animals.add_child(id=1005, title="Cats", slug="cats")
+        self.assertEqual(
+            [n.id for n in category_tree.children(self.animals)], [cats.pk, 1002]
+        )
+        self.assertEqual(category_tree.children(self.terriers), [])
+
+    def test_get_absolute_url_no_queries(self):
+        category_tree.root_id(self.animals)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.terriers.get_absolute_url(), "/encyclopedia/animals/dogs/terriers/"
+            )
+
+    def test_slug_change(self):
+        "It should know about a Category's changed slug"
+        category_tree.root_id(self.animals)
+        self.dogs.slug = "doggos"
+        self.dogs.save()
+
+        self.assertEqual(
+            self.terriers.get_absolute_url(), "/encyclopedia/animals/doggos/terriers/"
+        )
+
+    def test_no_queries_once_loaded(self):
+        category_tree.root_id(self.animals)
+        with self.assertNumQueries(0):
+            category_tree.root_id(self.terriers)
+
+    def test_topic_count_change_keeps_tree(self):
+        "Saving a Category without changing its path shouldn't reload the tree"
+        category_tree.root_id(self.animals)
+        self.dogs.topic_count = 3
+        self.dogs.save()
+        with self.assertNumQueries(0):
+            category_tree.root_id(self.terriers)
+
+    def test_move(self):
+        "It should know about moved Categories"
+        category_tree.root_id(self.animals)
+        self.dogs.move(self.plants, pos="sorted-child")
+
+        terriers = Category.objects.get(pk=self.terriers.pk)
+        self.assertEqual(category_tree.root_id(terriers), 1004)
+
+    def test_move_root(self):
+        "It should know about a root Category that's moved into another"
+        category_tree.root_id(self.animals)
+        path = self.plants.path
+        self.plants.move(self.animals, pos="sorted-child")
+
+        self.assertIsNone(category_tree.root_id(Category(path=path)))
+
+    def test_delete(self):
+        category_tree.root_id(self.animals)
+        path = self.plants.path
+        self.plants.delete()
+
+        self.assertIsNone(category_tree.root_id(Category(path=path)))
@@ -1,8 +1,14 @@
 from unittest.mock import call, patch
 
+from django.conf import settings
 from django.test import TestCase
 
+from pepysdiary.common.utilities import make_datetime
+from pepysdiary.encyclopedia.factories import TopicFactory
 from pepysdiary.encyclopedia.models import Category, Topic
+from pepysdiary.encyclopedia.wikipedia_fetcher import WikipediaFetcher
+
+from .test_wikipedia_fetcher import StubWikipediaServerMixin
 
 
 class CategoryManagerTestCase(TestCase):
@@ -28,6 +34,30 @@ class TopicManagerTestCase(TestCase):
     def test_pepys_homes_ids(self):
         self.assertEqual(Topic.objects.pepys_homes_ids(), [102, 1023])
 
+    def test_update_order_titles(self):
+        "It should update the changed order_titles with one UPDATE"
+        people = Category.add_root(id=settings.PEOPLE_CATEGORY_ID, title="People")
+        topics = [
+            TopicFactory(title=title)
+            for title in ["Thomas Agar", "Mrs Andrews", "Ale, buttered"]
+        ]
+        people.topics.add(topics[0], topics[1])
+        Topic.objects.filter(pk__in=[t.pk for t in topics]).update(order_title="")
+
+        # SELECT of people, SELECT of Topics, UPDATE:
+        with self.assertNumQueries(3):
+            order_titles = Topic.objects.update_order_titles([t.pk for t in topics])
+
+        self.assertEqual(order_titles[topics[0].pk], "Agar, Thomas")
+        self.assertEqual(
+            list(
+                Topic.objects.filter(pk__in=[t.pk for t in topics])
+                .order_by("pk")
+                .values_list("order_title", flat=True)
+            ),
+            ["Agar, Thomas", "Andrews, Mrs", "Ale, buttered"],
+        )
+
 
 class TopicManagerFetchWikipediaTextsTestCase(TestCase):
     "Testing TopicManager.fetch_wikipedia_texts()"
@@ -123,6 +153,75 @@ class TopicManagerFetchWikipediaTextsTestCase(TestCase):
         self.assertEqual(len(updated["failure"]), 0)
 
 
+class TopicManagerFetchWikipediaTextsConcurrentlyTestCase(
+    StubWikipediaServerMixin, TestCase
+):
+    "Testing TopicManager.fetch_wikipedia_texts() with concurrency"
+
+    fixtures = ["tests/encyclopedia/fixtures/wikipedia_test.json"]
+
+    def fetch(self, **kwargs):
+        with patch.object(WikipediaFetcher, "base_url", self.base_url):
+            return Topic.objects.fetch_wikipedia_texts(
+                concurrency=2, rate=100, processes=0, **kwargs
+            )
+
+    def test_it_saves_returned_texts(self):
+        updated = self.fetch(topic_ids=[112, 344, 6079])
+        self.assertEqual(sorted(updated["success"]), [112, 344])
+        self.assertEqual(updated["failure"], [])
+        self.assertEqual(updated["unchanged"], [])
+
+        topic = Topic.objects.get(pk=112)
+        self.assertEqual(
+            topic.wikipedia_html, "<p>Edward_Montagu%2C_1st_Earl_of_Sandwich</p>"
+        )
+        self.assertGreater(
+            topic.wikipedia_last_fetch, make_datetime("2015-03-03 00:00:00")
+        )
+        # Nothing else about the Topic should have been changed:
+        self.assertEqual(
+            topic.title, 'Sir Edward Mountagu ("my Lord," Earl of Sandwich)'
+        )
+
+    def test_unchanged(self):
+        "Pages fetched before should only be fetched if they've changed"
+        Topic.objects.filter(pk=112).update(wikipedia_html="<p>Old</p>")
+        updated = self.fetch(topic_ids=[112, 344])
+
+        self.assertEqual(updated["success"], [344])
+        self.assertEqual(updated["unchanged"], [112])
+        topic = Topic.objects.get(pk=112)
+        self.assertEqual(topic.wikipedia_html, "<p>Old</p>")
+        self.assertGreater(
+            topic.wikipedia_last_fetch, make_datetime("2015-03-03 00:00:00")
+        )
+        self.assertIn(
+            (
+                "/wiki/Edward_Montagu%2C_1st_Earl_of_Sandwich?action=render",
+                "Tue, 03 Mar 2015 00:00:00 GMT",
+            ),
+            self.server.requested,
+        )
+
+    def test_force(self):
+        "With force, unchanged pages should be fetched anyway"
+        Topic.objects.filter(pk=112).update(wikipedia_html="<p>Old</p>")
+        updated = self.fetch(topic_ids=[112], force=True)
+        self.assertEqual(updated["success"], [112])
+
+    def test_num(self):
+        updated = self.fetch(num=2)
+        # Those not fetched, or least recently fetched:
+        self.assertEqual(sorted(updated["success"]), [344, 9711])
+
+    def test_failure(self):
+        Topic.objects.filter(pk=112).update(wikipedia_fragment="Missing")
+        updated = self.fetch(topic_ids=[112])
+        self.assertEqual(updated["failure"], [112])
+        self.assertEqual(Topic.objects.get(pk=112).wikipedia_html, "")
+
+
 class TopicManagerMakeOrderTitleTestCase(TestCase):
     "Testing TopicManager.make_order_title()"
 
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 from django_comments.moderation import AlreadyModerated, moderator
 
@@ -178,6 +180,58 @@ class TopicTestCase(TestCase):
         topic = PlaceTopicFactory(title="The Cats", order_title="")
         self.assertEqual(topic.order_title, "Cats, The")
 
+    def test_order_title_title_changed(self):
+        "If the title changes, order_title should be re-made"
+        topic = PlaceTopicFactory(title="The Cats")
+        topic = Topic.objects.get(pk=topic.pk)
+        topic.title = "The Dogs"
+        topic.save()
+        topic.refresh_from_db()
+        self.assertEqual(topic.order_title, "Dogs, The")
+
+    def test_order_title_added_to_people(self):
+        "If a Topic is added to the People category, order_title should change"
+        people = CategoryFactory(id=category_lookups.PEOPLE)
+        topic = TopicFactory(title="Bob Ferris")
+        self.assertEqual(topic.order_title, "Bob Ferris")
+
+        topic.categories.add(people)
+        self.assertEqual(topic.order_title, "Ferris, Bob")
+        topic.refresh_from_db()
+        self.assertEqual(topic.order_title, "Ferris, Bob")
+
+        people.topics.remove(topic)
+        topic.refresh_from_db()
+        self.assertEqual(topic.order_title, "Bob Ferris")
+
+    def test_html_not_remade_if_unchanged(self):
+        "Saving shouldn't re-render Markdown if its source hasn't changed"
+        topic = TopicFactory(summary="Hello.", wheatley="Bye.")
+        topic = Topic.objects.get(pk=topic.pk)
+        topic.comment_count = 3
+        with patch("pepysdiary.encyclopedia.models.markdown") as markdown:
+            topic.save()
+            markdown.assert_not_called()
+
+    def test_html_remade_if_changed(self):
+        topic = TopicFactory(summary="Hello.", wheatley="Bye.")
+        topic = Topic.objects.get(pk=topic.pk)
+        topic.summary = "Hi."
+        topic.save()
+        self.assertEqual(topic.summary_html, "<p>Hi.</p>")
+        self.assertEqual(topic.wheatley_html, "<p>Bye.</p>")
+
+    def test_save_update_fields(self):
+        "If only saving some fields, HTML should only be made for those"
+        topic = TopicFactory(summary="Hello.", wheatley="Bye.")
+        topic.summary = "Hi."
+        topic.wheatley = "Ta-ta."
+        topic.save(update_fields=["summary"])
+        topic.refresh_from_db()
+        self.assertEqual(topic.summary_html, "<p>Hi.</p>")
+        self.assertEqual(topic.wheatley, "Bye.")
+        self.assertEqual(topic.wheatley_html, "<p>Bye.</p>")
+
     def test_has_location_true(self):
         topic = TopicFactory(latitude=0, longitude=0)
         self.assertTrue(topic.has_location)
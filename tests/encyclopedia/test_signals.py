@@ -1,6 +1,7 @@
 from django.test import TestCase
 
 from pepysdiary.encyclopedia.factories import CategoryFactory, TopicFactory
+from pepysdiary.encyclopedia.models import Category
 
 
 class TopicCategoriesChangedTestCase(TestCase):
@@ -58,3 +59,40 @@ class TopicCategoriesChangedTestCase(TestCase):
         topic.delete()
         category.refresh_from_db()
         self.assertEqual(category.topic_count, 0)
+
+    def test_clearing_topic_categories(self):
+        "When we clear a topic's categories, their topic counts should change"
+        category_1 = Category.add_root(title="Animals", slug="animals")
+        category_2 = Category.add_root(title="Plants", slug="plants")
+        topic = TopicFactory(categories=[category_1, category_2])
+
+        topic.categories.clear()
+        category_1.refresh_from_db()
+        category_2.refresh_from_db()
+        self.assertEqual(category_1.topic_count, 0)
+        self.assertEqual(category_2.topic_count, 0)
+
+    def test_clearing_category_topics(self):
+        "When we clear a category's topics, its topic count should change"
+        category = CategoryFactory()
+        TopicFactory(categories=[category])
+        TopicFactory(categories=[category])
+        category.refresh_from_db()
+        self.assertEqual(category.topic_count, 2)
+
+        category.topics.clear()
+        category.refresh_from_db()
+        self.assertEqual(category.topic_count, 0)
+
+    def test_setting_categories_num_queries(self):
+        "All the categories' counts should be updated in one query"
+        # (Not using the People category's ID, which would mean more queries.)
+        categories = [
+            Category.add_root(id=1000 + i, title=title, slug=title.lower())
+            for i, title in enumerate(["Animals", "Plants", "Minerals"])
+        ]
+        topic = TopicFactory()
+
+        # 2 SELECTs of existing categories, 1 INSERT, 1 UPDATE of counts:
+        with self.assertNumQueries(4):
+            topic.categories.set(categories)
@@ -1,10 +1,75 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
 from unittest.mock import patch
 
 import responses
 from django.test import TestCase
 from requests.exceptions import ConnectionError, Timeout, TooManyRedirects
+from responses import matchers
 
-from pepysdiary.encyclopedia.wikipedia_fetcher import WikipediaFetcher
+from pepysdiary.common.utilities import make_datetime
+from pepysdiary.encyclopedia.wikipedia_fetcher import (
+    ConcurrentWikipediaFetcher,
+    TokenBucket,
+    WikipediaFetcher,
+)
+
+
+class StubWikipediaHandler(BaseHTTPRequestHandler):
+    """
+    Serves "<p>Page_name</p><script></script>" for any page, except:
+    * 404 for "Missing".
+    * 304 if there's an If-Modified-Since header.
+    """
+
+    def do_GET(self):
+        self.server.requested.append((self.path, self.headers.get("If-Modified-Since")))
+        name = self.path.split("?")[0].rsplit("/", 1)[-1]
+        if name == "Missing":
+            self.send_response(404)
+            self.end_headers()
+        elif self.headers.get("If-Modified-Since"):
+            self.send_response(304)
+            self.end_headers()
+        else:
+            body = f"<p>{name}</p><script>alert(1)</script>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubWikipediaServerMixin:
+    """
+    Runs a local HTTP server, using StubWikipediaHandler, for the duration
+    of the TestCase. Its URL for pages is in self.base_url, and the
+    (path, If-Modified-Since) of each request is in self.server.requested.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubWikipediaHandler)
+        cls.server.daemon_threads = True
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}/wiki/"
+        thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.server.requested = []
 
 
 class FetchTestCase(TestCase):
@@ -41,6 +106,25 @@ class FetchTestCase(TestCase):
             self.assertEqual(result["content"], message)
             responses.reset()
 
+    @responses.activate
+    def test_it_sends_if_modified_since(self):
+        "If passed modified_since it should send it, and handle a 304"
+        responses.add(
+            responses.GET,
+            f"https://en.wikipedia.org/wiki/{self.page_name}",
+            status=304,
+            match=[
+                matchers.query_param_matcher({"action": "render"}),
+                matchers.header_matcher(
+                    {"If-Modified-Since": "Tue, 03 Mar 2015 12:30:00 GMT"}
+                ),
+            ],
+        )
+        result = WikipediaFetcher().fetch(
+            self.page_name, modified_since=make_datetime("2015-03-03 12:30:00")
+        )
+        self.assertEqual(result, {"success": True, "content": None})
+
     @responses.activate
     def test_it_handles_404s(self):
         self.add_response(body="<h1>Not found</h1>", status=404)
@@ -150,3 +234,76 @@ class FetchTestCase(TestCase):
         )
         out_html = "<div> </div><div>This should show up.</div>"
         self.assertEqual(WikipediaFetcher()._tidy_html(in_html), out_html)
+
+    def test_it_matches_tidying_with_bleach(self):
+        "The lxml sanitizer should make the same HTML as bleach and BeautifulSoup"
+        pages = sorted(
+            (Path(__file__).parent / "fixtures" / "wikipedia_pages").glob("*.html")
+        )
+        self.assertTrue(pages)
+        fetcher = WikipediaFetcher()
+        for path in pages:
+            with self.subTest(page=path.name):
+                html = path.read_text(encoding="utf-8")
+                self.assertEqual(
+                    fetcher._tidy_html(html), fetcher._tidy_html_with_bleach(html)
+                )
+
+
+class TokenBucketTestCase(TestCase):
+    def test_it_limits_the_rate(self):
+        bucket = TokenBucket(rate=50)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        # The first is immediate, then one every 0.02 seconds:
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_it_allows_bursts(self):
+        bucket = TokenBucket(rate=1, capacity=3)
+        start = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+class ConcurrentWikipediaFetcherTestCase(StubWikipediaServerMixin, TestCase):
+    def fetch_many(self, pages, **kwargs):
+        fetcher = ConcurrentWikipediaFetcher(
+            concurrency=3, rate=100, base_url=self.base_url, **kwargs
+        )
+        return dict(fetcher.fetch_many(pages))
+
+    def test_it_fetches_and_tidies(self):
+        results = self.fetch_many(
+            [(1, "Samuel_Pepys", None), (2, "Missing", None), (3, "Zeeland", None)],
+            processes=0,
+        )
+        self.assertEqual(
+            results,
+            {
+                1: {"success": True, "content": "<p>Samuel_Pepys</p>"},
+                2: {"success": False, "content": "HTTP Error: 404"},
+                3: {"success": True, "content": "<p>Zeeland</p>"},
+            },
+        )
+        self.assertEqual(len(self.server.requested), 3)
+
+    def test_it_tidies_in_processes(self):
+        results = self.fetch_many(
+            [(1, "Samuel_Pepys", None), (2, "Zeeland", None)], processes=2
+        )
+        self.assertEqual(results[1]["content"], "<p>Samuel_Pepys</p>")
+        self.assertEqual(results[2]["content"], "<p>Zeeland</p>")
+
+    def test_unchanged(self):
+        "It should send If-Modified-Since and return None content for a 304"
+        results = self.fetch_many(
+            [(1, "Samuel_Pepys", make_datetime("2015-03-03 12:30:00"))],
+            processes=0,
+        )
+        self.assertEqual(results, {1: {"success": True, "content": None}})
+        self.assertEqual(
+            self.server.requested,
+            [("/wiki/Samuel_Pepys?action=render", "Tue, 03 Mar 2015 12:30:00 GMT")],
+        )
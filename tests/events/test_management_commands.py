@@ -0,0 +1,55 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from pepysdiary.common.utilities import make_date
+from pepysdiary.events.factories import DayEventFactory
+from pepysdiary.events.models import DayEvent
+
+
+class ImportSuntimesTestCase(TestCase):
+    def test_imports(self):
+        out = StringIO()
+        call_command("import_suntimes", stdout=out)
+
+        events = DayEvent.objects.filter(
+            source=DayEvent.Source.TIMEANDDATE, event_date=make_date("1660-01-01")
+        ).order_by("order")
+        self.assertEqual(len(events), 2)
+        self.assertTrue(events[0].title.endswith(" sunrise"))
+        self.assertTrue(events[1].title.endswith(" sunset"))
+        self.assertIn(" created, 0 updated, 0 the same", out.getvalue())
+
+    def test_unchanged(self):
+        "Running it again should change nothing, with one query"
+        call_command("import_suntimes", stdout=StringIO())
+        out = StringIO()
+        with self.assertNumQueries(1):
+            call_command("import_suntimes", stdout=out)
+        self.assertIn("DONE: 0 created, 0 updated, ", out.getvalue())
+
+
+class FetchParliamentURLsTestCase(TestCase):
+    def test_from_fixture(self):
+        "It should create DayEvents, and delete ones no longer in the data"
+        old = DayEventFactory(
+            source=DayEvent.Source.PARLIAMENT,
+            event_date=make_date("1660-01-02"),
+            url="https://example.com/old",
+        )
+        out = StringIO()
+        call_command("fetch_parliament_urls", "--from-fixture", stdout=out)
+
+        self.assertFalse(DayEvent.objects.filter(pk=old.pk).exists())
+        event = DayEvent.objects.get(
+            url="https://www.british-history.ac.uk/commons-jrnl/vol7/pp801-802"
+        )
+        self.assertEqual(event.event_date, make_date("1660-01-02"))
+        self.assertEqual(event.title, "House of Commons")
+        self.assertIn("0 updated, 0 the same, 1 deleted", out.getvalue())
+
+        out = StringIO()
+        with self.assertNumQueries(1):
+            call_command("fetch_parliament_urls", "--from-fixture", stdout=out)
+        self.assertIn("DONE: 0 created, 0 updated, ", out.getvalue())
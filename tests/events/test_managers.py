@@ -0,0 +1,113 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from pepysdiary.common.utilities import make_date
+from pepysdiary.events.factories import DayEventFactory
+from pepysdiary.events.models import DayEvent
+from pepysdiary.events.on_this_day import on_this_day
+
+
+class DayEventManagerTestCase(TestCase):
+    def setUp(self):
+        self.start_date = make_date("1660-01-01")
+        self.end_date = make_date("1660-12-31")
+
+    def sync(self, events, **kwargs):
+        return DayEvent.objects.sync_source(
+            DayEvent.Source.TIMEANDDATE,
+            events,
+            key_fields=("event_date", "order"),
+            start_date=self.start_date,
+            end_date=self.end_date,
+            **kwargs,
+        )
+
+    def test_sync_source(self):
+        "It should create, update and leave DayEvents"
+        date = make_date("1660-01-01")
+        same = DayEventFactory(
+            source=DayEvent.Source.TIMEANDDATE, event_date=date, order=1, title="A"
+        )
+        changed = DayEventFactory(
+            source=DayEvent.Source.TIMEANDDATE, event_date=date, order=2, title="B"
+        )
+        # A different source, so shouldn't be touched:
+        other = DayEventFactory(
+            source=DayEvent.Source.GADBURY, event_date=date, order=1, title="Z"
+        )
+
+        counts = self.sync(
+            [
+                {"event_date": date, "order": 1, "title": "A"},
+                {"event_date": date, "order": 2, "title": "C"},
+                {"event_date": make_date("1660-01-02"), "order": 1, "title": "D"},
+            ]
+        )
+
+        self.assertEqual(
+            counts, {"created": 1, "updated": 1, "unchanged": 1, "deleted": 0}
+        )
+        self.assertEqual(DayEvent.objects.get(pk=same.pk).title, "A")
+        self.assertEqual(DayEvent.objects.get(pk=changed.pk).title, "C")
+        self.assertEqual(DayEvent.objects.get(pk=other.pk).title, "Z")
+        new = DayEvent.objects.get(title="D")
+        self.assertEqual(new.source, DayEvent.Source.TIMEANDDATE)
+        self.assertEqual(new.url, "")
+
+    def test_sync_source_unchanged(self):
+        "Syncing the same data again should only do one query"
+        events = [
+            {"event_date": make_date("1660-01-01"), "order": 1, "title": "A"},
+            {"event_date": make_date("1660-01-01"), "order": 2, "title": "B"},
+        ]
+        self.sync(events)
+        with self.assertNumQueries(1):
+            counts = self.sync(events)
+        self.assertEqual(
+            counts, {"created": 0, "updated": 0, "unchanged": 2, "deleted": 0}
+        )
+
+    def test_sync_source_delete_missing(self):
+        "It should only delete missing DayEvents within the dates if asked"
+        date = make_date("1660-01-01")
+        DayEventFactory(source=DayEvent.Source.TIMEANDDATE, event_date=date, order=1)
+        outside = DayEventFactory(
+            source=DayEvent.Source.TIMEANDDATE, event_date=make_date("1661-01-01")
+        )
+
+        self.assertEqual(self.sync([])["deleted"], 0)
+        self.assertEqual(self.sync([], delete_missing=True)["deleted"], 1)
+        self.assertEqual(list(DayEvent.objects.all()), [outside])
+
+    def test_sync_source_duplicates(self):
+        "Existing DayEvents with the same key should be reduced to one"
+        date = make_date("1660-01-01")
+        first = DayEventFactory(
+            source=DayEvent.Source.TIMEANDDATE, event_date=date, order=1, title="A"
+        )
+        DayEventFactory(
+            source=DayEvent.Source.TIMEANDDATE, event_date=date, order=1, title="A"
+        )
+
+        counts = self.sync([{"event_date": date, "order": 1, "title": "A"}])
+
+        self.assertEqual(counts["deleted"], 1)
+        self.assertEqual(list(DayEvent.objects.all()), [first])
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_sync_source_on_this_day(self):
+        "It should update the on-this-day index for the dates it changes"
+        cache.clear()
+        date = make_date("1660-01-01")
+        on_this_day.get(date)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sync([{"event_date": date, "order": 1, "title": "8:00 am sunrise"}])
+
+        self.assertEqual(
+            on_this_day.get(date)["events"],
+            [(DayEvent.Source.TIMEANDDATE, [("8:00 am sunrise", "")])],
+        )
+        cache.clear()
@@ -0,0 +1,134 @@
+from io import StringIO
+
+import time_machine
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from pepysdiary.common.utilities import make_date
+from pepysdiary.diary.factories import EntryFactory
+from pepysdiary.events.factories import DayEventFactory
+from pepysdiary.events.models import DayEvent
+from pepysdiary.events.on_this_day import on_this_day
+from pepysdiary.letters.factories import LetterFactory
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class OnThisDayIndexTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.date = make_date("1660-01-01")
+        DayEventFactory(
+            title="Event 2",
+            url="http://example.com/2",
+            source=DayEvent.Source.PARLIAMENT,
+            event_date=self.date,
+        )
+        DayEventFactory(
+            title="Event 1",
+            url="http://example.com/1",
+            source=DayEvent.Source.GADBURY,
+            event_date=self.date,
+        )
+        # No source, so shouldn't be included:
+        DayEventFactory(title="Event 3", source=None, event_date=self.date)
+        EntryFactory(title="Entry 1", diary_date=self.date)
+        LetterFactory(title="Letter 1", slug="letter1", letter_date=self.date)
+        # Another date:
+        DayEventFactory(event_date=make_date("1660-01-02"))
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_get(self):
+        self.assertEqual(
+            on_this_day.get(self.date),
+            {
+                "entries": [("Entry 1", "/diary/1660/01/01/")],
+                "letters": [("Letter 1", "/letters/1660/01/01/letter1/")],
+                "events": [
+                    (DayEvent.Source.GADBURY, [("Event 1", "http://example.com/1")]),
+                    (
+                        DayEvent.Source.PARLIAMENT,
+                        [("Event 2", "http://example.com/2")],
+                    ),
+                ],
+            },
+        )
+
+    def test_get_empty(self):
+        self.assertEqual(
+            on_this_day.get(make_date("1660-02-01")),
+            {"entries": [], "letters": [], "events": []},
+        )
+
+    def test_get_cached(self):
+        with self.assertNumQueries(3):
+            on_this_day.get(self.date)
+        with self.assertNumQueries(0):
+            on_this_day.get(self.date)
+
+    def test_cache_expires(self):
+        "Dates shouldn't be cached forever"
+        with time_machine.travel("2021-04-10 12:00:00 +0000", tick=False) as t:
+            on_this_day.build()
+            on_this_day.get(self.date)
+            t.move_to("2021-04-17 12:00:01 +0000")
+            with self.assertNumQueries(3):
+                on_this_day.get(self.date)
+
+    def test_build(self):
+        "It should cache every date with anything on it"
+        with self.assertNumQueries(3):
+            self.assertEqual(on_this_day.build(), 2)
+        with self.assertNumQueries(0):
+            on_this_day.get(self.date)
+            on_this_day.get(make_date("1660-01-02"))
+
+    def test_saved(self):
+        "Saving an object should update its date"
+        on_this_day.get(self.date)
+        with self.captureOnCommitCallbacks(execute=True):
+            LetterFactory(title="Letter 2", letter_date=self.date)
+        self.assertEqual(
+            [title for title, url in on_this_day.get(self.date)["letters"]],
+            ["Letter 1", "Letter 2"],
+        )
+
+    def test_moved(self):
+        "Changing an object's date should update both its old and new dates"
+        new_date = make_date("1660-01-02")
+        on_this_day.get(self.date)
+        on_this_day.get(new_date)
+        entry = EntryFactory(diary_date=make_date("1660-01-03"))
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.diary_date = new_date
+            entry.save()
+        self.assertEqual(len(on_this_day.get(new_date)["entries"]), 1)
+
+        on_this_day.get(self.date)
+        with self.captureOnCommitCallbacks(execute=True):
+            DayEvent.objects.get(title="Event 1").delete()
+            event = DayEvent.objects.get(title="Event 2")
+            event.event_date = make_date("1660-01-03")
+            event.save()
+        self.assertEqual(on_this_day.get(self.date)["events"], [])
+
+    def test_irrelevant_save(self):
+        "Saving fields the index doesn't use shouldn't change it"
+        letter = LetterFactory(letter_date=self.date)
+        on_this_day.get(self.date)
+        with self.captureOnCommitCallbacks(execute=True):
+            letter.comment_count = 3
+            letter.save(update_fields=["comment_count"])
+        with self.assertNumQueries(0):
+            on_this_day.get(self.date)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("build_on_this_day", stdout=out)
+        self.assertIn("Cached 2 dates in ", out.getvalue())
+        with self.assertNumQueries(0):
+            on_this_day.get(self.date)
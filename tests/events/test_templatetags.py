@@ -1,4 +1,5 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 from pepysdiary.common.utilities import make_date
 from pepysdiary.diary.factories import EntryFactory
@@ -188,3 +189,19 @@ class EventsTemplateTagsTestCase(TestCase):
         "When there's nothing to show, an empty string should be returned"
         html = events_for_day_in_sidebar(make_date("1660-02-01"))
         self.assertEqual(html, "")
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_events_for_day_in_sidebar_cached(self):
+        "It should use the on-this-day index, updated when a DayEvent is saved"
+        cache.clear()
+        events_for_day_in_sidebar(self.date)
+        with self.assertNumQueries(0):
+            events_for_day_in_sidebar(self.date)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DayEventFactory(event_date=self.date, title="New event")
+
+        self.assertIn("New event", events_for_day_in_sidebar(self.date))
+        cache.clear()
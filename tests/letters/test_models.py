@@ -62,6 +62,28 @@ class LetterTestCase(TestCase):
         self.assertEqual(len(topic_3_refs), 1)
         self.assertEqual(topic_3_refs[0], letter)
 
+    def test_makes_references_num_queries(self):
+        "It should only write the references that have changed"
+        topic_1 = TopicFactory(title="Cats")
+        topic_2 = TopicFactory(title="Dogs")
+        letter = LetterFactory(
+            text=(
+                f'<a href="http://www.pepysdiary.com/encyclopedia/{topic_1.id}/">cats</a>'
+            ),
+            footnotes=(
+                f'<a href="http://www.pepysdiary.com/encyclopedia/{topic_2.id}/">dogs</a>'
+            ),
+        )
+
+        # Get the Topic IDs, and the existing references. Nothing to write:
+        with self.assertNumQueries(2):
+            Letter.objects.make_references([letter])
+
+        self.assertEqual(
+            set(topic_1.letter_references.all()) | set(topic_2.letter_references.all()),
+            {letter},
+        )
+
     def test_makes_references_invalid_link(self):
         "If a link looks like a reference but is invalid, should be ignored"
         topic_1 = TopicFactory(title="Cats")
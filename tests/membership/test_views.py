@@ -8,12 +8,18 @@ from django.contrib.auth.tokens import default_token_generator
 from django.contrib.messages import get_messages
 from django.contrib.sites.models import Site
 from django.core import mail
+from django.db import connection
+from django.http import QueryDict
 from django.http.response import Http404
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 
-from pepysdiary.annotations.factories import PostAnnotationFactory
+from pepysdiary.annotations.factories import (
+    EntryAnnotationFactory,
+    PostAnnotationFactory,
+)
 from pepysdiary.common.factories import ConfigFactory
 from pepysdiary.common.utilities import make_datetime
 from pepysdiary.membership import views
@@ -575,6 +581,54 @@ class ProfileViewTestCase(ViewTestCase):
         self.assertEqual(data["comment_list"][1], annotation_1)
         self.assertEqual(data["comment_list"][2], annotation_2)
 
+    def test_annotations_objects_queries(self):
+        "Listing more Annotations shouldn't need more queries for their objects"
+        person = PersonFactory()
+        PostAnnotationFactory(user=person)
+        EntryAnnotationFactory(user=person)
+        # Load things that are only queried once per process, like the Config:
+        views.ProfileView.as_view()(self.request, pk=person.pk).render()
+
+        with CaptureQueriesContext(connection) as queries:
+            views.ProfileView.as_view()(self.request, pk=person.pk).render()
+
+        PostAnnotationFactory.create_batch(3, user=person)
+        EntryAnnotationFactory.create_batch(3, user=person)
+
+        with self.assertNumQueries(len(queries)):
+            response = views.ProfileView.as_view()(self.request, pk=person.pk)
+            response.render()
+        self.assertEqual(len(response.context_data["comment_list"]), 8)
+
+    def test_cursor_pagination(self):
+        "With a cursor GET arg, it should page through Annotations without OFFSET"
+        person = PersonFactory()
+        annotations = [
+            PostAnnotationFactory(
+                user=person, submit_date=make_datetime(f"2021-01-{i:02} 12:00:00")
+            )
+            for i in range(21, 0, -1)
+        ]
+
+        self.request.GET = QueryDict("cursor=")
+        response = views.ProfileView.as_view()(self.request, pk=person.pk)
+        page = response.context_data["page_obj"]
+        self.assertEqual(list(response.context_data["comment_list"]), annotations[:20])
+        self.assertTrue(page.has_next())
+
+        self.request.GET = QueryDict(f"cursor={page.next_cursor}")
+        response = views.ProfileView.as_view()(self.request, pk=person.pk)
+        self.assertEqual(list(response.context_data["comment_list"]), annotations[20:])
+
+        response.render()
+        self.assertContains(response, "?cursor=")
+
+    def test_invalid_cursor(self):
+        person = PersonFactory()
+        self.request.GET = QueryDict("cursor=foo")
+        with self.assertRaises(Http404):
+            views.ProfileView.as_view()(self.request, pk=person.pk)
+
 
 class RegisterViewTestCase(LoginTestCase):
     "Also testing their associated Forms"
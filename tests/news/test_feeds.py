@@ -1,4 +1,6 @@
 import time_machine
+from django.core.cache import cache
+from django.test import override_settings
 from django.utils.feedgenerator import rfc2822_date
 
 from pepysdiary.common.utilities import make_datetime
@@ -153,3 +155,21 @@ class LatestPostsFeedTestCase(FeedTestCase):
         self.assertEqual(len(items), 1)
 
         self.assertChildNodeContent(items[0], {"title": "Published Post"})
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_rendered_again_when_post_published(self):
+        "The cached feed should be forgotten when a Post is saved"
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            post = DraftPostFactory(title="Post")
+        channel = self.get_channel_element("/news/rss/")
+        self.assertEqual(len(channel.getElementsByTagName("item")), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.status = post.Status.PUBLISHED
+            post.save()
+
+        channel = self.get_channel_element("/news/rss/")
+        self.assertEqual(len(channel.getElementsByTagName("item")), 1)